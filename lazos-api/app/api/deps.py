@@ -1,18 +1,19 @@
 """
 API dependencies - Shared dependencies for route handlers
 """
-from typing import Generator
-from sqlalchemy.orm import Session
-from app.database import SessionLocal
+from typing import AsyncGenerator
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db, get_async_db  # noqa: F401 (re-export: los routes importan de deps)
+from app.db_router import get_replica_router, last_write
 
 
-def get_db() -> Generator[Session, None, None]:
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
     """
-    Dependency that provides a database session.
-    Yields a session and ensures it's closed after use.
+    Dependency that provides a read-only async session: a healthy replica
+    (round-robin) when DATABASE_REPLICA_URLS is set, otherwise the primary.
+    Clients that wrote recently only read from replicas that already have the write.
     """
-    db = SessionLocal()
-    try:
+    sessionmaker = get_replica_router().sessionmaker_for_read(last_write(request))
+    async with sessionmaker() as db:
         yield db
-    finally:
-        db.close()
@@ -0,0 +1,33 @@
+"""
+Respuestas JSON para los endpoints de lectura calientes (feed, mapa)
+
+FastAPI valida lo que devuelve el handler contra response_model, lo vuelve a
+convertir a tipos JSON (jsonable) y recién ahí lo encodea. Para filas que
+vienen de la base ya tipadas eso es trabajo repetido: estos handlers arman
+dicts con exactamente los campos del schema y los devuelven con
+TrustedJSONResponse, que los serializa directo con orjson (UUID, date,
+datetime y Enum incluidos). response_model se mantiene para OpenAPI y los
+tests verifican que el JSON sea idéntico al del camino validado.
+"""
+from typing import Any
+
+import orjson
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+
+
+class TrustedJSONResponse(ORJSONResponse):
+    """ORJSONResponse con datetimes UTC como "Z" (igual que pydantic)"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+
+
+def trusted_json(content: Any, response: Response) -> TrustedJSONResponse:
+    """
+    Devuelve content sin pasar por la validación de response_model.
+    `response` es el Response temporal del handler: al devolver una respuesta
+    propia FastAPI descarta sus headers, así que se copian (Cache-Control y
+    surrogate keys de cache_policy).
+    """
+    return TrustedJSONResponse(content, headers=dict(response.headers))
@@ -2,18 +2,24 @@
 Admin API endpoints
 """
 from fastapi import APIRouter, Depends, Header, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, func
+from sqlalchemy.orm import selectinload
 from uuid import UUID
 from typing import Optional
 from datetime import datetime
 
-from app.database import get_db
+from app.api.deps import get_async_db
 from app.models.report import Report
 from app.models.post import Post
 from app.models.post_image import PostImage
 from app.models.alert import Alert
 from app.config import settings
+from app.utils import metrics, circuit_breaker
+from app.utils.slow_queries import get_slow_query_log
+from app.services.response_cache import invalidate as invalidate_responses, POSTS, ALERTS
+from app.services.edge_cache import post_keys, alert_keys, schedule_purge
+from app.services.post_pipeline import PROCESSING_SERVICE, PROCESSING_ERROR_SERVICE
 
 router = APIRouter()
 
@@ -32,7 +38,7 @@ def verify_admin_password(x_admin_password: Optional[str] = Header(None)):
 @router.get("/admin/reports")
 async def list_pending_reports(
     resolved: bool = False,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _: str = Depends(verify_admin_password),
 ):
     """
@@ -46,13 +52,13 @@ async def list_pending_reports(
     - Alert details (if alert report)
     - Report count per post/alert
     """
-    # Query reports with post data
-    reports = (
-        db.query(Report)
-        .filter(Report.resolved == resolved)
+    # Query reports with post data (relaciones cargadas de antemano: en async no hay lazy load)
+    reports = (await db.execute(
+        select(Report)
+        .options(selectinload(Report.post), selectinload(Report.alert))
+        .where(Report.resolved == resolved)
         .order_by(Report.created_at.desc())
-        .all()
-    )
+    )).scalars().all()
 
     # Build response with post/alert data
     result = []
@@ -63,18 +69,17 @@ async def list_pending_reports(
             post = report.post
 
             # Get first image (primary or first by order)
-            first_image = (
-                db.query(PostImage)
-                .filter(PostImage.post_id == post.id)
+            first_image = (await db.execute(
+                select(PostImage)
+                .where(PostImage.post_id == post.id)
                 .order_by(PostImage.is_primary.desc(), PostImage.display_order)
-                .first()
-            )
+                .limit(1)
+            )).scalar_one_or_none()
 
             # Count total reports for this post
-            total_reports = (
-                db.query(func.count(Report.id))
-                .filter(Report.post_id == post.id, Report.resolved == False)
-                .scalar()
+            total_reports = await db.scalar(
+                select(func.count(Report.id))
+                .where(Report.post_id == post.id, Report.resolved == False)
             )
 
             result.append({
@@ -106,10 +111,9 @@ async def list_pending_reports(
             alert = report.alert
 
             # Count total reports for this alert
-            total_reports = (
-                db.query(func.count(Report.id))
-                .filter(Report.alert_id == alert.id, Report.resolved == False)
-                .scalar()
+            total_reports = await db.scalar(
+                select(func.count(Report.id))
+                .where(Report.alert_id == alert.id, Report.resolved == False)
             )
 
             result.append({
@@ -146,7 +150,7 @@ async def list_pending_reports(
 @router.post("/admin/reports/{report_id}/resolve")
 async def resolve_report(
     report_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _: str = Depends(verify_admin_password),
 ):
     """
@@ -154,7 +158,7 @@ async def resolve_report(
 
     Does NOT delete the post, just marks the report as reviewed.
     """
-    report = db.query(Report).filter(Report.id == report_id).first()
+    report = (await db.execute(select(Report).where(Report.id == report_id))).scalar_one_or_none()
     if not report:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -162,7 +166,7 @@ async def resolve_report(
         )
 
     report.resolved = True
-    db.commit()
+    await db.commit()
 
     return {
         "message": "Report marked as resolved",
@@ -173,7 +177,7 @@ async def resolve_report(
 @router.delete("/admin/posts/{post_id}")
 async def delete_post(
     post_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _: str = Depends(verify_admin_password),
 ):
     """
@@ -181,7 +185,7 @@ async def delete_post(
 
     Also marks all pending reports for this post as resolved.
     """
-    post = db.query(Post).filter(Post.id == post_id).first()
+    post = (await db.execute(select(Post).where(Post.id == post_id))).scalar_one_or_none()
     if not post:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -192,12 +196,15 @@ async def delete_post(
     post.is_active = False
 
     # Resolve all pending reports for this post
-    db.query(Report).filter(
-        Report.post_id == post_id,
-        Report.resolved == False
-    ).update({"resolved": True})
+    await db.execute(
+        update(Report)
+        .where(Report.post_id == post_id, Report.resolved == False)
+        .values(resolved=True)
+    )
 
-    db.commit()
+    await db.commit()
+    await invalidate_responses(POSTS)
+    schedule_purge(post_keys(post_id))
 
     return {
         "message": "Post deleted and reports resolved",
@@ -208,7 +215,7 @@ async def delete_post(
 @router.delete("/admin/alerts/{alert_id}")
 async def delete_alert(
     alert_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _: str = Depends(verify_admin_password),
 ):
     """
@@ -216,7 +223,7 @@ async def delete_alert(
 
     Also marks all pending reports for this alert as resolved.
     """
-    alert = db.query(Alert).filter(Alert.id == alert_id).first()
+    alert = (await db.execute(select(Alert).where(Alert.id == alert_id))).scalar_one_or_none()
     if not alert:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -227,12 +234,15 @@ async def delete_alert(
     alert.is_active = False
 
     # Resolve all pending reports for this alert
-    db.query(Report).filter(
-        Report.alert_id == alert_id,
-        Report.resolved == False
-    ).update({"resolved": True})
+    await db.execute(
+        update(Report)
+        .where(Report.alert_id == alert_id, Report.resolved == False)
+        .values(resolved=True)
+    )
 
-    db.commit()
+    await db.commit()
+    await invalidate_responses(ALERTS)
+    schedule_purge(alert_keys(alert_id))
 
     return {
         "message": "Alert deleted and reports resolved",
@@ -242,36 +252,39 @@ async def delete_alert(
 
 @router.get("/admin/pending")
 async def list_pending_posts(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _: str = Depends(verify_admin_password),
 ):
     """
     List all posts pending moderation approval.
 
     Returns posts with pending_approval = True, ordered by creation date (newest first).
+    Posts still in the moderation queue are left out until they are processed.
     Includes post details and first image for preview.
     """
     # Query posts pending approval
-    posts = (
-        db.query(Post)
-        .filter(Post.pending_approval == True)
+    posts = (await db.execute(
+        select(Post)
+        .where(
+            Post.pending_approval == True,
+            Post.validation_service.is_distinct_from(PROCESSING_SERVICE),
+        )
         .order_by(Post.created_at.desc())
-        .all()
-    )
+    )).scalars().all()
 
     # Build response with post data
     result = []
     for post in posts:
         # Get first image (primary or first by order)
-        first_image = (
-            db.query(PostImage)
-            .filter(PostImage.post_id == post.id)
+        first_image = (await db.execute(
+            select(PostImage)
+            .where(PostImage.post_id == post.id)
             .order_by(PostImage.is_primary.desc(), PostImage.display_order)
-            .first()
-        )
+            .limit(1)
+        )).scalar_one_or_none()
 
         # Extract lat/lng from geography
-        db_geom = db.scalar(func.ST_AsText(post.location))
+        db_geom = await db.scalar(func.ST_AsText(post.location))
         coords = db_geom.replace('POINT(', '').replace(')', '').split()
         longitude = float(coords[0])
         latitude = float(coords[1])
@@ -306,7 +319,7 @@ async def list_pending_posts(
 @router.post("/admin/pending/{post_id}/approve")
 async def approve_post(
     post_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _: str = Depends(verify_admin_password),
 ):
     """
@@ -314,8 +327,14 @@ async def approve_post(
 
     Sets pending_approval = False and records moderation_date.
     The post will become visible to regular users.
+
+    Posts whose uploaded images were not processed yet (still in the
+    moderation queue, or failed) cannot be approved. The row is locked so
+    the queue's finalize step cannot publish it concurrently.
     """
-    post = db.query(Post).filter(Post.id == post_id).first()
+    post = (await db.execute(
+        select(Post).where(Post.id == post_id).with_for_update()
+    )).scalar_one_or_none()
     if not post:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -328,10 +347,18 @@ async def approve_post(
             detail="Post is not pending approval"
         )
 
+    if post.validation_service in (PROCESSING_SERVICE, PROCESSING_ERROR_SERVICE):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Post images are still being processed"
+        )
+
     # Approve the post
     post.pending_approval = False
     post.moderation_date = datetime.utcnow()
-    db.commit()
+    await db.commit()
+    await invalidate_responses(POSTS)
+    schedule_purge(post_keys(post_id))
 
     return {
         "message": "Post approved successfully",
@@ -343,7 +370,7 @@ async def approve_post(
 async def reject_post(
     post_id: UUID,
     reason: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _: str = Depends(verify_admin_password),
 ):
     """
@@ -352,7 +379,7 @@ async def reject_post(
     Sets is_active = False, pending_approval = False, and records moderation_date.
     Optionally accepts a reason for the rejection.
     """
-    post = db.query(Post).filter(Post.id == post_id).first()
+    post = (await db.execute(select(Post).where(Post.id == post_id))).scalar_one_or_none()
     if not post:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -371,7 +398,9 @@ async def reject_post(
     post.moderation_date = datetime.utcnow()
     if reason:
         post.moderation_reason = reason
-    db.commit()
+    await db.commit()
+    await invalidate_responses(POSTS)
+    schedule_purge(post_keys(post_id))
 
     return {
         "message": "Post rejected successfully",
@@ -381,7 +410,7 @@ async def reject_post(
 
 @router.get("/admin/stats")
 async def get_admin_stats(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _: str = Depends(verify_admin_password),
 ):
     """
@@ -394,16 +423,16 @@ async def get_admin_stats(
     - Posts with reports
     - Posts pending approval count
     """
-    total_posts = db.query(func.count(Post.id)).scalar()
-    active_posts = db.query(func.count(Post.id)).filter(Post.is_active == True).scalar()
-    pending_approval_posts = db.query(func.count(Post.id)).filter(Post.pending_approval == True).scalar()
-    pending_reports = db.query(func.count(Report.id)).filter(Report.resolved == False).scalar()
-    resolved_reports = db.query(func.count(Report.id)).filter(Report.resolved == True).scalar()
+    total_posts = await db.scalar(select(func.count(Post.id)))
+    active_posts = await db.scalar(select(func.count(Post.id)).where(Post.is_active == True))
+    pending_approval_posts = await db.scalar(select(func.count(Post.id)).where(Post.pending_approval == True))
+    pending_reports = await db.scalar(select(func.count(Report.id)).where(Report.resolved == False))
+    resolved_reports = await db.scalar(select(func.count(Report.id)).where(Report.resolved == True))
 
     # Posts with at least one pending report
-    posts_with_reports = db.query(func.count(func.distinct(Report.post_id))).filter(
-        Report.resolved == False
-    ).scalar()
+    posts_with_reports = await db.scalar(
+        select(func.count(func.distinct(Report.post_id))).where(Report.resolved == False)
+    )
 
     return {
         "total_posts": total_posts,
@@ -414,3 +443,61 @@ async def get_admin_stats(
         "resolved_reports": resolved_reports,
         "posts_with_reports": posts_with_reports,
     }
+
+
+@router.get("/admin/metrics")
+async def get_metrics(
+    _: str = Depends(verify_admin_password),
+):
+    """
+    Get in-process performance metrics.
+
+    Returns counters and latency histograms (e.g. R2 PUT latency, retries
+    and failures) for this worker process.
+    """
+    return metrics.snapshot()
+
+
+@router.get("/admin/slow-queries")
+async def get_slow_queries(
+    limit: int = 50,
+    _: str = Depends(verify_admin_password),
+):
+    """
+    Get slow SQL statements captured by this worker (SLOW_QUERY_LOG=true).
+
+    - **limit**: Most recent captures to return (default: 50)
+
+    Returns each capture (statement, bound parameters, route, duration and
+    sampled EXPLAIN (ANALYZE, BUFFERS) output) and the captures grouped by
+    query shape, most expensive first.
+    """
+    slow_query_log = get_slow_query_log()
+    return {
+        "enabled": settings.SLOW_QUERY_LOG,
+        "threshold_ms": settings.SLOW_QUERY_THRESHOLD_MS,
+        "shapes": slow_query_log.shapes(),
+        "entries": slow_query_log.entries(limit),
+    }
+
+
+@router.delete("/admin/slow-queries", status_code=status.HTTP_204_NO_CONTENT)
+async def clear_slow_queries(
+    _: str = Depends(verify_admin_password),
+):
+    """Clear the slow query buffer (e.g. after adding an index)"""
+    get_slow_query_log().clear()
+
+
+@router.get("/admin/circuit-breakers")
+async def get_circuit_breakers(
+    _: str = Depends(verify_admin_password),
+):
+    """
+    Get the state of the circuit breakers around external services.
+
+    Returns state (closed/open/half_open), consecutive failures and recent
+    p99 latency per breaker (e.g. cloudflare_ai) and call type
+    (cloudflare_text, cloudflare_image).
+    """
+    return circuit_breaker.snapshot()
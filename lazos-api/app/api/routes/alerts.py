@@ -8,25 +8,38 @@ from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy import select, and_, func
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.api.deps import get_async_db, get_read_db
 from app.models.alert import Alert
 from app.models.post import AnimalEnum
 from app.schemas.alert import AlertCreate, AlertResponse, AlertListResponse
 from app.services.text_validation_ai import get_text_validation_ai
+from app.services.response_cache import invalidate as invalidate_responses, ALERTS
+from app.services.edge_cache import (
+    cache_policy,
+    feed_cache_control,
+    detail_cache_control,
+    alert_keys,
+    schedule_purge,
+    ALERTS_KEY,
+)
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
-@router.get("/alerts", response_model=AlertListResponse)
-def get_alerts(
+@router.get(
+    "/alerts",
+    response_model=AlertListResponse,
+    dependencies=[Depends(cache_policy(feed_cache_control, ALERTS_KEY))],
+)
+async def get_alerts(
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(20, ge=1, le=100, description="Items per page"),
     animal_type: Optional[AnimalEnum] = Query(None, description="Filter by animal type"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get paginated list of alerts with optional filters.
@@ -43,7 +56,7 @@ def get_alerts(
 
     # Count total items
     count_stmt = select(func.count()).select_from(Alert).where(and_(*filters))
-    total = db.execute(count_stmt).scalar_one()
+    total = (await db.execute(count_stmt)).scalar_one()
 
     # Build query with sorting (newest first)
     query = select(Alert).where(and_(*filters)).order_by(Alert.created_at.desc())
@@ -53,14 +66,14 @@ def get_alerts(
     query = query.offset(offset).limit(limit)
 
     # Execute query
-    result = db.execute(query)
+    result = await db.execute(query)
     alerts = result.scalars().all()
 
     # Convert alerts to response format
     alerts_response = []
     for alert in alerts:
         # Extract lat/lng from geography
-        db_geom = db.scalar(func.ST_AsText(alert.location))
+        db_geom = await db.scalar(func.ST_AsText(alert.location))
         # Parse POINT(lng lat) format
         coords = db_geom.replace('POINT(', '').replace(')', '').split()
         longitude = float(coords[0])
@@ -93,10 +106,14 @@ def get_alerts(
     )
 
 
-@router.get("/alerts/{alert_id}", response_model=AlertResponse)
-def get_alert(
+@router.get(
+    "/alerts/{alert_id}",
+    response_model=AlertResponse,
+    dependencies=[Depends(cache_policy(detail_cache_control, "alert:{alert_id}"))],
+)
+async def get_alert(
     alert_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get a specific alert by ID.
@@ -104,7 +121,7 @@ def get_alert(
     - **alert_id**: UUID of the alert
     """
     stmt = select(Alert).where(Alert.id == alert_id)
-    result = db.execute(stmt)
+    result = await db.execute(stmt)
     alert = result.scalar_one_or_none()
 
     if not alert:
@@ -114,7 +131,7 @@ def get_alert(
         )
 
     # Extract lat/lng from geography
-    db_geom = db.scalar(func.ST_AsText(alert.location))
+    db_geom = await db.scalar(func.ST_AsText(alert.location))
     coords = db_geom.replace('POINT(', '').replace(')', '').split()
     longitude = float(coords[0])
     latitude = float(coords[1])
@@ -137,7 +154,7 @@ def get_alert(
 @router.post("/alerts", response_model=AlertResponse, status_code=status.HTTP_201_CREATED)
 async def create_alert(
     alert_data: AlertCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Create a new alert (quick sighting notification without image).
@@ -182,13 +199,15 @@ async def create_alert(
         )
 
         db.add(new_alert)
-        db.commit()
-        db.refresh(new_alert)
+        await db.commit()
+        await invalidate_responses(ALERTS)
+        schedule_purge(alert_keys())
+        await db.refresh(new_alert)
 
         logger.info(f"✅ [BACKEND] Alert created successfully: {new_alert.id}")
 
         # Extract lat/lng for response
-        db_geom = db.scalar(func.ST_AsText(new_alert.location))
+        db_geom = await db.scalar(func.ST_AsText(new_alert.location))
         coords = db_geom.replace('POINT(', '').replace(')', '').split()
         resp_longitude = float(coords[0])
         resp_latitude = float(coords[1])
@@ -208,7 +227,7 @@ async def create_alert(
         return AlertResponse(**alert_dict)
 
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"❌ [BACKEND] Error creating alert: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -217,9 +236,9 @@ async def create_alert(
 
 
 @router.delete("/alerts/{alert_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_alert(
+async def delete_alert(
     alert_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Soft delete an alert (sets is_active to False).
@@ -227,7 +246,7 @@ def delete_alert(
     - **alert_id**: UUID of the alert to delete
     """
     stmt = select(Alert).where(Alert.id == alert_id)
-    result = db.execute(stmt)
+    result = await db.execute(stmt)
     alert = result.scalar_one_or_none()
 
     if not alert:
@@ -237,7 +256,9 @@ def delete_alert(
         )
 
     alert.is_active = False
-    db.commit()
+    await db.commit()
+    await invalidate_responses(ALERTS)
+    schedule_purge(alert_keys(alert_id))
 
     logger.info(f"🗑️ [BACKEND] Alert soft-deleted: {alert_id}")
 
@@ -1,21 +1,33 @@
 """
 Map API routes - Endpoints for map functionality
 """
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_, text, DateTime
 from typing import Optional, List
 from datetime import date
+from enum import Enum
 from pydantic import BaseModel
 from uuid import UUID
 
-from app.api.deps import get_db
+from app.api.deps import get_read_db
+from app.api.responses import trusted_json
+from app.config import settings
 from app.models.post import Post, SexEnum, SizeEnum, AnimalEnum
 from app.models.alert import Alert
+from app.services.edge_cache import cache_policy, feed_cache_control, MAP_KEY
+from app.services.map_encoding import encode_binary, encode_columnar, BINARY_MEDIA_TYPE
 
 router = APIRouter()
 
 
+class MapFormat(str, Enum):
+    """Formato del payload de /map/points/unified (ver app.services.map_encoding)"""
+    json = "json"
+    columnar = "columnar"
+    binary = "binary"
+
+
 class MapPostPoint(BaseModel):
     """Post point for map display"""
     id: UUID
@@ -55,7 +67,11 @@ class UnifiedMapPointsResponse(BaseModel):
     alerts: List[MapAlertPoint]
 
 
-@router.get("/map/points", response_model=MapPointsResponse)
+@router.get(
+    "/map/points",
+    response_model=MapPointsResponse,
+    dependencies=[Depends(cache_policy(feed_cache_control, MAP_KEY))],
+)
 async def get_map_points(
     # Bounds del mapa (opcional)
     sw_lat: Optional[float] = Query(None, ge=-90, le=90, description="Southwest latitude"),
@@ -70,7 +86,7 @@ async def get_map_points(
     date_to: Optional[date] = Query(None, description="Filter by sighting date (to)"),
     # Límite
     limit: int = Query(500, ge=1, le=1000, description="Max points to return"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Obtiene puntos para mostrar en el mapa.
@@ -86,7 +102,7 @@ async def get_map_points(
     - Lista de puntos con: id, lat, lng, thumbnail_url, animal_type, size
     """
     # Build filters
-    filters = [Post.is_active == True]
+    filters = [Post.is_active == True, Post.pending_approval == False]
 
     # Filtros por bounds (si se proporcionan todos)
     if all([sw_lat is not None, sw_lng is not None, ne_lat is not None, ne_lng is not None]):
@@ -112,14 +128,14 @@ async def get_map_points(
 
     # Query: obtener posts que cumplan los filtros
     query = select(Post).where(and_(*filters)).limit(limit)
-    result = db.execute(query)
+    result = await db.execute(query)
     posts = result.scalars().all()
 
     # Convertir a MapPoint
     points = []
     for post in posts:
         # Extraer lat/lng del campo location
-        db_geom = db.scalar(func.ST_AsText(post.location))
+        db_geom = await db.scalar(func.ST_AsText(post.location))
         coords = db_geom.replace('POINT(', '').replace(')', '').split()
         longitude = float(coords[0])
         latitude = float(coords[1])
@@ -136,8 +152,13 @@ async def get_map_points(
     return MapPointsResponse(data=points)
 
 
-@router.get("/map/points/unified", response_model=UnifiedMapPointsResponse)
+@router.get(
+    "/map/points/unified",
+    response_model=UnifiedMapPointsResponse,
+    dependencies=[Depends(cache_policy(feed_cache_control, MAP_KEY))],
+)
 async def get_unified_map_points(
+    response: Response,
     # Bounds del mapa (opcional)
     sw_lat: Optional[float] = Query(None, ge=-90, le=90, description="Southwest latitude"),
     sw_lng: Optional[float] = Query(None, ge=-180, le=180, description="Southwest longitude"),
@@ -149,7 +170,9 @@ async def get_unified_map_points(
     date_to: Optional[date] = Query(None, description="Filter by date (to)"),
     # Límite
     limit: int = Query(1000, ge=1, le=2000, description="Max points to return"),
-    db: Session = Depends(get_db),
+    # Formato
+    format: MapFormat = Query(MapFormat.json, description="Payload format (json, columnar or binary)"),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get unified map points including both posts and alerts.
@@ -162,9 +185,14 @@ async def get_unified_map_points(
     - Bounding box (sw_lat, sw_lng, ne_lat, ne_lng)
     - animal_type
     - date_from, date_to
+
+    **Formats:**
+    - json (default): one object per point
+    - columnar: parallel arrays, lat/lon as integer micro-degrees, relative thumbnails
+    - binary: fixed-width columns (application/vnd.lazos.map-points)
     """
     # Build filters for posts
-    post_filters = [Post.is_active == True]
+    post_filters = [Post.is_active == True, Post.pending_approval == False]
 
     # Bounds filter
     if all([sw_lat is not None, sw_lng is not None, ne_lat is not None, ne_lng is not None]):
@@ -183,9 +211,14 @@ async def get_unified_map_points(
         post_filters.append(Post.sighting_date <= date_to)
 
     # Query posts
-    post_query = select(Post).where(and_(*post_filters)).limit(limit)
-    post_results = db.execute(post_query)
-    posts = post_results.scalars().all()
+    post_query = select(
+        Post.id,
+        func.ST_Y(func.geometry(Post.location)),
+        func.ST_X(func.geometry(Post.location)),
+        Post.thumbnail_url,
+        Post.animal_type,
+    ).where(and_(*post_filters)).limit(limit)
+    posts = (await db.execute(post_query)).all()
 
     # Build filters for alerts
     alert_filters = [Alert.is_active == True]
@@ -208,42 +241,49 @@ async def get_unified_map_points(
         alert_filters.append(Alert.created_at <= func.cast(date_to, DateTime))
 
     # Query alerts
-    alert_query = select(Alert).where(and_(*alert_filters)).limit(limit)
-    alert_results = db.execute(alert_query)
-    alerts = alert_results.scalars().all()
-
-    # Convert posts to MapPostPoint
-    post_points = []
-    for post in posts:
-        # Extract lat/lon from location field
-        db_geom = db.scalar(func.ST_AsText(post.location))
-        coords = db_geom.replace('POINT(', '').replace(')', '').split()
-        longitude = float(coords[0])
-        latitude = float(coords[1])
-
-        post_points.append(MapPostPoint(
-            id=post.id,
-            lat=latitude,
-            lon=longitude,
-            thumbnail_url=post.thumbnail_url,
-            animal_type=post.animal_type.value
-        ))
-
-    # Convert alerts to MapAlertPoint
-    alert_points = []
-    for alert in alerts:
-        # Extract lat/lon from location field
-        db_geom = db.scalar(func.ST_AsText(alert.location))
-        coords = db_geom.replace('POINT(', '').replace(')', '').split()
-        longitude = float(coords[0])
-        latitude = float(coords[1])
-
-        alert_points.append(MapAlertPoint(
-            id=alert.id,
-            lat=latitude,
-            lon=longitude,
-            animal_type=alert.animal_type.value,
-            description=alert.description[:100] + ('...' if len(alert.description) > 100 else '')
-        ))
-
-    return UnifiedMapPointsResponse(posts=post_points, alerts=alert_points)
+    alert_query = select(
+        Alert.id,
+        func.ST_Y(func.geometry(Alert.location)),
+        func.ST_X(func.geometry(Alert.location)),
+        Alert.animal_type,
+        Alert.description,
+    ).where(and_(*alert_filters)).limit(limit)
+    alerts = (await db.execute(alert_query)).all()
+
+    alerts = [
+        (alert_id, latitude, longitude, animal_type, description[:100] + ('...' if len(description) > 100 else ''))
+        for alert_id, latitude, longitude, animal_type, description in alerts
+    ]
+
+    if format == MapFormat.binary:
+        return Response(
+            encode_binary(posts, alerts, settings.R2_PUBLIC_URL),
+            media_type=BINARY_MEDIA_TYPE,
+            headers=dict(response.headers),
+        )
+    if format == MapFormat.columnar:
+        return trusted_json(encode_columnar(posts, alerts, settings.R2_PUBLIC_URL), response)
+
+    # Dicts con los campos de MapPostPoint / MapAlertPoint (ver trusted_json)
+    post_points = [
+        {
+            "id": post_id,
+            "lat": latitude,
+            "lon": longitude,
+            "thumbnail_url": thumbnail_url,
+            "animal_type": animal_type.value,
+        }
+        for post_id, latitude, longitude, thumbnail_url, animal_type in posts
+    ]
+    alert_points = [
+        {
+            "id": alert_id,
+            "lat": latitude,
+            "lon": longitude,
+            "animal_type": animal_type.value,
+            "description": description,
+        }
+        for alert_id, latitude, longitude, animal_type, description in alerts
+    ]
+
+    return trusted_json({"posts": post_points, "alerts": alert_points}, response)
@@ -0,0 +1,37 @@
+"""
+Prometheus metrics endpoint
+"""
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from app.config import settings
+from app.utils.prometheus import CONTENT_TYPE, render_metrics
+
+router = APIRouter()
+
+
+def verify_metrics_token(authorization: Optional[str] = Header(None)):
+    """Dependency to verify the scrape token (without METRICS_TOKEN the endpoint is disabled)"""
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if authorization != f"Bearer {settings.METRICS_TOKEN}":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+@router.get("/metrics", include_in_schema=False, dependencies=[Depends(verify_metrics_token)])
+def get_prometheus_metrics():
+    """
+    Metrics in Prometheus text format.
+
+    Includes per-route request latency/counts by status, DB pool checkout
+    waits, R2 PUT latency and failures, Cloudflare AI latency and fallbacks,
+    NSFW phase 1 timings and the email queue depth. With METRICS_MULTIPROC_DIR
+    the values are aggregated across all uvicorn workers.
+    """
+    return PlainTextResponse(render_metrics(settings.METRICS_MULTIPROC_DIR), media_type=CONTENT_TYPE)
@@ -1,24 +1,46 @@
 """
 Posts API routes - CRUD operations for pet sighting posts
 """
-from fastapi import APIRouter, Depends, HTTPException, Query, status, UploadFile, File, Form
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status, UploadFile, File, Form
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_
 from typing import Optional, List
 from uuid import UUID
 from datetime import date
+import asyncio
 import math
+import re
 import logging
 
-from app.api.deps import get_db
+from app.api.deps import get_async_db, get_read_db
+from app.api.responses import trusted_json
 from app.models.post import Post, SexEnum, SizeEnum, AnimalEnum
 from app.models.post_image import PostImage
+from app.models.post_image_variant import PostImageVariant
 from app.schemas.post import PostCreate, PostResponse, PostUpdate, PostListResponse
 from app.schemas.common import PaginationMeta
 from app.services.image import ImageService
-from app.services.storage import get_storage_service
-from app.services.text_validation_ai import get_text_validation_ai
-from app.services.hybrid_image_validator import get_hybrid_validator
+from app.services.storage import get_storage_service, UPLOAD_PREFIX, UPLOAD_EXTENSIONS
+from app.services.upload_ingestion import read_upload, UploadBudget, UploadTooLargeError
+from app.config import settings
+from app.services.post_pipeline import (
+    moderate_content,
+    process_and_upload,
+    save_post_images,
+    stage_raw_images,
+    PROCESSING_SERVICE,
+)
+from app.services.moderation_queue import enqueue_moderation, notify_workers
+from app.utils.request_stats import stage
+from app.services.response_cache import invalidate as invalidate_responses, POSTS
+from app.services.edge_cache import (
+    cache_policy,
+    feed_cache_control,
+    detail_cache_control,
+    post_keys,
+    schedule_purge,
+    POSTS_KEY,
+)
 from geoalchemy2.elements import WKTElement
 
 logger = logging.getLogger(__name__)
@@ -26,8 +48,13 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-@router.get("/posts", response_model=PostListResponse)
+@router.get(
+    "/posts",
+    response_model=PostListResponse,
+    dependencies=[Depends(cache_policy(feed_cache_control, POSTS_KEY))],
+)
 async def list_posts(
+    response: Response,
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(20, ge=1, le=100, description="Items per page"),
     animal_type: Optional[AnimalEnum] = Query(None, description="Filter by animal type"),
@@ -39,7 +66,7 @@ async def list_posts(
     localidad: Optional[str] = Query(None, description="Filter by localidad"),
     sort: str = Query("sighting_date", description="Sort field (created_at or sighting_date)"),
     order: str = Query("desc", description="Sort order (asc or desc)"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     List all active posts with pagination and filters.
@@ -80,10 +107,14 @@ async def list_posts(
 
     # Count total items
     count_stmt = select(func.count()).select_from(Post).where(and_(*filters))
-    total = db.execute(count_stmt).scalar_one()
+    total = (await db.execute(count_stmt)).scalar_one()
 
-    # Build query with sorting
-    query = select(Post).where(and_(*filters))
+    # Build query with sorting (lat/lng en la misma query, no una por post)
+    query = select(
+        Post,
+        func.ST_Y(func.geometry(Post.location)).label("latitude"),
+        func.ST_X(func.geometry(Post.location)).label("longitude"),
+    ).where(and_(*filters))
 
     # Apply sorting
     if sort == "sighting_date":
@@ -101,23 +132,30 @@ async def list_posts(
     query = query.offset(offset).limit(limit)
 
     # Execute query
-    result = db.execute(query)
-    posts = result.scalars().all()
-
-    # Convert posts to response format
-    posts_response = []
-    for post in posts:
-        # Extract lat/lng from geography
-        db_geom = db.scalar(func.ST_AsText(post.location))
-        # Parse POINT(lng lat) format
-        coords = db_geom.replace('POINT(', '').replace(')', '').split()
-        longitude = float(coords[0])
-        latitude = float(coords[1])
-
-        # Count images for this post
-        image_count = db.query(PostImage).filter(PostImage.post_id == post.id).count()
+    rows = (await db.execute(query)).all()
+    posts = [row.Post for row in rows]
+
+    # Variantes responsive de la imagen principal de cada post (una sola query)
+    srcsets = {}
+    if posts:
+        variant_rows = (await db.execute(
+            select(PostImage.post_id, PostImageVariant)
+            .join(PostImageVariant, PostImageVariant.post_image_id == PostImage.id)
+            .where(PostImage.post_id.in_([post.id for post in posts]), PostImage.is_primary == True)
+        )).all()
+        variants_by_post = {}
+        for post_id, variant in variant_rows:
+            variants_by_post.setdefault(post_id, []).append(
+                {"url": variant.url, "width": variant.width, "format": variant.format}
+            )
+        srcsets = {
+            post_id: ImageService.build_srcset(variants)
+            for post_id, variants in variants_by_post.items()
+        }
 
-        post_dict = {
+    # Convert posts to response format (dicts con los campos de PostResponse, ver trusted_json)
+    posts_response = [
+        {
             "id": post.id,
             "image_url": post.image_url,
             "thumbnail_url": post.thumbnail_url,
@@ -131,9 +169,10 @@ async def list_posts(
             "sighting_date": post.sighting_date,
             "created_at": post.created_at,
             "is_active": post.is_active,
-            "image_count": image_count,
+            "srcset": srcsets.get(post.id),
         }
-        posts_response.append(PostResponse(**post_dict))
+        for post, latitude, longitude in rows
+    ]
 
     # Calculate total pages
     total_pages = math.ceil(total / limit) if total > 0 else 0
@@ -157,7 +196,7 @@ async def list_posts(
     if not provincia:
         # Query distinct provincias from filtered results
         distinct_query = select(Post.location_name).where(and_(*filters)).distinct()
-        location_names = db.execute(distinct_query).scalars().all()
+        location_names = (await db.execute(distinct_query)).scalars().all()
 
         provincia_counts = {}
         for loc_name in location_names:
@@ -173,7 +212,7 @@ async def list_posts(
     # Get distinct localidades (if provincia selected but not localidad)
     if provincia and not localidad:
         distinct_query = select(Post.location_name).where(and_(*filters)).distinct()
-        location_names = db.execute(distinct_query).scalars().all()
+        location_names = (await db.execute(distinct_query)).scalars().all()
 
         localidad_counts = {}
         for loc_name in location_names:
@@ -189,52 +228,170 @@ async def list_posts(
     # Get counts for other filter dimensions
     # Animal types
     if not animal_type:
-        type_counts = db.execute(
+        type_counts = (await db.execute(
             select(Post.animal_type, func.count())
             .where(and_(*filters))
             .group_by(Post.animal_type)
-        ).all()
+        )).all()
         available_filters['animal_types'] = [
             {'value': t.value, 'count': c} for t, c in type_counts
         ]
 
     # Sizes
     if not size:
-        size_counts = db.execute(
+        size_counts = (await db.execute(
             select(Post.size, func.count())
             .where(and_(*filters))
             .group_by(Post.size)
-        ).all()
+        )).all()
         available_filters['sizes'] = [
             {'value': s.value, 'count': c} for s, c in size_counts
         ]
 
     # Sexes
     if not sex:
-        sex_counts = db.execute(
+        sex_counts = (await db.execute(
             select(Post.sex, func.count())
             .where(and_(*filters))
             .group_by(Post.sex)
-        ).all()
+        )).all()
         available_filters['sexes'] = [
             {'value': sx.value, 'count': c} for sx, c in sex_counts
         ]
 
-    return PostListResponse(
-        data=posts_response,
-        meta={
-            "page": page,
-            "limit": limit,
-            "total": total,
-            "total_pages": total_pages,
+    return trusted_json(
+        {
+            "data": posts_response,
+            "meta": {
+                "page": page,
+                "limit": limit,
+                "total": total,
+                "total_pages": total_pages,
+            },
+            "available_filters": available_filters,
         },
-        available_filters=available_filters
+        response,
+    )
+
+
+# Keys válidas de POST /uploads: uploads/<uuid>.<ext>
+UPLOAD_KEY_PATTERN = re.compile(
+    rf"^{re.escape(UPLOAD_PREFIX)}[0-9a-f]{{8}}-[0-9a-f]{{4}}-[0-9a-f]{{4}}-[0-9a-f]{{4}}-[0-9a-f]{{12}}"
+    rf"\.({'|'.join(UPLOAD_EXTENSIONS.values())})$"
+)
+
+
+async def create_post_from_uploads(
+    db: AsyncSession,
+    upload_keys: List[str],
+    pending_approval: bool,
+    point_wkt: str,
+    **post_fields,
+) -> PostResponse:
+    """
+    Crea un post a partir de imágenes ya subidas directo a R2 (POST /uploads).
+
+    El post queda pendiente (no visible) con las URLs crudas hasta que
+    la cola de moderación valida, procesa y publica las imágenes en background.
+    """
+    if len(upload_keys) < 1 or len(upload_keys) > 3:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Debes subir entre 1 y 3 imágenes"
+        )
+
+    storage_service = get_storage_service()
+    max_bytes = settings.UPLOAD_MAX_FILE_MB * 1024 * 1024
+
+    for key in upload_keys:
+        if not UPLOAD_KEY_PATTERN.match(key):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"upload_key inválida: {key}"
+            )
+
+    # HEAD: verifica que el cliente haya subido cada imagen sin descargarla (boto3 es
+    # bloqueante: en el executor del storage, todas a la vez)
+    loop = asyncio.get_running_loop()
+    object_sizes = await asyncio.gather(*[
+        loop.run_in_executor(storage_service.executor, storage_service.get_object_size, key)
+        for key in upload_keys
+    ])
+    for key, object_size in zip(upload_keys, object_sizes):
+        if object_size is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"La imagen {key} no fue subida"
+            )
+        if object_size > max_bytes:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Imagen muy grande: {object_size / (1024 * 1024):.1f}MB. Máximo: {settings.UPLOAD_MAX_FILE_MB}MB"
+            )
+
+    logger.info(f"💾 [BACKEND] Guardando post con {len(upload_keys)} imágenes subidas directo a R2...")
+    return await create_pending_post(db, upload_keys, pending_approval, point_wkt, **post_fields)
+
+
+async def create_pending_post(
+    db: AsyncSession,
+    upload_keys: List[str],
+    pending_approval: bool,
+    point_wkt: str,
+    **post_fields,
+) -> PostResponse:
+    """
+    Guarda un post oculto y encola la moderación de sus imágenes crudas
+    (uploads/...) en la misma transacción. Responde sin esperar la validación.
+
+    El post no guarda URLs de las imágenes crudas (sin moderar, tamaño
+    original, con EXIF): image_url/thumbnail_url quedan vacías y las
+    post_images se crean recién al publicar.
+    """
+    new_post = Post(
+        image_url="",
+        thumbnail_url="",
+        location=point_wkt,
+        pending_approval=True,
+        moderation_reason="Procesando imágenes subidas",
+        validation_service=PROCESSING_SERVICE,
+        **post_fields,
+    )
+    db.add(new_post)
+    await db.flush()  # Get post.id without committing yet
+
+    # Validar, procesar y publicar en background
+    await db.run_sync(enqueue_moderation, new_post.id, upload_keys, pending_approval)
+    await db.commit()
+    await invalidate_responses(POSTS)
+    await db.refresh(new_post)
+    notify_workers()
+    logger.info(f"✅ [BACKEND] Post {new_post.id} creado, moderación encolada")
+
+    db_geom = await db.scalar(func.ST_AsText(new_post.location))
+    coords = db_geom.replace('POINT(', '').replace(')', '').split()
+
+    return PostResponse(
+        id=new_post.id,
+        image_url=new_post.image_url,
+        thumbnail_url=new_post.thumbnail_url,
+        sex=new_post.sex,
+        size=new_post.size,
+        animal_type=new_post.animal_type,
+        description=new_post.description,
+        location_name=new_post.location_name,
+        latitude=float(coords[1]),
+        longitude=float(coords[0]),
+        sighting_date=new_post.sighting_date,
+        created_at=new_post.created_at,
+        is_active=new_post.is_active,
     )
 
 
 @router.post("/posts", response_model=PostResponse, status_code=status.HTTP_201_CREATED)
 async def create_post(
-    images: List[UploadFile] = File(..., description="Fotos del animal (1-3 imágenes, JPG/PNG/WEBP, max 10MB c/u)"),
+    images: Optional[List[UploadFile]] = File(None, description="Fotos del animal (1-3 imágenes, JPG/PNG/WEBP, max 10MB c/u)"),
+    upload_keys: Optional[List[str]] = Form(None, description="Keys de imágenes ya subidas con POST /uploads (alternativa a images)"),
     latitude: float = Form(..., ge=-90, le=90, description="Latitud"),
     longitude: float = Form(..., ge=-180, le=180, description="Longitud"),
     size: SizeEnum = Form(..., description="Tamaño del animal"),
@@ -245,13 +402,14 @@ async def create_post(
     location_name: Optional[str] = Form(None, max_length=200, description="Nombre del lugar"),
     contact_method: Optional[str] = Form(None, max_length=200, description="Método de contacto"),
     pending_approval: bool = Form(False, description="Si está pendiente de aprobación de moderación"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Crear nueva publicación de avistamiento con múltiples imágenes.
 
     **Campos requeridos:**
-    - **images**: 1-3 archivos de imagen (JPG, PNG, WEBP, max 10MB c/u)
+    - **images**: 1-3 archivos de imagen (JPG, PNG, WEBP, max 10MB c/u),
+      o bien **upload_keys**: 1-3 keys obtenidas con POST /uploads y ya subidas a R2
     - **latitude**: Latitud (-90 a 90)
     - **longitude**: Longitud (-180 a 180)
     - **size**: Tamaño (small/medium/large)
@@ -264,9 +422,38 @@ async def create_post(
     - **location_name**: Nombre del lugar
     - **contact_method**: Email, teléfono o Instagram
     - **pending_approval**: Si está pendiente de moderación (default: False)
+
+    Con **upload_keys** (o con MODERATION_MODE=async) el post se crea pendiente
+    y se publica cuando la cola de moderación termina de validar y procesar
+    las imágenes en background.
     """
     try:
         logger.info("📥 [BACKEND] Recibiendo request para crear post...")
+
+        images = images or []
+        upload_keys = upload_keys or []
+
+        if images and upload_keys:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Enviá images o upload_keys, no ambos"
+            )
+
+        if upload_keys:
+            return await create_post_from_uploads(
+                db,
+                upload_keys=upload_keys,
+                pending_approval=pending_approval,
+                point_wkt=f'POINT({longitude} {latitude})',
+                sex=sex,
+                size=size,
+                animal_type=animal_type,
+                description=description,
+                location_name=location_name,
+                sighting_date=sighting_date,
+                contact_method=contact_method,
+            )
+
         logger.info(f"📸 [BACKEND] {len(images)} imágenes recibidas")
 
         # Validar cantidad de imágenes
@@ -279,68 +466,52 @@ async def create_post(
         # FASE 1: Leer y validar formato/tamaño de todas las imágenes
         logger.info(f"📦 [BACKEND] Leyendo {len(images)} imágenes...")
         raw_images_bytes = []
+        upload_budget = UploadBudget(settings.UPLOAD_MAX_REQUEST_MB * 1024 * 1024)
 
         for idx, image in enumerate(images):
             logger.info(f"📸 [BACKEND] Leyendo imagen {idx + 1}: {image.filename}, {image.content_type}")
 
-            # Leer imagen
-            image_bytes = await image.read()
+            # Leer imagen en streaming (corta apenas supera los límites o no es imagen)
+            with stage("read"):
+                image_bytes = await read_upload(image, budget=upload_budget)
             logger.info(f"📦 [BACKEND] Imagen {idx + 1} leída: {len(image_bytes)} bytes")
 
             # Validar formato y tamaño
-            ImageService.validate_image(image_bytes, max_size_mb=10)
+            with stage("validate"):
+                ImageService.validate_image(image_bytes, max_size_mb=settings.UPLOAD_MAX_FILE_MB)
 
             raw_images_bytes.append(image_bytes)
 
-        # FASE 2: Validación híbrida de contenido (TODAS las imágenes)
-        logger.info(f"🔍 [BACKEND] Iniciando validación híbrida de {len(raw_images_bytes)} imágenes...")
-        hybrid_validator = get_hybrid_validator()
-        validation_result = await hybrid_validator.validate_all(raw_images_bytes)
-
-        validation_service_used = None
-        validation_reason = None
+        if settings.MODERATION_MODE == "async":
+            # Guardar las imágenes crudas y responder; la cola valida y publica
+            staged_keys = await stage_raw_images(raw_images_bytes)
+            logger.info(f"💾 [BACKEND] {len(staged_keys)} imágenes guardadas, moderación asíncrona")
+            return await create_pending_post(
+                db,
+                upload_keys=staged_keys,
+                pending_approval=pending_approval,
+                point_wkt=f'POINT({longitude} {latitude})',
+                sex=sex,
+                size=size,
+                animal_type=animal_type,
+                description=description,
+                location_name=location_name,
+                sighting_date=sighting_date,
+                contact_method=contact_method,
+            )
 
-        if not validation_result["is_valid"]:
+        # FASE 2: Validación de contenido (imágenes con validador híbrido, luego texto)
+        moderation = await moderate_content(raw_images_bytes, description)
+        if moderation["flagged"]:
             # Marcar para moderación manual
             pending_approval = True
-            validation_service_used = validation_result["service"]
-            validation_reason = validation_result["reason"]
-            logger.warning(f"⚠️ [BACKEND] Imágenes marcadas para moderación: {validation_reason}")
-        else:
-            logger.info(f"✅ [BACKEND] Todas las imágenes aprobadas por validador híbrido ({validation_result['service']})")
-
-        # FASE 3: Procesar imágenes (resize + thumbnail)
-        logger.info(f"🖼️ [BACKEND] Procesando {len(raw_images_bytes)} imágenes...")
-        images_data = []
 
-        for idx, image_bytes in enumerate(raw_images_bytes):
-            processed_image, thumbnail = ImageService.process_upload(image_bytes)
-            logger.info(f"✅ [BACKEND] Imagen {idx + 1} procesada: {len(processed_image)} bytes, thumbnail: {len(thumbnail)} bytes")
-            images_data.append((processed_image, thumbnail))
-
-        # Subir todas las imágenes a R2
-        logger.info(f"☁️ [BACKEND] Subiendo {len(images_data)} imágenes a R2...")
-        storage_service = get_storage_service()
-        image_urls = storage_service.upload_images(images_data)
-        logger.info(f"✅ [BACKEND] {len(image_urls)} imágenes subidas a R2")
+        # FASE 3: Procesar imágenes (resize + thumbnail + variantes) y subir a R2
+        image_urls, uploaded_variants = await process_and_upload(raw_images_bytes)
 
         # Primera imagen para backward compatibility en el modelo Post
         first_image_url, first_thumb_url = image_urls[0]
 
-        # Validar texto con IA si hay descripción (solo si no fue rechazado ya por imagen)
-        if description and len(description.strip()) >= 10 and not validation_service_used:
-            text_validator = get_text_validation_ai()
-            text_validation = await text_validator.validate_sighting_text(description)
-            text_is_valid = text_validation["is_valid"]
-            logger.info(f"[Text Validation] valid={text_is_valid}, reason={text_validation['reason']}")
-
-            # Si el texto no es válido, marcar para aprobación manual
-            if not text_is_valid:
-                pending_approval = True
-                validation_service_used = "text_ai"
-                validation_reason = text_validation["reason"]
-                logger.warning(f"[Text Validation] Texto marcado para revisión: {text_validation['reason']}")
-
         # Crear punto geográfico
         point_wkt = f'POINT({longitude} {latitude})'
         logger.info(f"📍 [BACKEND] Ubicación: {point_wkt}, {location_name}")
@@ -359,36 +530,29 @@ async def create_post(
             sighting_date=sighting_date,
             contact_method=contact_method,
             pending_approval=pending_approval,
-            moderation_reason=validation_reason if validation_service_used else None,
-            validation_service=validation_service_used,
+            moderation_reason=moderation["reason"],
+            validation_service=moderation["service"],
         )
 
-        db.add(new_post)
-        db.flush()  # Get post.id without committing yet
+        with stage("commit"):
+            db.add(new_post)
+            await db.flush()  # Get post.id without committing yet
 
-        logger.info(f"✅ [BACKEND] Post creado: {new_post.id}")
+            logger.info(f"✅ [BACKEND] Post creado: {new_post.id}")
 
-        # Crear registros de post_images para cada imagen
-        logger.info(f"💾 [BACKEND] Guardando {len(image_urls)} imágenes en post_images...")
-        for idx, (img_url, thumb_url) in enumerate(image_urls):
-            post_image = PostImage(
-                post_id=new_post.id,
-                image_url=img_url,
-                thumbnail_url=thumb_url,
-                display_order=idx,
-                is_primary=(idx == 0)
-            )
-            db.add(post_image)
-            logger.info(f"   📷 Imagen {idx + 1}: {img_url} (primary: {idx == 0})")
+            # Crear registros de post_images (y variantes) para cada imagen
+            await db.run_sync(save_post_images, new_post.id, image_urls, uploaded_variants)
 
-        # Commit all changes
-        db.commit()
-        db.refresh(new_post)
+            # Commit all changes
+            await db.commit()
+        await invalidate_responses(POSTS)
+        schedule_purge(post_keys(new_post.id))
+        await db.refresh(new_post)
 
         logger.info(f"✅ [BACKEND] Post con {len(image_urls)} imágenes creado exitosamente")
 
         # Extraer lat/lng para respuesta
-        db_geom = db.scalar(func.ST_AsText(new_post.location))
+        db_geom = await db.scalar(func.ST_AsText(new_post.location))
         coords = db_geom.replace('POINT(', '').replace(')', '').split()
         resp_longitude = float(coords[0])
         resp_latitude = float(coords[1])
@@ -407,10 +571,18 @@ async def create_post(
             "sighting_date": new_post.sighting_date,
             "created_at": new_post.created_at,
             "is_active": new_post.is_active,
+            "srcset": ImageService.build_srcset(uploaded_variants[0]),
         }
 
         return PostResponse(**post_dict)
 
+    except HTTPException:
+        raise
+    except UploadTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
     except ValueError as e:
         # Error de validación
         raise HTTPException(
@@ -420,17 +592,20 @@ async def create_post(
     except Exception as e:
         # Error general
         logger.error(f"Error creando post: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error procesando la imagen: {str(e)}"
         )
 
 
-@router.get("/posts/{post_id}")
+@router.get(
+    "/posts/{post_id}",
+    dependencies=[Depends(cache_policy(detail_cache_control, "post:{post_id}"))],
+)
 async def get_post_detail(
     post_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Obtener detalles de un post específico con todas sus imágenes.
@@ -441,8 +616,10 @@ async def get_post_detail(
     """
     logger.info(f"📥 [BACKEND] Obteniendo detalles del post {post_id}")
 
-    # Buscar post
-    post = db.query(Post).filter(Post.id == post_id).first()
+    # Buscar post (los pendientes de moderación no son públicos)
+    post = (await db.execute(
+        select(Post).where(Post.id == post_id, Post.pending_approval == False)
+    )).scalar_one_or_none()
 
     if not post:
         raise HTTPException(
@@ -451,14 +628,32 @@ async def get_post_detail(
         )
 
     # Buscar todas las imágenes del post
-    post_images = db.query(PostImage).filter(
-        PostImage.post_id == post_id
-    ).order_by(PostImage.display_order).all()
+    post_images = (await db.execute(
+        select(PostImage)
+        .where(PostImage.post_id == post_id)
+        .order_by(PostImage.display_order)
+    )).scalars().all()
+
+    # Buscar variantes responsive de todas las imágenes
+    variants_by_image = {}
+    if post_images:
+        variants = (await db.execute(
+            select(PostImageVariant)
+            .where(PostImageVariant.post_image_id.in_([img.id for img in post_images]))
+            .order_by(PostImageVariant.width)
+        )).scalars().all()
+        for variant in variants:
+            variants_by_image.setdefault(variant.post_image_id, []).append({
+                "url": variant.url,
+                "width": variant.width,
+                "height": variant.height,
+                "format": variant.format,
+            })
 
     logger.info(f"✅ [BACKEND] Post encontrado con {len(post_images)} imágenes")
 
     # Extraer lat/lng
-    db_geom = db.scalar(func.ST_AsText(post.location))
+    db_geom = await db.scalar(func.ST_AsText(post.location))
     coords = db_geom.replace('POINT(', '').replace(')', '').split()
     longitude = float(coords[0])
     latitude = float(coords[1])
@@ -486,6 +681,8 @@ async def get_post_detail(
                 "thumbnail_url": img.thumbnail_url,
                 "display_order": img.display_order,
                 "is_primary": img.is_primary,
+                "variants": variants_by_image.get(img.id, []),
+                "srcset": ImageService.build_srcset(variants_by_image.get(img.id, [])),
             }
             for img in post_images
         ]
@@ -498,7 +695,7 @@ async def get_post_detail(
 async def update_post(
     post_id: UUID,
     post_update: PostUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Update an existing post.
@@ -513,7 +710,7 @@ async def update_post(
     """
     # Get existing post
     stmt = select(Post).where(Post.id == post_id)
-    result = db.execute(stmt)
+    result = await db.execute(stmt)
     post = result.scalar_one_or_none()
 
     if not post:
@@ -527,11 +724,13 @@ async def update_post(
     for field, value in update_data.items():
         setattr(post, field, value)
 
-    db.commit()
-    db.refresh(post)
+    await db.commit()
+    await invalidate_responses(POSTS)
+    schedule_purge(post_keys(post_id))
+    await db.refresh(post)
 
     # Extract lat/lng for response
-    db_geom = db.scalar(func.ST_AsText(post.location))
+    db_geom = await db.scalar(func.ST_AsText(post.location))
     coords = db_geom.replace('POINT(', '').replace(')', '').split()
     longitude = float(coords[0])
     latitude = float(coords[1])
@@ -558,7 +757,7 @@ async def update_post(
 @router.delete("/posts/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_post(
     post_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Delete a post (soft delete by setting is_active to False).
@@ -569,7 +768,7 @@ async def delete_post(
     """
     # Get existing post
     stmt = select(Post).where(Post.id == post_id)
-    result = db.execute(stmt)
+    result = await db.execute(stmt)
     post = result.scalar_one_or_none()
 
     if not post:
@@ -580,6 +779,8 @@ async def delete_post(
 
     # Soft delete
     post.is_active = False
-    db.commit()
+    await db.commit()
+    await invalidate_responses(POSTS)
+    schedule_purge(post_keys(post_id))
 
     return None
@@ -2,32 +2,35 @@
 Reports API endpoints
 """
 from fastapi import APIRouter, Depends, Request, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
 import logging
 
-from app.database import get_db
+from app.api.deps import get_async_db
 from app.models.report import Report
 from app.models.post import Post
 from app.models.alert import Alert
 from app.schemas.report import ReportCreate, ReportResponse
 from app.services.email import EmailService
 from app.config import settings
+from app.utils.metrics import Gauge
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 # Thread pool para envío de emails en background (no bloquear respuesta HTTP)
 email_executor = ThreadPoolExecutor(max_workers=2)
+email_queue_depth = Gauge("email_queue_depth", "Emails de reportes pendientes en email_executor (encolados o enviándose)")
 
 
 @router.post("/reports", response_model=ReportResponse, status_code=status.HTTP_201_CREATED)
 async def create_report(
     report: ReportCreate,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Create a new report for a post or alert.
@@ -44,7 +47,7 @@ async def create_report(
 
     # Verify item exists (post or alert)
     if report.post_id:
-        post = db.query(Post).filter(Post.id == report.post_id).first()
+        post = (await db.execute(select(Post).where(Post.id == report.post_id))).scalar_one_or_none()
         if not post:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -54,7 +57,7 @@ async def create_report(
         item_id = str(post.id)
 
     elif report.alert_id:
-        alert = db.query(Alert).filter(Alert.id == report.alert_id).first()
+        alert = (await db.execute(select(Alert).where(Alert.id == report.alert_id))).scalar_one_or_none()
         if not alert:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -75,12 +78,13 @@ async def create_report(
         reporter_ip=reporter_ip,
     )
     db.add(db_report)
-    db.commit()
-    db.refresh(db_report)
+    await db.commit()
+    await db.refresh(db_report)
 
     # Send email notification en background (NO bloquear respuesta HTTP)
     # Si SMTP falla o tarda 2+ minutos, el cliente ya recibió 201
     async def send_email_background():
+        email_queue_depth.inc()
         try:
             await asyncio.get_event_loop().run_in_executor(
                 email_executor,
@@ -94,6 +98,8 @@ async def create_report(
         except Exception as e:
             # Log error pero no afecta la respuesta (ya fue enviada)
             logger.error(f"❌ Error enviando email para reporte {db_report.id}: {e}")
+        finally:
+            email_queue_depth.dec()
 
     # Programar envío en background (fire-and-forget)
     asyncio.create_task(send_email_background())
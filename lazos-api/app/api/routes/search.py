@@ -2,11 +2,11 @@
 Unified search API endpoints for posts and alerts
 """
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, func, cast, String
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, or_, func, cast, String
 from typing import Optional, Literal
 
-from app.database import get_db
+from app.api.deps import get_read_db
 from app.models.post import Post
 from app.models.alert import Alert
 from app.schemas.search import SearchResponse, PostSearchResult, AlertSearchResult
@@ -21,7 +21,7 @@ async def search(
     lat: Optional[float] = Query(None, description="Latitude for proximity search"),
     lon: Optional[float] = Query(None, description="Longitude for proximity search"),
     radius_km: Optional[float] = Query(None, ge=0, le=100, description="Search radius in kilometers"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Unified search across posts and alerts.
@@ -65,15 +65,16 @@ async def search(
         if mapped_animal_type:
             search_conditions.append(cast(Post.animal_type, String) == mapped_animal_type)
 
-        post_query = db.query(Post).filter(
+        post_query = select(Post).where(
             Post.is_active == True,
+            Post.pending_approval == False,
             or_(*search_conditions)
         )
 
         # Add proximity filter if coordinates provided
         if proximity_search and radius_km:
             # ST_DWithin uses meters, so convert km to m
-            post_query = post_query.filter(
+            post_query = post_query.where(
                 func.ST_DWithin(
                     Post.location,
                     func.ST_SetSRID(func.ST_MakePoint(lon, lat), 4326),
@@ -82,19 +83,19 @@ async def search(
             )
 
         # Get results
-        post_results = post_query.all()
+        post_results = (await db.execute(post_query)).scalars().all()
 
         # Add distance if proximity search
         if proximity_search:
             posts = []
             for post in post_results:
                 # Calculate distance in km
-                distance = db.query(
+                distance = await db.scalar(
                     func.ST_Distance(
                         post.location,
                         func.ST_SetSRID(func.ST_MakePoint(lon, lat), 4326)
                     ) / 1000.0  # Convert meters to km
-                ).scalar()
+                )
 
                 # Create result with distance
                 post_dict = {
@@ -130,14 +131,14 @@ async def search(
         if mapped_animal_type:
             search_conditions_alert.append(cast(Alert.animal_type, String) == mapped_animal_type)
 
-        alert_query = db.query(Alert).filter(
+        alert_query = select(Alert).where(
             Alert.is_active == True,
             or_(*search_conditions_alert)
         )
 
         # Add proximity filter if coordinates provided
         if proximity_search and radius_km:
-            alert_query = alert_query.filter(
+            alert_query = alert_query.where(
                 func.ST_DWithin(
                     Alert.location,
                     func.ST_SetSRID(func.ST_MakePoint(lon, lat), 4326),
@@ -146,19 +147,19 @@ async def search(
             )
 
         # Get results
-        alert_results = alert_query.all()
+        alert_results = (await db.execute(alert_query)).scalars().all()
 
         # Add distance if proximity search
         if proximity_search:
             alerts = []
             for alert in alert_results:
                 # Calculate distance in km
-                distance = db.query(
+                distance = await db.scalar(
                     func.ST_Distance(
                         alert.location,
                         func.ST_SetSRID(func.ST_MakePoint(lon, lat), 4326)
                     ) / 1000.0
-                ).scalar()
+                )
 
                 # Create result with distance
                 alert_dict = {
@@ -0,0 +1,53 @@
+"""
+Uploads API routes - Presigned URLs for direct-to-storage image uploads
+"""
+from fastapi import APIRouter, HTTPException, status
+import logging
+
+from app.config import settings
+from app.schemas.upload import UploadRequest, UploadResponse
+from app.services.storage import get_storage_service
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.post("/uploads", response_model=UploadResponse, status_code=status.HTTP_201_CREATED)
+async def create_uploads(request: UploadRequest):
+    """
+    Obtener URLs firmadas para subir imágenes directo a R2.
+
+    Flujo en dos pasos:
+    1. **POST /uploads** con el content-type y el tamaño exacto de cada imagen (1-3) → URLs PUT firmadas
+    2. Subir cada imagen con PUT a su `upload_url` (enviando los `headers` indicados;
+       el Content-Length va firmado y tiene que coincidir con `size`)
+    3. **POST /posts** enviando las `key` en `upload_keys` en lugar de `images`
+
+    Las imágenes se validan, redimensionan y publican en background. Las
+    subidas que no se usan en un post se borran por lifecycle (UPLOAD_ORPHAN_DAYS).
+    """
+    max_bytes = settings.UPLOAD_MAX_FILE_MB * 1024 * 1024
+    for file in request.files:
+        if file.size > max_bytes:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Imagen muy grande: {file.size / (1024 * 1024):.1f}MB. Máximo: {settings.UPLOAD_MAX_FILE_MB}MB"
+            )
+
+    storage_service = get_storage_service()
+
+    try:
+        uploads = [
+            storage_service.create_presigned_upload(file.content_type, file.size)
+            for file in request.files
+        ]
+    except Exception as e:
+        logger.error(f"Error generando URLs firmadas: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error generando URLs de subida"
+        )
+
+    logger.info(f"☁️ [BACKEND] {len(uploads)} URLs firmadas generadas")
+    return UploadResponse(uploads=uploads)
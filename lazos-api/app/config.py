@@ -3,6 +3,16 @@ Application configuration using Pydantic Settings
 """
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import List
+from sqlalchemy.engine import make_url
+
+
+def asyncpg_url(database_url: str) -> str:
+    """URL de Postgres con el driver asyncpg (sslmode -> ssl, que es lo que entiende asyncpg)"""
+    url = make_url(database_url).set(drivername="postgresql+asyncpg")
+    query = dict(url.query)
+    if "sslmode" in query:
+        query["ssl"] = query.pop("sslmode")
+    return url.set(query=query).render_as_string(hide_password=False)
 
 
 class Settings(BaseSettings):
@@ -10,6 +20,57 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str = ""
+    DB_ECHO: bool = False  # loguea cada query (solo desarrollo)
+    DB_POOL_SIZE: int = 5  # conexiones persistentes por engine y proceso
+    DB_MAX_OVERFLOW: int = 10  # conexiones extra bajo picos
+    DB_POOL_TIMEOUT_SECONDS: float = 10.0  # espera máxima por una conexión libre
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # reabre conexiones más viejas que esto
+    DB_POOL_PRE_PING: bool = False  # SELECT 1 en cada checkout (un round-trip más)
+    DB_STATEMENT_TIMEOUT_MS: int = 15000  # 0 = sin límite
+    DB_IDLE_IN_TRANSACTION_TIMEOUT_MS: int = 60000
+    DB_PGBOUNCER: bool = False  # PgBouncer en modo transaction (sin prepared statements ni parámetros de arranque)
+
+    # Réplicas de lectura (comma-separated, like CORS_ORIGINS); vacío = todo al primario
+    DATABASE_REPLICA_URLS: str = ""
+    REPLICA_MAX_LAG_SECONDS: float = 5.0  # réplicas más atrasadas no reciben lecturas
+    REPLICA_HEALTH_CHECK_SECONDS: float = 5.0
+    READ_YOUR_WRITES_SECONDS: int = 30  # tras escribir, el cliente lee del primario (o de una réplica al día)
+
+    # Cache de respuestas de lecturas públicas (ETag / 304)
+    RESPONSE_CACHE_BACKEND: str = "memory"  # memory | redis | off
+    RESPONSE_CACHE_SIZE: int = 1000  # respuestas en memoria (backend memory)
+    RESPONSE_CACHE_TTL_SECONDS: int = 300
+    REDIS_URL: str = ""  # redis://host:6379/0 (backend redis)
+
+    # Cache en CDN (Cache-Control / surrogate keys) y purga por key al mutar
+    CACHE_FEED_S_MAXAGE: int = 60  # listados y mapa en el edge
+    CACHE_FEED_STALE_SECONDS: int = 300  # stale-while-revalidate
+    CACHE_DETAIL_MAX_AGE: int = 300  # detalle en el navegador
+    CACHE_DETAIL_S_MAXAGE: int = 86400  # detalle en el edge (se purga al cambiar)
+    EDGE_PURGE_BACKEND: str = "none"  # none | cloudflare
+    CLOUDFLARE_ZONE_ID: str = ""  # zona para purgar por Cache-Tag (con CLOUDFLARE_API_TOKEN)
+
+    # Compresión de respuestas (br si está instalado brotli, si no gzip)
+    COMPRESSION_MIN_BYTES: int = 1024  # respuestas más chicas salen sin comprimir
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4  # 0-11; 4-5 es el punto dulce para contenido dinámico
+
+    # Instrumentación por request (Server-Timing, log estructurado, alarma de queries)
+    REQUEST_STATS_LOG: bool = True  # una línea JSON por request con tiempos y queries
+    REQUEST_QUERY_ALARM: int = 20  # warning si un request ejecuta más queries (0 = sin alarma)
+
+    # Endpoint /metrics (formato Prometheus)
+    METRICS_ENABLED: bool = True
+    METRICS_TOKEN: str = ""  # /metrics exige Authorization: Bearer <token>; vacío = endpoint deshabilitado (404)
+    METRICS_MULTIPROC_DIR: str = ""  # directorio compartido por los workers de uvicorn (vacío = un solo proceso)
+    METRICS_FLUSH_SECONDS: float = 5.0  # cada cuánto vuelca cada worker sus métricas al directorio
+
+    # Diagnóstico de queries lentas (ring buffer en /api/v1/admin/slow-queries)
+    SLOW_QUERY_LOG: bool = False  # opt-in: captura statements lentos con parámetros y ruta
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0
+    SLOW_QUERY_BUFFER_SIZE: int = 200  # capturas que se conservan (las más viejas se descartan)
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = 0.1  # fracción de SELECTs lentos re-ejecutados con EXPLAIN (ANALYZE, BUFFERS)
+    SLOW_QUERY_EXPLAIN_ON_REPLICA: bool = True  # con réplicas, los EXPLAIN corren ahí y no en el primario
 
     # CORS - Read from env var with comma-separated values
     CORS_ORIGINS: str = "http://localhost:5173"
@@ -25,6 +86,33 @@ class Settings(BaseSettings):
     R2_SECRET_KEY: str = ""
     R2_BUCKET: str = "lazos-images"
     R2_PUBLIC_URL: str = ""
+    STORAGE_MAX_CONCURRENCY: int = 8  # PUTs simultáneos (y conexiones del pool de boto3)
+    STORAGE_MAX_RETRIES: int = 3
+    STORAGE_RETRY_BASE_DELAY: float = 0.2  # segundos, se duplica en cada reintento
+    STORAGE_KNOWN_KEYS_MAX: int = 10000  # keys content-addressed recordadas en memoria (evita HEADs)
+
+    # Image renditions (comma-separated, like CORS_ORIGINS)
+    IMAGE_VARIANT_WIDTHS: str = "200,400,800,1600"
+    IMAGE_VARIANT_FORMATS: str = "webp,jpeg,avif"  # avif solo si Pillow lo soporta
+    IMAGE_WORKERS: int = 4
+    IMAGE_VERDICT_CACHE_SIZE: int = 2000  # veredictos de validación por SHA-256 (LRU)
+    IMAGE_VERDICT_CACHE_TTL_SECONDS: int = 30 * 24 * 3600
+    IMAGE_VERDICT_CACHE_PERSIST: bool = False  # también en la tabla image_validation_verdicts (opt-in, como el de texto)
+
+    # Upload ingestion limits
+    UPLOAD_MAX_FILE_MB: int = 10
+    UPLOAD_MAX_REQUEST_MB: int = 32  # 3 imágenes de 10MB + campos del formulario
+    UPLOAD_MAX_PIXELS: int = 50_000_000  # Evita decompression bombs
+    UPLOAD_URL_EXPIRES_SECONDS: int = 900  # Validez de las URLs firmadas (POST /uploads)
+    UPLOAD_ORPHAN_DAYS: int = 1  # lifecycle de R2: borra uploads/ más viejos (scripts/setup_r2_lifecycle.py)
+
+    # Moderación: "inline" valida antes de responder, "async" publica vía cola
+    MODERATION_MODE: str = "inline"
+    MODERATION_WORKERS: int = 2  # workers de la cola por proceso (0 = no consumir)
+    MODERATION_POLL_SECONDS: float = 1.0
+    MODERATION_JOB_TIMEOUT_SECONDS: int = 300  # jobs "running" más viejos se re-toman
+    MODERATION_JOB_MAX_ATTEMPTS: int = 3
+    MODERATION_RETRY_BASE_SECONDS: float = 30.0
 
     # Application
     PROJECT_NAME: str = "LAZOS API"
@@ -44,6 +132,21 @@ class Settings(BaseSettings):
     # Cloudflare Workers AI
     CLOUDFLARE_ACCOUNT_ID: str = ""
     CLOUDFLARE_API_TOKEN: str = ""
+    TEXT_VERDICT_CACHE_SIZE: int = 5000  # veredictos de texto en memoria (LRU)
+    TEXT_VERDICT_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    TEXT_VERDICT_CACHE_PERSIST: bool = False  # también en la tabla text_validation_verdicts
+    AI_IMAGE_SIZE: int = 256  # lado menor (px) de la imagen enviada a Cloudflare AI, 224-384; 0 = original
+    AI_BREAKER_FAILURE_THRESHOLD: int = 5  # fallas consecutivas que abren el breaker
+    AI_BREAKER_OPEN_SECONDS: float = 30.0  # cooldown antes de la llamada de prueba
+    AI_LATENCY_SLO_SECONDS: float = 5.0  # llamadas más lentas cuentan como falla
+    AI_TIMEOUT_MIN_SECONDS: float = 2.0
+    AI_TIMEOUT_P99_MULTIPLIER: float = 1.5  # timeout = p99 reciente x multiplicador
+
+    # Cliente HTTP compartido (Cloudflare AI)
+    HTTP_HTTP2: bool = True  # requiere el extra httpx[http2]
+    HTTP_MAX_CONNECTIONS: int = 20
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0  # segundos
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -51,11 +154,31 @@ class Settings(BaseSettings):
         case_sensitive=True,
     )
 
+    @property
+    def async_database_url(self) -> str:
+        """DATABASE_URL con el driver asyncpg"""
+        return asyncpg_url(self.DATABASE_URL)
+
+    @property
+    def database_replica_urls_list(self) -> list[str]:
+        """Parse DATABASE_REPLICA_URLS into asyncpg URLs"""
+        return [asyncpg_url(url.strip()) for url in self.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+
     @property
     def cors_origins_list(self) -> list[str]:
         """Parse CORS_ORIGINS string into list of origins"""
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
 
+    @property
+    def image_variant_widths_list(self) -> list[int]:
+        """Parse IMAGE_VARIANT_WIDTHS string into sorted list of widths"""
+        return sorted({int(w) for w in self.IMAGE_VARIANT_WIDTHS.split(",") if w.strip()})
+
+    @property
+    def image_variant_formats_list(self) -> list[str]:
+        """Parse IMAGE_VARIANT_FORMATS string into list of formats"""
+        return [f.strip().lower() for f in self.IMAGE_VARIANT_FORMATS.split(",") if f.strip()]
+
 
 # Create settings instance
 settings = Settings()
@@ -1,18 +1,56 @@
 """
 Database configuration and session management
+
+Dos engines sobre la misma base:
+- async_engine (asyncpg): lo usan todos los route handlers vía get_async_db,
+  así una query lenta no ocupa un thread del threadpool de FastAPI.
+- engine (psycopg2): workers de background (cola de moderación, caches de
+  veredictos), scripts y alembic.
+
+Pool, timeouts de Postgres y compatibilidad con PgBouncer se configuran en
+Settings (DB_*); ver app/utils/db_pool.py.
 """
-from sqlalchemy import create_engine
+from typing import AsyncGenerator
+
+from pgvector.asyncpg import register_vector
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.config import settings
+from app.utils.db_pool import (
+    TimedQueuePool,
+    TimedAsyncQueuePool,
+    session_timeouts,
+    connect_args_psycopg2,
+    connect_args_asyncpg,
+    apply_timeouts_per_transaction,
+)
+from app.utils.request_stats import instrument_queries
+from app.utils.slow_queries import get_slow_query_log
+
+_timeouts = session_timeouts(settings.DB_STATEMENT_TIMEOUT_MS, settings.DB_IDLE_IN_TRANSACTION_TIMEOUT_MS)
+
+# Opciones de pool compartidas por ambos engines
+_pool_options = dict(
+    echo=settings.DB_ECHO,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,  # sin pre-ping: pool_recycle evita conexiones viejas
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+)
 
 # Create SQLAlchemy engine
 engine = create_engine(
     settings.DATABASE_URL,
-    echo=True,  # Set to False in production
-    pool_pre_ping=True,  # Verify connections before using them
-    pool_size=5,
-    max_overflow=10,
+    poolclass=TimedQueuePool,
+    connect_args=connect_args_psycopg2(_timeouts, settings.DB_PGBOUNCER),
+    **_pool_options,
 )
+engine.pool.metrics_label = "sync"
+instrument_queries(engine)
+if settings.SLOW_QUERY_LOG:
+    get_slow_query_log().instrument(engine)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(
@@ -21,6 +59,48 @@ SessionLocal = sessionmaker(
     bind=engine,
 )
 
+def _register_asyncpg_types(dbapi_connection, connection_record):
+    """Codec de pgvector (Post.embedding) en cada conexión asyncpg nueva"""
+    dbapi_connection.run_async(register_vector)
+
+
+def create_app_async_engine(url: str, metrics_label: str) -> AsyncEngine:
+    """
+    Engine asyncpg con la configuración de pool, timeouts y tipos de la app
+    (primario y réplicas de lectura).
+    """
+    async_engine = create_async_engine(
+        url,
+        poolclass=TimedAsyncQueuePool,
+        connect_args=connect_args_asyncpg(_timeouts, settings.DB_PGBOUNCER),
+        **_pool_options,
+    )
+    async_engine.pool.metrics_label = metrics_label
+    event.listen(async_engine.sync_engine, "connect", _register_asyncpg_types)
+    instrument_queries(async_engine.sync_engine)
+    if settings.SLOW_QUERY_LOG:
+        get_slow_query_log().instrument(async_engine.sync_engine)
+    if settings.DB_PGBOUNCER:
+        # Modo transaction: los timeouts se fijan por transacción, no por conexión
+        apply_timeouts_per_transaction(async_engine.sync_engine, _timeouts)
+    return async_engine
+
+
+if settings.DB_PGBOUNCER:
+    apply_timeouts_per_transaction(engine, _timeouts)
+
+# Engine async (asyncpg) para los route handlers
+async_engine = create_app_async_engine(settings.async_database_url, "async")
+
+
+# expire_on_commit=False: después del commit los atributos siguen cargados
+# (en async un lazy load implícito falla con MissingGreenlet)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 # Create Base class for declarative models
 Base = declarative_base()
 
@@ -36,3 +116,12 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency that provides an async database session.
+    Yields a session and ensures it's closed after use.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,204 @@
+"""
+Ruteo de lecturas a réplicas de Postgres
+
+Los GET públicos (listados, detalle, mapa, búsqueda) leen de una réplica
+elegida round-robin entre las sanas; escrituras y panel admin van siempre
+al primario (get_async_db).
+
+- Health check periódico: cada REPLICA_HEALTH_CHECK_SECONDS se mide el lag
+  de replicación de cada réplica; caídas o con más de REPLICA_MAX_LAG_SECONDS
+  de atraso dejan de recibir lecturas hasta el próximo check bueno.
+- Read-your-writes: después de una escritura el cliente recibe un token
+  "<timestamp>:<lsn>" en el header READ_YOUR_WRITES_HEADER (y en la cookie
+  READ_YOUR_WRITES_COOKIE, ver ReadYourWritesMiddleware), con la posición
+  del WAL del primario (pg_current_wal_lsn) al terminar la escritura, y lo
+  reenvía en sus lecturas. Mientras dura, solo se usa una réplica cuyo
+  pg_last_wal_replay_lsn ya llegó a esa posición; si ninguna, el primario.
+
+Sin DATABASE_REPLICA_URLS todo va al primario.
+"""
+import asyncio
+import itertools
+import logging
+import math
+import time
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from starlette.requests import HTTPConnection
+
+from app.config import settings
+from app.database import AsyncSessionLocal, async_engine, create_app_async_engine
+from app.utils.metrics import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+READ_YOUR_WRITES_COOKIE = "lazos_last_write"
+READ_YOUR_WRITES_HEADER = "X-Last-Write"
+PRIMARY = "primary"
+
+# Posición actual del WAL del primario, en bytes
+PRIMARY_LSN_QUERY = text("SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), '0/0')")
+# Posición del WAL reproducida por la réplica (bytes) y segundos desde la última transacción reproducida
+REPLICA_STATE_QUERY = text(
+    "SELECT pg_wal_lsn_diff(CASE WHEN pg_is_in_recovery() THEN pg_last_wal_replay_lsn()"
+    " ELSE pg_current_wal_lsn() END, '0/0'),"
+    " CASE WHEN pg_is_in_recovery()"
+    " THEN COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) ELSE 0 END"
+)
+
+
+class LastWrite(NamedTuple):
+    """Última escritura de un cliente (token read-your-writes)"""
+    at: float  # timestamp, define cuánto dura el read-your-writes
+    lsn: Optional[int]  # posición del WAL del primario tras la escritura (None = desconocida, leer del primario)
+
+
+def write_token(written_at: float, lsn: Optional[int]) -> str:
+    """Token read-your-writes que se manda al cliente: "<timestamp>:<lsn>" """
+    return f"{written_at:.3f}:{lsn}" if lsn is not None else f"{written_at:.3f}"
+
+
+db_replica_healthy = Gauge("db_replica_healthy", "1 si la réplica responde al health check")
+db_replica_lag_seconds = Gauge("db_replica_lag_seconds", "Atraso de replicación medido en el último health check")
+db_reads_total = Counter("db_reads_total", "Sesiones de lectura por destino (réplica o primario)")
+
+
+class Replica:
+    """Réplica de lectura con su propio pool y el estado del último health check"""
+
+    def __init__(self, name: str, url: str):
+        self.name = name  # label de métricas (la URL tiene credenciales)
+        self.engine = create_app_async_engine(url, name)
+        self.sessionmaker = async_sessionmaker(bind=self.engine, autoflush=False, expire_on_commit=False)
+        self.healthy = True
+        self.lag_seconds = 0.0
+        # Hasta el primer check no se sabe hasta dónde replicó: no sirve a clientes con escrituras recientes
+        self.replayed_lsn: Optional[int] = None
+
+    def can_serve(self, written: Optional[LastWrite]) -> bool:
+        if not self.healthy or self.lag_seconds > settings.REPLICA_MAX_LAG_SECONDS:
+            return False
+        if written is None:
+            return True
+        return written.lsn is not None and self.replayed_lsn is not None and self.replayed_lsn >= written.lsn
+
+    def record_check(self, lag_seconds: Optional[float], replayed_lsn: Optional[int] = None) -> None:
+        """Actualiza el estado con el resultado de un health check (None = falló)"""
+        was_healthy = self.healthy
+        self.healthy = lag_seconds is not None
+        if self.healthy:
+            self.lag_seconds = lag_seconds
+            self.replayed_lsn = replayed_lsn
+            db_replica_lag_seconds.set(lag_seconds, replica=self.name)
+        db_replica_healthy.set(1 if self.healthy else 0, replica=self.name)
+
+        if was_healthy and not self.healthy:
+            logger.warning(f"⚠️ [Replicas] {self.name} no responde, lecturas al resto/primario")
+        elif self.healthy and not was_healthy:
+            logger.info(f"✅ [Replicas] {self.name} recuperada (lag {lag_seconds:.2f}s)")
+
+
+class ReplicaRouter:
+    """Elige de dónde leer: réplica sana y al día (round-robin) o primario"""
+
+    def __init__(self, replica_urls: List[str]):
+        self.replicas = [Replica(f"replica{i}", url) for i, url in enumerate(replica_urls)]
+        self._round_robin = itertools.count()
+        self._health_task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    def pick(self, written: Optional[LastWrite] = None) -> Optional[Replica]:
+        """Próxima réplica que puede servir al cliente, o None (usar el primario)"""
+        candidates = [replica for replica in self.replicas if replica.can_serve(written)]
+        if not candidates:
+            return None
+        return candidates[next(self._round_robin) % len(candidates)]
+
+    def sessionmaker_for_read(self, written: Optional[LastWrite] = None) -> async_sessionmaker:
+        replica = self.pick(written)
+        db_reads_total.inc(target=replica.name if replica else PRIMARY)
+        return replica.sessionmaker if replica else AsyncSessionLocal
+
+    async def primary_lsn(self) -> Optional[int]:
+        """Posición actual del WAL del primario (None si no se pudo leer)"""
+        try:
+            async with async_engine.connect() as connection:
+                lsn = await connection.scalar(PRIMARY_LSN_QUERY)
+            return int(lsn)
+        except Exception as e:
+            logger.warning(f"⚠️ [Replicas] No se pudo leer el LSN del primario: {e}")
+            return None
+
+    async def check_replica(self, replica: Replica, primary_lsn: Optional[int] = None) -> None:
+        """
+        Mide el atraso de la réplica. Si ya reprodujo el WAL hasta primary_lsn
+        está al día (lag 0); si no, el lag son los segundos desde la última
+        transacción reproducida (sin primary_lsn, una réplica ociosa puede
+        parecer atrasada: las lecturas van al primario, que es lo seguro).
+        """
+        try:
+            async with replica.engine.connect() as connection:
+                replayed, since_replay = (await connection.execute(REPLICA_STATE_QUERY)).one()
+        except Exception as e:
+            logger.debug(f"[Replicas] Health check de {replica.name} falló: {e}")
+            replica.record_check(None)
+            return
+        replayed = int(replayed) if replayed is not None else None
+        caught_up = primary_lsn is not None and replayed is not None and replayed >= primary_lsn
+        replica.record_check(0.0 if caught_up else float(since_replay or 0), replayed)
+
+    async def check_all(self) -> None:
+        primary_lsn = await self.primary_lsn()
+        await asyncio.gather(*[self.check_replica(replica, primary_lsn) for replica in self.replicas])
+
+    async def _health_loop(self) -> None:
+        while True:
+            await self.check_all()
+            await asyncio.sleep(settings.REPLICA_HEALTH_CHECK_SECONDS)
+
+    def start_health_checks(self) -> None:
+        if self.enabled and self._health_task is None:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def close(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+def last_write(connection: HTTPConnection) -> Optional[LastWrite]:
+    """Última escritura del cliente (header o cookie read-your-writes), si sigue vigente"""
+    raw = connection.headers.get(READ_YOUR_WRITES_HEADER) or connection.cookies.get(READ_YOUR_WRITES_COOKIE)
+    if not raw:
+        return None
+    written_at, _, lsn = raw.partition(":")
+    try:
+        written_at, lsn = float(written_at), int(lsn) if lsn else None
+    except ValueError:
+        return None
+    if not math.isfinite(written_at):
+        return None
+    # Un timestamp futuro no extiende el read-your-writes
+    written = LastWrite(min(written_at, time.time()), lsn)
+    if time.time() - written.at > settings.READ_YOUR_WRITES_SECONDS:
+        return None
+    return written
+
+
+_replica_router: Optional[ReplicaRouter] = None
+
+
+def get_replica_router() -> ReplicaRouter:
+    """Get or create replica router singleton"""
+    global _replica_router
+    if _replica_router is None:
+        _replica_router = ReplicaRouter(settings.database_replica_urls_list)
+    return _replica_router
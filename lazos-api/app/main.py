@@ -3,13 +3,27 @@ LAZOS API - Main FastAPI application
 """
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
+from fastapi.responses import ORJSONResponse
 import logging
 
 from app.config import settings
-from app.api.routes import posts, map, alerts, reports, admin, search
+from app.database import async_engine
+from app.db_router import get_replica_router, READ_YOUR_WRITES_COOKIE, READ_YOUR_WRITES_HEADER
+from app.middleware import (
+    BodySizeLimitMiddleware,
+    CompressionMiddleware,
+    ReadYourWritesMiddleware,
+    RequestTimingMiddleware,
+    ResponseCacheMiddleware,
+    SecurityHeadersMiddleware,
+)
+from app.services.http_client import init_http_client, close_http_client
+from app.services import moderation_queue
+from app.services.response_cache import POSTS, ALERTS
+from app.services.edge_cache import drain_purges
+from app.utils import prometheus
+from app.utils.slow_queries import get_slow_query_log
+from app.api.routes import posts, map, alerts, reports, admin, search, uploads, metrics
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +44,28 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+)
+
+# Cache de GETs públicos (ETag / 304) - el más interno, así las respuestas
+# cacheadas también pasan por CORS y headers de seguridad
+app.add_middleware(
+    ResponseCacheMiddleware,
+    routes={
+        "/api/v1/posts": (POSTS,),
+        "/api/v1/alerts": (ALERTS,),
+        "/api/v1/map": (POSTS, ALERTS),
+    },
+    store_grace_seconds=settings.REPLICA_MAX_LAG_SECONDS if settings.database_replica_urls_list else 0.0,
+)
+
+# Compresión br/gzip - por fuera del cache de respuestas (guarda cuerpos sin comprimir
+# y cada cliente recibe el encoding que negoció)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_BYTES,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
 )
 
 # CORS middleware
@@ -39,22 +75,33 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PATCH", "DELETE"],
     allow_headers=["*"],
+    # El frontend (otro sitio) lee X-Last-Write de las escrituras y lo reenvía en sus lecturas
+    expose_headers=[READ_YOUR_WRITES_HEADER],
 )
 
 
 # Security headers middleware
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        response.headers["Permissions-Policy"] = "geolocation=(self)"
-        return response
+app.add_middleware(SecurityHeadersMiddleware)
 
+# Request body limit - corta uploads gigantes antes de bufferearlos
+app.add_middleware(BodySizeLimitMiddleware, max_bytes=settings.UPLOAD_MAX_REQUEST_MB * 1024 * 1024)
 
-app.add_middleware(SecurityHeadersMiddleware)
+# Read-your-writes - con réplicas, quien acaba de escribir no lee datos viejos
+if settings.database_replica_urls_list:
+    app.add_middleware(
+        ReadYourWritesMiddleware,
+        cookie_name=READ_YOUR_WRITES_COOKIE,
+        header_name=READ_YOUR_WRITES_HEADER,
+        max_age=settings.READ_YOUR_WRITES_SECONDS,
+        current_lsn=get_replica_router().primary_lsn,
+    )
+
+# Tiempo de respuesta, queries y etapas por request - el más externo, mide todo el stack
+app.add_middleware(
+    RequestTimingMiddleware,
+    log_stats=settings.REQUEST_STATS_LOG,
+    query_alarm=settings.REQUEST_QUERY_ALARM,
+)
 
 
 # Health check endpoint
@@ -84,12 +131,46 @@ app.include_router(map.router, prefix="/api/v1", tags=["Map"])
 app.include_router(reports.router, prefix="/api/v1", tags=["Reports"])
 app.include_router(admin.router, prefix="/api/v1", tags=["Admin"])
 app.include_router(search.router, prefix="/api/v1", tags=["Search"])
+app.include_router(uploads.router, prefix="/api/v1", tags=["Uploads"])
+if settings.METRICS_ENABLED:
+    app.include_router(metrics.router, tags=["Health"])
 
 
 # Startup event - Mostrar configuración crítica
 @app.on_event("startup")
 async def startup_event():
     """Log de configuración al iniciar el servidor"""
+    # Cliente HTTP compartido (keep-alive a Cloudflare AI)
+    init_http_client()
+
+    # Réplicas de lectura: health checks y medición de lag en background
+    replica_router = get_replica_router()
+    if replica_router.enabled:
+        replica_router.start_health_checks()
+        logger.info(f"✅ Réplicas de lectura: {len(replica_router.replicas)}")
+
+    # Queries lentas: los EXPLAIN muestreados corren en una réplica si hay, si no en el primario
+    if settings.SLOW_QUERY_LOG:
+        replica = replica_router.pick() if settings.SLOW_QUERY_EXPLAIN_ON_REPLICA else None
+        get_slow_query_log().set_explain_engine(replica.engine if replica else async_engine)
+        logger.info(
+            f"✅ Log de queries lentas (> {settings.SLOW_QUERY_THRESHOLD_MS}ms, "
+            f"EXPLAIN en {replica.name if replica else 'primario'})"
+        )
+
+    # Workers de la cola de moderación (posts con subida directa / MODERATION_MODE=async)
+    if settings.MODERATION_WORKERS > 0:
+        moderation_queue.start_workers()
+        logger.info(f"✅ Cola de moderación: {settings.MODERATION_WORKERS} workers (modo {settings.MODERATION_MODE})")
+
+    if settings.METRICS_ENABLED and not settings.METRICS_TOKEN:
+        logger.warning("⚠️ METRICS_TOKEN vacío: /metrics deshabilitado (responde 404)")
+
+    # Métricas de este worker al directorio compartido (/metrics suma todos los workers)
+    if settings.METRICS_ENABLED and settings.METRICS_MULTIPROC_DIR:
+        prometheus.start_flusher(settings.METRICS_MULTIPROC_DIR, settings.METRICS_FLUSH_SECONDS)
+        logger.info(f"✅ Métricas multiproceso en {settings.METRICS_MULTIPROC_DIR}")
+
     logger.info("=" * 80)
     logger.info("LAZOS API - CONFIGURACIÓN AL INICIO")
     logger.info("=" * 80)
@@ -105,3 +186,16 @@ async def startup_event():
         logger.info(f"✅ R2_PUBLIC_URL configurado correctamente")
 
     logger.info("=" * 80)
+
+
+# Shutdown event - Cerrar conexiones salientes
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Detiene los workers de moderación, espera las purgas del CDN, cierra el cliente HTTP compartido y el pool async"""
+    await moderation_queue.stop_workers()
+    if settings.METRICS_MULTIPROC_DIR:
+        await prometheus.stop_flusher(settings.METRICS_MULTIPROC_DIR)
+    await drain_purges()
+    await close_http_client()
+    await get_replica_router().close()
+    await async_engine.dispose()
@@ -0,0 +1,18 @@
+"""
+Middleware package - ASGI middleware
+"""
+from app.middleware.body_limit import BodySizeLimitMiddleware
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.read_your_writes import ReadYourWritesMiddleware
+from app.middleware.response_cache import ResponseCacheMiddleware
+from app.middleware.security_headers import SecurityHeadersMiddleware
+from app.middleware.timing import RequestTimingMiddleware
+
+__all__ = [
+    "BodySizeLimitMiddleware",
+    "CompressionMiddleware",
+    "ReadYourWritesMiddleware",
+    "RequestTimingMiddleware",
+    "ResponseCacheMiddleware",
+    "SecurityHeadersMiddleware",
+]
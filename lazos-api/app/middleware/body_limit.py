@@ -0,0 +1,79 @@
+"""
+Límite de tamaño del body de los requests (ASGI puro)
+
+Rechaza con 413 antes de que el parser multipart bufferee el body completo:
+- Si Content-Length supera el límite, responde sin leer el body
+- Si el body llega chunked, corta apenas los bytes recibidos superan el límite
+"""
+import json
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class BodySizeLimitMiddleware:
+    """Middleware ASGI que limita los bytes de body por request"""
+
+    def __init__(self, app: ASGIApp, max_bytes: int):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def _send_413(self, send: Send) -> None:
+        body = json.dumps({
+            "detail": f"Request demasiado grande. Máximo: {self.max_bytes // (1024 * 1024)}MB"
+        }).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"connection", b"close"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers", []))
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_bytes:
+            await self._send_413(send)
+            return
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # Cortar el stream: el parser ve un body truncado y la
+                    # respuesta de error se reemplaza por 413 en limited_send
+                    exceeded = True
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def limited_send(message: Message) -> None:
+            nonlocal response_started
+            if exceeded:
+                if message["type"] == "http.response.start" and not response_started:
+                    response_started = True
+                    await self._send_413(send)
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, limited_send)
+        except Exception:
+            # La app puede propagar el corte (ClientDisconnect) en vez de responder
+            if not exceeded:
+                raise
+            if not response_started:
+                await self._send_413(send)
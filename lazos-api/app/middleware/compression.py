@@ -0,0 +1,185 @@
+"""
+Compresión de respuestas br / gzip (ASGI puro)
+
+- Negocia con Accept-Encoding (q-values): br si el cliente lo acepta y
+  brotli está instalado, si no gzip.
+- Solo comprime tipos de texto/JSON (y el binario del mapa); imágenes y
+  respuestas que ya traen Content-Encoding (p. ej. tiles MVT en gzip) pasan
+  tal cual, igual que las que piden Cache-Control: no-transform.
+- Respuestas de un solo bloque más chicas que minimum_size no se comprimen.
+- Streaming: con more_body cada bloque se comprime y se hace flush, así el
+  cliente recibe los datos a medida que salen.
+
+Al comprimir, un ETag fuerte pasa a débil (W/): los bytes cambian según el
+encoding y la validación condicional del cache de respuestas ya acepta W/.
+"""
+import zlib
+from typing import Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.utils.metrics import Counter
+
+try:
+    import brotli  # dependencia opcional: sin ella solo gzip
+except ImportError:  # pragma: no cover
+    brotli = None
+
+compression_responses_total = Counter(
+    "compression_responses_total", "Respuestas comprimibles por encoding (br/gzip/identity)"
+)
+compression_bytes_total = Counter(
+    "compression_bytes_total", "Bytes de respuestas comprimidas antes (in) y después (out)"
+)
+
+COMPRESSIBLE_TYPES = {
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/vnd.lazos.map-points",
+    "image/svg+xml",
+}
+
+
+def _is_compressible(content_type: str) -> bool:
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return (
+        media_type.startswith("text/")
+        or media_type in COMPRESSIBLE_TYPES
+        or media_type.endswith("+json")
+    )
+
+
+def negotiate(accept_encoding: str, available: tuple) -> Optional[str]:
+    """Elige el encoding preferido (orden de `available`) entre los aceptados con q > 0"""
+    qualities: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            qualities[name.strip().lower()] = q
+
+    best, best_q = None, 0.0
+    for encoding in available:
+        q = qualities.get(encoding, qualities.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class _GzipStream:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        flush_mode = zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH
+        return self._compressor.compress(data) + self._compressor.flush(flush_mode)
+
+
+class _BrotliStream:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        out = self._compressor.process(data)
+        return out + (self._compressor.finish() if final else self._compressor.flush())
+
+
+class CompressionMiddleware:
+    """Middleware ASGI de compresión br / gzip con umbral de tamaño"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.encodings = ("br", "gzip") if brotli is not None else ("gzip",)
+
+    def _stream(self, encoding: str):
+        if encoding == "br":
+            return _BrotliStream(self.brotli_quality)
+        return _GzipStream(self.gzip_level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        start: Optional[Message] = None
+        stream = None
+        passthrough = False
+
+        async def compressing_send(message: Message) -> None:
+            nonlocal start, stream, passthrough
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=list(message.get("headers", [])))
+                if (
+                    message["status"] < 200
+                    or message["status"] in (204, 304)
+                    or "content-encoding" in headers
+                    or not _is_compressible(headers.get("content-type", ""))
+                    or "no-transform" in headers.get("cache-control", "")
+                ):
+                    passthrough = True
+                    await send(message)
+                    return
+                # Caches intermedios: la representación depende de Accept-Encoding
+                headers.add_vary_header("Accept-Encoding")
+                message["headers"] = headers.raw
+                content_length = headers.get("content-length")
+                if encoding is None or (content_length is not None and int(content_length) < self.minimum_size):
+                    passthrough = True
+                    compression_responses_total.inc(encoding="identity")
+                    await send(message)
+                    return
+                start = message  # se manda con el primer bloque, ya sabiendo si se comprime
+                return
+
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            compression_bytes_total.inc(len(body), direction="in")
+
+            if stream is None:
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    compression_responses_total.inc(encoding="identity")
+                    await send(start)
+                    await send(message)
+                    return
+                stream = self._stream(encoding)
+                compression_responses_total.inc(encoding=encoding)
+                headers = MutableHeaders(raw=start["headers"])
+                headers["Content-Encoding"] = encoding
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = f"W/{etag}"
+                data = stream.compress(body, final=not more_body)
+                if more_body:
+                    del headers["content-length"]
+                else:
+                    headers["Content-Length"] = str(len(data))
+                await send(start)
+            else:
+                data = stream.compress(body, final=not more_body)
+
+            compression_bytes_total.inc(len(data), direction="out")
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, compressing_send)
@@ -0,0 +1,62 @@
+"""
+Marca read-your-writes (ASGI puro)
+
+Después de una escritura exitosa (POST/PATCH/PUT/DELETE con status < 400)
+responde el token read-your-writes (timestamp y posición del WAL del
+primario, ver app.db_router) en el header X-Last-Write y en una cookie.
+get_read_db lo usa para no mandar al cliente a una réplica que todavía no
+reprodujo su cambio.
+
+El frontend está en otro sitio que la API (vercel.app / railway.app): el
+navegador no guarda ni reenvía una cookie SameSite=Lax en fetch cross-site,
+así que el cliente web reenvía el header (apiFetch en lazos-web). La cookie
+queda para clientes en el mismo sitio.
+"""
+import time
+from typing import Awaitable, Callable, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.db_router import write_token
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class ReadYourWritesMiddleware:
+    """Middleware ASGI que marca a los clientes que acaban de escribir"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        cookie_name: str,
+        header_name: str,
+        max_age: int,
+        current_lsn: Optional[Callable[[], Awaitable[Optional[int]]]] = None,
+    ):
+        self.app = app
+        self.cookie_name = cookie_name
+        self.header_name = header_name.lower().encode("latin-1")
+        self.max_age = max_age
+        # LSN del primario tras la escritura; sin él el cliente lee del primario mientras dura la marca
+        self.current_lsn = current_lsn
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def marking_send(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                lsn = await self.current_lsn() if self.current_lsn is not None else None
+                written_at = write_token(time.time(), lsn)
+                cookie = (
+                    f"{self.cookie_name}={written_at}; Max-Age={self.max_age}; "
+                    f"Path=/; HttpOnly; SameSite=Lax"
+                )
+                message["headers"] = list(message.get("headers", [])) + [
+                    (self.header_name, written_at.encode("latin-1")),
+                    (b"set-cookie", cookie.encode("latin-1")),
+                ]
+            await send(message)
+
+        await self.app(scope, receive, marking_send)
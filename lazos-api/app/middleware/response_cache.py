@@ -0,0 +1,181 @@
+"""
+Cache de GETs públicos con validación condicional (ASGI puro)
+
+Para las rutas configuradas (prefijo -> tablas de las que dependen):
+- If-None-Match / If-Modified-Since vigentes y cuerpo guardado para la
+  clave: 304 sin llamar a la app (sin entrada, la app decide: puede ser 404)
+- Cuerpo cacheado para el ETag actual: 200 desde el cache
+- Si no: llama a la app y guarda la respuesta 200
+
+Un cliente con una escritura reciente (token read-your-writes) no usa el
+cache: su request va directo a la app.
+
+Todas las respuestas llevan ETag y Last-Modified. El Cache-Control y las
+surrogate keys de la ruta (ver edge_cache.cache_policy) se guardan con el
+cuerpo y se repiten en los HIT y 304; sin política, Cache-Control: no-cache.
+"""
+import hashlib
+import logging
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.db_router import last_write
+from app.services.response_cache import get_response_cache, make_etag, response_cache_requests_total
+
+logger = logging.getLogger(__name__)
+
+# Headers de la respuesta original que se guardan con el cuerpo
+STORED_HEADERS = {b"content-type", b"cache-control", b"surrogate-key", b"cache-tag"}
+# Headers que RFC 9110 pide repetir en un 304
+NOT_MODIFIED_HEADERS = {"cache-control", "surrogate-key", "cache-tag"}
+DEFAULT_CACHE_CONTROL = (b"cache-control", b"no-cache")
+
+
+def normalized_key(path: str, query_string: bytes) -> str:
+    """Ruta + query params ordenados (el orden de los params no genera entradas distintas)"""
+    params = sorted(parse_qsl(query_string.decode("latin-1"), keep_blank_values=True))
+    raw = f"{path}?{urlencode(params)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in candidates
+
+
+def _not_modified_since(if_modified_since: str, last_modified: float) -> bool:
+    try:
+        return int(last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+
+class ResponseCacheMiddleware:
+    """Middleware ASGI de cache de respuestas con ETag / Last-Modified"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        routes: Dict[str, Sequence[str]],
+        store_grace_seconds: float = 0.0,
+    ):
+        self.app = app
+        self.routes = routes
+        # Con réplicas, no guardar respuestas armadas justo después de un cambio
+        # (la réplica puede no tenerlo todavía y quedaría cacheado con la versión nueva)
+        self.store_grace_seconds = store_grace_seconds
+
+    def _tables_for(self, path: str) -> Optional[Sequence[str]]:
+        for prefix, tables in self.routes.items():
+            if path == prefix or path.startswith(prefix + "/"):
+                return tables
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        tables = None
+        if scope["type"] == "http" and scope["method"] == "GET":
+            tables = self._tables_for(scope["path"])
+        cache = get_response_cache() if tables else None
+        if cache is None:
+            await self.app(scope, receive, send)
+            return
+        if last_write(HTTPConnection(scope)) is not None:
+            response_cache_requests_total.inc(result="bypass")
+            await self.app(scope, receive, send)
+            return
+
+        key = normalized_key(scope["path"], scope.get("query_string", b""))
+        try:
+            state = await cache.table_state(tables)
+            version_token, last_modified = state.token, state.last_modified
+            cached = await cache.get(f"{key}:{version_token}")
+        except Exception as e:
+            logger.error(f"❌ [ResponseCache] Backend no disponible, sin cache: {e}")
+            response_cache_requests_total.inc(result="bypass")
+            await self.app(scope, receive, send)
+            return
+
+        etag = make_etag(key, version_token)
+        validators = [
+            (b"etag", etag.encode("latin-1")),
+            (b"last-modified", formatdate(last_modified, usegmt=True).encode("latin-1")),
+        ]
+        stored_headers = [
+            (name.encode("latin-1"), value.encode("latin-1")) for name, value in (cached[0] if cached else [])
+        ]
+
+        headers = dict(scope.get("headers", []))
+        if_none_match = headers.get(b"if-none-match")
+        if_modified_since = headers.get(b"if-modified-since")
+        # Solo se responden condicionales de claves con una respuesta 200 guardada:
+        # el estado de las tablas no dice nada de un id inexistente o params inválidos
+        if cached is not None and (
+            (if_none_match is not None and _etag_matches(if_none_match.decode("latin-1"), etag))
+            or (
+                if_none_match is None
+                and if_modified_since is not None
+                and _not_modified_since(if_modified_since.decode("latin-1"), last_modified)
+            )
+        ):
+            response_cache_requests_total.inc(result="not_modified")
+            policy = [(name, value) for name, value in stored_headers if name.decode() in NOT_MODIFIED_HEADERS]
+            await send({
+                "type": "http.response.start",
+                "status": 304,
+                "headers": validators + (policy or [DEFAULT_CACHE_CONTROL]),
+            })
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        if cached is not None:
+            response_cache_requests_total.inc(result="hit")
+            body = cached[1]
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": stored_headers + validators + [
+                    (b"content-length", str(len(body)).encode("latin-1")),
+                    (b"x-cache", b"HIT"),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        response_cache_requests_total.inc(result="miss")
+        status = 0
+        to_store: List[Tuple[str, str]] = []
+        chunks: List[bytes] = []
+
+        async def caching_send(message: Message) -> None:
+            nonlocal status, to_store
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if status == 200:
+                    response_headers: List[Tuple[bytes, bytes]] = list(message.get("headers", []))
+                    if not any(name.lower() == b"cache-control" for name, _ in response_headers):
+                        response_headers.append(DEFAULT_CACHE_CONTROL)
+                    to_store = [
+                        (name.decode("latin-1").lower(), value.decode("latin-1"))
+                        for name, value in response_headers
+                        if name.lower() in STORED_HEADERS
+                    ]
+                    message["headers"] = response_headers + validators + [(b"x-cache", b"MISS")]
+            elif message["type"] == "http.response.body" and status == 200:
+                chunks.append(message.get("body", b""))
+                # La gracia cuenta desde la última invalidación, no desde el inicio de la época
+                settled = time.time() - state.invalidated_at >= self.store_grace_seconds
+                if not message.get("more_body", False) and settled:
+                    try:
+                        await cache.set(f"{key}:{version_token}", (to_store, b"".join(chunks)))
+                    except Exception as e:
+                        logger.error(f"❌ [ResponseCache] Error guardando respuesta: {e}")
+            await send(message)
+
+        await self.app(scope, receive, caching_send)
@@ -0,0 +1,42 @@
+"""
+Headers de seguridad en todas las respuestas (ASGI puro)
+
+Los agrega en http.response.start, sin envolver la respuesta como
+BaseHTTPMiddleware (que suma una task y un stream por request y rompe
+streaming y background tasks).
+"""
+from typing import Dict, Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+DEFAULT_SECURITY_HEADERS = {
+    "X-Content-Type-Options": "nosniff",
+    "X-Frame-Options": "DENY",
+    "X-XSS-Protection": "1; mode=block",
+    "Referrer-Policy": "strict-origin-when-cross-origin",
+    "Permissions-Policy": "geolocation=(self)",
+}
+
+
+class SecurityHeadersMiddleware:
+    """Middleware ASGI que agrega headers de seguridad a cada respuesta"""
+
+    def __init__(self, app: ASGIApp, headers: Optional[Dict[str, str]] = None):
+        self.app = app
+        self.headers = headers if headers is not None else DEFAULT_SECURITY_HEADERS
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=list(message.get("headers", [])))
+                for name, value in self.headers.items():
+                    headers[name] = value
+                message["headers"] = headers.raw
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
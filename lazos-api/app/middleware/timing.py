@@ -0,0 +1,112 @@
+"""
+Tiempo de respuesta e instrumentación por request (ASGI puro)
+
+- X-Response-Time: tiempo hasta los headers de la respuesta (en ms)
+- Server-Timing: tiempo en la base (con cantidad de queries), etapas del
+  handler (app.utils.request_stats.stage) y total, visibles en DevTools
+- http_request_duration_seconds / http_request_queries: duración total hasta
+  el último byte del cuerpo y queries por request, por método, ruta
+  (template, no el path con ids) y status
+- Log estructurado (una línea JSON por request) y warning cuando un request
+  supera query_alarm queries: así aparecen los N+1
+"""
+import logging
+import time
+
+import orjson
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.utils.metrics import Counter, Histogram
+from app.utils.request_stats import end_request, start_request, current_stats
+
+logger = logging.getLogger(__name__)
+
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds", "Duración de los requests HTTP por método, ruta y status"
+)
+http_request_queries = Histogram(
+    "http_request_queries", "Queries SQL por request", buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+)
+request_query_alarms_total = Counter(
+    "request_query_alarms_total", "Requests que superaron REQUEST_QUERY_ALARM queries, por ruta"
+)
+
+
+def route_template(scope: Scope) -> str:
+    """Template de la ruta que atendió el request ("/api/v1/posts/{post_id}")"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class RequestTimingMiddleware:
+    """Middleware ASGI que mide la duración, las queries y las etapas de cada request"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        header_name: str = "X-Response-Time",
+        server_timing: bool = True,
+        log_stats: bool = False,
+        query_alarm: int = 0,
+    ):
+        self.app = app
+        self.header_name = header_name.lower().encode("latin-1")
+        self.server_timing = server_timing
+        self.log_stats = log_stats
+        self.query_alarm = query_alarm
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = start_request(scope)
+        stats = current_stats()
+        status = 500
+        observed = False
+
+        def observe() -> None:
+            nonlocal observed
+            observed = True
+            route = route_template(scope)
+            labels = dict(method=scope["method"], route=route, status=status)
+            http_request_duration_seconds.observe(stats.elapsed(), **labels)
+            http_request_queries.observe(stats.queries, **labels)
+
+            record = None
+            if self.log_stats or (self.query_alarm and stats.queries > self.query_alarm):
+                record = orjson.dumps({
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": route,
+                    "status": status,
+                    **stats.as_dict(),
+                }).decode()
+            if self.query_alarm and stats.queries > self.query_alarm:
+                request_query_alarms_total.inc(route=route)
+                logger.warning(f"⚠️ [Request] {stats.queries} queries (> {self.query_alarm}): {record}")
+            elif self.log_stats:
+                logger.info(f"📊 [Request] {record}")
+
+        async def timing_send(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((self.header_name, f"{stats.elapsed() * 1000:.1f}ms".encode("latin-1")))
+                if self.server_timing:
+                    headers.append((b"server-timing", stats.server_timing().encode("latin-1")))
+                message["headers"] = headers
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                observe()
+
+        try:
+            await self.app(scope, receive, timing_send)
+        except Exception:
+            # Excepción sin respuesta: la registra como 500 (ServerErrorMiddleware responde afuera)
+            if not observed:
+                observe()
+            raise
+        finally:
+            end_request(token)
@@ -0,0 +1,45 @@
+"""
+ImageValidationVerdict model - Persisted result of the hybrid image validator
+"""
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.database import Base
+
+
+class ImageValidationVerdict(Base):
+    """
+    ImageValidationVerdict model - Cached validation of an image by content hash
+
+    Re-uploaded or duplicated images reuse the stored verdicts instead of
+    running Python NSFW and Cloudflare AI again.
+
+    Fields:
+    - sha256: SHA-256 of the raw image bytes (primary key)
+    - phase1: Python NSFW result (dict)
+    - phase2: Cloudflare AI result (dict), null if it never ran
+    - created_at / updated_at: Timestamps for TTL and cleanup
+    """
+    __tablename__ = "image_validation_verdicts"
+
+    sha256 = Column(String(64), primary_key=True)
+    phase1 = Column(JSONB, nullable=False)
+    phase2 = Column(JSONB, nullable=True)
+
+    # Timestamps
+    created_at = Column(
+        DateTime(timezone=True),
+        default=datetime.utcnow,
+        nullable=False,
+    )
+    updated_at = Column(
+        DateTime(timezone=True),
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+        nullable=False,
+        index=True,
+    )
+
+    def __repr__(self):
+        return f"<ImageValidationVerdict {self.sha256[:12]}>"
@@ -0,0 +1,73 @@
+"""
+ModerationJob model - Background validation/processing job for a post
+"""
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID, ARRAY
+import uuid
+
+from app.database import Base
+
+
+class ModerationJob(Base):
+    """
+    ModerationJob model - Queue entry for post-publish moderation
+
+    Posts created with direct uploads (or with MODERATION_MODE=async) are
+    persisted hidden and acknowledged immediately; their images are then
+    validated, processed and published by the background worker, which
+    claims jobs with SELECT ... FOR UPDATE SKIP LOCKED.
+
+    Fields:
+    - id: Unique identifier (UUID)
+    - post_id: Foreign key to posts table
+    - upload_keys: Raw image keys in R2 (uploads/...) to process
+    - pending_approval: Whether the author asked for manual moderation
+    - status: queued / running / done / failed
+    - attempts: Number of times the job was claimed
+    - last_error: Error of the last failed attempt
+    - run_after: Earliest time the job can be claimed (retry backoff)
+    - created_at / started_at / finished_at: Timestamps for queue latency
+    """
+    __tablename__ = "moderation_jobs"
+
+    # Primary key
+    id = Column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+    )
+
+    # Foreign key to posts
+    post_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("posts.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+
+    # Payload
+    upload_keys = Column(ARRAY(String(200)), nullable=False)
+    pending_approval = Column(Boolean, default=False, nullable=False)
+
+    # Queue state
+    status = Column(String(20), default="queued", nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(String(500), nullable=True)
+    run_after = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
+
+    # Timestamps
+    created_at = Column(
+        DateTime(timezone=True),
+        default=datetime.utcnow,
+        nullable=False,
+    )
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_moderation_jobs_status_run_after", "status", "run_after"),
+    )
+
+    def __repr__(self):
+        return f"<ModerationJob {self.id} - post {self.post_id} ({self.status})>"
@@ -0,0 +1,62 @@
+"""
+PostImageVariant model - Represents a responsive rendition of a post image
+"""
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+
+from app.database import Base
+
+
+class PostImageVariant(Base):
+    """
+    PostImageVariant model - A single width/format rendition of a PostImage
+
+    Each uploaded image is encoded at several widths (e.g. 200/400/800/1600)
+    and formats (WebP, JPEG and AVIF when available) so clients can pick the
+    smallest adequate file via srcset.
+
+    Fields:
+    - id: Unique identifier (UUID)
+    - post_image_id: Foreign key to post_images table
+    - width: Rendition width in px
+    - height: Rendition height in px
+    - format: Encoding format (webp/jpeg/avif)
+    - url: Public URL of the rendition in R2
+    - size_bytes: Encoded file size
+    - created_at: Timestamp when the rendition was uploaded
+    """
+    __tablename__ = "post_image_variants"
+
+    # Primary key
+    id = Column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+    )
+
+    # Foreign key to post_images
+    post_image_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("post_images.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+
+    # Rendition metadata
+    width = Column(Integer, nullable=False)
+    height = Column(Integer, nullable=False)
+    format = Column(String(10), nullable=False)
+    url = Column(String(500), nullable=False)
+    size_bytes = Column(Integer, nullable=False)
+
+    # Timestamps
+    created_at = Column(
+        DateTime(timezone=True),
+        default=datetime.utcnow,
+        nullable=False,
+    )
+
+    def __repr__(self):
+        return f"<PostImageVariant {self.id} - {self.width}w {self.format}>"
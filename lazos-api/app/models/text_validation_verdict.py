@@ -0,0 +1,43 @@
+"""
+TextValidationVerdict model - Persisted verdict of the text validation AI
+"""
+from datetime import datetime
+from sqlalchemy import Column, String, Boolean, Float, DateTime
+
+from app.database import Base
+
+
+class TextValidationVerdict(Base):
+    """
+    TextValidationVerdict model - Cached AI verdict for a normalized text
+
+    Alerts and posts repeat the same short descriptions, so the verdict of
+    the text validation model is stored under a hash of the normalized
+    text + model + prompt version and reused across processes/restarts.
+
+    Fields:
+    - key: SHA-256 of model|prompt_version|normalized text (primary key)
+    - is_valid: Verdict of the model
+    - reason: Reason returned to the caller
+    - confidence: Confidence returned to the caller
+    - model: Model that produced the verdict
+    - created_at: Timestamp when the verdict was stored
+    """
+    __tablename__ = "text_validation_verdicts"
+
+    key = Column(String(64), primary_key=True)
+    is_valid = Column(Boolean, nullable=False)
+    reason = Column(String(500), nullable=False)
+    confidence = Column(Float, nullable=False)
+    model = Column(String(100), nullable=False)
+
+    # Timestamps
+    created_at = Column(
+        DateTime(timezone=True),
+        default=datetime.utcnow,
+        nullable=False,
+        index=True,
+    )
+
+    def __repr__(self):
+        return f"<TextValidationVerdict {self.key[:12]} - valid={self.is_valid}>"
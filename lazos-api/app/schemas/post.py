@@ -49,6 +49,7 @@ class PostResponse(PostBase):
     longitude: float
     created_at: datetime
     is_active: bool
+    srcset: Optional[dict[str, str]] = None  # Variantes de la imagen principal por formato
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -0,0 +1,30 @@
+"""
+Upload Pydantic schemas for direct-to-storage (presigned) uploads
+"""
+from pydantic import BaseModel, Field
+from typing import List, Literal
+
+
+class UploadFileSpec(BaseModel):
+    """A file the client intends to upload"""
+    content_type: Literal["image/jpeg", "image/png", "image/webp"]
+    size: int = Field(..., gt=0, description="Tamaño exacto del archivo en bytes (se firma en la URL)")
+
+
+class UploadRequest(BaseModel):
+    """Schema for requesting presigned upload URLs"""
+    files: List[UploadFileSpec] = Field(..., min_length=1, max_length=3)
+
+
+class UploadTicket(BaseModel):
+    """Presigned PUT URL for a single file"""
+    key: str
+    upload_url: str
+    method: str = "PUT"
+    headers: dict[str, str]
+    expires_in: int
+
+
+class UploadResponse(BaseModel):
+    """Schema for presigned upload URLs response"""
+    uploads: List[UploadTicket]
@@ -0,0 +1,174 @@
+"""
+Políticas de cache para CDN (Cache-Control + surrogate keys) y purga en el edge
+
+Cada GET público declara su política con la dependency cache_policy():
+- Feeds (listados de posts/avisos, mapa): s-maxage corto + stale-while-revalidate,
+  el navegador revalida siempre (max-age=0) contra el ETag.
+- Detalle de post/aviso: cacheable mucho tiempo en el edge, se purga al cambiar.
+- Clientes con una escritura reciente (read-your-writes, ver app.db_router):
+  private, no-store. El frontend además agrega el token a la URL de sus
+  GETs, así tampoco recibe la copia del edge.
+
+Las respuestas llevan Surrogate-Key (separadas por espacio, Fastly y otros) y
+Cache-Tag (separadas por coma, Cloudflare). Las mutaciones llaman a
+schedule_purge() después del commit con las keys afectadas: la purga corre en
+una task aparte, así la respuesta no espera la llamada a la API del CDN. El
+hook de purga se elige con EDGE_PURGE_BACKEND (none | cloudflare).
+"""
+import asyncio
+import contextvars
+import logging
+from typing import Callable, Iterable, List, Optional, Set
+from uuid import UUID
+
+from fastapi import Request, Response
+
+from app.config import settings
+from app.db_router import last_write
+from app.services.http_client import timed_post
+
+logger = logging.getLogger(__name__)
+
+# Surrogate keys
+POSTS_KEY = "posts"
+ALERTS_KEY = "alerts"
+MAP_KEY = "map"
+
+# Cloudflare acepta hasta 30 tags por request de purga
+CLOUDFLARE_MAX_TAGS = 30
+# Respuestas para un cliente que acaba de escribir: ni el edge ni el navegador las guardan
+READ_YOUR_WRITES_CACHE_CONTROL = "private, no-store"
+
+
+def feed_cache_control() -> str:
+    return (
+        f"public, max-age=0, s-maxage={settings.CACHE_FEED_S_MAXAGE}, "
+        f"stale-while-revalidate={settings.CACHE_FEED_STALE_SECONDS}"
+    )
+
+
+def detail_cache_control() -> str:
+    return (
+        f"public, max-age={settings.CACHE_DETAIL_MAX_AGE}, s-maxage={settings.CACHE_DETAIL_S_MAXAGE}, "
+        f"stale-while-revalidate={settings.CACHE_FEED_STALE_SECONDS}"
+    )
+
+
+def post_keys(post_id: UUID) -> List[str]:
+    """Keys a purgar cuando cambia un post (detalle, feeds y mapa)"""
+    return [f"post:{post_id}", POSTS_KEY, MAP_KEY]
+
+
+def alert_keys(alert_id: Optional[UUID] = None) -> List[str]:
+    """Keys a purgar cuando cambia un aviso (detalle si existe, feeds y mapa)"""
+    keys = [f"alert:{alert_id}"] if alert_id else []
+    return keys + [ALERTS_KEY, MAP_KEY]
+
+
+def cache_policy(cache_control: Callable[[], str], *surrogate_keys: str) -> Callable:
+    """
+    Dependency que agrega Cache-Control y surrogate keys a la respuesta.
+    Las keys pueden usar path params: "post:{post_id}".
+    Solo aplica a respuestas exitosas (un HTTPException descarta estos headers).
+    """
+    def dependency(request: Request, response: Response) -> None:
+        keys = [key.format(**request.path_params) for key in surrogate_keys]
+        fresh = last_write(request) is not None
+        response.headers["Cache-Control"] = READ_YOUR_WRITES_CACHE_CONTROL if fresh else cache_control()
+        response.headers["Surrogate-Key"] = " ".join(keys)
+        response.headers["Cache-Tag"] = ",".join(keys)
+
+    return dependency
+
+
+class PurgeHook:
+    """Interfaz de purga por surrogate key en el edge"""
+
+    async def purge(self, keys: List[str]) -> None:
+        raise NotImplementedError
+
+
+class NoopPurgeHook(PurgeHook):
+    """Sin CDN delante (desarrollo): no hace nada"""
+
+    async def purge(self, keys: List[str]) -> None:
+        logger.debug(f"[EdgeCache] Purga omitida (sin CDN): {keys}")
+
+
+class RecordingPurgeHook(PurgeHook):
+    """Guarda las purgas pedidas (tests)"""
+
+    def __init__(self):
+        self.purged: List[List[str]] = []
+
+    async def purge(self, keys: List[str]) -> None:
+        self.purged.append(list(keys))
+
+    @property
+    def keys(self) -> set:
+        return {key for keys in self.purged for key in keys}
+
+
+class CloudflarePurgeHook(PurgeHook):
+    """Purga por Cache-Tag con la API de Cloudflare"""
+
+    def __init__(self, zone_id: str, api_token: str):
+        self.url = f"https://api.cloudflare.com/client/v4/zones/{zone_id}/purge_cache"
+        self.headers = {"Authorization": f"Bearer {api_token}"}
+
+    async def purge(self, keys: List[str]) -> None:
+        for i in range(0, len(keys), CLOUDFLARE_MAX_TAGS):
+            response = await timed_post(
+                "cloudflare_purge",
+                self.url,
+                timeout=5.0,
+                headers=self.headers,
+                json={"tags": keys[i:i + CLOUDFLARE_MAX_TAGS]},
+            )
+            response.raise_for_status()
+
+
+_purge_hook: Optional[PurgeHook] = None
+
+
+def get_purge_hook() -> PurgeHook:
+    """Get or create purge hook singleton"""
+    global _purge_hook
+    if _purge_hook is None:
+        if settings.EDGE_PURGE_BACKEND == "cloudflare":
+            _purge_hook = CloudflarePurgeHook(settings.CLOUDFLARE_ZONE_ID, settings.CLOUDFLARE_API_TOKEN)
+        else:
+            _purge_hook = NoopPurgeHook()
+    return _purge_hook
+
+
+async def purge_surrogate_keys(keys: Iterable[str]) -> None:
+    """
+    Purga en el edge las respuestas con esas keys. Llamar después del commit;
+    si la purga falla solo se loguea (el s-maxage acota cuánto queda viejo).
+    """
+    keys = list(dict.fromkeys(keys))
+    try:
+        await get_purge_hook().purge(keys)
+    except Exception as e:
+        logger.error(f"❌ [EdgeCache] Error purgando {keys}: {e}")
+
+
+_pending_purges: Set[asyncio.Task] = set()
+
+
+def schedule_purge(keys: Iterable[str]) -> None:
+    """
+    Lanza purge_surrogate_keys en background (sin esperar al CDN). Llamar
+    después del commit, desde el event loop.
+    """
+    # Contexto vacío: la purga no se cuenta en las estadísticas del request que la lanzó
+    task = asyncio.get_running_loop().create_task(purge_surrogate_keys(list(keys)), context=contextvars.Context())
+    _pending_purges.add(task)
+    task.add_done_callback(_pending_purges.discard)
+
+
+async def drain_purges(timeout: float = 5.0) -> None:
+    """Espera las purgas en curso (al apagar la app)"""
+    if _pending_purges:
+        await asyncio.wait(list(_pending_purges), timeout=timeout)
@@ -0,0 +1,146 @@
+"""
+Cliente HTTP compartido (httpx.AsyncClient) para los servicios externos
+
+Un único cliente con keep-alive, HTTP/2 y límites de conexiones, creado al
+iniciar la app y cerrado al apagarla. Así las validaciones con Cloudflare AI
+reutilizan la conexión TLS en vez de abrir una nueva por llamada.
+"""
+import logging
+import time
+from typing import Optional
+
+import httpx
+
+from app.config import settings
+from app.utils.circuit_breaker import CircuitBreaker, CircuitOpenError, get_breaker
+from app.utils.metrics import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+# Latencia de cada request saliente, por servicio y resultado
+http_client_request_seconds = Histogram(
+    "http_client_request_seconds", "Latencia de requests HTTP salientes"
+)
+# Validaciones que no obtuvieron veredicto de Cloudflare AI, por validador (image/text) y motivo
+cloudflare_ai_fallbacks_total = Counter(
+    "cloudflare_ai_fallbacks_total", "Validaciones resueltas por fallback sin respuesta de Cloudflare AI"
+)
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def init_http_client(transport: Optional[httpx.AsyncBaseTransport] = None) -> httpx.AsyncClient:
+    """
+    Crea el cliente compartido (reemplaza al anterior si existía).
+
+    Args:
+        transport: Transport alternativo (ej: httpx.MockTransport en tests)
+    """
+    global _client
+
+    http2 = settings.HTTP_HTTP2 and _http2_available()
+    if settings.HTTP_HTTP2 and not http2:
+        logger.warning("⚠️ HTTP/2 no disponible (falta httpx[http2]), usando HTTP/1.1")
+
+    _client = httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(15.0, connect=5.0),
+        transport=transport,
+    )
+    logger.info(f"✅ Cliente HTTP compartido creado (http2={http2})")
+    return _client
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Retorna el cliente compartido (lo crea si la app no lo inicializó)"""
+    if _client is None or _client.is_closed:
+        return init_http_client()
+    return _client
+
+
+async def close_http_client() -> None:
+    """Cierra el cliente compartido y sus conexiones"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        logger.info("Cliente HTTP compartido cerrado")
+
+
+def get_cloudflare_breaker() -> CircuitBreaker:
+    """Breaker compartido por los validadores de Cloudflare AI (imagen y texto)"""
+    return get_breaker(
+        "cloudflare_ai",
+        failure_threshold=settings.AI_BREAKER_FAILURE_THRESHOLD,
+        open_seconds=settings.AI_BREAKER_OPEN_SECONDS,
+        slow_call_seconds=settings.AI_LATENCY_SLO_SECONDS,
+        min_timeout=settings.AI_TIMEOUT_MIN_SECONDS,
+        timeout_multiplier=settings.AI_TIMEOUT_P99_MULTIPLIER,
+    )
+
+
+async def timed_post(
+    service: str,
+    url: str,
+    breaker: Optional[CircuitBreaker] = None,
+    timeout: float = 15.0,
+    **kwargs,
+) -> httpx.Response:
+    """
+    POST con el cliente compartido, registrando la latencia en
+    http_client_request_seconds{service, status}.
+
+    Con breaker, la llamada se corta si está abierto, el timeout se adapta al
+    p99 observado para `service` (con `timeout` como máximo) y el resultado
+    alimenta al breaker (errores de red, 429 y 5xx cuentan como falla; un
+    timeout además entra como muestra de latencia).
+
+    Raises:
+        CircuitOpenError: Si el breaker está abierto
+        httpx.HTTPError: Errores de red/timeout (se registran como status=error)
+    """
+    if breaker is not None:
+        if not breaker.allow_request():
+            http_client_request_seconds.observe(0.0, service=service, status="circuit_open")
+            raise CircuitOpenError(f"{breaker.name} degradado, circuito abierto")
+        timeout = breaker.timeout(timeout, window=service)
+
+    client = get_http_client()
+    start = time.perf_counter()
+    try:
+        response = await client.post(url, timeout=timeout, **kwargs)
+    except BaseException as e:
+        elapsed = time.perf_counter() - start
+        if isinstance(e, httpx.HTTPError):
+            http_client_request_seconds.observe(elapsed, service=service, status="error")
+        if breaker is not None:
+            if isinstance(e, httpx.TimeoutException):
+                breaker.record_failure(latency=timeout, window=service)
+            elif isinstance(e, Exception):
+                breaker.record_failure()
+            else:
+                # Cancelación: no es una falla del servicio
+                breaker.release_probe()
+        raise
+
+    elapsed = time.perf_counter() - start
+    http_client_request_seconds.observe(elapsed, service=service, status=str(response.status_code))
+    if breaker is not None:
+        if response.status_code == 429 or response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success(elapsed, window=service)
+    return response
@@ -8,9 +8,17 @@ import logging
 from typing import List, Dict, Tuple
 from app.services.nsfw_detector import detect_nsfw
 from app.services.image_validation_ai import get_image_validation_ai
+from app.services.image_verdict_cache import get_image_verdict_cache, image_hash
+from app.utils.metrics import Counter, Histogram
+from app.utils.request_stats import stage
 
 logger = logging.getLogger(__name__)
 
+# Fase 1 (Python NSFW): duración por lote e imágenes por resultado
+# (clean/suspicious; cached = veredicto cacheado o repetida en el lote)
+nsfw_phase1_seconds = Histogram("nsfw_phase1_seconds", "Duración de la fase 1 (Python NSFW) por lote de imágenes")
+nsfw_phase1_images_total = Counter("nsfw_phase1_images_total", "Imágenes de la fase 1 por resultado")
+
 
 class HybridImageValidator:
     """
@@ -27,6 +35,8 @@ class HybridImageValidator:
 
     def __init__(self):
         self.cloudflare_validator = get_image_validation_ai()
+        # Imágenes repetidas (mismo SHA-256) no vuelven a pasar por ninguna fase
+        self.verdict_cache = get_image_verdict_cache()
 
     async def validate_all(self, images_data: List[bytes]) -> Dict[str, any]:
         """
@@ -59,12 +69,28 @@ class HybridImageValidator:
         # ========================================
         # FASE 1: Python NSFW (TODAS en paralelo)
         # ========================================
-        logger.info(f"[Hybrid Validator] Fase 1: Python NSFW validando {total_images} imágenes...")
-
+        hashes = [image_hash(img_bytes) for img_bytes in images_data]
+        cached = await self.verdict_cache.get_many(hashes)
+        # Un índice por hash no cacheado (imágenes duplicadas se validan una vez)
+        first_index = {}
+        for i, h in enumerate(hashes):
+            first_index.setdefault(h, i)
+        uncached_indices = [i for h, i in first_index.items() if h not in cached]
+        new_entries = {}
+
+        logger.info(
+            f"[Hybrid Validator] Fase 1: Python NSFW validando {len(uncached_indices)} imágenes "
+            f"({total_images - len(uncached_indices)} cacheadas o repetidas)..."
+        )
+
+        fresh_results = []
         try:
-            python_results = await asyncio.gather(*[
-                detect_nsfw(img_bytes) for img_bytes in images_data
-            ])
+            # Un lote todo cacheado no entra al histograma (bajaría la latencia real de la fase)
+            if uncached_indices:
+                with stage("nsfw"), nsfw_phase1_seconds.time():
+                    fresh_results = await asyncio.gather(*[
+                        detect_nsfw(images_data[i]) for i in uncached_indices
+                    ])
         except Exception as e:
             logger.error(f"[Hybrid Validator] Error en Fase 1 Python NSFW: {str(e)}")
             # Si Python NSFW falla, aprobar por defecto (no bloquear subida)
@@ -76,6 +102,17 @@ class HybridImageValidator:
                 "confidence": 0.0
             }
 
+        phase1_by_hash = {h: entry["phase1"] for h, entry in cached.items()}
+        for i, result in zip(uncached_indices, fresh_results):
+            phase1_by_hash[hashes[i]] = result
+            # Los errores de análisis no se cachean
+            if not result["reason"].startswith("Error"):
+                new_entries[hashes[i]] = {"phase1": result, "phase2": None}
+        python_results = [phase1_by_hash[h] for h in hashes]
+        for result in fresh_results:
+            nsfw_phase1_images_total.inc(result="clean" if result["is_valid"] else "suspicious")
+        nsfw_phase1_images_total.inc(total_images - len(uncached_indices), result="cached")
+
         # Identificar imágenes sospechosas (Python marcó como no válidas)
         suspicious_indices = [
             i for i, result in enumerate(python_results)
@@ -86,6 +123,7 @@ class HybridImageValidator:
 
         # Si Python no encontró nada sospechoso → aprobar todo ✅
         if not suspicious_indices:
+            await self.verdict_cache.store(new_entries)
             logger.info("[Hybrid Validator] ✅ Todas las imágenes aprobadas por Python NSFW")
             return {
                 "is_valid": True,
@@ -102,6 +140,7 @@ class HybridImageValidator:
 
         # Si Cloudflare AI no está configurado → confiar en Python NSFW
         if not self.cloudflare_validator.endpoint:
+            await self.verdict_cache.store(new_entries)
             logger.warning("[Hybrid Validator] Cloudflare AI no configurado, confiando en Python NSFW")
             flagged_reasons = [
                 python_results[i]["reason"] for i in suspicious_indices
@@ -114,16 +153,33 @@ class HybridImageValidator:
                 "confidence": 0.6
             }
 
-        # Validar solo las sospechosas con Cloudflare AI (en paralelo)
+        # Validar solo las sospechosas sin resultado de Cloudflare AI cacheado (en paralelo)
+        def cached_phase2(i):
+            entry = cached.get(hashes[i])
+            return entry["phase2"] if entry else None
+
+        pending_indices = [
+            i for i in suspicious_indices
+            if cached_phase2(i) is None and first_index[hashes[i]] == i
+        ]
         try:
             cloudflare_tasks = [
                 self.cloudflare_validator.validate_image(images_data[i])
-                for i in suspicious_indices
+                for i in pending_indices
             ]
 
-            cloudflare_results = await asyncio.gather(*cloudflare_tasks)
+            with stage("cloudflare"):
+                fresh_cloudflare = dict(zip(
+                    (hashes[i] for i in pending_indices),
+                    await asyncio.gather(*cloudflare_tasks),
+                ))
+            cloudflare_results = [
+                fresh_cloudflare[hashes[i]] if hashes[i] in fresh_cloudflare else cached_phase2(i)
+                for i in suspicious_indices
+            ]
 
         except Exception as e:
+            await self.verdict_cache.store(new_entries)
             logger.error(f"[Hybrid Validator] Error en Fase 2 Cloudflare AI: {str(e)}")
             # Si Cloudflare AI falla → confiar en Python NSFW
             flagged_reasons = [
@@ -137,6 +193,12 @@ class HybridImageValidator:
                 "confidence": 0.6
             }
 
+        # Cachear los resultados reales de Cloudflare AI (None = falló, no se cachea)
+        for sha256, cf_result in fresh_cloudflare.items():
+            if cf_result is not None:
+                new_entries[sha256] = {"phase1": phase1_by_hash[sha256], "phase2": cf_result}
+        await self.verdict_cache.store(new_entries)
+
         # Verificar qué imágenes Cloudflare AI confirmó como problemáticas
         confirmed_flagged = []
         for original_idx, cf_result in zip(suspicious_indices, cloudflare_results):
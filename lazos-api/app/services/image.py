@@ -4,7 +4,20 @@ Redimensiona y comprime imágenes para optimizar almacenamiento
 """
 from PIL import Image, ImageOps
 from io import BytesIO
-from typing import Tuple
+from typing import Tuple, List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+
+from app.config import settings
+
+try:
+    # Plugin opcional que registra el encoder AVIF en Pillow
+    import pillow_avif  # noqa: F401
+except ImportError:
+    pass
+
+# Thread pool para codificar variantes en paralelo (Pillow libera el GIL al codificar)
+image_executor = ThreadPoolExecutor(max_workers=settings.IMAGE_WORKERS)
 
 
 class ImageService:
@@ -14,6 +27,55 @@ class ImageService:
     MAX_SIZE = 2000  # px máximo del lado mayor
     THUMBNAIL_SIZE = 400  # px para thumbnail
     QUALITY = 85  # calidad JPEG
+    AI_QUALITY = 90  # calidad JPEG de la imagen enviada a Cloudflare AI
+
+    # Formatos de variantes: nombre -> (formato Pillow, content-type, extensión, opciones)
+    VARIANT_FORMATS = {
+        "avif": ("AVIF", "image/avif", "avif", {"quality": 60}),
+        "webp": ("WEBP", "image/webp", "webp", {"quality": 80, "method": 4}),
+        "jpeg": ("JPEG", "image/jpeg", "jpg", {"quality": 85, "optimize": True, "progressive": True}),
+    }
+
+    @staticmethod
+    def _load_rgb(image_bytes: bytes, draft_size: Optional[Tuple[int, int]] = None) -> Image.Image:
+        """
+        Abre una imagen, aplica rotación EXIF y la convierte a RGB
+        (elimina transparencias usando fondo blanco)
+
+        Args:
+            draft_size: Si se indica, los JPEG se decodifican directamente a
+                una escala reducida (>= draft_size), mucho más rápido
+        """
+        img = Image.open(BytesIO(image_bytes))
+        if draft_size and img.format == 'JPEG':
+            img.draft('RGB', draft_size)
+
+        # Aplicar rotación EXIF automáticamente (fix para imágenes de celular)
+        img = ImageOps.exif_transpose(img)
+
+        # Convertir a RGB (maneja PNG con transparencia, RGBA, etc.)
+        if img.mode in ('RGBA', 'LA', 'P'):
+            # Crear fondo blanco
+            background = Image.new('RGB', img.size, (255, 255, 255))
+            if img.mode == 'P':
+                img = img.convert('RGBA')
+            background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
+            img = background
+        elif img.mode != 'RGB':
+            img = img.convert('RGB')
+
+        return img
+
+    @staticmethod
+    def _load_bounded(image_bytes: bytes) -> Image.Image:
+        """Carga la imagen en RGB limitada a MAX_SIZE del lado mayor"""
+        img = ImageService._load_rgb(image_bytes)
+        if max(img.size) > ImageService.MAX_SIZE:
+            img.thumbnail(
+                (ImageService.MAX_SIZE, ImageService.MAX_SIZE),
+                Image.Resampling.LANCZOS
+            )
+        return img
 
     @staticmethod
     def process_upload(image_bytes: bytes) -> Tuple[bytes, bytes]:
@@ -34,29 +96,8 @@ class ImageService:
             ValueError: Si la imagen es inválida
         """
         try:
-            # Abrir imagen y convertir a RGB
-            img = Image.open(BytesIO(image_bytes))
-
-            # Aplicar rotación EXIF automáticamente (fix para imágenes de celular)
-            img = ImageOps.exif_transpose(img)
-
-            # Convertir a RGB (maneja PNG con transparencia, RGBA, etc.)
-            if img.mode in ('RGBA', 'LA', 'P'):
-                # Crear fondo blanco
-                background = Image.new('RGB', img.size, (255, 255, 255))
-                if img.mode == 'P':
-                    img = img.convert('RGBA')
-                background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                img = background
-            elif img.mode != 'RGB':
-                img = img.convert('RGB')
-
-            # Redimensionar imagen principal si es muy grande
-            if max(img.size) > ImageService.MAX_SIZE:
-                img.thumbnail(
-                    (ImageService.MAX_SIZE, ImageService.MAX_SIZE),
-                    Image.Resampling.LANCZOS
-                )
+            # Abrir, convertir a RGB y redimensionar imagen principal si es muy grande
+            img = ImageService._load_bounded(image_bytes)
 
             # Generar thumbnail
             thumb = img.copy()
@@ -88,6 +129,148 @@ class ImageService:
         except Exception as e:
             raise ValueError(f"Error procesando imagen: {str(e)}")
 
+    @staticmethod
+    def model_input(image_bytes: bytes, short_side: Optional[int] = None) -> bytes:
+        """
+        Genera la imagen que se envía a los modelos de clasificación
+        (ResNet-50 trabaja a 224x224): JPEG con el lado menor reducido
+        a short_side px (nunca agranda).
+
+        Args:
+            image_bytes: Bytes de la imagen original
+            short_side: Lado menor en px (default: settings.AI_IMAGE_SIZE)
+
+        Returns:
+            bytes: JPEG reducido
+
+        Raises:
+            ValueError: Si la imagen es inválida
+        """
+        short_side = short_side or settings.AI_IMAGE_SIZE
+        if not short_side:
+            return image_bytes
+
+        try:
+            img = ImageService._load_rgb(image_bytes, draft_size=(short_side, short_side))
+            scale = short_side / min(img.size)
+            if scale < 1:
+                img = img.resize(
+                    (max(1, round(img.width * scale)), max(1, round(img.height * scale))),
+                    Image.Resampling.LANCZOS
+                )
+
+            buffer = BytesIO()
+            img.save(buffer, format='JPEG', quality=ImageService.AI_QUALITY)
+            return buffer.getvalue()
+        except Exception as e:
+            raise ValueError(f"Error generando imagen para el modelo: {str(e)}")
+
+    @staticmethod
+    def supported_variant_formats(formats: Optional[List[str]] = None) -> List[str]:
+        """
+        Filtra los formatos pedidos a los que Pillow puede codificar.
+        AVIF solo está disponible si el plugin correspondiente está instalado.
+        """
+        Image.init()
+        formats = formats if formats is not None else settings.image_variant_formats_list
+        return [
+            fmt for fmt in formats
+            if fmt in ImageService.VARIANT_FORMATS
+            and ImageService.VARIANT_FORMATS[fmt][0] in Image.SAVE
+        ]
+
+    @staticmethod
+    def _variant_widths(original_width: int, widths: List[int]) -> List[int]:
+        """
+        Anchos a generar sin agrandar la imagen: se descartan los mayores
+        al original y se agrega el ancho original como variante más grande.
+        """
+        result = [w for w in widths if w <= original_width]
+        if len(result) < len(widths) and original_width not in result:
+            result.append(original_width)
+        return sorted(set(result))
+
+    @staticmethod
+    def _render_width(img: Image.Image, width: int, formats: List[str]) -> List[Dict]:
+        """Redimensiona a un ancho y codifica en todos los formatos pedidos"""
+        if width < img.width:
+            height = max(1, round(img.height * width / img.width))
+            resized = img.resize((width, height), Image.Resampling.LANCZOS)
+        else:
+            resized = img
+
+        variants = []
+        for fmt in formats:
+            pil_format, content_type, _, options = ImageService.VARIANT_FORMATS[fmt]
+            buffer = BytesIO()
+            resized.save(buffer, format=pil_format, **options)
+            variants.append({
+                "width": resized.width,
+                "height": resized.height,
+                "format": fmt,
+                "content_type": content_type,
+                "data": buffer.getvalue(),
+            })
+        return variants
+
+    @staticmethod
+    async def generate_variants(
+        image_bytes: bytes,
+        widths: Optional[List[int]] = None,
+        formats: Optional[List[str]] = None,
+    ) -> List[Dict]:
+        """
+        Genera el set de variantes responsive (anchos x formatos) de una imagen.
+        Cada ancho se codifica en paralelo en image_executor.
+
+        Args:
+            image_bytes: Bytes de la imagen original
+            widths: Anchos en px (default: settings.IMAGE_VARIANT_WIDTHS)
+            formats: Formatos (default: settings.IMAGE_VARIANT_FORMATS)
+
+        Returns:
+            List[Dict]: [{"width", "height", "format", "content_type", "data"}, ...]
+            ordenadas por ancho
+
+        Raises:
+            ValueError: Si la imagen es inválida
+        """
+        widths = widths if widths is not None else settings.image_variant_widths_list
+        formats = ImageService.supported_variant_formats(formats)
+        loop = asyncio.get_running_loop()
+
+        try:
+            img = await loop.run_in_executor(image_executor, ImageService._load_bounded, image_bytes)
+            results = await asyncio.gather(*[
+                loop.run_in_executor(image_executor, ImageService._render_width, img, width, formats)
+                for width in ImageService._variant_widths(img.width, widths)
+            ])
+        except Exception as e:
+            raise ValueError(f"Error generando variantes: {str(e)}")
+
+        return [variant for width_variants in results for variant in width_variants]
+
+    @staticmethod
+    def build_srcset(variants: List[Dict]) -> Dict[str, str]:
+        """
+        Construye strings srcset por formato a partir de variantes con URL.
+
+        Args:
+            variants: Lista de dicts con "url", "width" y "format"
+
+        Returns:
+            Dict[str, str]: {"webp": "url 200w, url 400w", "jpeg": "..."}
+        """
+        srcset = {}
+        for fmt in ImageService.VARIANT_FORMATS:
+            entries = sorted(
+                (v for v in variants if v["format"] == fmt),
+                key=lambda v: v["width"]
+            )
+            if entries:
+                srcset[fmt] = ", ".join(f"{v['url']} {v['width']}w" for v in entries)
+        return srcset
+
     @staticmethod
     def validate_image(image_bytes: bytes, max_size_mb: int = 10) -> None:
         """
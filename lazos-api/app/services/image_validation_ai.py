@@ -2,11 +2,16 @@
 Servicio de validación de imágenes usando Cloudflare Workers AI
 Detecta contenido NSFW/inapropiado en imágenes
 """
+import asyncio
 import httpx
 import logging
 import base64
 from typing import Optional, Dict
 
+from app.services.http_client import timed_post, get_cloudflare_breaker, cloudflare_ai_fallbacks_total
+from app.services.image import ImageService, image_executor
+from app.utils.circuit_breaker import CircuitOpenError
+
 logger = logging.getLogger(__name__)
 
 
@@ -49,8 +54,12 @@ class ImageValidationAI:
             }
 
         try:
+            # ResNet-50 trabaja a 224x224: enviar un JPEG reducido en vez del original
+            loop = asyncio.get_running_loop()
+            model_bytes = await loop.run_in_executor(image_executor, ImageService.model_input, image_bytes)
+
             # Convertir imagen a base64 para enviar a Cloudflare AI
-            image_b64 = base64.b64encode(image_bytes).decode('utf-8')
+            image_b64 = base64.b64encode(model_bytes).decode('utf-8')
 
             headers = {
                 "Authorization": f"Bearer {self.api_token}",
@@ -61,61 +70,73 @@ class ImageValidationAI:
                 "image": image_b64
             }
 
-            async with httpx.AsyncClient(timeout=15.0) as client:
-                response = await client.post(self.endpoint, headers=headers, json=payload)
+            response = await timed_post(
+                "cloudflare_image", self.endpoint,
+                breaker=get_cloudflare_breaker(), timeout=15.0,
+                headers=headers, json=payload,
+            )
 
-                if response.status_code != 200:
-                    logger.error(f"Cloudflare AI error: {response.status_code} - {response.text}")
-                    # En caso de error de API, retornar None para triggear fallback
-                    return None
+            if response.status_code != 200:
+                logger.error(f"Cloudflare AI error: {response.status_code} - {response.text}")
+                cloudflare_ai_fallbacks_total.inc(validator="image", reason="api_error")
+                # En caso de error de API, retornar None para triggear fallback
+                return None
 
-                result = response.json()
+            result = response.json()
 
-                # Analizar respuesta de Cloudflare AI
-                # El modelo ResNet-50 devuelve clasificaciones
-                # Buscamos etiquetas relacionadas con NSFW o contenido inapropiado
-                predictions = result.get("result", [])
+            # Analizar respuesta de Cloudflare AI
+            # El modelo ResNet-50 devuelve clasificaciones
+            # Buscamos etiquetas relacionadas con NSFW o contenido inapropiado
+            predictions = result.get("result", [])
 
-                # Lista de etiquetas que indican contenido inapropiado
-                nsfw_labels = [
-                    "bikini", "swimsuit", "underwear", "brassiere",
-                    "miniskirt", "abaya", "academic_gown"
-                ]
+            # Lista de etiquetas que indican contenido inapropiado
+            nsfw_labels = [
+                "bikini", "swimsuit", "underwear", "brassiere",
+                "miniskirt", "abaya", "academic_gown"
+            ]
 
-                # Verificar si hay predicciones con alta confianza de contenido inapropiado
-                max_nsfw_confidence = 0.0
-                detected_label = None
+            # Verificar si hay predicciones con alta confianza de contenido inapropiado
+            max_nsfw_confidence = 0.0
+            detected_label = None
 
-                for pred in predictions:
-                    label = pred.get("label", "").lower()
-                    score = pred.get("score", 0.0)
+            for pred in predictions:
+                label = pred.get("label", "").lower()
+                score = pred.get("score", 0.0)
 
-                    # Si encontramos una etiqueta NSFW con alta confianza
-                    if any(nsfw_term in label for nsfw_term in nsfw_labels):
-                        if score > max_nsfw_confidence:
-                            max_nsfw_confidence = score
-                            detected_label = label
+                # Si encontramos una etiqueta NSFW con alta confianza
+                if any(nsfw_term in label for nsfw_term in nsfw_labels):
+                    if score > max_nsfw_confidence:
+                        max_nsfw_confidence = score
+                        detected_label = label
 
-                # Umbral de confianza para rechazar (70%)
-                is_valid = max_nsfw_confidence < 0.7
+            # Umbral de confianza para rechazar (70%)
+            is_valid = max_nsfw_confidence < 0.7
 
-                logger.info(f"[Cloudflare AI] Imagen validada: valid={is_valid}, label={detected_label}, confidence={max_nsfw_confidence}")
+            logger.info(f"[Cloudflare AI] Imagen validada: valid={is_valid}, label={detected_label}, confidence={max_nsfw_confidence}")
 
-                return {
-                    "is_valid": is_valid,
-                    "reason": f"Contenido inapropiado detectado: {detected_label}" if not is_valid else "Imagen apropiada",
-                    "confidence": max_nsfw_confidence if not is_valid else (1.0 - max_nsfw_confidence),
-                    "service": "cloudflare_ai"
-                }
+            return {
+                "is_valid": is_valid,
+                "reason": f"Contenido inapropiado detectado: {detected_label}" if not is_valid else "Imagen apropiada",
+                "confidence": max_nsfw_confidence if not is_valid else (1.0 - max_nsfw_confidence),
+                "service": "cloudflare_ai"
+            }
 
+        except CircuitOpenError:
+            # Servicio degradado: retornar None para triggear fallback (moderación manual)
+            logger.warning("Cloudflare AI degradado (circuito abierto), usando fallback")
+            cloudflare_ai_fallbacks_total.inc(validator="image", reason="circuit_open")
+            return None
         except httpx.TimeoutException:
-            logger.error("Cloudflare AI timeout después de 15s")
+            logger.error("Cloudflare AI timeout")
+            cloudflare_ai_fallbacks_total.inc(validator="image", reason="timeout")
             return None
         except httpx.RequestError as e:
             logger.error(f"Cloudflare AI request error: {str(e)}")
+            cloudflare_ai_fallbacks_total.inc(validator="image", reason="request_error")
             return None
         except Exception as e:
             logger.error(f"Error validando imagen con Cloudflare AI: {str(e)}")
+            cloudflare_ai_fallbacks_total.inc(validator="image", reason="error")
             return None
 
 
@@ -0,0 +1,114 @@
+"""
+Cache de veredictos de validación de imágenes por SHA-256
+
+LRU en memoria (TTLCache "image_verdicts") respaldado por la tabla
+image_validation_verdicts (con IMAGE_VERDICT_CACHE_PERSIST), para que imágenes
+repetidas no vuelvan a pasar por Python NSFW ni por Cloudflare AI. Cada entrada guarda:
+    {"phase1": resultado Python NSFW, "phase2": resultado Cloudflare AI o None}
+"""
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from app.config import settings
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+def image_hash(image_bytes: bytes) -> str:
+    """SHA-256 de los bytes de la imagen"""
+    return hashlib.sha256(image_bytes).hexdigest()
+
+
+class ImageVerdictCache:
+    """Veredictos por hash: memoria primero, luego DB (opcional)"""
+
+    def __init__(self):
+        self.memory = TTLCache(
+            "image_verdicts",
+            max_size=settings.IMAGE_VERDICT_CACHE_SIZE,
+            ttl_seconds=settings.IMAGE_VERDICT_CACHE_TTL_SECONDS,
+        )
+
+    def _load_persisted(self, hashes: List[str]) -> Dict[str, Dict]:
+        """Busca veredictos vigentes en la tabla (bloqueante)"""
+        from app.database import SessionLocal
+        from app.models.image_validation_verdict import ImageValidationVerdict
+
+        min_updated_at = datetime.now(timezone.utc) - timedelta(seconds=settings.IMAGE_VERDICT_CACHE_TTL_SECONDS)
+        db = SessionLocal()
+        try:
+            rows = db.query(ImageValidationVerdict).filter(
+                ImageValidationVerdict.sha256.in_(hashes),
+                ImageValidationVerdict.updated_at >= min_updated_at,
+            ).all()
+            return {row.sha256: {"phase1": row.phase1, "phase2": row.phase2} for row in rows}
+        finally:
+            db.close()
+
+    def _persist(self, entries: Dict[str, Dict]) -> None:
+        """Guarda (upsert) veredictos en la tabla (bloqueante)"""
+        from app.database import SessionLocal
+        from app.models.image_validation_verdict import ImageValidationVerdict
+
+        now = datetime.now(timezone.utc)
+        db = SessionLocal()
+        try:
+            for sha256, entry in entries.items():
+                db.merge(ImageValidationVerdict(
+                    sha256=sha256,
+                    phase1=entry["phase1"],
+                    phase2=entry["phase2"],
+                    updated_at=now,
+                ))
+            db.commit()
+        finally:
+            db.close()
+
+    async def get_many(self, hashes: List[str]) -> Dict[str, Dict]:
+        """Veredictos cacheados para los hashes dados (los que no están se omiten)"""
+        found = {}
+        for sha256 in set(hashes):
+            entry = self.memory.get(sha256)
+            if entry is not None:
+                found[sha256] = entry
+
+        missing = [h for h in set(hashes) if h not in found]
+        if missing and settings.IMAGE_VERDICT_CACHE_PERSIST:
+            try:
+                persisted = await asyncio.get_running_loop().run_in_executor(None, self._load_persisted, missing)
+            except Exception as e:
+                logger.error(f"[ImageVerdictCache] Error leyendo veredictos persistidos: {str(e)}")
+                persisted = {}
+            for sha256, entry in persisted.items():
+                self.memory.set(sha256, entry)
+            found.update(persisted)
+
+        return found
+
+    async def store(self, entries: Dict[str, Dict]) -> None:
+        """Guarda veredictos {sha256: {"phase1", "phase2"}}"""
+        if not entries:
+            return
+        for sha256, entry in entries.items():
+            self.memory.set(sha256, entry)
+
+        if settings.IMAGE_VERDICT_CACHE_PERSIST:
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, self._persist, entries)
+            except Exception as e:
+                logger.error(f"[ImageVerdictCache] Error persistiendo veredictos: {str(e)}")
+
+
+_instance: Optional[ImageVerdictCache] = None
+
+
+def get_image_verdict_cache() -> ImageVerdictCache:
+    """Singleton del cache de veredictos de imágenes"""
+    global _instance
+    if _instance is None:
+        _instance = ImageVerdictCache()
+    return _instance
@@ -0,0 +1,168 @@
+"""
+Formatos compactos del payload del mapa (/map/points/unified?format=...)
+
+- json (default): un objeto por punto (UnifiedMapPointsResponse)
+- columnar: JSON con arrays paralelos por columna; lat/lon cuantizados a
+  1e-6 grados como enteros, ids en hex sin guiones, tipo de animal como
+  código (índice en animal_types) y thumbnails relativos a base_url.
+- binary: mismas columnas en un buffer de ancho fijo (little-endian) que el
+  cliente lee con typed arrays sin crear un objeto por punto
+  (lazos-web/src/lib/mapPoints.js):
+
+    header (16 bytes)   "LZMP" | u16 versión | u16 reservado | u32 posts (n) | u32 avisos (m)
+    i32[n] lat posts    i32[n] lon posts    i32[m] lat avisos    i32[m] lon avisos
+    16n bytes           ids de posts (UUID)
+    16m bytes           ids de avisos (UUID)
+    32n bytes           sha256 del thumbnail (keys content-addressed posts/{sha256}.jpg);
+                        ceros si el thumbnail no sigue ese formato (va en strings.thumbnails)
+    u8[n] tipos posts   u8[m] tipos avisos
+    strings             JSON UTF-8 hasta el final: base_url, animal_types,
+                        thumbnails {índice: key relativa o URL} y descriptions[m]
+"""
+import re
+import struct
+from typing import Dict, List, Sequence, Tuple
+from uuid import UUID
+
+import orjson
+
+from app.models.post import AnimalEnum
+
+MAGIC = b"LZMP"
+VERSION = 1
+COORD_SCALE = 1_000_000
+ANIMAL_TYPES = [animal.value for animal in AnimalEnum]
+BINARY_MEDIA_TYPE = "application/vnd.lazos.map-points"
+
+# Thumbnails content-addressed (storage.content_key): se mandan como digest de 32 bytes
+CONTENT_THUMBNAIL = re.compile(r"^posts/([0-9a-f]{64})\.jpg$")
+
+# (id, lat, lon, thumbnail_url, animal_type)
+PostPoint = Tuple[UUID, float, float, str, AnimalEnum]
+# (id, lat, lon, animal_type, description)
+AlertPoint = Tuple[UUID, float, float, AnimalEnum, str]
+
+_ANIMAL_CODES = {animal: code for code, animal in enumerate(AnimalEnum)}
+
+
+def quantize(degrees: float) -> int:
+    """Grados -> entero en micro-grados (~11 cm de precisión)"""
+    return round(degrees * COORD_SCALE)
+
+
+def relative_key(url: str, base_url: str) -> str:
+    """Quita base_url del thumbnail; URLs de otro origen quedan completas"""
+    prefix = base_url.rstrip("/") + "/"
+    if base_url and url.startswith(prefix):
+        return url[len(prefix):]
+    return url
+
+
+def encode_columnar(posts: Sequence[PostPoint], alerts: Sequence[AlertPoint], base_url: str) -> Dict:
+    return {
+        "format": "columnar",
+        "base_url": base_url.rstrip("/"),
+        "animal_types": ANIMAL_TYPES,
+        "posts": {
+            "id": [post[0].hex for post in posts],
+            "lat": [quantize(post[1]) for post in posts],
+            "lon": [quantize(post[2]) for post in posts],
+            "thumb": [relative_key(post[3], base_url) for post in posts],
+            "type": [_ANIMAL_CODES[post[4]] for post in posts],
+        },
+        "alerts": {
+            "id": [alert[0].hex for alert in alerts],
+            "lat": [quantize(alert[1]) for alert in alerts],
+            "lon": [quantize(alert[2]) for alert in alerts],
+            "type": [_ANIMAL_CODES[alert[3]] for alert in alerts],
+            "description": [alert[4] for alert in alerts],
+        },
+    }
+
+
+def encode_binary(posts: Sequence[PostPoint], alerts: Sequence[AlertPoint], base_url: str) -> bytes:
+    n, m = len(posts), len(alerts)
+    thumbnails: Dict[str, str] = {}
+    digests: List[bytes] = []
+    for index, post in enumerate(posts):
+        key = relative_key(post[3], base_url)
+        match = CONTENT_THUMBNAIL.match(key)
+        if match:
+            digests.append(bytes.fromhex(match.group(1)))
+        else:
+            digests.append(bytes(32))
+            thumbnails[str(index)] = key
+
+    strings = orjson.dumps({
+        "base_url": base_url.rstrip("/"),
+        "animal_types": ANIMAL_TYPES,
+        "thumbnails": thumbnails,
+        "descriptions": [alert[4] for alert in alerts],
+    })
+    return b"".join([
+        struct.pack("<4sHHII", MAGIC, VERSION, 0, n, m),
+        struct.pack(f"<{n}i", *(quantize(post[1]) for post in posts)),
+        struct.pack(f"<{n}i", *(quantize(post[2]) for post in posts)),
+        struct.pack(f"<{m}i", *(quantize(alert[1]) for alert in alerts)),
+        struct.pack(f"<{m}i", *(quantize(alert[2]) for alert in alerts)),
+        b"".join(post[0].bytes for post in posts),
+        b"".join(alert[0].bytes for alert in alerts),
+        b"".join(digests),
+        bytes(_ANIMAL_CODES[post[4]] for post in posts),
+        bytes(_ANIMAL_CODES[alert[3]] for alert in alerts),
+        strings,
+    ])
+
+
+def decode_binary(payload: bytes) -> Dict:
+    """Decodifica el formato binary a columnas (tests y scripts; el cliente usa mapPoints.js)"""
+    magic, version, _, n, m = struct.unpack_from("<4sHHII", payload, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Payload de mapa inválido: {magic!r} v{version}")
+    offset = 16
+
+    def take(size: int) -> bytes:
+        nonlocal offset
+        chunk = payload[offset:offset + size]
+        offset += size
+        return chunk
+
+    post_lat = struct.unpack(f"<{n}i", take(4 * n))
+    post_lon = struct.unpack(f"<{n}i", take(4 * n))
+    alert_lat = struct.unpack(f"<{m}i", take(4 * m))
+    alert_lon = struct.unpack(f"<{m}i", take(4 * m))
+    post_ids = take(16 * n)
+    alert_ids = take(16 * m)
+    digests = take(32 * n)
+    post_types = take(n)
+    alert_types = take(m)
+    strings = orjson.loads(payload[offset:])
+
+    base_url = strings["base_url"]
+    thumbs = []
+    for i in range(n):
+        key = strings["thumbnails"].get(str(i)) or f"posts/{digests[32 * i:32 * (i + 1)].hex()}.jpg"
+        thumbs.append(key if "://" in key or not base_url else f"{base_url}/{key}")
+
+    return {
+        "posts": [
+            {
+                "id": UUID(bytes=post_ids[16 * i:16 * (i + 1)]),
+                "lat": post_lat[i] / COORD_SCALE,
+                "lon": post_lon[i] / COORD_SCALE,
+                "thumbnail_url": thumbs[i],
+                "animal_type": strings["animal_types"][post_types[i]],
+            }
+            for i in range(n)
+        ],
+        "alerts": [
+            {
+                "id": UUID(bytes=alert_ids[16 * i:16 * (i + 1)]),
+                "lat": alert_lat[i] / COORD_SCALE,
+                "lon": alert_lon[i] / COORD_SCALE,
+                "animal_type": strings["animal_types"][alert_types[i]],
+                "description": strings["descriptions"][i],
+            }
+            for i in range(m)
+        ],
+    }
@@ -0,0 +1,240 @@
+"""
+Cola de moderación post-publicación (Postgres + SKIP LOCKED)
+
+Los posts se guardan ocultos y se responde al instante; la validación,
+el procesamiento de imágenes y la publicación corren en workers que toman
+jobs de moderation_jobs con SELECT ... FOR UPDATE SKIP LOCKED, así varios
+workers (o procesos) nunca toman el mismo job.
+
+Métricas: moderation_queue_depth, moderation_job_wait_seconds (encolado →
+inicio), moderation_job_seconds (duración) y moderation_jobs_total{status}.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from uuid import UUID
+
+from sqlalchemy import select, func, or_, and_
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.moderation_job import ModerationJob
+from app.services.post_pipeline import finalize_direct_upload
+from app.utils.metrics import Counter, Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+moderation_queue_depth = Gauge("moderation_queue_depth", "Jobs de moderación encolados")
+moderation_job_wait_seconds = Histogram("moderation_job_wait_seconds", "Espera en cola de los jobs de moderación")
+moderation_job_seconds = Histogram("moderation_job_seconds", "Duración de los jobs de moderación")
+moderation_jobs_total = Counter("moderation_jobs_total", "Jobs de moderación terminados por resultado")
+
+# Despierta a los workers locales apenas se encola un job (sin esperar el polling)
+_wakeup: Optional[asyncio.Event] = None
+_worker_tasks: List[asyncio.Task] = []
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def enqueue_moderation(db: Session, post_id: UUID, upload_keys: List[str], pending_approval: bool = False) -> ModerationJob:
+    """
+    Agrega un job de moderación para el post. No hace commit: se confirma
+    junto con el post para que nunca quede un post sin job (o viceversa).
+    """
+    job = ModerationJob(
+        post_id=post_id,
+        upload_keys=list(upload_keys),
+        pending_approval=pending_approval,
+        status=QUEUED,
+        run_after=_utcnow(),
+        created_at=_utcnow(),
+    )
+    db.add(job)
+    return job
+
+
+def notify_workers() -> None:
+    """Despierta a los workers de este proceso (llamar después del commit)"""
+    if _wakeup is not None:
+        _wakeup.set()
+
+
+def claim_query(now: datetime):
+    """
+    Próximo job disponible: encolado y vencido su backoff, o en ejecución
+    hace más de MODERATION_JOB_TIMEOUT_SECONDS (worker caído).
+    """
+    stale_before = now - timedelta(seconds=settings.MODERATION_JOB_TIMEOUT_SECONDS)
+    return (
+        select(ModerationJob)
+        .where(or_(
+            and_(ModerationJob.status == QUEUED, ModerationJob.run_after <= now),
+            and_(ModerationJob.status == RUNNING, ModerationJob.started_at < stale_before),
+        ))
+        .order_by(ModerationJob.run_after)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+
+
+def claim_job() -> Optional[dict]:
+    """
+    Toma un job (bloqueante) y lo marca como running.
+
+    Returns:
+        dict con los datos del job, o None si la cola está vacía
+    """
+    db = SessionLocal()
+    try:
+        now = _utcnow()
+        job = db.execute(claim_query(now)).scalar_one_or_none()
+        if job is None:
+            db.commit()
+            return None
+
+        job.status = RUNNING
+        job.attempts += 1
+        job.started_at = now
+        claimed = {
+            "id": job.id,
+            "post_id": job.post_id,
+            "upload_keys": list(job.upload_keys),
+            "pending_approval": job.pending_approval,
+            "attempts": job.attempts,
+            "created_at": job.created_at,
+        }
+        db.commit()
+        return claimed
+    finally:
+        db.close()
+
+
+def retry_delay(attempts: int) -> float:
+    """Backoff exponencial entre intentos (segundos)"""
+    return settings.MODERATION_RETRY_BASE_SECONDS * (2 ** (attempts - 1))
+
+
+def complete_job(job_id: UUID, success: bool, attempts: int, error: Optional[str] = None) -> str:
+    """
+    Marca el resultado del job (bloqueante). Si falló y quedan intentos,
+    lo re-encola con backoff.
+
+    Returns:
+        str: Estado final del job
+    """
+    db = SessionLocal()
+    try:
+        job = db.get(ModerationJob, job_id)
+        if job is None:
+            return FAILED
+
+        now = _utcnow()
+        if success:
+            job.status = DONE
+            job.finished_at = now
+        elif attempts < settings.MODERATION_JOB_MAX_ATTEMPTS:
+            job.status = QUEUED
+            job.run_after = now + timedelta(seconds=retry_delay(attempts))
+        else:
+            job.status = FAILED
+            job.finished_at = now
+        job.last_error = error[:500] if error else None
+        db.commit()
+        return job.status
+    finally:
+        db.close()
+
+
+def queue_depth() -> int:
+    """Cantidad de jobs encolados (bloqueante)"""
+    db = SessionLocal()
+    try:
+        return db.scalar(select(func.count()).select_from(ModerationJob).where(ModerationJob.status == QUEUED))
+    finally:
+        db.close()
+
+
+async def run_job(job: dict) -> str:
+    """Ejecuta un job ya tomado y registra el resultado"""
+    loop = asyncio.get_running_loop()
+    created_at = job["created_at"]
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    moderation_job_wait_seconds.observe((_utcnow() - created_at).total_seconds())
+
+    error = None
+    with moderation_job_seconds.time():
+        try:
+            success = await finalize_direct_upload(job["post_id"], job["upload_keys"], job["pending_approval"])
+            if not success:
+                error = "Error procesando imágenes"
+        except Exception as e:
+            success = False
+            error = str(e)
+
+    final_status = await loop.run_in_executor(None, complete_job, job["id"], success, job["attempts"], error)
+    moderation_jobs_total.inc(status=final_status)
+    logger.info(f"[ModerationQueue] Job {job['id']} (post {job['post_id']}) → {final_status}")
+    return final_status
+
+
+async def _worker_loop(worker_id: int) -> None:
+    loop = asyncio.get_running_loop()
+    logger.info(f"[ModerationQueue] Worker {worker_id} iniciado")
+
+    while True:
+        _wakeup.clear()
+        try:
+            job = await loop.run_in_executor(None, claim_job)
+            if job is not None:
+                await run_job(job)
+                continue
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ [ModerationQueue] Error en worker {worker_id}: {str(e)}")
+
+        # Cola vacía (o error): esperar al próximo job o al polling
+        try:
+            await asyncio.wait_for(_wakeup.wait(), timeout=settings.MODERATION_POLL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def _depth_loop() -> None:
+    """Actualiza moderation_queue_depth cada MODERATION_POLL_SECONDS, haya o no backlog"""
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            moderation_queue_depth.set(await loop.run_in_executor(None, queue_depth))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ [ModerationQueue] Error midiendo la cola: {str(e)}")
+        await asyncio.sleep(settings.MODERATION_POLL_SECONDS)
+
+
+def start_workers() -> None:
+    """Lanza MODERATION_WORKERS workers (y el medidor de la cola) en el event loop actual"""
+    global _wakeup
+    _wakeup = asyncio.Event()
+    for worker_id in range(settings.MODERATION_WORKERS):
+        _worker_tasks.append(asyncio.create_task(_worker_loop(worker_id)))
+    _worker_tasks.append(asyncio.create_task(_depth_loop()))
+
+
+async def stop_workers() -> None:
+    """Cancela los workers (los jobs en curso se re-toman al vencer el timeout)"""
+    for task in _worker_tasks:
+        task.cancel()
+    await asyncio.gather(*_worker_tasks, return_exceptions=True)
+    _worker_tasks.clear()
@@ -0,0 +1,276 @@
+"""
+Pipeline de publicación de posts
+Moderación de contenido, procesamiento de imágenes y subida a R2,
+compartido por la subida multipart (create_post) y la publicación en
+background (subida directa a R2 o MODERATION_MODE=async, vía moderation_queue).
+"""
+import asyncio
+import logging
+import uuid
+from typing import List, Tuple, Dict, Optional
+from uuid import UUID
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.post import Post
+from app.models.post_image import PostImage
+from app.models.post_image_variant import PostImageVariant
+from app.services.image import ImageService, image_executor
+from app.services.storage import get_storage_service, UPLOAD_PREFIX, UPLOAD_EXTENSIONS
+from app.services.upload_ingestion import sniff_image_format, UnsupportedImageError
+from app.services.text_validation_ai import get_text_validation_ai
+from app.services.hybrid_image_validator import get_hybrid_validator
+from app.services.response_cache import invalidate as invalidate_responses, POSTS
+from app.services.edge_cache import post_keys, schedule_purge
+from app.utils.request_stats import stage
+
+logger = logging.getLogger(__name__)
+
+# validation_service de los posts cuyas imágenes se están procesando en background
+PROCESSING_SERVICE = "processing"
+# ... y de los que quedaron pendientes porque el procesamiento falló
+PROCESSING_ERROR_SERVICE = "processing_error"
+
+
+async def moderate_content(raw_images_bytes: List[bytes], description: Optional[str]) -> Dict:
+    """
+    Valida imágenes (validador híbrido) y, si pasan, la descripción (IA de texto).
+
+    Returns:
+        dict: {
+            "flagged": bool,  # True si el post debe ir a moderación manual
+            "service": str | None,
+            "reason": str | None
+        }
+    """
+    logger.info(f"🔍 [BACKEND] Iniciando validación híbrida de {len(raw_images_bytes)} imágenes...")
+    hybrid_validator = get_hybrid_validator()
+    validation_result = await hybrid_validator.validate_all(raw_images_bytes)
+
+    if not validation_result["is_valid"]:
+        logger.warning(f"⚠️ [BACKEND] Imágenes marcadas para moderación: {validation_result['reason']}")
+        return {"flagged": True, "service": validation_result["service"], "reason": validation_result["reason"]}
+
+    logger.info(f"✅ [BACKEND] Todas las imágenes aprobadas por validador híbrido ({validation_result['service']})")
+
+    # Validar texto con IA si hay descripción (solo si no fue rechazado ya por imagen)
+    if description and len(description.strip()) >= 10:
+        text_validator = get_text_validation_ai()
+        with stage("cloudflare"):
+            text_validation = await text_validator.validate_sighting_text(description)
+        logger.info(f"[Text Validation] valid={text_validation['is_valid']}, reason={text_validation['reason']}")
+
+        # Si el texto no es válido, marcar para aprobación manual
+        if not text_validation["is_valid"]:
+            logger.warning(f"[Text Validation] Texto marcado para revisión: {text_validation['reason']}")
+            return {"flagged": True, "service": "text_ai", "reason": text_validation["reason"]}
+
+    return {"flagged": False, "service": None, "reason": None}
+
+
+async def process_and_upload(raw_images_bytes: List[bytes]) -> Tuple[List[Tuple[str, str]], List[List[Dict]]]:
+    """
+    Procesa las imágenes (resize + thumbnail + variantes) y las sube a R2.
+
+    Returns:
+        Tuple: (image_urls [(url_imagen, url_thumbnail)], variantes subidas por imagen)
+    """
+    logger.info(f"🖼️ [BACKEND] Procesando {len(raw_images_bytes)} imágenes...")
+    loop = asyncio.get_running_loop()
+
+    with stage("process"):
+        # Resize + thumbnail en image_executor (Pillow es CPU: no bloquear el event loop)
+        images_data = await asyncio.gather(*[
+            loop.run_in_executor(image_executor, ImageService.process_upload, image_bytes)
+            for image_bytes in raw_images_bytes
+        ])
+        for idx, (processed_image, thumbnail) in enumerate(images_data):
+            logger.info(f"✅ [BACKEND] Imagen {idx + 1} procesada: {len(processed_image)} bytes, thumbnail: {len(thumbnail)} bytes")
+
+        # Generar variantes responsive (anchos x formatos) de todas las imágenes en paralelo
+        variants_data = await asyncio.gather(*[
+            ImageService.generate_variants(image_bytes) for image_bytes in raw_images_bytes
+        ])
+    logger.info(f"🖼️ [BACKEND] {sum(len(v) for v in variants_data)} variantes generadas")
+
+    # Subir todas las imágenes a R2
+    logger.info(f"☁️ [BACKEND] Subiendo {len(images_data)} imágenes a R2...")
+    storage_service = get_storage_service()
+    with stage("upload"):
+        image_urls, uploaded_variants = await storage_service.upload_images(images_data, variants_data)
+    logger.info(f"✅ [BACKEND] {len(image_urls)} imágenes subidas a R2")
+
+    return image_urls, uploaded_variants
+
+
+def save_post_images(
+    db: Session,
+    post_id: UUID,
+    image_urls: List[Tuple[str, str]],
+    uploaded_variants: List[List[Dict]],
+) -> None:
+    """
+    Crea los registros de post_images (y sus variantes) de un post. No hace commit.
+    """
+    logger.info(f"💾 [BACKEND] Guardando {len(image_urls)} imágenes en post_images...")
+    for idx, (img_url, thumb_url) in enumerate(image_urls):
+        post_image = PostImage(
+            post_id=post_id,
+            image_url=img_url,
+            thumbnail_url=thumb_url,
+            display_order=idx,
+            is_primary=(idx == 0)
+        )
+        db.add(post_image)
+        db.flush()  # Get post_image.id for its variants
+
+        variants = uploaded_variants[idx] if idx < len(uploaded_variants) else []
+        for variant in variants:
+            db.add(PostImageVariant(post_image_id=post_image.id, **variant))
+        logger.info(f"   📷 Imagen {idx + 1}: {img_url} (primary: {idx == 0}, variantes: {len(variants)})")
+
+
+def _download_uploads(upload_keys: List[str]) -> List[bytes]:
+    """Descarga y valida las imágenes subidas directo a R2 (bloqueante)"""
+    storage_service = get_storage_service()
+    max_bytes = settings.UPLOAD_MAX_FILE_MB * 1024 * 1024
+    raw_images_bytes = []
+
+    for key in upload_keys:
+        image_bytes = storage_service.download_object(key, max_bytes=max_bytes)
+        if sniff_image_format(image_bytes[:16]) is None:
+            raise UnsupportedImageError(f"Archivo no es una imagen válida: {key}")
+        ImageService.validate_image(image_bytes, max_size_mb=settings.UPLOAD_MAX_FILE_MB)
+        raw_images_bytes.append(image_bytes)
+
+    return raw_images_bytes
+
+
+async def stage_raw_images(raw_images_bytes: List[bytes]) -> List[str]:
+    """
+    Guarda las imágenes crudas en uploads/ (mismo lugar que las subidas
+    directas) para procesarlas en background.
+
+    Returns:
+        List[str]: Keys de las imágenes crudas
+    """
+    objects = []
+    for image_bytes in raw_images_bytes:
+        content_type = f"image/{sniff_image_format(image_bytes[:16])}"
+        key = f"{UPLOAD_PREFIX}{uuid.uuid4()}.{UPLOAD_EXTENSIONS[content_type]}"
+        objects.append((key, image_bytes, content_type))
+
+    await get_storage_service().upload_objects(objects, skip_existing=False)
+    return [key for key, _, _ in objects]
+
+
+def _load_description(post_id: UUID) -> Tuple[bool, Optional[str]]:
+    """(existe el post, descripción) (bloqueante)"""
+    db = SessionLocal()
+    try:
+        post = db.query(Post).filter(Post.id == post_id).first()
+        return (True, post.description) if post else (False, None)
+    finally:
+        db.close()
+
+
+def _mark_processing_error(post_id: UUID, error: str) -> None:
+    """Deja el post pendiente con el error como motivo (bloqueante)"""
+    db = SessionLocal()
+    try:
+        db.query(Post).filter(Post.id == post_id).update({
+            Post.validation_service: PROCESSING_ERROR_SERVICE,
+            Post.moderation_reason: f"Error procesando imágenes subidas: {error}"[:500],
+        }, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _publish_post(
+    post_id: UUID,
+    image_urls: List[Tuple[str, str]],
+    uploaded_variants: List[List[Dict]],
+    pending_approval: bool,
+    moderation: Dict,
+) -> Optional[bool]:
+    """
+    Reemplaza las imágenes crudas por las procesadas y publica el post (bloqueante).
+
+    Returns:
+        Optional[bool]: pending_approval final, None si el post ya no existe
+    """
+    db = SessionLocal()
+    try:
+        # Lock de la fila: un admin no puede aprobarlo mientras se publica
+        post = db.query(Post).filter(Post.id == post_id).with_for_update().first()
+        if not post:
+            return None
+        db.query(PostImage).filter(PostImage.post_id == post_id).delete()
+        save_post_images(db, post_id, image_urls, uploaded_variants)
+
+        post.image_url, post.thumbnail_url = image_urls[0]
+        post.pending_approval = pending_approval or moderation["flagged"]
+        post.validation_service = moderation["service"]
+        post.moderation_reason = moderation["reason"]
+        db.commit()
+        return post.pending_approval
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+async def finalize_direct_upload(post_id: UUID, upload_keys: List[str], pending_approval: bool = False) -> bool:
+    """
+    Finaliza un post guardado con imágenes crudas en uploads/:
+    descarga las imágenes, las valida, genera las renditions y publica el post.
+
+    Corre en los workers de la cola, en el event loop de la API: el acceso a
+    la base (sesión sync) y al storage va al thread pool y el trabajo de
+    Pillow a image_executor, así no frena los requests del mismo proceso.
+
+    Si la validación marca el contenido, el post queda en moderación manual.
+    Si el procesamiento falla, el post queda pendiente con el error como motivo.
+
+    Returns:
+        bool: True si el post quedó procesado (publicado o en moderación manual)
+    """
+    storage_service = get_storage_service()
+    loop = asyncio.get_running_loop()
+
+    try:
+        exists, description = await loop.run_in_executor(None, _load_description, post_id)
+        if not exists:
+            logger.error(f"[Finalize] Post {post_id} no encontrado")
+            return True
+
+        try:
+            raw_images_bytes = await loop.run_in_executor(None, _download_uploads, upload_keys)
+
+            moderation = await moderate_content(raw_images_bytes, description)
+            image_urls, uploaded_variants = await process_and_upload(raw_images_bytes)
+        except Exception as e:
+            logger.error(f"❌ [Finalize] Error procesando imágenes del post {post_id}: {str(e)}")
+            await loop.run_in_executor(None, _mark_processing_error, post_id, str(e))
+            return False
+
+        final_pending = await loop.run_in_executor(
+            None, _publish_post, post_id, image_urls, uploaded_variants, pending_approval, moderation,
+        )
+        if final_pending is None:
+            logger.error(f"[Finalize] Post {post_id} borrado durante el procesamiento")
+            return True
+        await invalidate_responses(POSTS)
+        schedule_purge(post_keys(post_id))
+
+        logger.info(f"✅ [Finalize] Post {post_id} publicado (pending_approval={final_pending})")
+    except Exception as e:
+        logger.error(f"❌ [Finalize] Error finalizando post {post_id}: {str(e)}")
+        return False
+
+    # Las imágenes crudas ya no se necesitan
+    await loop.run_in_executor(storage_service.executor, storage_service.delete_keys, upload_keys)
+    return True
@@ -0,0 +1,174 @@
+"""
+Cache de respuestas de las lecturas públicas (ETag / Last-Modified)
+
+Cada tabla cacheada (posts, alerts) tiene una versión que se incrementa en
+cada mutación (invalidate). El ETag de una respuesta se deriva de la ruta,
+los query params normalizados y las versiones de las tablas de las que
+depende, así un If-None-Match se resuelve con 304 sin tocar la base.
+
+Backends (RESPONSE_CACHE_BACKEND):
+- "memory": LRU en proceso. Versiones por proceso: con varios workers de
+  uvicorn (o la cola de moderación publicando en otro proceso) cada uno
+  solo ve sus propias escrituras. Los ETags incluyen un id de proceso (sin
+  304 falsos entre workers) y una época de RESPONSE_CACHE_TTL_SECONDS
+  alineada al reloj: una escritura de otro proceso se ve, como mucho, al
+  empezar la época siguiente.
+- "redis": versiones y cuerpos compartidos entre procesos (REDIS_URL).
+- "off": sin cache.
+"""
+import hashlib
+import json
+import logging
+import time
+import uuid
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from app.config import settings
+from app.utils.cache import TTLCache
+from app.utils.metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+POSTS = "posts"
+ALERTS = "alerts"
+
+response_cache_requests_total = Counter(
+    "response_cache_requests_total", "GETs cacheables por resultado (hit/miss/not_modified/bypass)"
+)
+
+# (headers a repetir: content-type, cache-control, surrogate keys; body)
+CachedResponse = Tuple[List[Tuple[str, str]], bytes]
+
+
+class TableState(NamedTuple):
+    """Estado de las tablas de una ruta"""
+
+    token: str  # versiones: entra en el ETag y en la clave del cuerpo
+    last_modified: float  # para Last-Modified (en memoria incluye el inicio de la época)
+    invalidated_at: float  # última invalidación real (0 si nunca hubo)
+
+
+def make_etag(key: str, version_token: str) -> str:
+    digest = hashlib.sha256(f"{key}|{version_token}".encode("utf-8")).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+class MemoryResponseCache:
+    """Versiones y cuerpos en memoria del proceso"""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._process_id = uuid.uuid4().hex[:8]
+        self._started_at = time.time()
+        self._versions: Dict[str, Tuple[int, float]] = {}
+        self._bodies = TTLCache("responses", max_size=max_size, ttl_seconds=ttl_seconds)
+
+    async def table_state(self, tables: Iterable[str]) -> TableState:
+        # Las escrituras de otros procesos no suben estas versiones: la época cambia el
+        # ETag, la clave del cuerpo y Last-Modified cada TTL, así nada queda viejo más que eso
+        epoch = int(time.time() // self.ttl_seconds)
+        states = [self._versions.get(table, (0, self._started_at)) for table in tables]
+        token = f"{self._process_id}:{epoch}:" + ".".join(str(version) for version, _ in states)
+        invalidated_at = max((modified for version, modified in states if version), default=0.0)
+        return TableState(token, max(epoch * self.ttl_seconds, *(modified for _, modified in states)), invalidated_at)
+
+    async def invalidate(self, tables: Iterable[str]) -> None:
+        now = time.time()
+        for table in tables:
+            version, _ = self._versions.get(table, (0, now))
+            self._versions[table] = (version + 1, now)
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        return self._bodies.get(key)
+
+    async def set(self, key: str, value: CachedResponse) -> None:
+        self._bodies.set(key, value)
+
+
+class RedisResponseCache:
+    """Versiones (INCR) y cuerpos (SET EX) en Redis, compartidos entre procesos"""
+
+    PREFIX = "lazos:rc:"
+
+    def __init__(self, client, ttl_seconds: float):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+
+    @classmethod
+    def from_url(cls, url: str, ttl_seconds: float) -> "RedisResponseCache":
+        import redis.asyncio as redis  # dependencia opcional: solo con RESPONSE_CACHE_BACKEND=redis
+
+        return cls(redis.from_url(url), ttl_seconds)
+
+    async def table_state(self, tables: Iterable[str]) -> TableState:
+        tables = list(tables)
+        keys = [f"{self.PREFIX}version:{t}" for t in tables] + [f"{self.PREFIX}modified:{t}" for t in tables]
+        values = await self.client.mget(keys)
+        if None in values:
+            # Redis vacío (primer arranque o flush): versión inicial basada en el reloj,
+            # así nunca se reutiliza un ETag emitido antes de perder las versiones
+            await self._init_versions(tables)
+            values = await self.client.mget(keys)
+        versions, modified = values[:len(tables)], values[len(tables):]
+        token = ".".join(version.decode() for version in versions)
+        last_modified = max(float(m) for m in modified)
+        return TableState(token, last_modified, last_modified)
+
+    async def _init_versions(self, tables: Iterable[str]) -> None:
+        now = time.time()
+        async with self.client.pipeline(transaction=False) as pipe:
+            for table in tables:
+                pipe.set(f"{self.PREFIX}version:{table}", int(now * 1000), nx=True)
+                pipe.set(f"{self.PREFIX}modified:{table}", now, nx=True)
+            await pipe.execute()
+
+    async def invalidate(self, tables: Iterable[str]) -> None:
+        now = time.time()
+        async with self.client.pipeline(transaction=False) as pipe:
+            for table in tables:
+                pipe.incr(f"{self.PREFIX}version:{table}")
+                pipe.set(f"{self.PREFIX}modified:{table}", now)
+            await pipe.execute()
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        raw = await self.client.get(f"{self.PREFIX}body:{key}")
+        if raw is None:
+            return None
+        headers, _, body = raw.partition(b"\n")
+        return [tuple(header) for header in json.loads(headers)], body
+
+    async def set(self, key: str, value: CachedResponse) -> None:
+        headers, body = value
+        await self.client.set(
+            f"{self.PREFIX}body:{key}",
+            json.dumps(headers).encode("utf-8") + b"\n" + body,
+            ex=int(self.ttl_seconds),
+        )
+
+
+_response_cache = None
+
+
+def get_response_cache():
+    """Get or create response cache singleton (None con RESPONSE_CACHE_BACKEND=off)"""
+    global _response_cache
+    if _response_cache is None and settings.RESPONSE_CACHE_BACKEND != "off":
+        if settings.RESPONSE_CACHE_BACKEND == "redis":
+            _response_cache = RedisResponseCache.from_url(settings.REDIS_URL, settings.RESPONSE_CACHE_TTL_SECONDS)
+        else:
+            _response_cache = MemoryResponseCache(settings.RESPONSE_CACHE_SIZE, settings.RESPONSE_CACHE_TTL_SECONDS)
+    return _response_cache
+
+
+async def invalidate(*tables: str) -> None:
+    """
+    Invalida las respuestas cacheadas que dependen de las tablas.
+    Llamar después del commit; si el backend falla solo se loguea.
+    """
+    cache = get_response_cache()
+    if cache is None:
+        return
+    try:
+        await cache.invalidate(tables)
+    except Exception as e:
+        logger.error(f"❌ [ResponseCache] Error invalidando {tables}: {e}")
@@ -2,16 +2,72 @@
 Servicio de almacenamiento en Cloudflare R2 (S3-compatible)
 """
 import boto3
-from botocore.exceptions import ClientError
+from botocore.exceptions import ClientError, BotoCoreError
 from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+import asyncio
+import hashlib
+import random
+import threading
+import time
 import uuid
-from typing import Tuple, List
+from typing import Tuple, List, Dict, Optional
 import logging
 
 from app.config import settings
+from app.services.image import ImageService
+from app.utils.metrics import Counter, Histogram
 
 logger = logging.getLogger(__name__)
 
+# Uploads directos (presigned PUT) antes de ser procesados
+UPLOAD_PREFIX = "uploads/"
+UPLOAD_EXTENSIONS = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/webp": "webp",
+}
+# Regla de lifecycle que limpia los uploads/ huérfanos (scripts/setup_r2_lifecycle.py)
+UPLOAD_LIFECYCLE_RULE_ID = "lazos-expire-uploads"
+
+# Los objetos de posts se nombran por hash de contenido: nunca cambian,
+# así que el CDN y el navegador pueden cachearlos indefinidamente
+POSTS_PREFIX = "posts/"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Los uploads/ son crudos y sin moderar (y se borran o rechazan): nunca se cachean
+UPLOAD_CACHE_CONTROL = "private, no-store"
+
+
+def cache_control_for(key: str) -> str:
+    """Cache-Control de un objeto: inmutable solo para las keys content-addressed de posts/"""
+    return IMMUTABLE_CACHE_CONTROL if key.startswith(POSTS_PREFIX) else UPLOAD_CACHE_CONTROL
+
+
+# Métricas de subida a R2
+storage_put_seconds = Histogram("storage_put_seconds", "Latencia de cada PUT a R2")
+storage_put_retries_total = Counter("storage_put_retries_total", "Reintentos de PUT a R2")
+storage_put_failures_total = Counter("storage_put_failures_total", "PUTs a R2 fallidos tras reintentos")
+storage_dedup_hits_total = Counter("storage_dedup_hits_total", "Objetos no subidos porque el contenido ya existía")
+
+# Códigos de error de S3/R2 que vale la pena reintentar
+TRANSIENT_ERROR_CODES = {
+    "InternalError", "ServiceUnavailable", "SlowDown", "RequestTimeout",
+    "RequestTimeTooSkewed", "Throttling", "ThrottlingException", "500", "502", "503", "504",
+}
+
+
+def content_key(data: bytes, extension: str) -> str:
+    """Key content-addressed de un objeto: posts/{sha256}.{extension}"""
+    return f"{POSTS_PREFIX}{hashlib.sha256(data).hexdigest()}.{extension}"
+
+
+def _is_transient(error: Exception) -> bool:
+    """Indica si un error de PUT es transitorio (red, 5xx o throttling)"""
+    if isinstance(error, ClientError):
+        return error.response.get('Error', {}).get('Code') in TRANSIENT_ERROR_CODES
+    return isinstance(error, (BotoCoreError, ConnectionError, TimeoutError))
+
 
 class StorageService:
     """Servicio para subir archivos a Cloudflare R2"""
@@ -26,16 +82,30 @@ class StorageService:
         # Configurar cliente S3 para R2
         self.s3_client = boto3.client(
             's3',
-            endpoint_url=settings.R2_ENDPOINT,
+            endpoint_url=settings.R2_ENDPOINT or None,
             aws_access_key_id=settings.R2_ACCESS_KEY,
             aws_secret_access_key=settings.R2_SECRET_KEY,
             config=Config(
                 signature_version='s3v4',
-                s3={'addressing_style': 'path'}
+                s3={'addressing_style': 'path'},
+                # Un pool de conexiones por cada thread de subida
+                max_pool_connections=settings.STORAGE_MAX_CONCURRENCY,
+                # Los reintentos se hacen en _put_with_retry (con métricas)
+                retries={'total_max_attempts': 1},
             )
         )
         self.bucket = settings.R2_BUCKET
 
+        # Thread pool acotado para los PUT bloqueantes de boto3
+        self.executor = ThreadPoolExecutor(
+            max_workers=settings.STORAGE_MAX_CONCURRENCY,
+            thread_name_prefix="storage",
+        )
+
+        # Índice local (LRU acotado) de keys content-addressed que ya existen en R2
+        self._known_keys: OrderedDict = OrderedDict()
+        self._known_keys_lock = threading.Lock()
+
     def upload_image(self, image_bytes: bytes, thumbnail_bytes: bytes) -> Tuple[str, str]:
         """
         Sube imagen y thumbnail a R2
@@ -98,67 +168,291 @@ class StorageService:
             logger.error(f"Error inesperado subiendo imagen: {str(e)}")
             raise Exception(f"Error subiendo imagen: {str(e)}")
 
-    def upload_images(self, images_data: List[Tuple[bytes, bytes]]) -> List[Tuple[str, str]]:
+    def _put_with_retry(self, key: str, body: bytes, content_type: str) -> None:
+        """
+        PUT de un objeto con reintentos y backoff exponencial (con jitter)
+        para errores transitorios. Bloqueante: se ejecuta en self.executor.
         """
-        Sube múltiples imágenes y thumbnails a R2
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                self.s3_client.put_object(
+                    Bucket=self.bucket,
+                    Key=key,
+                    Body=body,
+                    ContentType=content_type,
+                    CacheControl=cache_control_for(key),
+                )
+                storage_put_seconds.observe(time.perf_counter() - start, outcome="success")
+                return
+            except Exception as e:
+                storage_put_seconds.observe(time.perf_counter() - start, outcome="error")
+                if attempt >= settings.STORAGE_MAX_RETRIES or not _is_transient(e):
+                    storage_put_failures_total.inc()
+                    raise
+                attempt += 1
+                storage_put_retries_total.inc()
+                delay = settings.STORAGE_RETRY_BASE_DELAY * (2 ** (attempt - 1)) * (0.5 + random.random())
+                logger.warning(f"[StorageService] PUT {key} falló ({str(e)}), reintento {attempt} en {delay:.2f}s")
+                time.sleep(delay)
+
+    def _remember_key(self, key: str) -> None:
+        with self._known_keys_lock:
+            self._known_keys[key] = True
+            self._known_keys.move_to_end(key)
+            while len(self._known_keys) > settings.STORAGE_KNOWN_KEYS_MAX:
+                self._known_keys.popitem(last=False)
+
+    def _object_exists(self, key: str) -> bool:
+        """Indica si el objeto ya existe (índice local primero, luego HEAD)"""
+        with self._known_keys_lock:
+            if key in self._known_keys:
+                self._known_keys.move_to_end(key)
+                return True
+
+        if self.get_object_size(key) is None:
+            return False
+        self._remember_key(key)
+        return True
+
+    def _store_object(self, key: str, body: bytes, content_type: str, skip_existing: bool = True) -> bool:
+        """
+        Sube el objeto si su contenido todavía no existe en R2.
+        Bloqueante: se ejecuta en self.executor.
+
+        Returns:
+            bool: True si se subió, False si ya existía (deduplicado)
+        """
+        if skip_existing and self._object_exists(key):
+            storage_dedup_hits_total.inc()
+            return False
+        self._put_with_retry(key, body, content_type)
+        if skip_existing:
+            self._remember_key(key)
+        return True
+
+    async def upload_objects(self, objects: List[Tuple[str, bytes, str]], skip_existing: bool = True) -> List[str]:
+        """
+        Sube un lote de objetos content-addressed a R2 en paralelo (thread pool
+        acotado), salteando los que ya existen. Si alguno falla, elimina los
+        uploads/ que se subieron en este lote (son de este request) y lanza la
+        excepción. Los posts/ subidos quedan: son compartidos por contenido y
+        otro request puede haberse deduplicado contra ellos (índice local o
+        HEAD) mientras tanto; un huérfano ocupa espacio, borrarlo rompería ese post.
+
+        Args:
+            objects: Lista de tuplas (key, body, content_type)
+            skip_existing: Si False no se chequea existencia (keys nuevas, ej: uploads/)
+
+        Returns:
+            List[str]: Keys subidas en este lote (las deduplicadas no se incluyen)
+
+        Raises:
+            Exception: Si falla la subida de algún objeto
+        """
+        # La misma imagen puede aparecer dos veces en un post
+        unique_objects = list({key: (key, body, content_type) for key, body, content_type in objects}.values())
+
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(*[
+            loop.run_in_executor(self.executor, self._store_object, key, body, content_type, skip_existing)
+            for key, body, content_type in unique_objects
+        ], return_exceptions=True)
+
+        uploaded_keys = [key for (key, _, _), r in zip(unique_objects, results) if r is True]
+        errors = [(key, r) for (key, _, _), r in zip(unique_objects, results) if isinstance(r, BaseException)]
+        if errors:
+            deletable = [key for key in uploaded_keys if key.startswith(UPLOAD_PREFIX)]
+            logger.error(
+                f"[StorageService] {len(errors)}/{len(unique_objects)} objetos fallaron, limpiando "
+                f"{len(deletable)} uploads/ (quedan {len(uploaded_keys) - len(deletable)} content-addressed)"
+            )
+            with self._known_keys_lock:
+                for key in deletable:
+                    self._known_keys.pop(key, None)
+            await loop.run_in_executor(self.executor, self.delete_keys, deletable)
+
+            key, error = errors[0]
+            if isinstance(error, ClientError):
+                raise Exception(f"Error subiendo {key}: {error.response['Error']['Message']}")
+            raise Exception(f"Error subiendo {key}: {str(error)}")
+
+        return uploaded_keys
+
+    async def upload_images(
+        self,
+        images_data: List[Tuple[bytes, bytes]],
+        variants_data: Optional[List[List[Dict]]] = None,
+    ) -> Tuple[List[Tuple[str, str]], List[List[Dict]]]:
+        """
+        Sube imágenes, thumbnails y variantes responsive de un post a R2,
+        todos en paralelo en un único lote. Las keys se derivan del hash del
+        contenido procesado, así que el contenido repetido no se vuelve a subir.
 
         Args:
             images_data: Lista de tuplas (image_bytes, thumbnail_bytes)
+            variants_data: Variantes de cada imagen (ver ImageService.generate_variants)
 
         Returns:
-            List[Tuple[str, str]]: Lista de tuplas (url_imagen, url_thumbnail)
+            Tuple: (
+                [(url_imagen, url_thumbnail)] por imagen,
+                [[{"width", "height", "format", "url", "size_bytes"}]] por imagen
+            )
 
         Raises:
-            Exception: Si falla la subida de alguna imagen
+            Exception: Si falla la subida de algún objeto (los ya subidos se eliminan)
         """
-        results = []
+        variants_data = variants_data or [[] for _ in images_data]
+        objects = []
+        image_urls = []
+        uploaded_variants = []
+
+        for image_bytes, thumbnail_bytes in images_data:
+            image_key = content_key(image_bytes, "jpg")
+            thumb_key = content_key(thumbnail_bytes, "jpg")
+
+            objects.append((image_key, image_bytes, 'image/jpeg'))
+            objects.append((thumb_key, thumbnail_bytes, 'image/jpeg'))
+            image_urls.append((self.public_url(image_key), self.public_url(thumb_key)))
+
+        for variants in variants_data:
+            image_variants = []
+
+            for variant in variants:
+                extension = ImageService.VARIANT_FORMATS[variant["format"]][2]
+                key = content_key(variant["data"], extension)
+                objects.append((key, variant["data"], variant["content_type"]))
+                image_variants.append({
+                    "width": variant["width"],
+                    "height": variant["height"],
+                    "format": variant["format"],
+                    "url": self.public_url(key),
+                    "size_bytes": len(variant["data"]),
+                })
+            uploaded_variants.append(image_variants)
+
+        start = time.perf_counter()
+        uploaded_keys = await self.upload_objects(objects)
+
+        logger.info(
+            f"[StorageService] {len(images_data)} imágenes: {len(uploaded_keys)}/{len(objects)} objetos subidos "
+            f"(resto deduplicado) en {(time.perf_counter() - start) * 1000:.0f}ms"
+        )
+        return image_urls, uploaded_variants
 
-        for idx, (image_bytes, thumbnail_bytes) in enumerate(images_data):
-            try:
-                # Generar nombre único usando UUID
-                file_id = str(uuid.uuid4())
+    def create_presigned_upload(self, content_type: str, size: int) -> Dict:
+        """
+        Genera una URL firmada para que el cliente suba una imagen directo a R2
 
-                # Nombres de archivos
-                image_key = f"posts/{file_id}.jpg"
-                thumb_key = f"posts/{file_id}_thumb.jpg"
+        Content-Type, Cache-Control y Content-Length van firmados: un PUT con
+        otro tamaño que el declarado falla la firma. (R2 no soporta POST
+        firmado con content-length-range.) El navegador pone el Content-Length
+        solo; Content-Type y Cache-Control los manda el cliente (headers).
 
-                # Subir imagen principal
-                self.s3_client.put_object(
-                    Bucket=self.bucket,
-                    Key=image_key,
-                    Body=image_bytes,
-                    ContentType='image/jpeg',
-                )
+        Args:
+            content_type: Content-Type que el cliente debe enviar en el PUT
+            size: Tamaño exacto del archivo en bytes
 
-                # Subir thumbnail
-                self.s3_client.put_object(
-                    Bucket=self.bucket,
-                    Key=thumb_key,
-                    Body=thumbnail_bytes,
-                    ContentType='image/jpeg',
-                )
+        Returns:
+            Dict: {"key", "upload_url", "method", "headers", "expires_in"}
+        """
+        extension = UPLOAD_EXTENSIONS[content_type]
+        key = f"{UPLOAD_PREFIX}{uuid.uuid4()}.{extension}"
+        expires_in = settings.UPLOAD_URL_EXPIRES_SECONDS
+
+        upload_url = self.s3_client.generate_presigned_url(
+            'put_object',
+            Params={
+                'Bucket': self.bucket,
+                'Key': key,
+                'ContentType': content_type,
+                'ContentLength': size,
+                'CacheControl': UPLOAD_CACHE_CONTROL,
+            },
+            ExpiresIn=expires_in,
+        )
 
-                # Construir URLs públicas
-                base_url = settings.R2_PUBLIC_URL
-                image_url = f"{base_url}/{image_key}"
-                thumb_url = f"{base_url}/{thumb_key}"
+        return {
+            "key": key,
+            "upload_url": upload_url,
+            "method": "PUT",
+            "headers": {"Content-Type": content_type, "Cache-Control": UPLOAD_CACHE_CONTROL},
+            "expires_in": expires_in,
+        }
 
-                logger.info(f"[StorageService] Imagen {idx + 1} subida: {image_key}")
-                logger.info(f"[StorageService] URLs generadas: {image_url}, {thumb_url}")
+    def ensure_upload_lifecycle(self, days: int) -> None:
+        """
+        Regla de lifecycle que borra los objetos de uploads/ con más de `days` días
+        (subidas directas que nunca se usaron en un post, o cuyo finalize falló).
+        Conserva las demás reglas del bucket.
+        """
+        try:
+            rules = self.s3_client.get_bucket_lifecycle_configuration(Bucket=self.bucket)['Rules']
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'NoSuchLifecycleConfiguration':
+                raise
+            rules = []
+
+        rules = [rule for rule in rules if rule.get('ID') != UPLOAD_LIFECYCLE_RULE_ID]
+        rules.append({
+            'ID': UPLOAD_LIFECYCLE_RULE_ID,
+            'Filter': {'Prefix': UPLOAD_PREFIX},
+            'Status': 'Enabled',
+            'Expiration': {'Days': days},
+        })
+        self.s3_client.put_bucket_lifecycle_configuration(
+            Bucket=self.bucket, LifecycleConfiguration={'Rules': rules},
+        )
 
-                results.append((image_url, thumb_url))
+    def get_object_size(self, key: str) -> Optional[int]:
+        """
+        Retorna el tamaño en bytes de un objeto (HEAD), o None si no existe
+        """
+        try:
+            response = self.s3_client.head_object(Bucket=self.bucket, Key=key)
+            return response['ContentLength']
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('404', 'NoSuchKey', 'NotFound'):
+                return None
+            raise
 
-            except ClientError as e:
-                error_code = e.response['Error']['Code']
-                error_msg = e.response['Error']['Message']
-                logger.error(f"Error subiendo imagen {idx + 1} a R2: {error_code} - {error_msg}")
-                raise Exception(f"Error subiendo imagen {idx + 1}: {error_msg}")
-            except Exception as e:
-                logger.error(f"Error inesperado subiendo imagen {idx + 1}: {str(e)}")
-                raise Exception(f"Error subiendo imagen {idx + 1}: {str(e)}")
+    def download_object(self, key: str, max_bytes: int) -> bytes:
+        """
+        Descarga un objeto de R2 sin superar max_bytes
+
+        Raises:
+            ValueError: Si el objeto no existe o supera max_bytes
+        """
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            raise ValueError(f"No se encontró la imagen subida {key}: {e.response['Error']['Message']}")
+
+        if response['ContentLength'] > max_bytes:
+            response['Body'].close()
+            raise ValueError(f"Imagen muy grande: {response['ContentLength'] / (1024 * 1024):.1f}MB")
+
+        return response['Body'].read()
+
+    def delete_keys(self, keys: List[str]) -> None:
+        """
+        Elimina objetos por key (soft fail, solo logea errores)
+        """
+        if not keys:
+            return
+        try:
+            self.s3_client.delete_objects(
+                Bucket=self.bucket,
+                Delete={'Objects': [{'Key': key} for key in keys]}
+            )
+            logger.info(f"[StorageService] {len(keys)} objetos eliminados")
+        except Exception as e:
+            logger.error(f"Error eliminando objetos de R2: {str(e)}")
 
-        logger.info(f"[StorageService] {len(results)} imágenes subidas exitosamente")
-        return results
+    def public_url(self, key: str) -> str:
+        """URL pública de un objeto"""
+        return f"{settings.R2_PUBLIC_URL}/{key}"
 
     def delete_image(self, image_url: str, thumbnail_url: str) -> None:
         """
@@ -1,12 +1,207 @@
 """
 Servicio de validación semántica de texto usando Cloudflare Workers AI
 """
-import httpx
+import asyncio
+import hashlib
 import logging
-from typing import Optional
+import re
+import unicodedata
+from datetime import datetime, timedelta, timezone
+from typing import Optional, List, Dict
+
+from app.config import settings
+from app.services.http_client import timed_post, get_cloudflare_breaker, cloudflare_ai_fallbacks_total
+from app.utils.cache import TTLCache
+from app.utils.circuit_breaker import CircuitOpenError
+from app.utils.metrics import Counter
 
 logger = logging.getLogger(__name__)
 
+# Cambiar al modificar el prompt: invalida los veredictos cacheados
+PROMPT_VERSION = "v1"
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Normaliza el texto para el cache: unicode NFKC, minúsculas, espacios y puntuación final"""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = _WHITESPACE_RE.sub(" ", text)
+    return text.strip(" .,;:!?¡¿\"'")
+
+
+# ============================================
+# Pre-clasificador local (evita el LLM en casos obvios)
+# ============================================
+
+# Cómo se decidió cada texto: local_valid / local_invalid / cache / llm
+text_validation_decisions_total = Counter(
+    "text_validation_decisions_total", "Decisiones de validación de texto por origen"
+)
+
+ANIMAL_TERMS = {
+    "perro", "perra", "perrito", "perrita", "perros", "perras", "cachorro", "cachorra", "cachorros",
+    "gato", "gata", "gatito", "gatita", "gatos", "gatas", "michi", "felino", "canino", "can",
+    "mascota", "mascotas", "animal", "animales", "callejero", "callejera", "collar", "correa",
+    "conejo", "loro", "caballo", "tortuga", "hurón", "huron", "pitbull", "caniche", "labrador",
+    "ovejero", "salchicha", "galgo", "mestizo", "mestiza", "siames", "siamés",
+}
+
+LOCATION_TERMS = {
+    "esquina", "calle", "avenida", "av", "plaza", "parque", "barrio", "cuadra", "frente", "cerca",
+    "entre", "ruta", "estación", "estacion", "puerta", "vereda", "plazoleta", "colectivo", "parada",
+    "escuela", "hospital", "supermercado", "kiosco", "almacén", "almacen", "altura", "km", "autopista",
+    "costanera", "rambla", "peaje", "casa", "edificio", "terreno", "baldío", "baldio",
+}
+
+DESCRIPTION_TERMS = {
+    "negro", "negra", "blanco", "blanca", "marrón", "marron", "gris", "atigrado", "atigrada",
+    "manchas", "manchado", "manchada", "rubio", "rubia", "color", "pelo", "peludo", "peluda",
+    "chico", "chica", "grande", "mediano", "mediana", "flaco", "flaca", "herido", "herida",
+    "rengo", "renga", "suelto", "suelta", "perdido", "perdida", "asustado", "asustada", "solo", "sola",
+    "macho", "hembra", "cola", "orejas", "ojos", "raza",
+}
+
+TEST_TERMS = {"test", "testing", "prueba", "probando", "asdf", "qwerty", "lorem", "ipsum", "xxx", "aaa"}
+
+# Venta de animales u otros avisos comerciales: nunca se aprueban localmente
+COMMERCE_TERMS = {
+    "vendo", "vende", "venden", "vendemos", "venta", "ventas", "precio", "precios", "oferta", "ofertas",
+    "promo", "promoción", "promocion", "compro", "cuotas", "envío", "envio", "envíos", "envios",
+    "criadero", "pedigree", "pedigrí", "pedigri", "permuto", "pesos", "usd", "dólares", "dolares",
+}
+
+_WORD_RE = re.compile(r"[a-zñ]+")
+_URL_RE = re.compile(r"(https?://|www\.)\S+|\b\S+\.(com|net|org|ar|io|ly|xyz|info)(/\S*)?\b")
+_PHONE_RE = re.compile(r"(?:\+?\d[\d\s\-]{6,}\d)")
+_REPEAT_RE = re.compile(r"(.)\1{5,}")
+_PRICE_RE = re.compile(r"\$\s*\d|\d\s*\$")
+# 4+ consonantes seguidas no aparecen en castellano salvo en grupos como "nstr" (construir, obstruir)
+_CONSONANT_RUN_RE = re.compile(r"[bcdfghjklmnñpqrstvwxz]{4,}")
+_SPANISH_CONSONANT_RUNS = {"nstr", "bstr", "nscr", "bscr", "nspl"}
+
+
+def _fold(text: str) -> str:
+    """Minúsculas sin tildes (para comparar contra los léxicos)"""
+    decomposed = unicodedata.normalize("NFKD", normalize_text(text))
+    kept = "".join(c for c in decomposed if not unicodedata.combining(c) or c == "\u0303")
+    return unicodedata.normalize("NFC", kept)
+
+
+def _lexicon(terms: set) -> set:
+    return {_fold(term) for term in terms}
+
+
+_ANIMALS = _lexicon(ANIMAL_TERMS)
+_LOCATIONS = _lexicon(LOCATION_TERMS)
+_DESCRIPTIONS = _lexicon(DESCRIPTION_TERMS)
+_TESTS = _lexicon(TEST_TERMS)
+_COMMERCE = _lexicon(COMMERCE_TERMS)
+
+
+def _is_plausible_word(word: str) -> bool:
+    """Palabra pronunciable: tiene vocal y no tiene grupos de consonantes imposibles"""
+    if not re.search(r"[aeiouy]", word):
+        return False
+    return all(run in _SPANISH_CONSONANT_RUNS for run in _CONSONANT_RUN_RE.findall(word))
+
+
+def _plausible_fraction(words: List[str]) -> float:
+    """Proporción de palabras (de 3+ letras) que parecen palabras reales"""
+    long_words = [w for w in words if len(w) >= 3]
+    if not long_words:
+        return 0.0
+    return sum(_is_plausible_word(w) for w in long_words) / len(long_words)
+
+
+def classify_locally(text: str) -> Optional[dict]:
+    """
+    Clasifica el texto sin LLM cuando el caso es obvio.
+
+    - Aprueba si menciona un animal y además una ubicación o rasgo descriptivo,
+      sin señales de spam ni de venta y con palabras reales
+    - Rechaza spam (URLs, varios teléfonos, caracteres repetidos), avisos de
+      venta sin ningún animal, o texto de prueba/sin sentido sin animal
+    - Ventas que mencionan animales ("Vendo perro de raza") y textos con
+      palabras sin sentido entre las claves quedan para el LLM
+
+    Returns:
+        dict con la forma de validate_sighting_text, o None si el caso es
+        ambiguo y debe decidirlo el LLM
+    """
+    folded = _fold(text)
+    words = _WORD_RE.findall(folded)
+    word_set = set(words)
+
+    has_animal = bool(word_set & _ANIMALS)
+    has_context = bool(word_set & (_LOCATIONS | _DESCRIPTIONS))
+    urls = len(_URL_RE.findall(folded))
+    phones = len(_PHONE_RE.findall(folded))
+    letters = sum(c.isalpha() for c in folded)
+    commerce = bool(word_set & _COMMERCE) or bool(_PRICE_RE.search(folded))
+    plausible = _plausible_fraction(words)
+
+    # Señales de spam
+    if urls > 0 or phones >= 2 or _REPEAT_RE.search(folded):
+        if not has_animal or urls > 1 or phones >= 3:
+            return {"is_valid": False, "reason": "Texto parece spam (links, teléfonos o caracteres repetidos)", "confidence": 0.9}
+        return None
+
+    # Avisos de venta: sin animal es spam; con animal lo decide el LLM
+    if commerce:
+        if not has_animal:
+            return {"is_valid": False, "reason": "Texto parece un aviso comercial", "confidence": 0.85}
+        return None
+
+    # Texto de prueba o sin palabras reales
+    if not has_animal:
+        if word_set and word_set <= (_TESTS | {"hola", "chau", "ok", "si", "no", "jaja", "jajaja"}):
+            return {"is_valid": False, "reason": "Texto de prueba o sin contenido", "confidence": 0.9}
+        if letters < len(folded.replace(" ", "")) * 0.5 or plausible < 0.5:
+            return {"is_valid": False, "reason": "Texto sin sentido", "confidence": 0.85}
+        return None
+
+    # Aprobar solo texto con palabras reales (no claves sueltas entre basura)
+    if has_context and plausible >= 0.8:
+        return {"is_valid": True, "reason": "Aprobado por clasificador local", "confidence": 0.85}
+    return None
+
+
+def evaluate_local_classifier(samples: List[Dict]) -> Dict:
+    """
+    Mide el pre-clasificador contra textos etiquetados.
+
+    Con etiquetas a mano mide la coincidencia con esas etiquetas; para medir
+    la coincidencia con el LLM hay que etiquetar con sus veredictos reales.
+
+    Args:
+        samples: Lista de dicts {"text": str, "is_valid": bool}
+
+    Returns:
+        dict: {
+            "total": int,
+            "decided_locally": int,
+            "avoided_fraction": float,  # proporción de llamadas al LLM evitadas
+            "agreement": float  # coincidencia con las etiquetas entre los decididos localmente
+        }
+    """
+    decided = 0
+    agreed = 0
+    for sample in samples:
+        verdict = classify_locally(sample["text"])
+        if verdict is None:
+            continue
+        decided += 1
+        agreed += verdict["is_valid"] == sample["is_valid"]
+
+    total = len(samples)
+    return {
+        "total": total,
+        "decided_locally": decided,
+        "avoided_fraction": decided / total if total else 0.0,
+        "agreement": agreed / decided if decided else 1.0,
+    }
+
 
 class TextValidationAI:
     def __init__(self, account_id: Optional[str] = None, api_token: Optional[str] = None):
@@ -19,6 +214,76 @@ class TextValidationAI:
         else:
             self.endpoint = None
 
+        # Veredictos por hash de texto normalizado + modelo + versión del prompt
+        self.verdict_cache = TTLCache(
+            "text_verdicts",
+            max_size=settings.TEXT_VERDICT_CACHE_SIZE,
+            ttl_seconds=settings.TEXT_VERDICT_CACHE_TTL_SECONDS,
+        )
+
+    def cache_key(self, text: str) -> str:
+        """Key del cache de veredictos para un texto"""
+        raw = f"{self.model}|{PROMPT_VERSION}|{normalize_text(text)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _load_persisted_verdict(self, key: str) -> Optional[dict]:
+        """Busca un veredicto vigente en text_validation_verdicts (bloqueante)"""
+        from app.database import SessionLocal
+        from app.models.text_validation_verdict import TextValidationVerdict
+
+        min_created_at = datetime.now(timezone.utc) - timedelta(seconds=settings.TEXT_VERDICT_CACHE_TTL_SECONDS)
+        db = SessionLocal()
+        try:
+            row = db.query(TextValidationVerdict).filter(
+                TextValidationVerdict.key == key,
+                TextValidationVerdict.created_at >= min_created_at,
+            ).first()
+            if row is None:
+                return None
+            return {"is_valid": row.is_valid, "reason": row.reason, "confidence": row.confidence}
+        finally:
+            db.close()
+
+    def _persist_verdict(self, key: str, verdict: dict) -> None:
+        """Guarda (upsert) un veredicto en text_validation_verdicts (bloqueante)"""
+        from app.database import SessionLocal
+        from app.models.text_validation_verdict import TextValidationVerdict
+
+        db = SessionLocal()
+        try:
+            db.merge(TextValidationVerdict(
+                key=key,
+                model=self.model,
+                created_at=datetime.now(timezone.utc),
+                **verdict,
+            ))
+            db.commit()
+        finally:
+            db.close()
+
+    async def _cached_verdict(self, key: str) -> Optional[dict]:
+        verdict = self.verdict_cache.get(key)
+        if verdict is not None or not settings.TEXT_VERDICT_CACHE_PERSIST:
+            return verdict
+
+        try:
+            verdict = await asyncio.get_running_loop().run_in_executor(None, self._load_persisted_verdict, key)
+        except Exception as e:
+            logger.error(f"[AI] Error leyendo veredicto persistido: {str(e)}")
+            return None
+        if verdict is not None:
+            self.verdict_cache.set(key, verdict)
+        return verdict
+
+    async def _store_verdict(self, key: str, verdict: dict) -> None:
+        self.verdict_cache.set(key, verdict)
+        if not settings.TEXT_VERDICT_CACHE_PERSIST:
+            return
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self._persist_verdict, key, verdict)
+        except Exception as e:
+            logger.error(f"[AI] Error persistiendo veredicto: {str(e)}")
+
     async def validate_sighting_text(self, text: str) -> dict:
         """
         Valida si el texto describe un avistamiento de mascota.
@@ -37,6 +302,23 @@ class TextValidationAI:
         if not text or len(text.strip()) < 10:
             return {"is_valid": True, "reason": "Texto muy corto, skip validación", "confidence": 0.0}
 
+        # Casos obvios se deciden localmente
+        local_verdict = classify_locally(text)
+        if local_verdict is not None:
+            text_validation_decisions_total.inc(source="local_valid" if local_verdict["is_valid"] else "local_invalid")
+            logger.info(f"[AI] Texto: '{text[:50]}...' → clasificador local (valid={local_verdict['is_valid']})")
+            return local_verdict
+
+        # Textos repetidos se deciden sin llamar al modelo
+        key = self.cache_key(text)
+        cached = await self._cached_verdict(key)
+        if cached is not None:
+            text_validation_decisions_total.inc(source="cache")
+            logger.info(f"[AI] Texto: '{text[:50]}...' → veredicto cacheado (valid={cached['is_valid']})")
+            return dict(cached)
+
+        text_validation_decisions_total.inc(source="llm")
+
         try:
             prompt = f"""Analiza si el siguiente texto describe un avistamiento de animal (perro, gato, mascota) o da indicaciones de ubicación/dirección donde se vio.
 
@@ -59,28 +341,41 @@ Respuesta:"""
                 "temperature": 0.1
             }
 
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.post(self.endpoint, headers=headers, json=payload)
+            response = await timed_post(
+                "cloudflare_text", self.endpoint,
+                breaker=get_cloudflare_breaker(), timeout=10.0,
+                headers=headers, json=payload,
+            )
 
-                if response.status_code != 200:
-                    logger.error(f"Cloudflare AI error: {response.status_code}")
-                    return {"is_valid": True, "reason": "API error", "confidence": 0.0}
+            if response.status_code != 200:
+                logger.error(f"Cloudflare AI error: {response.status_code}")
+                cloudflare_ai_fallbacks_total.inc(validator="text", reason="api_error")
+                return {"is_valid": True, "reason": "API error", "confidence": 0.0}
 
-                result = response.json()
-                ai_response = result.get("result", {}).get("response", "").upper().strip()
+            result = response.json()
+            ai_response = result.get("result", {}).get("response", "").upper().strip()
 
-                logger.info(f"[AI] Texto: '{text[:50]}...' → {ai_response}")
+            logger.info(f"[AI] Texto: '{text[:50]}...' → {ai_response}")
 
-                is_valid = "VALIDO" in ai_response and "INVALIDO" not in ai_response
+            is_valid = "VALIDO" in ai_response and "INVALIDO" not in ai_response
 
-                return {
-                    "is_valid": is_valid,
-                    "reason": "Aprobado por IA" if is_valid else "Texto no parece describir un avistamiento",
-                    "confidence": 0.8 if is_valid else 0.2
-                }
+            verdict = {
+                "is_valid": is_valid,
+                "reason": "Aprobado por IA" if is_valid else "Texto no parece describir un avistamiento",
+                "confidence": 0.8 if is_valid else 0.2
+            }
+            # Solo se cachean respuestas reales del modelo (no errores de API)
+            await self._store_verdict(key, verdict)
+            return dict(verdict)
 
+        except CircuitOpenError:
+            # Servicio degradado: aprobar sin esperar el timeout
+            logger.warning("[AI] Cloudflare AI degradado (circuito abierto), aprobando por defecto")
+            cloudflare_ai_fallbacks_total.inc(validator="text", reason="circuit_open")
+            return {"is_valid": True, "reason": "AI degradada", "confidence": 0.0}
         except Exception as e:
             logger.error(f"Error AI: {str(e)}")
+            cloudflare_ai_fallbacks_total.inc(validator="text", reason="error")
             return {"is_valid": True, "reason": f"Error: {str(e)}", "confidence": 0.0}
 
 
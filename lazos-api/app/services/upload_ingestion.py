@@ -0,0 +1,148 @@
+"""
+Ingesta de uploads por streaming
+Lee los archivos en chunks, detecta el formato por magic bytes y rechaza
+los archivos demasiado grandes o que no son imágenes sin terminar de leerlos.
+
+El parser multipart de Starlette ya volcó cada archivo a su propio
+SpooledTemporaryFile antes de llamar al handler: el rechazo antes de recibir
+el body lo hace BodySizeLimitMiddleware (Content-Length del request).
+"""
+import logging
+from typing import Optional
+from fastapi import UploadFile
+from PIL import ImageFile
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024  # 64KB por lectura
+
+# Firmas de los formatos aceptados (JPG/PNG/WEBP)
+MAGIC_SIGNATURES = {
+    "jpeg": (b"\xff\xd8\xff",),
+    "png": (b"\x89PNG\r\n\x1a\n",),
+}
+
+
+class UploadTooLargeError(ValueError):
+    """El archivo o el request supera el límite de bytes"""
+
+
+class UnsupportedImageError(ValueError):
+    """El archivo no es una imagen en un formato aceptado"""
+
+
+def sniff_image_format(head: bytes) -> Optional[str]:
+    """
+    Detecta el formato de imagen a partir de los primeros bytes.
+
+    Args:
+        head: Primeros bytes del archivo (al menos 12)
+
+    Returns:
+        str: "jpeg", "png" o "webp", o None si no se reconoce
+    """
+    for fmt, signatures in MAGIC_SIGNATURES.items():
+        if any(head.startswith(sig) for sig in signatures):
+            return fmt
+    if len(head) >= 12 and head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+class UploadBudget:
+    """Bytes restantes para todos los archivos de un mismo request"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.remaining = max_bytes
+
+    def consume(self, n: int) -> None:
+        self.remaining -= n
+        if self.remaining < 0:
+            raise UploadTooLargeError(
+                f"Las imágenes superan el máximo total de {self.max_bytes // (1024 * 1024)}MB"
+            )
+
+
+async def read_upload(
+    upload: UploadFile,
+    budget: Optional[UploadBudget] = None,
+    max_bytes: Optional[int] = None,
+) -> bytes:
+    """
+    Lee un UploadFile en chunks validando formato y tamaño a medida que avanza.
+
+    - El primer chunk se usa para detectar el formato (magic bytes)
+    - El header de la imagen se parsea apenas está disponible para rechazar
+      dimensiones absurdas sin decodificar la imagen completa
+    - Los chunks se leen del archivo que ya spooleó Starlette (sin otra copia
+      intermedia) y se corta apenas superan max_bytes, así en memoria nunca
+      hay más que el límite por archivo
+
+    Args:
+        upload: Archivo recibido
+        budget: Presupuesto de bytes compartido por el request (opcional)
+        max_bytes: Máximo por archivo (default: settings.UPLOAD_MAX_FILE_MB)
+
+    Returns:
+        bytes: Contenido completo del archivo
+
+    Raises:
+        UploadTooLargeError: Si el archivo o el request superan el límite
+        UnsupportedImageError: Si el archivo no es JPG/PNG/WEBP o sus dimensiones son inválidas
+    """
+    max_bytes = max_bytes if max_bytes is not None else settings.UPLOAD_MAX_FILE_MB * 1024 * 1024
+    max_mb = max_bytes / (1024 * 1024)
+
+    # El parser multipart ya conoce el tamaño: rechazar sin leer nada
+    if upload.size is not None and upload.size > max_bytes:
+        raise UploadTooLargeError(f"Imagen muy grande: {upload.size / (1024 * 1024):.1f}MB. Máximo: {max_mb:.0f}MB")
+
+    header_parser = ImageFile.Parser()
+    header_checked = False
+    image_format = None
+    total = 0
+    chunks = []
+
+    while True:
+        chunk = await upload.read(CHUNK_SIZE)
+        if not chunk:
+            break
+
+        if total == 0:
+            image_format = sniff_image_format(chunk)
+            if image_format is None:
+                raise UnsupportedImageError(
+                    f"Archivo no es una imagen válida ({upload.filename}): formatos aceptados JPG, PNG, WEBP"
+                )
+
+        total += len(chunk)
+        if total > max_bytes:
+            raise UploadTooLargeError(f"Imagen muy grande: más de {max_mb:.0f}MB")
+        if budget is not None:
+            budget.consume(len(chunk))
+
+        # Alimentar el parser solo hasta obtener el header (tamaño y modo)
+        if not header_checked:
+            try:
+                header_parser.feed(chunk)
+            except Exception as e:
+                raise UnsupportedImageError(f"Header de imagen inválido ({upload.filename}): {str(e)}")
+            if header_parser.image is not None:
+                header_checked = True
+                width, height = header_parser.image.size
+                if width * height > settings.UPLOAD_MAX_PIXELS:
+                    raise UnsupportedImageError(
+                        f"Imagen con demasiados píxeles: {width}x{height}"
+                    )
+
+        chunks.append(chunk)
+
+    if total == 0:
+        raise UnsupportedImageError(f"Archivo vacío: {upload.filename}")
+
+    data = b"".join(chunks)
+    logger.info(f"[Upload] {upload.filename}: {total} bytes ({image_format}) leídos en streaming")
+    return data
@@ -0,0 +1,67 @@
+"""
+Cache LRU acotado con TTL (en proceso, thread-safe)
+
+Cada cache se identifica por nombre y registra hits/misses en
+cache_requests_total{cache, result} para seguir su hit-rate.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Hashable
+
+from app.utils.metrics import Counter
+
+cache_requests_total = Counter("cache_requests_total", "Lookups en caches en proceso (hit/miss)")
+
+_MISSING = object()
+
+
+class TTLCache:
+    """LRU con expiración por entrada"""
+
+    def __init__(self, name: str, max_size: int, ttl_seconds: float):
+        self.name = name
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Retorna el valor cacheado, o default si no existe o expiró"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._data.move_to_end(key)
+                    cache_requests_total.inc(cache=self.name, result="hit")
+                    return value
+                del self._data[key]
+        cache_requests_total.inc(cache=self.name, result="miss")
+        return default
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def hit_rate(self) -> float:
+        """Proporción de hits sobre el total de lookups (0 si no hubo)"""
+        hits = cache_requests_total.value(cache=self.name, result="hit")
+        total = hits + cache_requests_total.value(cache=self.name, result="miss")
+        return hits / total if total else 0.0
@@ -0,0 +1,190 @@
+"""
+Circuit breaker con timeouts adaptativos para servicios externos
+
+- closed: las llamadas pasan; N fallas (o llamadas lentas) consecutivas lo abren
+- open: las llamadas se cortan en el acto (el caller usa su fallback)
+- half_open: pasado el cooldown se deja pasar una sola llamada de prueba;
+  si sale bien se cierra, si falla se vuelve a abrir
+
+El timeout de cada llamada se adapta al p99 de las latencias recientes, así
+un servicio degradado no retiene requests durante el timeout máximo. Las
+latencias se guardan por ventana (ej: un modelo de texto lento y uno de
+imágenes rápido comparten breaker pero no p99), y una llamada que vence su
+timeout entra como muestra con ese valor: si el servicio se vuelve más lento
+el p99 sube con él. La llamada de prueba de half_open usa como timeout el SLO
+de latencia (slow_call_seconds), no el adaptativo.
+El estado se exporta en el gauge circuit_breaker_state{breaker}.
+"""
+import math
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from app.utils.metrics import Counter, Gauge
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+circuit_breaker_state = Gauge("circuit_breaker_state", "Estado del breaker (0=closed, 1=half_open, 2=open)")
+circuit_breaker_transitions_total = Counter("circuit_breaker_transitions_total", "Cambios de estado del breaker")
+circuit_breaker_rejected_total = Counter("circuit_breaker_rejected_total", "Llamadas cortadas por el breaker abierto")
+
+
+class CircuitOpenError(Exception):
+    """La llamada no se hizo porque el breaker está abierto"""
+
+
+class CircuitBreaker:
+    """Breaker por servicio externo (thread-safe)"""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        open_seconds: float = 30.0,
+        slow_call_seconds: float = 5.0,
+        min_timeout: float = 1.0,
+        timeout_multiplier: float = 1.5,
+        window_size: int = 200,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.slow_call_seconds = slow_call_seconds
+        self.min_timeout = min_timeout
+        self.timeout_multiplier = timeout_multiplier
+
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.window_size = window_size
+        self._latencies: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+        circuit_breaker_state.set(_STATE_VALUES[CLOSED], breaker=name)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _set_state(self, state: str) -> None:
+        if state == self._state:
+            return
+        self._state = state
+        circuit_breaker_state.set(_STATE_VALUES[state], breaker=self.name)
+        circuit_breaker_transitions_total.inc(breaker=self.name, to=state)
+
+    def _maybe_half_open(self) -> None:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._set_state(HALF_OPEN)
+            self._probe_in_flight = False
+
+    def _trip(self) -> None:
+        self._opened_at = time.monotonic()
+        self._probe_in_flight = False
+        self._set_state(OPEN)
+
+    def allow_request(self) -> bool:
+        """Indica si la llamada puede hacerse (en half_open, solo una prueba a la vez)"""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+        circuit_breaker_rejected_total.inc(breaker=self.name)
+        return False
+
+    def _add_sample(self, latency: float, window: str) -> None:
+        if window not in self._latencies:
+            self._latencies[window] = deque(maxlen=self.window_size)
+        self._latencies[window].append(latency)
+
+    def record_success(self, latency: float, window: str = "default") -> None:
+        """Registra una llamada exitosa; si superó el SLO de latencia cuenta como falla"""
+        with self._lock:
+            self._add_sample(latency, window)
+        if latency > self.slow_call_seconds:
+            self.record_failure()
+            return
+        with self._lock:
+            self._consecutive_failures = 0
+            self._probe_in_flight = False
+            self._set_state(CLOSED)
+
+    def record_failure(self, latency: Optional[float] = None, window: str = "default") -> None:
+        """
+        Registra una falla (error, timeout, 5xx o llamada lenta).
+
+        Args:
+            latency: En un timeout, el timeout usado (entra como muestra de latencia)
+            window: Ventana de latencias de la llamada
+        """
+        with self._lock:
+            if latency is not None:
+                self._add_sample(latency, window)
+            self._consecutive_failures += 1
+            if self._state == HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                self._trip()
+
+    def release_probe(self) -> None:
+        """Libera la llamada de prueba sin resultado (ej: request cancelado)"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def p99(self, window: str = "default") -> float:
+        """p99 de las latencias recientes de la ventana (0 si no hay muestras)"""
+        with self._lock:
+            samples = sorted(self._latencies.get(window, ()))
+        if not samples:
+            return 0.0
+        return samples[min(len(samples) - 1, math.ceil(0.99 * len(samples)) - 1)]
+
+    def timeout(self, max_timeout: float, window: str = "default") -> float:
+        """
+        Timeout adaptativo: p99 reciente x multiplicador, acotado a [min_timeout, max_timeout].
+        La llamada de prueba (half_open) espera al menos el SLO de latencia: con el timeout
+        adaptativo fallaría siempre si el servicio se volvió más lento y no se cerraría nunca.
+        """
+        p99 = self.p99(window)
+        if p99 == 0.0:
+            return max_timeout
+        timeout = max(self.min_timeout, min(max_timeout, p99 * self.timeout_multiplier))
+        with self._lock:
+            probing = self._state == HALF_OPEN
+        if probing:
+            timeout = max(timeout, min(max_timeout, self.slow_call_seconds))
+        return timeout
+
+    def snapshot(self) -> Dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._consecutive_failures,
+            "p99_seconds": {window: round(self.p99(window), 4) for window in list(self._latencies)},
+        }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str, **kwargs) -> CircuitBreaker:
+    """Retorna el breaker compartido con ese nombre (lo crea en la primera llamada)"""
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name, **kwargs)
+        return _breakers[name]
+
+
+def snapshot() -> Dict[str, Dict]:
+    """Estado de todos los breakers"""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.snapshot() for breaker in breakers}
@@ -0,0 +1,121 @@
+"""
+Pools de conexiones instrumentados y parámetros de sesión de Postgres
+
+- TimedQueuePool / TimedAsyncQueuePool: QueuePool que mide la espera de cada
+  checkout y la saturación del pool (conexiones en uso / pool_size + max_overflow).
+- connect_args_psycopg2 / connect_args_asyncpg: statement_timeout e
+  idle_in_transaction_session_timeout como parámetros de arranque de la conexión.
+- Con PgBouncer en modo transaction los parámetros de arranque y los SET de
+  sesión no sirven (la conexión del servidor cambia entre transacciones):
+  los timeouts se aplican con set_config(..., true) al inicio de cada
+  transacción y asyncpg no usa prepared statements cacheados.
+
+Métricas: db_pool_checkout_seconds, db_pool_checked_out, db_pool_waiting,
+db_pool_saturation y db_pool_timeouts_total, todas con label pool (sync/async).
+"""
+import time
+import uuid
+from typing import Dict
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+from app.utils.metrics import Counter, Gauge, Histogram
+
+db_pool_checkout_seconds = Histogram(
+    "db_pool_checkout_seconds",
+    "Espera para obtener una conexión del pool",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0),
+)
+db_pool_checked_out = Gauge("db_pool_checked_out", "Conexiones del pool en uso")
+db_pool_waiting = Gauge("db_pool_waiting", "Checkouts esperando una conexión libre")
+db_pool_saturation = Gauge("db_pool_saturation", "Conexiones en uso / capacidad del pool (0-1)")
+db_pool_timeouts_total = Counter("db_pool_timeouts_total", "Checkouts que agotaron pool_timeout")
+
+
+class _TimedPoolMixin:
+    """Mide checkouts y saturación; el label sobrevive a recreate() (engine.dispose)"""
+
+    metrics_label = "default"
+
+    def _update_usage(self) -> None:
+        in_use = max(self.checkedout(), 0)
+        capacity = self.size() + max(self._max_overflow, 0)
+        db_pool_checked_out.set(in_use, pool=self.metrics_label)
+        db_pool_saturation.set(in_use / capacity if capacity else 0.0, pool=self.metrics_label)
+
+    def _do_get(self):
+        start = time.perf_counter()
+        db_pool_waiting.inc(pool=self.metrics_label)
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            db_pool_timeouts_total.inc(pool=self.metrics_label)
+            raise
+        finally:
+            db_pool_waiting.dec(pool=self.metrics_label)
+            db_pool_checkout_seconds.observe(time.perf_counter() - start, pool=self.metrics_label)
+        self._update_usage()
+        return connection
+
+    def _do_return_conn(self, record) -> None:
+        super()._do_return_conn(record)
+        self._update_usage()
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics_label = self.metrics_label
+        return pool
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    """QueuePool (psycopg2) con métricas"""
+
+
+class TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool (asyncpg) con métricas"""
+
+
+def session_timeouts(statement_timeout_ms: int, idle_in_transaction_timeout_ms: int) -> Dict[str, str]:
+    """Parámetros de sesión de Postgres (0 = sin límite)"""
+    return {
+        "statement_timeout": str(statement_timeout_ms),
+        "idle_in_transaction_session_timeout": str(idle_in_transaction_timeout_ms),
+    }
+
+
+def connect_args_psycopg2(timeouts: Dict[str, str], pgbouncer: bool) -> Dict:
+    """connect_args del engine sync: timeouts en el startup packet (-c)"""
+    if pgbouncer:
+        return {}
+    return {"options": " ".join(f"-c {name}={value}" for name, value in timeouts.items())}
+
+
+def connect_args_asyncpg(timeouts: Dict[str, str], pgbouncer: bool) -> Dict:
+    """
+    connect_args del engine async. Con PgBouncer se desactivan los caches de
+    prepared statements (del driver y de SQLAlchemy) y cada statement usa un
+    nombre único, así dos clientes nunca chocan en la misma conexión del servidor.
+    """
+    if pgbouncer:
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        }
+    return {"server_settings": dict(timeouts)}
+
+
+def apply_timeouts_per_transaction(engine: Engine, timeouts: Dict[str, str]) -> None:
+    """
+    Aplica los timeouts al inicio de cada transacción (SET LOCAL en una sola
+    query), para PgBouncer en modo transaction.
+    """
+    assignments = ", ".join(f"set_config('{name}', '{value}', true)" for name, value in timeouts.items())
+    statement = text(f"SELECT {assignments}")
+
+    @event.listens_for(engine, "begin")
+    def _set_local_timeouts(connection):
+        connection.execute(statement)
@@ -0,0 +1,191 @@
+"""
+Métricas en proceso (contadores, gauges e histogramas de latencia)
+
+API mínima estilo Prometheus: cada métrica se registra una vez a nivel de
+módulo y se actualiza con inc/set/observe, opcionalmente con labels.
+snapshot() devuelve todo el registro como dict serializable; export() lo
+devuelve en crudo (labels como pares, buckets como lista) para el endpoint
+/metrics (app.utils.prometheus).
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Tuple, Iterator
+
+# Buckets de latencia en segundos (de 5ms a 30s)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_registry: Dict[str, "_Metric"] = {}
+_registry_lock = threading.Lock()
+
+
+def _label_key(labels: Dict[str, str]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: Tuple[Tuple[str, str], ...]) -> str:
+    return ",".join(f"{k}={v}" for k, v in key)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._lock = threading.Lock()
+        with _registry_lock:
+            _registry[name] = self
+
+    def snapshot(self) -> Dict:
+        raise NotImplementedError
+
+    def export(self) -> Dict:
+        """Series en crudo: [[pares (label, valor)], valor]"""
+        with self._lock:
+            series = [[list(key), value] for key, value in self._values.items()]
+        return {"type": self.kind, "description": self.description, "series": series}
+
+
+class Counter(_Metric):
+    """Contador monótono"""
+    kind = "counter"
+
+    def __init__(self, name: str, description: str):
+        super().__init__(name, description)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {_format_labels(k): v for k, v in self._values.items()}
+
+
+class Gauge(_Metric):
+    """Valor instantáneo"""
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str):
+        super().__init__(name, description)
+        self._values: Dict[Tuple, float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {_format_labels(k): v for k, v in self._values.items()}
+
+
+class Histogram(_Metric):
+    """Histograma de latencias con buckets acumulativos"""
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, description)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple, Dict] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = {"count": 0, "sum": 0.0, "max": 0.0, "buckets": [0] * len(self.buckets)}
+                self._series[key] = series
+            series["count"] += 1
+            series["sum"] += value
+            series["max"] = max(series["max"], value)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["buckets"][i] += 1
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """Mide la duración del bloque en segundos"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        """Cantidad de observaciones de la serie"""
+        series = self._series.get(_label_key(labels))
+        return series["count"] if series else 0
+
+    def quantile(self, q: float, **labels) -> float:
+        """Estimación del cuantil q (0-1) a partir de los buckets"""
+        series = self._series.get(_label_key(labels))
+        if not series or series["count"] == 0:
+            return 0.0
+        target = q * series["count"]
+        for bound, cumulative in zip(self.buckets, series["buckets"]):
+            if cumulative >= target:
+                return bound
+        return series["max"]
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                _format_labels(k): {
+                    "count": s["count"],
+                    "sum": round(s["sum"], 6),
+                    "max": round(s["max"], 6),
+                    "buckets": dict(zip((str(b) for b in self.buckets), s["buckets"])),
+                }
+                for k, s in self._series.items()
+            }
+
+    def export(self) -> Dict:
+        with self._lock:
+            series = [
+                [list(key), {"count": s["count"], "sum": s["sum"], "buckets": list(s["buckets"])}]
+                for key, s in self._series.items()
+            ]
+        return {
+            "type": self.kind,
+            "description": self.description,
+            "buckets": list(self.buckets),
+            "series": series,
+        }
+
+
+def snapshot() -> Dict[str, Dict]:
+    """Estado de todas las métricas registradas"""
+    with _registry_lock:
+        metrics = list(_registry.values())
+    return {
+        metric.name: {
+            "type": metric.kind,
+            "description": metric.description,
+            "values": metric.snapshot(),
+        }
+        for metric in metrics
+    }
+
+
+def export() -> Dict[str, Dict]:
+    """Estado en crudo de todas las métricas (ver _Metric.export)"""
+    with _registry_lock:
+        metrics = list(_registry.values())
+    return {metric.name: metric.export() for metric in metrics}
@@ -0,0 +1,245 @@
+"""
+Exposición de las métricas en formato de texto de Prometheus (/metrics)
+
+render(metrics.export()) arma el texto a partir del registro en proceso
+(app.utils.metrics), sin depender de prometheus_client.
+
+Con varios workers de uvicorn cada proceso tiene su propio registro. Con un
+directorio compartido (METRICS_MULTIPROC_DIR) cada worker vuelca su estado a
+<dir>/<pid>-<arranque>.json (escritura atómica) cada METRICS_FLUSH_SECONDS y
+el worker que atiende /metrics suma los archivos de todos:
+- counters e histogramas se suman entre procesos, también los de workers ya
+  terminados (así los totales no retroceden cuando uvicorn recicla uno)
+- gauges llevan label pid y solo se exponen los de procesos vivos
+
+Cada archivo lleva la generación del proceso padre (el master de uvicorn).
+Al arrancar y al apagarse cada worker borra los archivos de procesos muertos
+de otra generación (un deploy anterior). Los de workers muertos de la
+generación actual se quedan y se siguen sumando. El instante de arranque en
+el nombre evita que un pid reciclado pise el archivo de un worker muerto
+(los contadores retrocederían); sin /proc el archivo es <dir>/<pid>.json.
+"""
+import asyncio
+import logging
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import orjson
+
+from app.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_flusher: Optional[asyncio.Task] = None
+_generation: Optional[str] = None
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pairs: Iterable[Tuple[str, str]]) -> str:
+    rendered = ",".join(f'{name}="{_escape(value)}"' for name, value in pairs)
+    return f"{{{rendered}}}" if rendered else ""
+
+
+def _number(value: float) -> str:
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def render(exported: Dict[str, Dict]) -> str:
+    """Texto de exposición (version 0.0.4) de un estado como el de metrics.export()"""
+    lines: List[str] = []
+    for name in sorted(exported):
+        metric = exported[name]
+        description = metric["description"].replace("\\", "\\\\").replace("\n", "\\n")
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        for pairs, value in sorted(metric["series"], key=lambda series: series[0]):
+            pairs = [tuple(pair) for pair in pairs]
+            if metric["type"] != "histogram":
+                lines.append(f"{name}{_labels(pairs)} {_number(value)}")
+                continue
+            for bound, cumulative in zip(metric["buckets"], value["buckets"]):
+                lines.append(f"{name}_bucket{_labels(pairs + [('le', _number(bound))])} {cumulative}")
+            lines.append(f"{name}_bucket{_labels(pairs + [('le', '+Inf')])} {value['count']}")
+            lines.append(f"{name}_sum{_labels(pairs)} {_number(value['sum'])}")
+            lines.append(f"{name}_count{_labels(pairs)} {value['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def _start_time(pid: int) -> str:
+    """Instante de arranque del proceso (campo 22 de /proc/<pid>/stat); "" sin /proc"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # El nombre (campo 2) puede tener espacios
+            return f.read().rsplit(")", 1)[1].split()[19]
+    except (OSError, IndexError):
+        return ""
+
+
+def _pid_alive(pid: int, started: str = "") -> bool:
+    """Si el proceso sigue vivo; con `started`, que no sea otro proceso con el pid reciclado"""
+    try:
+        if pid != os.getpid():
+            os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return not started or _start_time(pid) in ("", started)
+
+
+def merge(states: Iterable[Tuple[int, str, Dict[str, Dict]]]) -> Dict[str, Dict]:
+    """Suma los estados exportados por cada proceso (pid, arranque, metrics.export())"""
+    merged: Dict[str, Dict] = {}
+    values: Dict[str, Dict[Tuple, object]] = {}
+
+    for pid, started, exported in states:
+        alive = _pid_alive(pid, started)
+        for name, metric in exported.items():
+            target = merged.setdefault(name, {key: val for key, val in metric.items() if key != "series"})
+            series = values.setdefault(name, {})
+            if metric["type"] != target["type"]:
+                continue
+            if metric["type"] == "histogram" and metric["buckets"] != target["buckets"]:
+                # Otro set de buckets (archivo de una versión anterior): no se puede sumar
+                continue
+            for pairs, value in metric["series"]:
+                key = tuple(tuple(pair) for pair in pairs)
+                if metric["type"] == "gauge":
+                    if alive:
+                        series[tuple(sorted(key + (("pid", str(pid)),)))] = value
+                elif metric["type"] == "histogram":
+                    current = series.get(key)
+                    if current is None:
+                        series[key] = {"count": value["count"], "sum": value["sum"], "buckets": list(value["buckets"])}
+                    else:
+                        current["count"] += value["count"]
+                        current["sum"] += value["sum"]
+                        current["buckets"] = [a + b for a, b in zip(current["buckets"], value["buckets"])]
+                else:
+                    series[key] = series.get(key, 0) + value
+
+    for name, metric in merged.items():
+        metric["series"] = [[list(key), value] for key, value in values[name].items()]
+    return merged
+
+
+def generation() -> str:
+    """Identifica al proceso padre: pid más su instante de arranque (si hay /proc)"""
+    global _generation
+    if _generation is None:
+        parent = os.getppid()
+        _generation = str(parent)
+        started = _start_time(parent)
+        try:
+            with open("/proc/sys/kernel/random/boot_id") as f:
+                if started:
+                    _generation = f"{parent}:{started}:{f.read().strip()}"
+        except OSError:
+            pass
+    return _generation
+
+
+def state_filename() -> str:
+    """Nombre del archivo de este proceso: <pid>-<arranque>.json (<pid>.json sin /proc)"""
+    pid = os.getpid()
+    started = _start_time(pid)
+    return f"{pid}-{started}.json" if started else f"{pid}.json"
+
+
+def write_state(directory: str) -> None:
+    """Vuelca el registro de este proceso a <directory>/<pid>-<arranque>.json"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, state_filename())
+    tmp_path = f"{path}.tmp"
+    state = {
+        "pid": os.getpid(),
+        "started": _start_time(os.getpid()),
+        "generation": generation(),
+        "metrics": metrics.export(),
+    }
+    with open(tmp_path, "wb") as f:
+        f.write(orjson.dumps(state))
+    os.replace(tmp_path, path)
+
+
+def prune_stale(directory: str) -> int:
+    """Borra los archivos de procesos muertos de otra generación (deploys anteriores)"""
+    if not os.path.isdir(directory):
+        return 0
+    removed = 0
+    for filename in os.listdir(directory):
+        pid, _, started = filename.split(".", 1)[0].partition("-")
+        if not pid.isdigit() or _pid_alive(int(pid), started):
+            continue
+        path = os.path.join(directory, filename)
+        if filename.endswith(".json"):
+            try:
+                with open(path, "rb") as f:
+                    if orjson.loads(f.read()).get("generation") == generation():
+                        continue
+            except (OSError, ValueError, AttributeError):
+                pass
+        try:
+            os.remove(path)
+            removed += 1
+        except OSError:
+            pass
+    if removed:
+        logger.info(f"🧹 [Metrics] {removed} archivos de métricas viejos borrados de {directory}")
+    return removed
+
+
+def read_states(directory: str) -> List[Tuple[int, str, Dict[str, Dict]]]:
+    """Estados volcados por todos los procesos (ignora archivos ilegibles)"""
+    states = []
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(directory, filename), "rb") as f:
+                state = orjson.loads(f.read())
+            states.append((int(state["pid"]), str(state.get("started", "")), state["metrics"]))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"⚠️ [Metrics] Archivo de métricas ilegible {filename}: {e}")
+    return states
+
+
+def render_metrics(directory: str = "") -> str:
+    """Texto de /metrics: este proceso, o la suma de todos si hay directorio compartido"""
+    if not directory:
+        return render(metrics.export())
+    write_state(directory)
+    return render(merge(read_states(directory)))
+
+
+async def _flush_loop(directory: str, interval: float) -> None:
+    while True:
+        try:
+            await asyncio.to_thread(write_state, directory)
+        except Exception as e:
+            logger.error(f"❌ [Metrics] Error volcando métricas a {directory}: {e}")
+        await asyncio.sleep(interval)
+
+
+def start_flusher(directory: str, interval: float) -> None:
+    """Limpia archivos viejos y vuelca las métricas de este worker al directorio cada `interval` segundos"""
+    global _flusher
+    prune_stale(directory)
+    _flusher = asyncio.create_task(_flush_loop(directory, interval))
+
+
+async def stop_flusher(directory: str) -> None:
+    """Detiene el volcado periódico, escribe el estado final del worker y limpia archivos viejos"""
+    global _flusher
+    if _flusher is not None:
+        _flusher.cancel()
+        await asyncio.gather(_flusher, return_exceptions=True)
+        _flusher = None
+        write_state(directory)
+        prune_stale(directory)
@@ -0,0 +1,106 @@
+"""
+Estadísticas por request: tiempo y cantidad de queries, etapas nombradas
+
+RequestTimingMiddleware abre un RequestStats por request (en un contextvar,
+así lo ven también las sesiones sync vía run_sync y los asyncio.to_thread).
+- instrument_queries(engine): hooks de SQLAlchemy que suman cada query
+  ejecutada dentro del request (cantidad y tiempo en la base).
+- stage("nsfw"): mide una etapa del handler (read, validate, nsfw,
+  cloudflare, process, upload, commit); si se repite, se acumula.
+
+Fuera de un request (workers de la cola, scripts) todo es no-op.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Dict, Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_QUERY_START = "_request_stats_started_at"
+
+
+class RequestStats:
+    """Contadores de un request en curso"""
+
+    def __init__(self, scope: Optional[Dict] = None):
+        self.scope = scope
+        self.started_at = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.stages: Dict[str, float] = {}
+
+    @property
+    def route(self) -> str:
+        """Template de la ruta que atiende el request (el router la deja en el scope)"""
+        route = (self.scope or {}).get("route")
+        return getattr(route, "path", None) or "unmatched"
+
+    def add_stage(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    def server_timing(self) -> str:
+        """Valor del header Server-Timing (duraciones en ms)"""
+        metrics = [f'db;dur={self.db_seconds * 1000:.1f};desc="{self.queries} queries"']
+        metrics += [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.stages.items()]
+        metrics.append(f"total;dur={self.elapsed() * 1000:.1f}")
+        return ", ".join(metrics)
+
+    def as_dict(self) -> Dict:
+        return {
+            "duration_ms": round(self.elapsed() * 1000, 1),
+            "db_ms": round(self.db_seconds * 1000, 1),
+            "queries": self.queries,
+            "stages_ms": {name: round(seconds * 1000, 1) for name, seconds in self.stages.items()},
+        }
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def start_request(scope: Optional[Dict] = None) -> Token:
+    """Abre las estadísticas del request actual (devuelve el token para end_request)"""
+    return _current.set(RequestStats(scope))
+
+
+def end_request(token: Token) -> None:
+    _current.reset(token)
+
+
+def current_stats() -> Optional[RequestStats]:
+    return _current.get()
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Mide la duración del bloque como etapa `name` del request actual"""
+    stats = _current.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if stats is not None:
+            stats.add_stage(name, time.perf_counter() - start)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        setattr(context, _QUERY_START, time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    started_at = getattr(context, _QUERY_START, None)
+    if stats is not None and started_at is not None:
+        stats.queries += 1
+        stats.db_seconds += time.perf_counter() - started_at
+
+
+def instrument_queries(engine: Engine) -> None:
+    """Cuenta las queries del engine (sync o async_engine.sync_engine) en el request actual"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
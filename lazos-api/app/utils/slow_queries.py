@@ -0,0 +1,207 @@
+"""
+Captura de queries lentas con EXPLAIN automático (modo diagnóstico, opt-in)
+
+Con SLOW_QUERY_LOG=true cada statement que tarda más de
+SLOW_QUERY_THRESHOLD_MS queda en un ring buffer en memoria (los últimos
+SLOW_QUERY_BUFFER_SIZE) con sus parámetros, la ruta que lo originó y la
+duración; /api/v1/admin/slow-queries los muestra, agrupados además por forma
+(el SQL con placeholders), para ver qué queries de list_posts/search/map
+necesitan índices con tráfico real.
+
+Una fracción (SLOW_QUERY_EXPLAIN_SAMPLE_RATE) de los SELECT capturados se
+re-ejecuta en background con EXPLAIN (ANALYZE, BUFFERS), en una réplica si
+hay (SLOW_QUERY_EXPLAIN_ON_REPLICA) o en el primario, nunca en la
+conexión del request. Se corre un solo EXPLAIN a la vez; si hay uno en curso
+la muestra se descarta. Solo se explican queries del engine async (mismo
+driver y formato de parámetros que el engine del EXPLAIN).
+
+Los parámetros pueden tener datos personales: el buffer solo vive en memoria
+y el endpoint exige la contraseña de admin.
+"""
+import asyncio
+import contextvars
+import logging
+import random
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.utils.metrics import Counter
+from app.utils.request_stats import current_stats
+
+logger = logging.getLogger(__name__)
+
+_QUERY_START = "_slow_query_started_at"
+_MAX_PARAMETER_CHARS = 200
+# Solo lecturas: EXPLAIN ANALYZE ejecuta la query de verdad
+_READ_ONLY = re.compile(r"^\s*SELECT\b", re.IGNORECASE)
+_WRITES = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE|FOR\s+UPDATE|FOR\s+SHARE|nextval)\b", re.IGNORECASE)
+
+slow_queries_total = Counter("slow_queries_total", "Queries por encima de SLOW_QUERY_THRESHOLD_MS, por ruta")
+slow_query_explains_total = Counter("slow_query_explains_total", "EXPLAIN de queries lentas por resultado")
+
+
+def _format_parameters(parameters: Any) -> Any:
+    """Parámetros legibles y serializables (los largos, ej. embeddings, se recortan)"""
+    def short(value: Any) -> str:
+        text = repr(value)
+        return text if len(text) <= _MAX_PARAMETER_CHARS else f"{text[:_MAX_PARAMETER_CHARS]}…"
+
+    if isinstance(parameters, dict):
+        return {str(name): short(value) for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [short(value) for value in parameters]
+    return short(parameters)
+
+
+def explainable(statement: str) -> bool:
+    """True si la query es un SELECT sin efectos (se puede re-ejecutar con ANALYZE)"""
+    return bool(_READ_ONLY.match(statement)) and not _WRITES.search(statement)
+
+
+class SlowQueryLog:
+    """Ring buffer de queries lentas y EXPLAIN muestreado en background"""
+
+    def __init__(self, threshold_ms: float, size: int = 200, explain_sample_rate: float = 0.0):
+        self.threshold_seconds = threshold_ms / 1000
+        self.explain_sample_rate = explain_sample_rate
+        self.explain_engine: Optional[AsyncEngine] = None
+        self._entries: Deque[Dict] = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self._explaining = False
+        self._ids = 0
+
+    def set_explain_engine(self, engine: Optional[AsyncEngine]) -> None:
+        """Engine (réplica o primario) donde se corren los EXPLAIN"""
+        self.explain_engine = engine
+
+    def record(self, statement: str, parameters: Any, seconds: float, driver: str) -> Dict:
+        stats = current_stats()
+        scope = (stats.scope if stats is not None else None) or {}
+        route = stats.route if stats is not None else "background"
+        with self._lock:
+            self._ids += 1
+            entry = {
+                "id": self._ids,
+                "captured_at": datetime.now(timezone.utc).isoformat(),
+                "method": scope.get("method"),
+                "route": route,
+                "duration_ms": round(seconds * 1000, 1),
+                "statement": statement,
+                "parameters": _format_parameters(parameters),
+                "explain": None,
+            }
+            self._entries.append(entry)
+        slow_queries_total.inc(route=route)
+        logger.warning(f"🐢 [SlowQuery] {entry['duration_ms']}ms en {route}: {' '.join(statement.split())[:200]}")
+        self._maybe_explain(entry, statement, parameters, driver)
+        return entry
+
+    def _maybe_explain(self, entry: Dict, statement: str, parameters: Any, driver: str) -> None:
+        engine = self.explain_engine
+        if (
+            engine is None
+            or self._explaining
+            or engine.dialect.driver != driver
+            or not explainable(statement)
+            or random.random() >= self.explain_sample_rate
+        ):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # engine sync fuera del event loop (workers, scripts)
+        self._explaining = True
+        entry["explain"] = "pending"
+        # Contexto vacío: las queries del EXPLAIN no cuentan para el request ni se vuelven a capturar
+        loop.create_task(self._explain(engine, entry, statement, parameters), context=contextvars.Context())
+
+    async def _explain(self, engine: AsyncEngine, entry: Dict, statement: str, parameters: Any) -> None:
+        try:
+            async with engine.connect() as connection:
+                result = await connection.exec_driver_sql(
+                    f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters
+                )
+                entry["explain"] = "\n".join(row[0] for row in result)
+            slow_query_explains_total.inc(result="ok")
+        except Exception as e:
+            entry["explain"] = f"error: {e}"
+            slow_query_explains_total.inc(result="error")
+            logger.error(f"❌ [SlowQuery] Error en EXPLAIN: {e}")
+        finally:
+            self._explaining = False
+
+    def entries(self, limit: Optional[int] = None) -> List[Dict]:
+        """Capturas más recientes primero"""
+        with self._lock:
+            entries = list(reversed(self._entries))
+        return entries[:limit] if limit else entries
+
+    def shapes(self) -> List[Dict]:
+        """Capturas agrupadas por SQL (placeholders = misma forma), las más costosas primero"""
+        shapes: Dict[str, Dict] = {}
+        for entry in self.entries():
+            shape = shapes.setdefault(entry["statement"], {
+                "statement": entry["statement"],
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "routes": set(),
+                "explain": None,
+            })
+            shape["count"] += 1
+            shape["total_ms"] = round(shape["total_ms"] + entry["duration_ms"], 1)
+            shape["max_ms"] = max(shape["max_ms"], entry["duration_ms"])
+            shape["routes"].add(entry["route"])
+            if shape["explain"] is None and entry["explain"] not in (None, "pending"):
+                shape["explain"] = entry["explain"]
+        for shape in shapes.values():
+            shape["routes"] = sorted(shape["routes"])
+        return sorted(shapes.values(), key=lambda shape: shape["total_ms"], reverse=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            setattr(context, _QUERY_START, time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started_at = getattr(context, _QUERY_START, None)
+        if started_at is None:
+            return
+        elapsed = time.perf_counter() - started_at
+        if elapsed >= self.threshold_seconds and not statement.lstrip().upper().startswith("EXPLAIN"):
+            self.record(statement, parameters, elapsed, conn.dialect.driver)
+
+    def instrument(self, engine: Engine) -> None:
+        """Captura las queries lentas del engine (sync o async_engine.sync_engine)"""
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+
+_instance: Optional[SlowQueryLog] = None
+
+
+def get_slow_query_log() -> SlowQueryLog:
+    """
+    Singleton del log de queries lentas.
+    Carga la configuración desde settings en la primera llamada.
+    """
+    global _instance
+    if _instance is None:
+        from app.config import settings
+        _instance = SlowQueryLog(
+            threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+            size=settings.SLOW_QUERY_BUFFER_SIZE,
+            explain_sample_rate=settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE,
+        )
+    return _instance
@@ -0,0 +1,6 @@
+"""
+Suite de benchmarks reproducible: datos sintéticos (seed), escenarios de
+carga (scenarios) y runner con p50/p95/p99 y throughput (run).
+
+Ver benchmarks/README.md para levantar PostGIS + storage mockeado.
+"""
@@ -0,0 +1,258 @@
+"""
+Geografía sintética: localidades de lazos-web con coordenadas y densidad Zipf
+
+localidades.json (el mismo que usan los filtros del frontend) solo tiene
+nombres por provincia. Las ciudades principales tienen coordenadas reales
+(aproximadas al centro); el resto se ubica de forma determinística (hash
+del nombre) alrededor de la capital de su provincia, los barrios de CABA
+dentro de la ciudad y las localidades bonaerenses sin coordenadas en el
+conurbano. Alcanza para que los bounds del mapa y las búsquedas por
+proximidad vean la distribución real: mucho en AMBA y capitales, poco en
+el resto.
+
+La densidad sigue una Zipf sobre un ranking de localidades (las grandes
+primero): la de rango r recibe un peso 1 / r^s.
+"""
+import bisect
+import hashlib
+import json
+import math
+import os
+import random
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+# lazos-api/benchmarks -> raíz del repo
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_LOCALIDADES_PATH = os.path.join(_REPO_ROOT, "lazos-web", "src", "data", "localidades.json")
+
+# Capital de cada provincia (lat, lng) y radio (grados) para las localidades sin coordenadas
+PROVINCE_ANCHORS: Dict[str, Tuple[float, float, float]] = {
+    "Buenos Aires": (-34.65, -58.55, 0.30),  # conurbano
+    "CABA": (-34.6037, -58.4416, 0.05),
+    "Catamarca": (-28.469, -65.779, 0.8),
+    "Chaco": (-27.451, -58.986, 1.0),
+    "Chubut": (-43.300, -65.102, 1.5),
+    "Córdoba": (-31.420, -64.188, 1.0),
+    "Corrientes": (-27.469, -58.830, 1.0),
+    "Entre Ríos": (-31.732, -60.529, 1.0),
+    "Formosa": (-26.185, -58.173, 1.0),
+    "Jujuy": (-24.185, -65.299, 0.7),
+    "La Pampa": (-36.620, -64.290, 1.2),
+    "La Rioja": (-29.413, -66.856, 0.8),
+    "Mendoza": (-32.889, -68.845, 0.8),
+    "Misiones": (-27.367, -55.896, 0.8),
+    "Neuquén": (-38.952, -68.059, 1.0),
+    "Río Negro": (-40.813, -62.996, 1.5),
+    "Salta": (-24.782, -65.423, 1.0),
+    "San Juan": (-31.537, -68.525, 0.7),
+    "San Luis": (-33.301, -66.338, 0.8),
+    "Santa Cruz": (-51.623, -69.216, 1.5),
+    "Santa Fe": (-31.633, -60.700, 1.0),
+    "Santiago del Estero": (-27.795, -64.261, 1.0),
+    "Tierra del Fuego": (-54.801, -68.303, 0.6),
+    "Tucumán": (-26.808, -65.217, 0.4),
+}
+
+# Coordenadas de las ciudades con más población (lat, lng)
+KNOWN_LOCALIDADES: Dict[Tuple[str, str], Tuple[float, float]] = {
+    ("Buenos Aires", "La Plata"): (-34.921, -57.954),
+    ("Buenos Aires", "Mar del Plata"): (-38.005, -57.542),
+    ("Buenos Aires", "General Pueyrredón"): (-38.005, -57.542),
+    ("Buenos Aires", "Bahía Blanca"): (-38.719, -62.272),
+    ("Buenos Aires", "Tandil"): (-37.321, -59.133),
+    ("Buenos Aires", "Necochea"): (-38.554, -58.739),
+    ("Buenos Aires", "Olavarría"): (-36.892, -60.322),
+    ("Buenos Aires", "Azul"): (-36.777, -59.858),
+    ("Buenos Aires", "Junín"): (-34.585, -60.946),
+    ("Buenos Aires", "Pergamino"): (-33.890, -60.573),
+    ("Buenos Aires", "San Nicolás"): (-33.334, -60.211),
+    ("Buenos Aires", "Villa Constitución"): (-33.230, -60.330),
+    ("Buenos Aires", "Zárate"): (-34.098, -59.028),
+    ("Buenos Aires", "Campana"): (-34.164, -58.959),
+    ("Buenos Aires", "Luján"): (-34.570, -59.105),
+    ("Buenos Aires", "Mercedes"): (-34.651, -59.430),
+    ("Buenos Aires", "Chivilcoy"): (-34.896, -60.017),
+    ("Buenos Aires", "Saladillo"): (-35.637, -59.778),
+    ("Buenos Aires", "Villa Gesell"): (-37.263, -56.973),
+    ("Buenos Aires", "Carmen de Patagones"): (-40.799, -62.984),
+    ("Buenos Aires", "Berisso"): (-34.873, -57.886),
+    ("Buenos Aires", "Cañuelas"): (-35.052, -58.760),
+    ("Buenos Aires", "Pilar"): (-34.458, -58.914),
+    ("Buenos Aires", "Escobar"): (-34.348, -58.795),
+    ("Buenos Aires", "Quilmes"): (-34.720, -58.254),
+    ("Buenos Aires", "Lanús"): (-34.706, -58.392),
+    ("Buenos Aires", "Lomas de Zamora"): (-34.761, -58.406),
+    ("Buenos Aires", "Avellaneda"): (-34.662, -58.365),
+    ("Buenos Aires", "Morón"): (-34.653, -58.620),
+    ("Buenos Aires", "San Isidro"): (-34.472, -58.527),
+    ("Buenos Aires", "Tigre"): (-34.426, -58.580),
+    ("Buenos Aires", "La Matanza"): (-34.770, -58.625),
+    ("Buenos Aires", "San Justo"): (-34.683, -58.560),
+    ("Córdoba", "Córdoba"): (-31.420, -64.188),
+    ("Córdoba", "Río Cuarto"): (-33.123, -64.349),
+    ("Córdoba", "Villa María"): (-32.407, -63.240),
+    ("Córdoba", "Villa Carlos Paz"): (-31.424, -64.497),
+    ("Córdoba", "San Francisco"): (-31.428, -62.083),
+    ("Santa Fe", "Rosario"): (-32.944, -60.650),
+    ("Santa Fe", "Santa Fe"): (-31.633, -60.700),
+    ("Santa Fe", "Rafaela"): (-31.253, -61.492),
+    ("Santa Fe", "Venado Tuerto"): (-33.746, -61.969),
+    ("Santa Fe", "Reconquista"): (-29.150, -59.650),
+    ("Santa Fe", "Villa Constitución"): (-33.230, -60.330),
+    ("Mendoza", "Mendoza"): (-32.889, -68.845),
+    ("Mendoza", "Godoy Cruz"): (-32.926, -68.845),
+    ("Mendoza", "Guaymallén"): (-32.900, -68.790),
+    ("Mendoza", "San Rafael"): (-34.617, -68.330),
+    ("Tucumán", "San Miguel de Tucumán"): (-26.808, -65.217),
+    ("Tucumán", "Yerba Buena"): (-26.816, -65.316),
+    ("Tucumán", "Tafí Viejo"): (-26.732, -65.259),
+    ("Salta", "Salta"): (-24.782, -65.423),
+    ("Salta", "Tartagal"): (-22.517, -63.801),
+    ("Salta", "Orán"): (-23.137, -64.324),
+    ("Entre Ríos", "Paraná"): (-31.732, -60.529),
+    ("Entre Ríos", "Concordia"): (-31.393, -58.021),
+    ("Entre Ríos", "Gualeguaychú"): (-33.009, -58.517),
+    ("Chaco", "Resistencia"): (-27.451, -58.986),
+    ("Chaco", "Presidencia Roque Sáenz Peña"): (-26.785, -60.439),
+    ("Corrientes", "Corrientes"): (-27.469, -58.830),
+    ("Corrientes", "Goya"): (-29.140, -59.263),
+    ("Misiones", "Posadas"): (-27.367, -55.896),
+    ("Misiones", "Oberá"): (-27.487, -55.119),
+    ("Misiones", "Puerto Iguazú"): (-25.597, -54.578),
+    ("Jujuy", "San Salvador de Jujuy"): (-24.185, -65.299),
+    ("Santiago del Estero", "Santiago del Estero"): (-27.795, -64.261),
+    ("Santiago del Estero", "La Banda"): (-27.734, -64.242),
+    ("Neuquén", "Neuquén"): (-38.952, -68.059),
+    ("Neuquén", "San Martín de los Andes"): (-40.157, -71.353),
+    ("Río Negro", "Viedma"): (-40.813, -62.996),
+    ("Río Negro", "General Roca"): (-39.033, -67.583),
+    ("Río Negro", "Cipolletti"): (-38.934, -67.990),
+    ("Río Negro", "Bariloche"): (-41.133, -71.310),
+    ("Río Negro", "San Carlos de Bariloche"): (-41.133, -71.310),
+    ("Chubut", "Comodoro Rivadavia"): (-45.865, -67.497),
+    ("Chubut", "Trelew"): (-43.253, -65.309),
+    ("Chubut", "Puerto Madryn"): (-42.769, -65.038),
+    ("Chubut", "Esquel"): (-42.911, -71.319),
+    ("Chubut", "Rawson"): (-43.300, -65.102),
+    ("San Juan", "San Juan"): (-31.537, -68.525),
+    ("San Luis", "San Luis"): (-33.301, -66.338),
+    ("San Luis", "Villa Mercedes"): (-33.675, -65.457),
+    ("La Pampa", "Santa Rosa"): (-36.620, -64.290),
+    ("La Pampa", "General Pico"): (-35.656, -63.757),
+    ("La Rioja", "La Rioja"): (-29.413, -66.856),
+    ("Catamarca", "San Fernando del Valle de Catamarca"): (-28.469, -65.779),
+    ("Formosa", "Formosa"): (-26.185, -58.173),
+    ("Santa Cruz", "Río Gallegos"): (-51.623, -69.216),
+    ("Santa Cruz", "Caleta Olivia"): (-46.439, -67.528),
+    ("Santa Cruz", "El Calafate"): (-50.338, -72.265),
+    ("Tierra del Fuego", "Ushuaia"): (-54.801, -68.303),
+    ("Tierra del Fuego", "Río Grande"): (-53.787, -67.709),
+}
+
+# Ranking de densidad: primero estas (de más a menos avisos), después el resto
+HOTSPOTS: List[Tuple[str, str]] = [
+    ("CABA", "Palermo"),
+    ("CABA", "Caballito"),
+    ("Córdoba", "Córdoba"),
+    ("Santa Fe", "Rosario"),
+    ("Buenos Aires", "La Plata"),
+    ("CABA", "Flores"),
+    ("Buenos Aires", "Mar del Plata"),
+    ("Buenos Aires", "La Matanza"),
+    ("CABA", "Belgrano"),
+    ("Mendoza", "Mendoza"),
+    ("Buenos Aires", "Quilmes"),
+    ("Tucumán", "San Miguel de Tucumán"),
+    ("CABA", "Almagro"),
+    ("Buenos Aires", "Lomas de Zamora"),
+    ("Salta", "Salta"),
+    ("Buenos Aires", "Lanús"),
+    ("CABA", "Villa Urquiza"),
+    ("Santa Fe", "Santa Fe"),
+    ("Buenos Aires", "Morón"),
+    ("Entre Ríos", "Paraná"),
+    ("Buenos Aires", "Bahía Blanca"),
+    ("Neuquén", "Neuquén"),
+    ("Misiones", "Posadas"),
+    ("Chaco", "Resistencia"),
+]
+
+# ~0.01 grados = ~1 km: dispersión de los avisos alrededor del centro de la localidad
+_CITY_SPREAD = 0.012
+_BARRIO_SPREAD = 0.006
+
+
+@dataclass(frozen=True)
+class Localidad:
+    provincia: str
+    nombre: str
+    lat: float
+    lng: float
+    spread: float  # desvío (grados) de los puntos alrededor del centro
+
+    def random_point(self, rng: random.Random) -> Tuple[float, float]:
+        """Punto con distribución normal alrededor del centro"""
+        return (
+            round(self.lat + rng.gauss(0, self.spread), 6),
+            round(self.lng + rng.gauss(0, self.spread), 6),
+        )
+
+
+def _stable_unit(*parts: str) -> float:
+    """Número en [0, 1) determinístico para un string (no depende de PYTHONHASHSEED)"""
+    digest = hashlib.sha256("|".join(parts).encode()).digest()
+    return int.from_bytes(digest[:8], "big") / 2 ** 64
+
+
+def place(provincia: str, nombre: str) -> Tuple[float, float]:
+    """Centro de la localidad: real si se conoce, si no cerca de la capital de su provincia"""
+    known = KNOWN_LOCALIDADES.get((provincia, nombre))
+    if known:
+        return known
+    lat, lng, radius = PROVINCE_ANCHORS[provincia]
+    angle = 2 * math.pi * _stable_unit(provincia, nombre, "angle")
+    distance = radius * math.sqrt(_stable_unit(provincia, nombre, "distance"))
+    return round(lat + distance * math.sin(angle), 4), round(lng + distance * math.cos(angle), 4)
+
+
+def load_localidades(path: Optional[str] = None) -> List[Localidad]:
+    """
+    Localidades de lazos-web con coordenadas, en orden de ranking (HOTSPOTS primero,
+    el resto en un orden fijo).
+    """
+    path = path or os.environ.get("LOCALIDADES_PATH") or DEFAULT_LOCALIDADES_PATH
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+
+    localidades = {}
+    for provincia, nombres in data.items():
+        if provincia not in PROVINCE_ANCHORS:
+            continue
+        for nombre in nombres:
+            lat, lng = place(provincia, nombre)
+            spread = _BARRIO_SPREAD if provincia == "CABA" else _CITY_SPREAD
+            localidades[(provincia, nombre)] = Localidad(provincia, nombre, lat, lng, spread)
+
+    ranked = [localidades[key] for key in HOTSPOTS if key in localidades]
+    hot = set(HOTSPOTS)
+    rest = sorted((key for key in localidades if key not in hot), key=lambda key: _stable_unit(*key, "rank"))
+    return ranked + [localidades[key] for key in rest]
+
+
+class ZipfSampler:
+    """Elige elementos con probabilidad 1 / rango^s (rango 1 = el primero)"""
+
+    def __init__(self, items: List, s: float = 1.0):
+        self.items = items
+        weights = [1 / (rank ** s) for rank in range(1, len(items) + 1)]
+        total = sum(weights)
+        self.cumulative = []
+        acc = 0.0
+        for weight in weights:
+            acc += weight / total
+            self.cumulative.append(acc)
+
+    def sample(self, rng: random.Random):
+        index = bisect.bisect_left(self.cumulative, rng.random())
+        return self.items[min(index, len(self.items) - 1)]
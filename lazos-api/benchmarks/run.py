@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Runner de los escenarios de carga (p50/p95/p99 y throughput)
+
+Corre cada escenario de benchmarks/scenarios.py contra un servidor (closed
+loop: C clientes concurrentes, cada uno manda el próximo request apenas
+recibe la respuesta) y reporta por escenario requests/s, latencias
+p50/p95/p99/máx y errores (excepciones o status >= 400). Con --json guarda
+los resultados para comparar dos builds sobre la misma base sembrada.
+
+    python -m benchmarks.run http://localhost:8000
+    python -m benchmarks.run http://localhost:8000 --scenarios feed,map_pan --duration 60 --concurrency 64
+    python -m benchmarks.run http://localhost:8000 --json results/main.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+# Agregar path para importar app
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from benchmarks.geo import load_localidades
+from benchmarks.scenarios import SCENARIOS, AdminQueuesScenario, BenchRequest, Scenario
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Percentil q (0-100) por nearest-rank sobre valores ya ordenados"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(q / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(name: str, latencies: List[float], statuses: Counter, elapsed: float) -> Dict:
+    latencies = sorted(latencies)
+    total = len(latencies)
+    errors = sum(count for status, count in statuses.items() if status == "error" or int(status) >= 400)
+    return {
+        "scenario": name,
+        "requests": total,
+        "errors": errors,
+        "rps": round(total / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "max_ms": round(latencies[-1] * 1000, 1) if latencies else 0.0,
+        "statuses": dict(statuses),
+    }
+
+
+async def send(client: httpx.AsyncClient, request: BenchRequest) -> httpx.Response:
+    return await client.request(
+        request.method,
+        request.path,
+        params=request.params or None,
+        headers=request.headers or None,
+        data=request.data,
+        files=request.files,
+    )
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    total: Optional[int],
+    duration: Optional[float],
+    concurrency: int,
+    seed: int,
+    warmup: int,
+) -> Dict:
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    remaining = iter(range(total)) if total else None
+    deadline: Optional[float] = None
+
+    async def client_loop(worker_id: int, record: bool, count: Optional[int] = None) -> None:
+        requests = scenario.requests(random.Random(f"{seed}-{scenario.name}-{worker_id}"))
+        sent = 0
+        while True:
+            if count is not None:
+                if sent >= count:
+                    return
+            elif deadline is not None:
+                if time.perf_counter() >= deadline:
+                    return
+            elif next(remaining, None) is None:
+                return
+            sent += 1
+            request = next(requests)
+            start = time.perf_counter()
+            try:
+                response = await send(client, request)
+                status = str(response.status_code)
+            except httpx.HTTPError:
+                status = "error"
+            if record:
+                latencies.append(time.perf_counter() - start)
+                statuses[status] += 1
+
+    # Warm-up: conexiones keep-alive, pools y caches (no se mide)
+    if warmup:
+        await asyncio.gather(*[client_loop(-1 - i, False, warmup) for i in range(min(concurrency, 4))])
+
+    start = time.perf_counter()
+    if duration:
+        deadline = start + duration
+    await asyncio.gather(*[client_loop(i, True) for i in range(concurrency)])
+    return summarize(scenario.name, latencies, statuses, time.perf_counter() - start)
+
+
+def print_results(results: List[Dict]) -> None:
+    print(f"\n{'escenario':<14} {'requests':>8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'máx ms':>8} {'errores':>8}")
+    for r in results:
+        print(
+            f"{r['scenario']:<14} {r['requests']:>8} {r['rps']:>8.1f} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} "
+            f"{r['p99_ms']:>8.1f} {r['max_ms']:>8.1f} {r['errors']:>8}"
+        )
+
+
+async def main(args: argparse.Namespace) -> None:
+    localidades = load_localidades(args.localidades)
+    names = args.scenarios.split(",") if args.scenarios else list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        raise SystemExit(f"Escenarios desconocidos: {', '.join(unknown)} (disponibles: {', '.join(SCENARIOS)})")
+
+    results = []
+    for name in names:
+        if name == AdminQueuesScenario.name:
+            scenario = AdminQueuesScenario(localidades, args.zipf_s, admin_password=args.admin_password)
+        else:
+            scenario = SCENARIOS[name](localidades, args.zipf_s)
+        concurrency = args.concurrency or scenario.default_concurrency
+        total = None if args.duration else (args.requests or scenario.default_requests)
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+        print(f"▶ {name}: {f'{args.duration}s' if args.duration else f'{total} requests'}, concurrencia {concurrency}")
+        async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+            results.append(await run_scenario(
+                client, scenario, total, args.duration, concurrency, args.seed, args.warmup,
+            ))
+
+    print_results(results)
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "base_url": args.base_url,
+                "seed": args.seed,
+                "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "results": results,
+            }, f, indent=2, ensure_ascii=False)
+        print(f"\n✅ Resultados en {args.json}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base_url", help="URL base del servidor (ej: http://localhost:8000)")
+    parser.add_argument("--scenarios", help=f"Escenarios separados por coma (default: todos: {','.join(SCENARIOS)})")
+    parser.add_argument("--requests", type=int, help="Requests por escenario (default: el de cada escenario)")
+    parser.add_argument("--duration", type=float, help="Segundos por escenario (en vez de --requests)")
+    parser.add_argument("--concurrency", type=int, help="Clientes concurrentes (default: el de cada escenario)")
+    parser.add_argument("--warmup", type=int, default=20, help="Requests de warm-up por cliente de calentamiento")
+    parser.add_argument("--seed", type=int, default=42, help="Semilla de los clientes")
+    parser.add_argument("--zipf-s", type=float, default=1.0, help="Exponente Zipf (igual que en el seed)")
+    parser.add_argument("--localidades", help="Ruta a localidades.json (default: lazos-web/src/data)")
+    parser.add_argument("--admin-password", default=os.environ.get("ADMIN_PASSWORD", ""), help="Para admin_queues")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Timeout por request (segundos)")
+    parser.add_argument("--json", help="Archivo donde guardar los resultados")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,232 @@
+"""
+Escenarios de carga: qué requests dispara cada cliente simulado
+
+Cada escenario genera una secuencia infinita de requests por cliente (un
+generador con su propio Random), así los escenarios con estado (paneo del
+mapa) se comportan como una sesión real y la corrida es reproducible con la
+misma semilla.
+
+- feed: listado de posts (páginas tempranas mucho más frecuentes) y alertas
+- facets: filtros combinados de animal, tamaño, sexo, fechas y provincia/localidad
+- map_pan: sesiones de mapa que arrancan en una localidad, panean y hacen zoom
+- search: búsqueda de texto
+- proximity: búsqueda con lat/lon/radius_km alrededor de una localidad
+- upload_burst: ráfagas de POST /posts con 1-2 JPEGs (van al storage mockeado)
+- admin_queues: reportes pendientes, cola de moderación y estadísticas
+"""
+import io
+import random
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional
+
+from benchmarks.geo import Localidad, ZipfSampler
+
+API = "/api/v1"
+
+
+@dataclass
+class BenchRequest:
+    method: str
+    path: str
+    params: Dict = field(default_factory=dict)
+    headers: Dict = field(default_factory=dict)
+    data: Optional[Dict] = None
+    files: Optional[List] = None
+
+
+class Scenario:
+    """Base: nombre, valores por defecto de la corrida y generador de requests"""
+
+    name = ""
+    default_requests = 1000
+    default_concurrency = 32
+
+    def __init__(self, localidades: List[Localidad], zipf_s: float = 1.0):
+        self.localidades = localidades
+        self.sampler = ZipfSampler(localidades, s=zipf_s)
+
+    def requests(self, rng: random.Random) -> Iterator[BenchRequest]:
+        raise NotImplementedError
+
+
+class FeedScenario(Scenario):
+    name = "feed"
+
+    def requests(self, rng):
+        pages = ZipfSampler(list(range(1, 51)), s=1.5)
+        while True:
+            if rng.random() < 0.8:
+                yield BenchRequest("GET", f"{API}/posts", {"page": pages.sample(rng), "limit": 20})
+            else:
+                yield BenchRequest("GET", f"{API}/alerts", {"page": pages.sample(rng), "limit": 20})
+
+
+class FacetsScenario(Scenario):
+    name = "facets"
+
+    def requests(self, rng):
+        while True:
+            params = {"page": rng.choice([1, 1, 1, 2, 3]), "limit": 20}
+            if rng.random() < 0.6:
+                params["animal_type"] = rng.choice(["dog", "cat", "other"])
+            if rng.random() < 0.3:
+                params["size"] = rng.choice(["small", "medium", "large"])
+            if rng.random() < 0.2:
+                params["sex"] = rng.choice(["male", "female", "unknown"])
+            if rng.random() < 0.3:
+                params["date_from"] = (date.today() - timedelta(days=rng.choice([7, 30, 90]))).isoformat()
+            if rng.random() < 0.5:
+                localidad = self.sampler.sample(rng)
+                params["provincia"] = localidad.provincia
+                if rng.random() < 0.6:
+                    params["localidad"] = localidad.nombre
+            if rng.random() < 0.2:
+                params["sort"] = "created_at"
+            yield BenchRequest("GET", f"{API}/posts", params)
+
+
+class MapPanScenario(Scenario):
+    name = "map_pan"
+
+    # Alto del viewport en grados: barrio, ciudad, área metropolitana, región
+    SPANS = [0.02, 0.08, 0.4, 2.0]
+
+    def requests(self, rng):
+        while True:
+            # Nueva sesión: arranca en una localidad con un zoom al azar y hace 5-20 movimientos
+            localidad = self.sampler.sample(rng)
+            lat, lng = localidad.lat, localidad.lng
+            zoom = rng.randrange(len(self.SPANS))
+            for _ in range(rng.randint(5, 20)):
+                span = self.SPANS[zoom]
+                params = {
+                    "sw_lat": round(lat - span / 2, 5),
+                    "sw_lng": round(lng - span * 0.75, 5),
+                    "ne_lat": round(lat + span / 2, 5),
+                    "ne_lng": round(lng + span * 0.75, 5),
+                    "format": "binary",
+                }
+                if rng.random() < 0.15:
+                    params["animal_type"] = rng.choice(["dog", "cat"])
+                yield BenchRequest("GET", f"{API}/map/points/unified", params)
+
+                action = rng.random()
+                if action < 0.7:
+                    lat += rng.uniform(-0.3, 0.3) * span
+                    lng += rng.uniform(-0.3, 0.3) * span
+                elif action < 0.85:
+                    zoom = max(zoom - 1, 0)
+                else:
+                    zoom = min(zoom + 1, len(self.SPANS) - 1)
+
+
+SEARCH_TERMS = ["perro", "gato", "collar", "negro", "blanco", "atigrado", "plaza", "asustado", "correa", "marrón"]
+
+
+class SearchScenario(Scenario):
+    name = "search"
+
+    def requests(self, rng):
+        while True:
+            if rng.random() < 0.7:
+                q = rng.choice(SEARCH_TERMS)
+            else:
+                q = self.sampler.sample(rng).nombre
+            yield BenchRequest("GET", f"{API}/search", {"q": q, "type": rng.choice(["all", "all", "posts", "alerts"])})
+
+
+class ProximityScenario(Scenario):
+    name = "proximity"
+
+    def requests(self, rng):
+        while True:
+            lat, lng = self.sampler.sample(rng).random_point(rng)
+            yield BenchRequest("GET", f"{API}/search", {
+                "q": rng.choice(SEARCH_TERMS),
+                "lat": lat,
+                "lon": lng,
+                "radius_km": rng.choice([1, 2, 5, 10, 25]),
+            })
+
+
+def make_jpeg(rng: random.Random, width: int = 1280, height: int = 960) -> bytes:
+    """Foto sintética: degradé con rectángulos (tamaño y costo de decodificación de una foto real)"""
+    from PIL import Image, ImageDraw
+
+    image = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    draw = ImageDraw.Draw(image)
+    for _ in range(40):
+        x, y = rng.randrange(width), rng.randrange(height)
+        color = tuple(rng.randrange(256) for _ in range(3))
+        draw.rectangle([x, y, x + rng.randint(20, 300), y + rng.randint(20, 300)], fill=color)
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue()
+
+
+class UploadBurstScenario(Scenario):
+    name = "upload_burst"
+    default_requests = 64
+    default_concurrency = 16  # la ráfaga: todos los clientes suben a la vez
+
+    def __init__(self, localidades, zipf_s=1.0):
+        super().__init__(localidades, zipf_s)
+        rng = random.Random(0)
+        self.photos = [make_jpeg(rng) for _ in range(4)]
+
+    def requests(self, rng):
+        while True:
+            localidad = self.sampler.sample(rng)
+            lat, lng = localidad.random_point(rng)
+            animal = rng.choice(["dog", "cat"])
+            files = []
+            for _ in range(rng.choice([1, 1, 2])):
+                # Bytes extra después del EOI: cada subida es un contenido distinto
+                # (sin dedup en storage ni cache de veredictos), la imagen decodifica igual
+                photo = rng.choice(self.photos) + rng.randbytes(16)
+                files.append(("images", ("foto.jpg", photo, "image/jpeg")))
+            yield BenchRequest("POST", f"{API}/posts", data={
+                "latitude": lat,
+                "longitude": lng,
+                "size": rng.choice(["small", "medium", "large"]),
+                "animal_type": animal,
+                "sex": "unknown",
+                "sighting_date": date.today().isoformat(),
+                "description": f"{'Perro' if animal == 'dog' else 'Gato'} visto cerca de la plaza de {localidad.nombre}, con collar.",
+                "location_name": f"Av. San Martín 100, {localidad.nombre}, {localidad.provincia}",
+            }, files=files)
+
+
+class AdminQueuesScenario(Scenario):
+    name = "admin_queues"
+    default_requests = 300
+    default_concurrency = 4  # pocos moderadores
+
+    def __init__(self, localidades, zipf_s=1.0, admin_password: str = ""):
+        super().__init__(localidades, zipf_s)
+        self.headers = {"X-Admin-Password": admin_password}
+
+    def requests(self, rng):
+        while True:
+            action = rng.random()
+            if action < 0.45:
+                yield BenchRequest("GET", f"{API}/admin/reports", {"resolved": "false"}, self.headers)
+            elif action < 0.9:
+                yield BenchRequest("GET", f"{API}/admin/pending", {}, self.headers)
+            else:
+                yield BenchRequest("GET", f"{API}/admin/stats", {}, self.headers)
+
+
+SCENARIOS = {
+    scenario.name: scenario
+    for scenario in [
+        FeedScenario,
+        FacetsScenario,
+        MapPanScenario,
+        SearchScenario,
+        ProximityScenario,
+        UploadBurstScenario,
+        AdminQueuesScenario,
+    ]
+}
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Generador de datos sintéticos para los benchmarks
+
+Crea N posts (con 1-3 imágenes cada uno), alertas y reportes repartidos por
+las localidades de lazos-web con densidad Zipf (ver benchmarks/geo.py). Todo
+sale de un Random con semilla fija: la misma semilla da la misma base (con
+fechas relativas al día de la corrida), así dos corridas de benchmarks (o dos
+builds) se comparan sobre los mismos datos.
+
+- Posts: fechas de avistamiento de los últimos --days días (más densas hacia
+  hoy), ~3% pendientes de moderación y ~5% inactivos (cola de admin realista)
+- Imágenes: URLs bajo R2_PUBLIC_URL (el benchmark no descarga imágenes; las
+  subidas nuevas van al storage mockeado)
+- Reportes: sobre ~2% de posts y ~1% de alertas, la mitad resueltos
+
+Ejecutar (con DATABASE_URL apuntando a la base de benchmarks, NUNCA producción):
+    python -m benchmarks.seed --posts 20000 --alerts 5000 --reset
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from typing import Dict, Iterator, List, Optional
+
+# Agregar path para importar app
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.geo import Localidad, ZipfSampler, load_localidades
+
+STREETS = [
+    "Av. Rivadavia", "Av. San Martín", "Belgrano", "Sarmiento", "Mitre", "Av. Corrientes",
+    "Moreno", "25 de Mayo", "9 de Julio", "Urquiza", "Alsina", "Independencia",
+    "Av. Libertador", "Lavalle", "Tucumán", "Italia", "España", "Pellegrini",
+]
+COLORS = ["negro", "blanco", "marrón", "atigrado", "gris", "dorado", "manchado", "tricolor", "canela"]
+PLACES = [
+    "cerca de la plaza", "en la parada del colectivo", "frente a la escuela", "en la esquina del kiosco",
+    "por la vía del tren", "en el estacionamiento del súper", "cerca de la estación", "en el parque",
+]
+TRAITS = ["con collar rojo", "sin collar", "rengueando", "muy asustado", "con correa", "flaco", "manso", "con chapita"]
+DIRECTIONS = ["hacia el norte", "hacia el sur", "hacia el centro", "entrando al parque", "cruzando la avenida", None]
+ANIMAL_WORDS = {"dog": "Perro", "cat": "Gato", "other": "Animal"}
+
+# Pesos de los atributos de un post
+ANIMAL_WEIGHTS = {"dog": 0.62, "cat": 0.30, "other": 0.08}
+SIZE_WEIGHTS = {"small": 0.35, "medium": 0.45, "large": 0.20}
+SEX_WEIGHTS = {"unknown": 0.5, "male": 0.26, "female": 0.24}
+
+BATCH_SIZE = 1000
+
+
+def _weighted(rng: random.Random, weights: Dict[str, float]) -> str:
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def _recent_day(rng: random.Random, days: int) -> int:
+    """Días hacia atrás: exponencial (la mitad de los avisos en el último ~20% del rango)"""
+    return min(int(rng.expovariate(5 / days)), days - 1)
+
+
+def _location_name(rng: random.Random, localidad: Localidad) -> str:
+    # Formato que filtran provincia/localidad en list_posts: "calle número, localidad, provincia"
+    return f"{rng.choice(STREETS)} {rng.randint(1, 4999)}, {localidad.nombre}, {localidad.provincia}"
+
+
+def _description(rng: random.Random, animal: str) -> str:
+    return (
+        f"{ANIMAL_WORDS[animal]} {rng.choice(COLORS)} {rng.choice(TRAITS)}, "
+        f"visto {rng.choice(PLACES)}."
+    )
+
+
+class SeedGenerator:
+    """Filas para posts, post_images, alerts y reports (sin tocar la base)"""
+
+    def __init__(
+        self,
+        seed: int = 42,
+        days: int = 180,
+        zipf_s: float = 1.0,
+        public_url: str = "http://localhost:5000/lazos-bench",
+        localidades: Optional[List[Localidad]] = None,
+        today: Optional[date] = None,
+    ):
+        self.rng = random.Random(seed)
+        self.days = days
+        self.public_url = public_url.rstrip("/")
+        self.sampler = ZipfSampler(localidades or load_localidades(), s=zipf_s)
+        self.today = today or date.today()
+        self.post_ids: List[uuid.UUID] = []
+        self.alert_ids: List[uuid.UUID] = []
+
+    def _timestamp(self, day: date) -> datetime:
+        seconds = self.rng.randint(7 * 3600, 23 * 3600)
+        return datetime.combine(day, dt_time(), tzinfo=timezone.utc) + timedelta(seconds=seconds)
+
+    def posts(self, count: int) -> Iterator[Dict]:
+        """Filas de posts; cada una lleva sus imágenes en "_images" (post_images)"""
+        rng = self.rng
+        for _ in range(count):
+            localidad = self.sampler.sample(rng)
+            lat, lng = localidad.random_point(rng)
+            animal = _weighted(rng, ANIMAL_WEIGHTS)
+            sighting_date = self.today - timedelta(days=_recent_day(rng, self.days))
+            created_at = self._timestamp(sighting_date)
+            post_id = uuid.UUID(int=rng.getrandbits(128), version=4)
+            images = []
+            for order in range(rng.choices([1, 2, 3], weights=[0.6, 0.3, 0.1])[0]):
+                name = uuid.UUID(int=rng.getrandbits(128), version=4)
+                images.append({
+                    "id": uuid.UUID(int=rng.getrandbits(128), version=4),
+                    "post_id": post_id,
+                    "image_url": f"{self.public_url}/posts/{name}.jpg",
+                    "thumbnail_url": f"{self.public_url}/thumbnails/{name}.jpg",
+                    "display_order": order,
+                    "is_primary": order == 0,
+                    "created_at": created_at,
+                })
+            pending = rng.random() < 0.03
+            self.post_ids.append(post_id)
+            yield {
+                "id": post_id,
+                "image_url": images[0]["image_url"],
+                "thumbnail_url": images[0]["thumbnail_url"],
+                "sex": _weighted(rng, SEX_WEIGHTS),
+                "size": _weighted(rng, SIZE_WEIGHTS),
+                "animal_type": animal,
+                "description": _description(rng, animal) if rng.random() < 0.9 else None,
+                "location": f"SRID=4326;POINT({lng} {lat})",
+                "location_name": _location_name(rng, localidad),
+                "sighting_date": sighting_date,
+                "created_at": created_at,
+                "is_active": rng.random() >= 0.05,
+                "pending_approval": pending,
+                "validation_service": "python_nsfw",
+                "moderation_reason": "Imagen marcada para revisión" if pending else None,
+                "contact_method": f"11{rng.randint(10000000, 99999999)}" if rng.random() < 0.4 else None,
+                "_images": images,
+            }
+
+    def alerts(self, count: int) -> Iterator[Dict]:
+        rng = self.rng
+        for _ in range(count):
+            localidad = self.sampler.sample(rng)
+            lat, lng = localidad.random_point(rng)
+            animal = _weighted(rng, ANIMAL_WEIGHTS)
+            alert_id = uuid.UUID(int=rng.getrandbits(128), version=4)
+            self.alert_ids.append(alert_id)
+            # Las alertas son más efímeras: último mes
+            created_on = self.today - timedelta(days=_recent_day(rng, min(self.days, 30)))
+            yield {
+                "id": alert_id,
+                "description": _description(rng, animal),
+                "animal_type": animal,
+                "direction": rng.choice(DIRECTIONS),
+                "location": f"SRID=4326;POINT({lng} {lat})",
+                "location_name": _location_name(rng, localidad),
+                "created_at": self._timestamp(created_on),
+                "is_active": rng.random() >= 0.1,
+            }
+
+    def reports(self, post_ratio: float = 0.02, alert_ratio: float = 0.01) -> Iterator[Dict]:
+        """Reportes sobre los posts y alertas ya generados"""
+        rng = self.rng
+        targets = [("post_id", post_id) for post_id in self.post_ids if rng.random() < post_ratio]
+        targets += [("alert_id", alert_id) for alert_id in self.alert_ids if rng.random() < alert_ratio]
+        for column, target_id in targets:
+            yield {
+                "id": uuid.UUID(int=rng.getrandbits(128), version=4),
+                "post_id": target_id if column == "post_id" else None,
+                "alert_id": target_id if column == "alert_id" else None,
+                "reason": rng.choices(["not_animal", "inappropriate", "spam", "other"], weights=[4, 2, 3, 1])[0],
+                "description": "Reporte generado para benchmarks" if rng.random() < 0.5 else None,
+                "reporter_ip": f"10.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}",
+                "created_at": self._timestamp(self.today - timedelta(days=_recent_day(rng, 30))),
+                "resolved": rng.random() < 0.5,
+            }
+
+
+def _batches(rows: Iterator[Dict], size: int = BATCH_SIZE) -> Iterator[List[Dict]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def ensure_bucket() -> None:
+    """Crea el bucket en el storage mockeado (S3 de moto) si no existe"""
+    from app.services.storage import get_storage_service
+
+    service = get_storage_service()
+    existing = {bucket["Name"] for bucket in service.s3_client.list_buckets().get("Buckets", [])}
+    if service.bucket not in existing:
+        service.s3_client.create_bucket(Bucket=service.bucket)
+        print(f"✅ Bucket {service.bucket} creado")
+
+
+def seed_database(generator: SeedGenerator, posts: int, alerts: int, reset: bool) -> Dict[str, int]:
+    """Inserta los datos generados en lotes (engine sync de la app)"""
+    from sqlalchemy import text
+
+    from app.database import engine
+    from app.models.alert import Alert
+    from app.models.post import Post
+    from app.models.post_image import PostImage
+    from app.models.report import Report
+
+    counts = {"posts": 0, "post_images": 0, "alerts": 0, "reports": 0}
+    with engine.begin() as connection:
+        if reset:
+            connection.execute(text("TRUNCATE reports, post_images, posts, alerts CASCADE"))
+
+        for batch in _batches(generator.posts(posts)):
+            images = [image for row in batch for image in row.pop("_images")]
+            connection.execute(Post.__table__.insert(), batch)
+            connection.execute(PostImage.__table__.insert(), images)
+            counts["posts"] += len(batch)
+            counts["post_images"] += len(images)
+
+        for batch in _batches(generator.alerts(alerts)):
+            connection.execute(Alert.__table__.insert(), batch)
+            counts["alerts"] += len(batch)
+
+        for batch in _batches(generator.reports()):
+            connection.execute(Report.__table__.insert(), batch)
+            counts["reports"] += len(batch)
+
+        # Estadísticas al día para que el planner use los índices como en producción
+        connection.execute(text("ANALYZE posts, post_images, alerts, reports"))
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=20000, help="Posts a crear")
+    parser.add_argument("--alerts", type=int, default=5000, help="Alertas a crear")
+    parser.add_argument("--seed", type=int, default=42, help="Semilla (misma semilla = mismos datos)")
+    parser.add_argument("--days", type=int, default=180, help="Antigüedad máxima de los avistamientos")
+    parser.add_argument("--zipf-s", type=float, default=1.0, help="Exponente Zipf de la densidad por localidad")
+    parser.add_argument("--localidades", help="Ruta a localidades.json (default: lazos-web/src/data)")
+    parser.add_argument("--reset", action="store_true", help="Vacía posts, imágenes, alertas y reportes antes")
+    parser.add_argument("--no-bucket", action="store_true", help="No crear el bucket en el storage mockeado")
+    args = parser.parse_args()
+
+    from app.config import settings
+
+    generator = SeedGenerator(
+        seed=args.seed,
+        days=args.days,
+        zipf_s=args.zipf_s,
+        public_url=settings.R2_PUBLIC_URL or "http://localhost:5000/lazos-bench",
+        localidades=load_localidades(args.localidades),
+    )
+    if not args.no_bucket:
+        ensure_bucket()
+
+    start = time.perf_counter()
+    counts = seed_database(generator, args.posts, args.alerts, args.reset)
+    elapsed = time.perf_counter() - start
+    print(f"✅ Seed listo en {elapsed:.1f}s: " + ", ".join(f"{count} {name}" for name, count in counts.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,11 @@ sys.path.append(str(Path(__file__).resolve().parents[1]))
 from app.database import Base
 # Import all models to ensure they're registered with Base.metadata
 from app.models.post import Post
+from app.models.post_image import PostImage
+from app.models.post_image_variant import PostImageVariant
+from app.models.text_validation_verdict import TextValidationVerdict
+from app.models.image_validation_verdict import ImageValidationVerdict
+from app.models.moderation_job import ModerationJob
 from app.models.user import User
 from app.models.alert import Alert
 from app.models.report import Report
@@ -0,0 +1,48 @@
+"""add post_image_variants table
+
+Revision ID: 20260105_0000
+Revises: 20251231_0000
+Create Date: 2026-01-05 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '20260105_0000'
+down_revision = '20251231_0000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Get connection and inspector to check existing schema
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    # Create post_image_variants table if it doesn't exist
+    if 'post_image_variants' not in inspector.get_table_names():
+        op.create_table(
+            'post_image_variants',
+            sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True, server_default=sa.text('gen_random_uuid()')),
+            sa.Column('post_image_id', postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column('width', sa.Integer(), nullable=False),
+            sa.Column('height', sa.Integer(), nullable=False),
+            sa.Column('format', sa.String(length=10), nullable=False),
+            sa.Column('url', sa.String(length=500), nullable=False),
+            sa.Column('size_bytes', sa.Integer(), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('NOW()')),
+            sa.ForeignKeyConstraint(['post_image_id'], ['post_images.id'], ondelete='CASCADE'),
+        )
+
+    # Create index on post_image_id if it doesn't exist
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_post_image_variants_post_image_id
+        ON post_image_variants (post_image_id);
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_post_image_variants_post_image_id', table_name='post_image_variants')
+    op.drop_table('post_image_variants')
@@ -0,0 +1,44 @@
+"""add text_validation_verdicts table
+
+Revision ID: 20260106_0000
+Revises: 20260105_0000
+Create Date: 2026-01-06 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20260106_0000'
+down_revision = '20260105_0000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Get connection and inspector to check existing schema
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    # Create text_validation_verdicts table if it doesn't exist
+    if 'text_validation_verdicts' not in inspector.get_table_names():
+        op.create_table(
+            'text_validation_verdicts',
+            sa.Column('key', sa.String(length=64), primary_key=True),
+            sa.Column('is_valid', sa.Boolean(), nullable=False),
+            sa.Column('reason', sa.String(length=500), nullable=False),
+            sa.Column('confidence', sa.Float(), nullable=False),
+            sa.Column('model', sa.String(length=100), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('NOW()')),
+        )
+
+    # Index on created_at for TTL lookups and cleanup
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_text_validation_verdicts_created_at
+        ON text_validation_verdicts (created_at);
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_text_validation_verdicts_created_at', table_name='text_validation_verdicts')
+    op.drop_table('text_validation_verdicts')
@@ -0,0 +1,56 @@
+"""add moderation_jobs table
+
+Revision ID: 20260107_0000
+Revises: 20260106_0000
+Create Date: 2026-01-07 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '20260107_0000'
+down_revision = '20260106_0000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Get connection and inspector to check existing schema
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    # Create moderation_jobs table if it doesn't exist
+    if 'moderation_jobs' not in inspector.get_table_names():
+        op.create_table(
+            'moderation_jobs',
+            sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True, server_default=sa.text('gen_random_uuid()')),
+            sa.Column('post_id', postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column('upload_keys', postgresql.ARRAY(sa.String(length=200)), nullable=False),
+            sa.Column('pending_approval', sa.Boolean(), nullable=False, server_default=sa.text('false')),
+            sa.Column('status', sa.String(length=20), nullable=False, server_default='queued'),
+            sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('last_error', sa.String(length=500), nullable=True),
+            sa.Column('run_after', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('NOW()')),
+            sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('NOW()')),
+            sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+            sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+            sa.ForeignKeyConstraint(['post_id'], ['posts.id'], ondelete='CASCADE'),
+        )
+
+    # Indexes: post lookup and the worker's claim query
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_moderation_jobs_post_id
+        ON moderation_jobs (post_id);
+    """)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_moderation_jobs_status_run_after
+        ON moderation_jobs (status, run_after);
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_moderation_jobs_status_run_after', table_name='moderation_jobs')
+    op.drop_index('ix_moderation_jobs_post_id', table_name='moderation_jobs')
+    op.drop_table('moderation_jobs')
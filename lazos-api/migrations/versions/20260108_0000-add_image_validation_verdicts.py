@@ -0,0 +1,44 @@
+"""add image_validation_verdicts table
+
+Revision ID: 20260108_0000
+Revises: 20260107_0000
+Create Date: 2026-01-08 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '20260108_0000'
+down_revision = '20260107_0000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Get connection and inspector to check existing schema
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    # Create image_validation_verdicts table if it doesn't exist
+    if 'image_validation_verdicts' not in inspector.get_table_names():
+        op.create_table(
+            'image_validation_verdicts',
+            sa.Column('sha256', sa.String(length=64), primary_key=True),
+            sa.Column('phase1', postgresql.JSONB(), nullable=False),
+            sa.Column('phase2', postgresql.JSONB(), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('NOW()')),
+            sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('NOW()')),
+        )
+
+    # Index on updated_at for TTL lookups and cleanup
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_image_validation_verdicts_updated_at
+        ON image_validation_verdicts (updated_at);
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_image_validation_verdicts_updated_at', table_name='image_validation_verdicts')
+    op.drop_table('image_validation_verdicts')
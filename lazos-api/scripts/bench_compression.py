@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark de compresión de respuestas por ruta (bytes en el cable y CPU)
+
+Arma payloads sintéticos con el mismo formato que las rutas reales (feed de
+100 posts con available_filters, mapa de 4000 puntos en json y binary, lista
+de reportes del admin) y para cada encoding que usa CompressionMiddleware
+reporta tamaño comprimido, ratio y ms de CPU por respuesta.
+
+Ejecutar: python scripts/bench_compression.py [--iterations 50]
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+# Agregar path para importar app
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import orjson
+from fastapi import Response
+
+from app.api.responses import trusted_json
+from app.config import settings
+from app.middleware.compression import _BrotliStream, _GzipStream, brotli
+from app.models.post import AnimalEnum
+from app.services.map_encoding import encode_binary
+from bench_serialization import map_points, posts_page
+
+BASE_URL = "https://pub-1a2b3c4d5e6f.r2.dev"
+
+
+def map_rows(n: int):
+    """Filas (id, lat, lon, thumbnail, tipo) como las de /map/points/unified"""
+    content = map_points(n)
+    posts = [
+        (p["id"], p["lat"], p["lon"], f"{BASE_URL}/posts/{uuid.uuid4().hex * 2}.jpg", AnimalEnum.dog)
+        for p in content["posts"]
+    ]
+    alerts = [(a["id"], a["lat"], a["lon"], AnimalEnum.cat, a["description"]) for a in content["alerts"]]
+    return content, posts, alerts
+
+
+def admin_reports(n: int) -> dict:
+    now = datetime.now(timezone.utc)
+    return {
+        "data": [
+            {
+                "id": uuid.uuid4(),
+                "post_id": uuid.uuid4(),
+                "reason": "inappropriate",
+                "description": "La foto no corresponde a un animal perdido, parece publicidad",
+                "status": "pending",
+                "created_at": now - timedelta(minutes=i),
+                "post": {"thumbnail_url": f"{BASE_URL}/posts/{uuid.uuid4().hex}.jpg", "is_active": True},
+            }
+            for i in range(n)
+        ],
+        "meta": {"page": 1, "limit": n, "total": 812},
+    }
+
+
+def payloads() -> list:
+    content, posts, alerts = map_rows(4000)
+    return [
+        ("/posts (100 items)", trusted_json(posts_page(100), Response()).body),
+        ("/map/points/unified (4000, json)", trusted_json(content, Response()).body),
+        ("/map/points/unified (4000, binary)", encode_binary(posts, alerts, BASE_URL)),
+        ("/admin/reports (100 items)", orjson.dumps(admin_reports(100), option=orjson.OPT_UTC_Z)),
+    ]
+
+
+def measure(stream_factory, body: bytes, iterations: int) -> tuple:
+    start = time.process_time()
+    for _ in range(iterations):
+        data = stream_factory().compress(body, final=True)
+    return len(data), (time.process_time() - start) / iterations * 1000
+
+
+def main(iterations: int) -> None:
+    encoders = [("gzip", lambda: _GzipStream(settings.COMPRESSION_GZIP_LEVEL))]
+    if brotli is not None:
+        encoders.append(("br", lambda: _BrotliStream(settings.COMPRESSION_BROTLI_QUALITY)))
+    else:
+        print("⚠️  brotli no instalado: solo gzip")
+
+    for name, body in payloads():
+        print(f"\n{name}: {len(body):,} bytes sin comprimir")
+        for encoding, factory in encoders:
+            size, cpu_ms = measure(factory, body, iterations)
+            print(f"  {encoding:<5} {size:>10,} bytes  ({len(body) / size:4.1f}x)  {cpu_ms:6.2f} ms CPU")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=50, help="Repeticiones por encoding")
+    args = parser.parse_args()
+    main(args.iterations)
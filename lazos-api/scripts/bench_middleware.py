@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark del overhead por request de los middlewares de headers/timing
+
+Compara en proceso (httpx.ASGITransport, sin red) la misma app con:
+- none: sin middlewares
+- base_http: SecurityHeadersMiddleware anterior (BaseHTTPMiddleware)
+- asgi: SecurityHeadersMiddleware + RequestTimingMiddleware en ASGI puro
+
+sobre /health y un /api/v1/posts que devuelve una página de 20 posts (la
+base no interviene: se mide solo el costo del stack de middlewares).
+
+Ejecutar: python scripts/bench_middleware.py [--requests 5000]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Agregar path para importar app
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import FastAPI, Response
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+from app.api.responses import trusted_json
+from app.middleware import RequestTimingMiddleware, SecurityHeadersMiddleware
+from app.middleware.security_headers import DEFAULT_SECURITY_HEADERS
+from bench_serialization import posts_page
+
+
+class BaseHTTPSecurityHeaders(BaseHTTPMiddleware):
+    """Implementación anterior de app/main.py"""
+
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+        for name, value in DEFAULT_SECURITY_HEADERS.items():
+            response.headers[name] = value
+        return response
+
+
+def build_app(stack: str) -> FastAPI:
+    app = FastAPI()
+    page = posts_page(20)
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy", "version": "1.0.0"}
+
+    @app.get("/api/v1/posts")
+    async def posts(response: Response):
+        return trusted_json(page, response)
+
+    if stack == "base_http":
+        app.add_middleware(BaseHTTPSecurityHeaders)
+    elif stack == "asgi":
+        app.add_middleware(SecurityHeadersMiddleware)
+        app.add_middleware(RequestTimingMiddleware)
+    return app
+
+
+async def run(app: FastAPI, path: str, total: int) -> float:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for _ in range(100):  # warm-up
+            await client.get(path)
+        start = time.perf_counter()
+        for _ in range(total):
+            await client.get(path)
+        return (time.perf_counter() - start) / total * 1e6
+
+
+async def main(total: int) -> None:
+    stacks = ["none", "base_http", "asgi"]
+    for path in ["/health", "/api/v1/posts"]:
+        print(f"\n{path}  ({total} requests secuenciales)")
+        results = {stack: await run(build_app(stack), path, total) for stack in stacks}
+        for stack in stacks:
+            overhead = results[stack] - results["none"]
+            print(f"  {stack:<10} {results[stack]:8.1f} µs/request  (+{overhead:6.1f} µs de middleware)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000, help="Requests por ruta y stack")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark de serialización de las respuestas de lectura calientes
+
+Compara, con los mismos datos sintéticos, el CPU por request de:
+- validated: modelos pydantic por fila + validación contra response_model +
+  jsonable + json stdlib (el camino por defecto de FastAPI)
+- trusted: dicts armados desde las filas + orjson (app.api.responses.trusted_json)
+
+para una página de 100 posts de /posts y 2000 puntos de /map/points/unified.
+
+Ejecutar: python scripts/bench_serialization.py [--iterations 200]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+# Agregar path para importar app
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.api.responses import trusted_json
+from app.api.routes.map import MapAlertPoint, MapPostPoint, UnifiedMapPointsResponse
+from app.models.post import AnimalEnum, SexEnum, SizeEnum
+from app.schemas.post import PostListResponse, PostResponse
+
+
+def posts_page(n: int) -> dict:
+    now = datetime.now(timezone.utc)
+    data = [
+        {
+            "id": uuid.uuid4(),
+            "image_url": f"https://cdn.lazos.app/posts/{uuid.uuid4()}.webp",
+            "thumbnail_url": f"https://cdn.lazos.app/posts/{uuid.uuid4()}_thumb.webp",
+            "sex": list(SexEnum)[i % 3],
+            "size": list(SizeEnum)[i % 3],
+            "animal_type": list(AnimalEnum)[i % 3],
+            "description": "Perro mediano color marrón con collar rojo, muy asustado " * 3,
+            "location_name": "Av. Corrientes 1234, Almagro, Ciudad Autónoma de Buenos Aires",
+            "latitude": -34.6 + i * 1e-4,
+            "longitude": -58.4 - i * 1e-4,
+            "sighting_date": date.today() - timedelta(days=i % 30),
+            "created_at": now - timedelta(hours=i),
+            "is_active": True,
+            "srcset": {"webp": "https://cdn.lazos.app/a_320.webp 320w, https://cdn.lazos.app/a_640.webp 640w"},
+        }
+        for i in range(n)
+    ]
+    available_filters = {
+        "provincias": [{"value": f"Provincia {i}", "count": i} for i in range(24)],
+        "animal_types": [{"value": a.value, "count": 10} for a in AnimalEnum],
+    }
+    meta = {"page": 1, "limit": n, "total": 5000, "total_pages": 50}
+    return {"data": data, "meta": meta, "available_filters": available_filters}
+
+
+def map_points(n: int) -> dict:
+    posts = [
+        {
+            "id": uuid.uuid4(),
+            "lat": -34.6 + i * 1e-4,
+            "lon": -58.4 - i * 1e-4,
+            "thumbnail_url": f"https://cdn.lazos.app/posts/{uuid.uuid4()}_thumb.webp",
+            "animal_type": "dog",
+        }
+        for i in range(n // 2)
+    ]
+    alerts = [
+        {"id": uuid.uuid4(), "lat": -31.4, "lon": -64.2, "animal_type": "cat", "description": "Gato gris " * 10}
+        for _ in range(n - n // 2)
+    ]
+    return {"posts": posts, "alerts": alerts}
+
+
+def validated_posts(content: dict) -> bytes:
+    model = PostListResponse(
+        data=[PostResponse(**post) for post in content["data"]],
+        meta=content["meta"],
+        available_filters=content["available_filters"],
+    )
+    return _fastapi_render(PostListResponse, model)
+
+
+def validated_map(content: dict) -> bytes:
+    model = UnifiedMapPointsResponse(
+        posts=[MapPostPoint(**p) for p in content["posts"]],
+        alerts=[MapAlertPoint(**a) for a in content["alerts"]],
+    )
+    return _fastapi_render(UnifiedMapPointsResponse, model)
+
+
+_fields = {}
+_loop = asyncio.new_event_loop()
+
+
+def _fastapi_render(response_model, model) -> bytes:
+    field = _fields.setdefault(response_model, create_response_field("response", response_model))
+    jsonable = _loop.run_until_complete(serialize_response(field=field, response_content=model, is_coroutine=True))
+    return JSONResponse(jsonable).body
+
+
+def trusted(content: dict) -> bytes:
+    return trusted_json(content, Response()).body
+
+
+def measure(fn, content: dict, iterations: int) -> tuple:
+    fn(content)  # warm-up
+    start = time.process_time()
+    for _ in range(iterations):
+        body = fn(content)
+    return (time.process_time() - start) / iterations * 1000, len(body)
+
+
+def main(iterations: int) -> None:
+    cases = [
+        ("/posts (100 items)", posts_page(100), validated_posts),
+        ("/map/points/unified (2000 pts)", map_points(2000), validated_map),
+    ]
+    for name, content, validated in cases:
+        before_ms, before_bytes = measure(validated, content, iterations)
+        after_ms, after_bytes = measure(trusted, content, iterations)
+        print(f"\n{name}")
+        print(f"  validated  {before_ms:7.2f} ms CPU/request  {before_bytes:>8} bytes")
+        print(f"  trusted    {after_ms:7.2f} ms CPU/request  {after_bytes:>8} bytes")
+        print(f"  → {before_ms / after_ms:.1f}x menos CPU")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200, help="Repeticiones por caso")
+    args = parser.parse_args()
+    main(args.iterations)
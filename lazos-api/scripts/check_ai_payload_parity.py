@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Script para verificar que los veredictos de Cloudflare AI no cambian al
+enviar la imagen reducida (AI_IMAGE_SIZE) en vez del archivo original.
+Requiere CLOUDFLARE_ACCOUNT_ID y CLOUDFLARE_API_TOKEN configurados.
+
+Ejecutar: python scripts/check_ai_payload_parity.py <carpeta_con_imagenes>
+"""
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+# Agregar path para importar app
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.services.http_client import close_http_client
+from app.services.image_validation_ai import get_image_validation_ai
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
+
+
+async def main(folder: Path) -> int:
+    validator = get_image_validation_ai()
+    if not validator.endpoint:
+        print("❌ Cloudflare AI no configurado")
+        return 1
+
+    paths = sorted(p for p in folder.iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+    reduced_size = settings.AI_IMAGE_SIZE
+    mismatches = 0
+
+    for path in paths:
+        image_bytes = path.read_bytes()
+        settings.AI_IMAGE_SIZE = 0
+        full = await validator.validate_image(image_bytes)
+        settings.AI_IMAGE_SIZE = reduced_size
+        reduced = await validator.validate_image(image_bytes)
+
+        if full is None or reduced is None:
+            print(f"⚠️  {path.name}: error de API, se omite")
+            continue
+        same = full["is_valid"] == reduced["is_valid"]
+        mismatches += not same
+        print(f"{'✅' if same else '❌'} {path.name}: original={full['is_valid']} reducida={reduced['is_valid']}")
+
+    await close_http_client()
+    print(f"\n{len(paths) - mismatches}/{len(paths)} veredictos iguales (AI_IMAGE_SIZE={reduced_size})")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(__doc__)
+        sys.exit(2)
+    sys.exit(asyncio.run(main(Path(sys.argv[1]))))
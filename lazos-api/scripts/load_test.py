@@ -0,0 +1,79 @@
+"""
+Load test de los endpoints de lectura (throughput concurrente)
+
+Dispara N requests con C clientes concurrentes contra uno o más servidores
+y reporta requests/s y latencias p50/p99 por endpoint. Sirve para comparar
+dos builds (p. ej. handlers sync sobre psycopg2 vs async sobre asyncpg)
+corriendo contra la misma base:
+
+    python scripts/load_test.py http://localhost:8000 http://localhost:8001 \
+        --requests 2000 --concurrency 64
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, List
+
+import httpx
+
+ENDPOINTS = [
+    "/api/v1/posts?limit=20",
+    "/api/v1/map/points/unified",
+    "/api/v1/alerts?limit=20",
+    "/api/v1/search?q=perro",
+]
+
+
+async def run_endpoint(client: httpx.AsyncClient, path: str, total: int, concurrency: int) -> Dict:
+    latencies: List[float] = []
+    errors = 0
+    remaining = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            try:
+                response = await client.get(path)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "errors": errors,
+    }
+
+
+async def main(base_urls: List[str], total: int, concurrency: int) -> None:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    for base_url in base_urls:
+        print(f"\n{base_url}  ({total} requests, concurrencia {concurrency})")
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+            for path in ENDPOINTS:
+                await client.get(path)  # warm-up (pool de conexiones, caches)
+                result = await run_endpoint(client, path, total, concurrency)
+                print(
+                    f"  {path:<32} {result['rps']:8.1f} req/s  "
+                    f"p50 {result['p50_ms']:7.1f}ms  p99 {result['p99_ms']:7.1f}ms  "
+                    f"errores {result['errors']}"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base_urls", nargs="+", help="URL base de cada servidor a comparar")
+    parser.add_argument("--requests", type=int, default=1000, help="Requests por endpoint")
+    parser.add_argument("--concurrency", type=int, default=32, help="Clientes concurrentes")
+    args = parser.parse_args()
+    asyncio.run(main(args.base_urls, args.requests, args.concurrency))
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Script para configurar la regla de lifecycle del bucket R2 que borra las
+subidas directas huérfanas (uploads/ con más de UPLOAD_ORPHAN_DAYS días).
+
+POST /uploads entrega URLs firmadas sin autenticación: las imágenes que se
+suben y nunca se usan en un post (o cuyo procesamiento falló) quedan en
+uploads/ hasta que esta regla las borra. Correr una vez por bucket (requiere
+un token de R2 con permiso de administrar el bucket).
+
+Ejecutar: python scripts/setup_r2_lifecycle.py [--days N]
+"""
+import argparse
+import os
+import sys
+
+# Agregar path para importar app
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.services.storage import get_storage_service, UPLOAD_PREFIX
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=settings.UPLOAD_ORPHAN_DAYS, help="Días antes de borrar")
+    args = parser.parse_args()
+
+    storage_service = get_storage_service()
+    storage_service.ensure_upload_lifecycle(args.days)
+    print(f"✅ Lifecycle configurado en {storage_service.bucket}: {UPLOAD_PREFIX} se borra a los {args.days} día(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,33 @@
+"""
+Shared test fixtures
+"""
+import pytest
+
+from app.config import settings
+from app.services import storage
+from app.utils import circuit_breaker
+
+
+@pytest.fixture(autouse=True)
+def fresh_circuit_breakers(monkeypatch):
+    """Each test starts with closed breakers (they are process-wide singletons)"""
+    monkeypatch.setattr(circuit_breaker, "_breakers", {})
+
+
+@pytest.fixture
+def s3_storage(monkeypatch):
+    """StorageService backed by a mocked S3 bucket (moto)"""
+    moto = pytest.importorskip("moto")
+
+    monkeypatch.setattr(settings, "R2_ENDPOINT", "")
+    monkeypatch.setattr(settings, "R2_ACCESS_KEY", "testing")
+    monkeypatch.setattr(settings, "R2_SECRET_KEY", "testing")
+    monkeypatch.setattr(settings, "R2_PUBLIC_URL", "https://cdn.test")
+    monkeypatch.setattr(storage, "_storage_service", None)
+
+    with moto.mock_aws():
+        service = storage.get_storage_service()
+        service.s3_client.create_bucket(Bucket=service.bucket)
+        yield service
+
+    monkeypatch.setattr(storage, "_storage_service", None)
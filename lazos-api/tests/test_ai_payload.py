@@ -0,0 +1,109 @@
+"""
+Tests for the downscaled Cloudflare AI payload (parity with full-size uploads)
+"""
+import base64
+import json
+import random
+from io import BytesIO
+
+import httpx
+import pytest
+from PIL import Image, ImageDraw
+
+from app.config import settings
+from app.services import http_client
+from app.services.http_client import init_http_client
+from app.services.image import ImageService
+from app.services.image_validation_ai import ImageValidationAI
+from app.services.nsfw_detector import NSFWDetector
+
+
+def noisy_photo(size, base_color, seed) -> Image.Image:
+    """Photo-like image: base color, noise and a few shapes (hard to compress)"""
+    rng = random.Random(seed)
+    img = Image.effect_noise(size, 40).convert("RGB")
+    img = Image.blend(Image.new("RGB", size, base_color), img, 0.25)
+    draw = ImageDraw.Draw(img)
+    for _ in range(20):
+        x, y = rng.randrange(size[0]), rng.randrange(size[1])
+        color = tuple(rng.randrange(256) for _ in range(3))
+        draw.ellipse((x, y, x + size[0] // 8, y + size[1] // 8), fill=color)
+    return img
+
+
+def encode(img: Image.Image, fmt: str = "JPEG") -> bytes:
+    buffer = BytesIO()
+    img.save(buffer, format=fmt, quality=95)
+    return buffer.getvalue()
+
+
+# Fixture set: skin-dominant, animal-like and mixed images in several sizes/formats
+FIXTURES = [
+    encode(noisy_photo((3000, 2000), (224, 172, 150), 1)),
+    encode(noisy_photo((2000, 3000), (205, 150, 120), 2)),
+    encode(noisy_photo((3000, 2000), (110, 80, 50), 3)),
+    encode(noisy_photo((1600, 1200), (240, 240, 235), 4)),
+    encode(noisy_photo((1200, 1200), (160, 120, 100), 5), "PNG"),
+    encode(noisy_photo((300, 200), (224, 172, 150), 6)),
+]
+
+
+def fake_resnet(request: httpx.Request) -> httpx.Response:
+    """
+    ResNet-50 stand-in: applies the model preprocessing (shorter side 256,
+    center crop 224) and labels by proportion of skin-tone pixels.
+    """
+    image_bytes = base64.b64decode(json.loads(request.content)["image"])
+    img = ImageService._load_rgb(image_bytes)
+    scale = 256 / min(img.size)
+    img = img.resize((round(img.width * scale), round(img.height * scale)), Image.Resampling.BILINEAR)
+    left, top = (img.width - 224) // 2, (img.height - 224) // 2
+    img = img.crop((left, top, left + 224, top + 224))
+
+    pixels = list(img.resize((56, 56)).getdata())
+    skin = sum(NSFWDetector._is_skin_tone(*p) for p in pixels) / len(pixels)
+    label = "bikini" if skin > 0.4 else "golden retriever"
+    return httpx.Response(200, json={"result": [{"label": label, "score": round(0.5 + skin / 2, 2)}]})
+
+
+@pytest.fixture
+def resnet_requests():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return fake_resnet(request)
+
+    init_http_client(transport=httpx.MockTransport(handler))
+    yield requests
+    http_client._client = None
+
+
+def test_model_input_dimensions():
+    """Test that the model payload is a small JPEG with shorter side 256"""
+    payload = ImageService.model_input(FIXTURES[0], short_side=256)
+    img = Image.open(BytesIO(payload))
+
+    assert img.format == "JPEG"
+    assert min(img.size) == 256
+    assert ImageService.model_input(FIXTURES[5], short_side=256) != FIXTURES[5]
+    assert min(Image.open(BytesIO(ImageService.model_input(FIXTURES[5], short_side=256))).size) == 200
+
+
+@pytest.mark.asyncio
+async def test_downscaled_payload_keeps_verdicts(resnet_requests, monkeypatch):
+    """Test verdict parity between full uploads and the downscaled payload"""
+    validator = ImageValidationAI("acc", "token")
+
+    monkeypatch.setattr(settings, "AI_IMAGE_SIZE", 0)
+    full = [await validator.validate_image(image) for image in FIXTURES]
+    full_bytes = sum(len(r.content) for r in resnet_requests)
+
+    resnet_requests.clear()
+    monkeypatch.setattr(settings, "AI_IMAGE_SIZE", 256)
+    small = [await validator.validate_image(image) for image in FIXTURES]
+    small_bytes = sum(len(r.content) for r in resnet_requests)
+
+    assert [r["is_valid"] for r in full] == [r["is_valid"] for r in small]
+    assert {r["is_valid"] for r in full} == {True, False}
+    assert full_bytes / small_bytes > 50
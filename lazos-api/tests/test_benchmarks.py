@@ -0,0 +1,92 @@
+"""
+Tests for the benchmark suite (seed generator, scenarios and runner), no database needed
+"""
+import random
+from collections import Counter
+from datetime import date
+
+import httpx
+import pytest
+
+from benchmarks.geo import ZipfSampler, load_localidades
+from benchmarks.run import percentile, run_scenario
+from benchmarks.scenarios import SCENARIOS, MapPanScenario
+from benchmarks.seed import SeedGenerator
+
+
+@pytest.fixture(scope="module")
+def localidades():
+    return load_localidades()
+
+
+def test_seed_is_reproducible_and_zipfian(localidades):
+    """Test that the same seed gives the same rows and density follows the ranking"""
+    first = list(SeedGenerator(seed=7, localidades=localidades, today=date(2026, 1, 1)).posts(3000))
+    second = list(SeedGenerator(seed=7, localidades=localidades, today=date(2026, 1, 1)).posts(3000))
+    assert first == second
+
+    by_localidad = Counter(row["location_name"].split(", ", 1)[1] for row in first)
+    top = f"{localidades[0].nombre}, {localidades[0].provincia}"
+    assert by_localidad.most_common(1)[0][0] == top
+    assert by_localidad[top] > 10 * by_localidad[f"{localidades[-1].nombre}, {localidades[-1].provincia}"]
+
+
+def test_seed_rows_match_the_schema_and_filters(localidades):
+    """Test images, Argentine coordinates, location_name format and reports targets"""
+    generator = SeedGenerator(seed=3, localidades=localidades, today=date(2026, 1, 1))
+    posts = list(generator.posts(500))
+    alerts = list(generator.alerts(200))
+    reports = list(generator.reports(post_ratio=0.5, alert_ratio=0.5))
+
+    for row in posts + alerts:
+        lng, lat = map(float, row["location"].removeprefix("SRID=4326;POINT(").rstrip(")").split())
+        assert -56 < lat < -21 and -74 < lng < -53
+        # list_posts filtra provincia con LIKE '%, {provincia}'
+        assert row["location_name"].count(", ") == 2
+    assert all(1 <= len(row["_images"]) <= 3 and row["_images"][0]["is_primary"] for row in posts)
+    assert all((report["post_id"] is None) != (report["alert_id"] is None) for report in reports)
+    assert {report["post_id"] for report in reports if report["post_id"]} <= {row["id"] for row in posts}
+
+
+def test_zipf_sampler_weights():
+    """Test that rank r is picked ~1/r as often as rank 1"""
+    rng = random.Random(1)
+    sampler = ZipfSampler(["a", "b", "c", "d"], s=1.0)
+    counts = Counter(sampler.sample(rng) for _ in range(20000))
+    assert counts["a"] / counts["b"] == pytest.approx(2, rel=0.1)
+    assert counts["a"] / counts["d"] == pytest.approx(4, rel=0.15)
+
+
+def test_map_pan_sessions_send_valid_bounds(localidades):
+    """Test that panning/zooming keeps sw < ne and valid coordinates"""
+    requests = MapPanScenario(localidades).requests(random.Random(5))
+    for _ in range(200):
+        params = next(requests).params
+        assert params["sw_lat"] < params["ne_lat"] and params["sw_lng"] < params["ne_lng"]
+        assert -90 <= params["sw_lat"] and params["ne_lat"] <= 90
+
+
+def test_percentile_nearest_rank():
+    values = [i / 100 for i in range(1, 101)]
+    assert percentile(values, 50) == 0.5
+    assert percentile(values, 99) == 0.99
+    assert percentile([], 95) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_runner_reports_latencies_and_errors(localidades):
+    """Test a scenario run against a mock server (1 of every 10 requests fails)"""
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        return httpx.Response(500 if len(calls) % 10 == 0 else 200, json={"data": []})
+
+    scenario = SCENARIOS["feed"](localidades)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://bench") as client:
+        result = await run_scenario(client, scenario, total=100, duration=None, concurrency=8, seed=1, warmup=2)
+
+    assert result["requests"] == 100
+    assert result["errors"] == 10
+    assert result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"] <= result["max_ms"]
+    assert set(calls) <= {"/api/v1/posts", "/api/v1/alerts"}
@@ -0,0 +1,143 @@
+"""
+Tests for the circuit breaker around Cloudflare AI
+"""
+from io import BytesIO
+
+import httpx
+import pytest
+from PIL import Image
+
+from app.services import http_client
+from app.services.http_client import init_http_client, timed_post
+from app.services.text_validation_ai import TextValidationAI
+from app.services.image_validation_ai import ImageValidationAI
+from app.utils import circuit_breaker
+from app.utils.circuit_breaker import CircuitBreaker, CircuitOpenError, CLOSED, OPEN, HALF_OPEN
+
+
+def make_jpeg() -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", (64, 48), (120, 90, 60)).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+AMBIGUOUS_TEXT = "Lo vi ayer a la tarde cerca del club"
+
+
+@pytest.fixture
+def failing_cloudflare():
+    """Shared client whose Cloudflare AI always answers 503"""
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503)
+
+    init_http_client(transport=httpx.MockTransport(handler))
+    yield calls
+    http_client._client = None
+
+
+def test_breaker_opens_after_consecutive_failures():
+    """Test closed -> open after the failure threshold"""
+    breaker = CircuitBreaker("test", failure_threshold=3)
+
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success(0.1)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.allow_request() is False
+
+
+def test_breaker_half_open_probe():
+    """Test that a single probe is allowed after the cooldown"""
+    breaker = CircuitBreaker("test", failure_threshold=1, open_seconds=0)
+    breaker.record_failure()
+
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request() is True
+    assert breaker.allow_request() is False
+
+    breaker.record_success(0.1)
+    assert breaker.state == CLOSED
+
+
+def test_slow_calls_count_as_failures():
+    """Test that calls above the latency SLO trip the breaker"""
+    breaker = CircuitBreaker("test", failure_threshold=2, slow_call_seconds=1.0)
+
+    breaker.record_success(2.0)
+    breaker.record_success(3.0)
+
+    assert breaker.state == OPEN
+
+
+def test_adaptive_timeout_follows_p99():
+    """Test that the timeout tracks p99 latency within bounds"""
+    breaker = CircuitBreaker("test", min_timeout=1.0, timeout_multiplier=2.0)
+    assert breaker.timeout(15.0) == 15.0
+
+    for _ in range(100):
+        breaker.record_success(0.8)
+    assert breaker.timeout(15.0) == pytest.approx(1.6)
+
+    breaker.record_success(0.1)
+    assert breaker.timeout(1.2) == 1.2
+
+
+def test_latency_windows_are_separate_and_include_timeouts():
+    """Test that each model has its own p99 and timed-out calls feed it"""
+    breaker = CircuitBreaker("test", failure_threshold=100, min_timeout=0.5, timeout_multiplier=1.5)
+    for _ in range(100):
+        breaker.record_success(4.0, window="cloudflare_text")
+        breaker.record_success(0.4, window="cloudflare_image")
+    assert breaker.timeout(10.0, window="cloudflare_text") == pytest.approx(6.0)
+    assert breaker.timeout(10.0, window="cloudflare_image") == pytest.approx(0.6)
+
+    # El servicio de imágenes se vuelve más lento: los timeouts suben el p99
+    for _ in range(3):
+        breaker.record_failure(latency=breaker.timeout(10.0, window="cloudflare_image"), window="cloudflare_image")
+    assert breaker.timeout(10.0, window="cloudflare_image") > 0.6
+    assert breaker.timeout(10.0, window="cloudflare_text") == pytest.approx(6.0)
+
+
+def test_half_open_probe_waits_for_the_latency_slo():
+    """Test that the probe is not cut by the adaptive timeout that opened the breaker"""
+    breaker = CircuitBreaker("test", failure_threshold=1, open_seconds=0, slow_call_seconds=5.0, min_timeout=0.5)
+    for _ in range(100):
+        breaker.record_success(0.5)
+    assert breaker.timeout(15.0) == pytest.approx(0.75)
+
+    breaker.record_failure(latency=0.75)
+    assert breaker.allow_request() is True
+    assert breaker.timeout(15.0) == 5.0
+
+    breaker.record_success(2.0)
+    assert breaker.state == CLOSED
+
+
+@pytest.mark.asyncio
+async def test_validators_short_circuit_when_open(failing_cloudflare):
+    """Test that both validators use their fallbacks once the breaker opens"""
+    text_validator = TextValidationAI("acc", "token")
+    image_validator = ImageValidationAI("acc", "token")
+
+    for _ in range(5):
+        await text_validator.validate_sighting_text(AMBIGUOUS_TEXT)
+    calls_when_open = len(failing_cloudflare)
+
+    text_result = await text_validator.validate_sighting_text(AMBIGUOUS_TEXT)
+    image_result = await image_validator.validate_image(make_jpeg())
+
+    assert len(failing_cloudflare) == calls_when_open == 5
+    assert text_result == {"is_valid": True, "reason": "AI degradada", "confidence": 0.0}
+    assert image_result is None
+    assert circuit_breaker.snapshot()["cloudflare_ai"]["state"] == OPEN
+
+    with pytest.raises(CircuitOpenError):
+        await timed_post("test", "https://example.com", breaker=circuit_breaker.get_breaker("cloudflare_ai"))
@@ -0,0 +1,104 @@
+"""
+Tests for the br/gzip compression middleware
+"""
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.middleware import CompressionMiddleware
+from app.middleware.compression import negotiate
+
+brotli = pytest.importorskip("brotli")
+
+BIG = {"data": [{"id": i, "description": "Perro mediano marrón con collar rojo"} for i in range(200)]}
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+    @app.get("/big")
+    async def big():
+        return BIG
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/image")
+    async def image():
+        return Response(b"\xff\xd8" + b"\x00" * 5000, media_type="image/jpeg")
+
+    @app.get("/pregzipped")
+    async def pregzipped():
+        body = gzip.compress(b"x" * 5000)
+        return Response(body, media_type="application/json", headers={"Content-Encoding": "gzip"})
+
+    @app.get("/etag")
+    async def etag():
+        return PlainTextResponse("lazos " * 500, headers={"ETag": '"abc"'})
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for i in range(5):
+                yield f"linea {i} ".encode() * 200
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    return TestClient(app)
+
+
+def test_negotiate_prefers_br_and_honours_q_values():
+    """Test Accept-Encoding negotiation"""
+    assert negotiate("gzip, deflate, br", ("br", "gzip")) == "br"
+    assert negotiate("br;q=0.5, gzip", ("br", "gzip")) == "gzip"
+    assert negotiate("br;q=0, *", ("br", "gzip")) == "gzip"
+    assert negotiate("identity", ("br", "gzip")) is None
+    assert negotiate("", ("br", "gzip")) is None
+
+
+def test_large_json_is_compressed_with_the_negotiated_encoding(client):
+    """Test br and gzip responses decode to the original body"""
+    response = client.get("/big", headers={"Accept-Encoding": "br, gzip"})
+    assert response.headers["content-encoding"] == "br"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.json() == BIG
+
+    response = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert int(response.headers["content-length"]) < len(response.content)
+    assert response.json() == BIG
+
+
+def test_small_images_and_already_encoded_responses_are_skipped(client):
+    """Test threshold, non-compressible types and pre-encoded bodies"""
+    small = client.get("/small", headers={"Accept-Encoding": "br"})
+    assert "content-encoding" not in small.headers
+    assert small.headers["vary"] == "Accept-Encoding"
+
+    image = client.get("/image", headers={"Accept-Encoding": "br"})
+    assert "content-encoding" not in image.headers
+    assert "vary" not in image.headers
+
+    pregzipped = client.get("/pregzipped", headers={"Accept-Encoding": "br"})
+    assert pregzipped.headers["content-encoding"] == "gzip"
+    assert pregzipped.content == b"x" * 5000
+
+
+def test_compressed_responses_get_weak_etags(client):
+    """Test that a strong ETag becomes weak once the bytes depend on the encoding"""
+    assert client.get("/etag", headers={"Accept-Encoding": "gzip"}).headers["etag"] == 'W/"abc"'
+    assert client.get("/etag", headers={"Accept-Encoding": "identity"}).headers["etag"] == '"abc"'
+
+
+def test_streaming_responses_are_compressed_chunk_by_chunk(client):
+    """Test that streamed bodies are compressed without content-length"""
+    response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.text == "".join(f"linea {i} " * 200 for i in range(5))
@@ -0,0 +1,72 @@
+"""
+Tests for the instrumented connection pool and Postgres session settings
+"""
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.utils.db_pool import (
+    TimedQueuePool,
+    session_timeouts,
+    connect_args_psycopg2,
+    connect_args_asyncpg,
+    db_pool_checkout_seconds,
+    db_pool_saturation,
+    db_pool_timeouts_total,
+)
+
+
+@pytest.fixture
+def sqlite_engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=TimedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    engine.pool.metrics_label = "test"
+    yield engine
+    engine.dispose()
+
+
+def test_pool_records_checkout_and_saturation(sqlite_engine):
+    """Test that checkouts are timed and saturation follows connections in use"""
+    checkouts_before = db_pool_checkout_seconds.count(pool="test")
+
+    with sqlite_engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        assert db_pool_saturation.value(pool="test") == 1.0
+
+    assert db_pool_saturation.value(pool="test") == 0.0
+    assert db_pool_checkout_seconds.count(pool="test") == checkouts_before + 1
+
+
+def test_pool_counts_checkout_timeouts(sqlite_engine):
+    """Test that an exhausted pool counts the timeout and keeps its label after dispose"""
+    timeouts_before = db_pool_timeouts_total.value(pool="test")
+
+    with sqlite_engine.connect():
+        with pytest.raises(PoolTimeoutError):
+            sqlite_engine.connect()
+
+    assert db_pool_timeouts_total.value(pool="test") == timeouts_before + 1
+
+    sqlite_engine.dispose()
+    assert sqlite_engine.pool.metrics_label == "test"
+
+
+def test_connect_args_move_timeouts_out_of_startup_for_pgbouncer():
+    """Test that PgBouncer mode drops startup parameters and prepared statement caches"""
+    timeouts = session_timeouts(15000, 60000)
+
+    assert connect_args_psycopg2(timeouts, pgbouncer=False) == {
+        "options": "-c statement_timeout=15000 -c idle_in_transaction_session_timeout=60000"
+    }
+    assert connect_args_asyncpg(timeouts, pgbouncer=False) == {"server_settings": timeouts}
+
+    assert connect_args_psycopg2(timeouts, pgbouncer=True) == {}
+    pgbouncer_args = connect_args_asyncpg(timeouts, pgbouncer=True)
+    assert pgbouncer_args["statement_cache_size"] == 0
+    assert pgbouncer_args["prepared_statement_cache_size"] == 0
+    assert pgbouncer_args["prepared_statement_name_func"]() != pgbouncer_args["prepared_statement_name_func"]()
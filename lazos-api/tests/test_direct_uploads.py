@@ -0,0 +1,316 @@
+"""
+Tests for direct-to-storage (presigned) uploads against a local S3 stand-in (moto)
+"""
+import threading
+import uuid
+from datetime import date, datetime
+from io import BytesIO
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from PIL import Image
+from fastapi.testclient import TestClient
+
+pytest.importorskip("moto")
+
+from app.api.deps import get_async_db, get_read_db
+from app.api.routes.posts import create_pending_post
+from app.config import settings
+from app.main import app
+from app.models.post import AnimalEnum, SexEnum, SizeEnum
+from app.services import post_pipeline
+from app.services.image import ImageService
+from app.services.post_pipeline import PROCESSING_SERVICE, _download_uploads
+from app.services.storage import UPLOAD_LIFECYCLE_RULE_ID, UPLOAD_PREFIX
+
+client = TestClient(app)
+
+
+def make_jpeg() -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", (32, 32), (200, 100, 50)).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+def test_create_uploads_returns_presigned_urls(s3_storage):
+    """Test that POST /uploads returns one presigned PUT per file"""
+    response = client.post("/api/v1/uploads", json={
+        "files": [{"content_type": "image/jpeg", "size": 250_000}, {"content_type": "image/webp", "size": 90_000}]
+    })
+    assert response.status_code == 201
+    uploads = response.json()["uploads"]
+    assert len(uploads) == 2
+    assert uploads[0]["key"].startswith("uploads/") and uploads[0]["key"].endswith(".jpg")
+    assert uploads[1]["key"].endswith(".webp")
+    assert uploads[0]["method"] == "PUT"
+    assert uploads[0]["headers"] == {"Content-Type": "image/jpeg", "Cache-Control": "private, no-store"}
+    assert "X-Amz-Signature" in uploads[0]["upload_url"]
+    # El tamaño declarado va firmado: un PUT con otro Content-Length no pasa
+    signed_headers = parse_qs(urlparse(uploads[0]["upload_url"]).query)["X-Amz-SignedHeaders"][0]
+    assert {"content-length", "cache-control"} <= set(signed_headers.split(";"))
+
+
+def test_create_uploads_rejects_oversized_files(s3_storage):
+    """Test that declared sizes above UPLOAD_MAX_FILE_MB never get a URL"""
+    too_big = settings.UPLOAD_MAX_FILE_MB * 1024 * 1024 + 1
+    response = client.post("/api/v1/uploads", json={"files": [{"content_type": "image/jpeg", "size": too_big}]})
+    assert response.status_code == 413
+    assert client.post("/api/v1/uploads", json={"files": [{"content_type": "image/jpeg"}]}).status_code == 422
+
+
+def test_create_uploads_rejects_unsupported_type(s3_storage):
+    """Test that only image content types can be requested"""
+    response = client.post("/api/v1/uploads", json={"files": [{"content_type": "application/pdf", "size": 1000}]})
+    assert response.status_code == 422
+
+
+def test_uploaded_object_roundtrip(s3_storage):
+    """Test HEAD/GET helpers used by the finalize step"""
+    data = make_jpeg()
+    ticket = s3_storage.create_presigned_upload("image/jpeg", len(data))
+    s3_storage.s3_client.put_object(Bucket=s3_storage.bucket, Key=ticket["key"], Body=data)
+
+    assert s3_storage.get_object_size(ticket["key"]) == len(data)
+    assert s3_storage.get_object_size("uploads/missing.jpg") is None
+    assert _download_uploads([ticket["key"]]) == [data]
+
+    with pytest.raises(ValueError):
+        s3_storage.download_object(ticket["key"], max_bytes=10)
+
+
+def test_download_uploads_rejects_non_images(s3_storage):
+    """Test that the finalize step rejects uploads that are not images"""
+    ticket = s3_storage.create_presigned_upload("image/png", 19)
+    s3_storage.s3_client.put_object(Bucket=s3_storage.bucket, Key=ticket["key"], Body=b"not an image at all")
+
+    with pytest.raises(ValueError):
+        _download_uploads([ticket["key"]])
+
+
+def test_upload_lifecycle_rule_expires_orphans_and_keeps_other_rules(s3_storage):
+    """Test the lifecycle rule that cleans up uploads/ never used in a post"""
+    s3_storage.s3_client.put_bucket_lifecycle_configuration(Bucket=s3_storage.bucket, LifecycleConfiguration={
+        "Rules": [{"ID": "other", "Filter": {"Prefix": "tmp/"}, "Status": "Enabled", "Expiration": {"Days": 7}}],
+    })
+
+    s3_storage.ensure_upload_lifecycle(1)
+    s3_storage.ensure_upload_lifecycle(2)  # idempotente: reemplaza la regla propia
+
+    rules = {
+        rule["ID"]: rule
+        for rule in s3_storage.s3_client.get_bucket_lifecycle_configuration(Bucket=s3_storage.bucket)["Rules"]
+    }
+    assert set(rules) == {"other", UPLOAD_LIFECYCLE_RULE_ID}
+    assert rules[UPLOAD_LIFECYCLE_RULE_ID]["Filter"] == {"Prefix": UPLOAD_PREFIX}
+    assert rules[UPLOAD_LIFECYCLE_RULE_ID]["Expiration"] == {"Days": 2}
+    assert rules[UPLOAD_LIFECYCLE_RULE_ID]["Status"] == "Enabled"
+
+
+class FakeQuery:
+    def __init__(self, session, model):
+        self.session, self.model = session, model
+
+    def filter(self, *args):
+        return self
+
+    def with_for_update(self):
+        return self
+
+    def first(self):
+        self.session.touch()
+        return self.session.post
+
+    def delete(self):
+        self.session.touch()
+
+    def update(self, values, synchronize_session=None):
+        self.session.touch()
+
+
+class FakeSession:
+    """Sesión sync mínima que anota en qué thread se usa"""
+
+    threads = set()
+
+    def __init__(self, post):
+        self.post = post
+
+    def touch(self):
+        FakeSession.threads.add(threading.get_ident())
+
+    def query(self, model):
+        return FakeQuery(self, model)
+
+    def add(self, obj):
+        self.touch()
+
+    def flush(self):
+        self.touch()
+
+    def commit(self):
+        self.touch()
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_finalize_keeps_db_and_pillow_off_the_event_loop(s3_storage, monkeypatch):
+    """Test that the queue's finalize step does no blocking DB or image work on the loop thread"""
+    data = make_jpeg()
+    ticket = s3_storage.create_presigned_upload("image/jpeg", len(data))
+    s3_storage.s3_client.put_object(Bucket=s3_storage.bucket, Key=ticket["key"], Body=data)
+
+    post = SimpleNamespace(description="Perro negro con collar rojo", pending_approval=True)
+    FakeSession.threads = set()
+    monkeypatch.setattr(post_pipeline, "SessionLocal", lambda: FakeSession(post))
+
+    async def approve(raw_images_bytes, description):
+        return {"flagged": False, "service": None, "reason": None}
+
+    monkeypatch.setattr(post_pipeline, "moderate_content", approve)
+    pillow_threads = set()
+    process_upload = ImageService.process_upload
+
+    def tracked_process_upload(image_bytes):
+        pillow_threads.add(threading.get_ident())
+        return process_upload(image_bytes)
+
+    monkeypatch.setattr(ImageService, "process_upload", staticmethod(tracked_process_upload))
+
+    assert await post_pipeline.finalize_direct_upload(uuid.uuid4(), [ticket["key"]]) is True
+
+    loop_thread = threading.get_ident()
+    assert FakeSession.threads and loop_thread not in FakeSession.threads
+    assert pillow_threads and loop_thread not in pillow_threads
+    assert post.pending_approval is False
+    assert post.image_url.startswith("https://cdn.test/")
+    assert s3_storage.get_object_size(ticket["key"]) is None
+
+
+class FakeAsyncSession:
+    """AsyncSession mínima para create_pending_post: registra lo que se guarda"""
+
+    def __init__(self):
+        self.added, self.sync_calls = [], []
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    async def flush(self):
+        self.added[-1].id = uuid.uuid4()
+
+    async def run_sync(self, fn, *args):
+        self.sync_calls.append(fn.__name__)
+
+    async def commit(self):
+        pass
+
+    async def refresh(self, obj):
+        obj.created_at, obj.is_active = datetime.utcnow(), True
+
+    async def scalar(self, statement):
+        return "POINT(-58.38 -34.6)"
+
+
+class PendingPostDB:
+    """
+    Base con un solo post, pendiente de moderación: las queries sobre posts
+    lo devuelven salvo que filtren por pending_approval = false
+    """
+
+    def __init__(self, post):
+        self.post = post
+
+    async def execute(self, statement):
+        froms = [table.name for table in statement.get_final_froms()]
+        hidden = "posts.pending_approval = false" in str(statement.whereclause)
+        return PendingPostResult([self.post] if froms == ["posts"] and not hidden else [])
+
+
+class PendingPostResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+    def scalar_one_or_none(self):
+        return self.rows[0] if self.rows else None
+
+
+@pytest.mark.asyncio
+async def test_pending_direct_upload_post_stores_no_raw_urls(monkeypatch):
+    """Test that a post waiting for moderation never points at its raw uploads/ objects"""
+    monkeypatch.setattr("app.api.routes.posts.notify_workers", lambda: None)
+    session = FakeAsyncSession()
+
+    response = await create_pending_post(
+        session, [f"{UPLOAD_PREFIX}{uuid.uuid4()}.jpg"], False, "POINT(-58.38 -34.6)",
+        size=SizeEnum.medium, animal_type=AnimalEnum.dog, sex=SexEnum.unknown,
+        sighting_date=date.today(), description=None, location_name=None, contact_method=None,
+    )
+
+    post = session.added[0]
+    assert post.pending_approval is True
+    assert post.image_url == post.thumbnail_url == response.image_url == ""
+    assert session.sync_calls == ["enqueue_moderation"]
+
+
+def test_pending_direct_upload_post_is_not_public():
+    """Test that map, search and detail hide posts still pending moderation"""
+    post_id = uuid.uuid4()
+    post = SimpleNamespace(id=post_id, thumbnail_url=f"https://cdn.test/{UPLOAD_PREFIX}raw.jpg", pending_approval=True)
+    db = PendingPostDB(post)
+
+    async def fake_db():
+        yield db
+
+    app.dependency_overrides[get_read_db] = fake_db
+    try:
+        map_points = client.get("/api/v1/map/points")
+        unified = client.get("/api/v1/map/points/unified")
+        search = client.get("/api/v1/search", params={"q": "perro"})
+        detail = client.get(f"/api/v1/posts/{post_id}")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert map_points.status_code == 200 and map_points.json()["data"] == []
+    assert unified.status_code == 200 and unified.json()["posts"] == []
+    assert search.status_code == 200 and search.json()["posts"] == []
+    assert detail.status_code == 404
+
+
+def test_admin_cannot_approve_a_post_still_in_the_queue(monkeypatch):
+    """Test that posts whose uploads are still processing are hidden from and locked for moderators"""
+    monkeypatch.setattr(settings, "ADMIN_PASSWORD", "secret")
+    post = SimpleNamespace(pending_approval=True, validation_service=PROCESSING_SERVICE)
+    statements = []
+
+    class LockingSession:
+        async def execute(self, statement):
+            statements.append(statement)
+            hidden = "validation_service IS DISTINCT FROM" in str(statement.whereclause)
+            return PendingPostResult([] if hidden else [post])
+
+    async def fake_db():
+        yield LockingSession()
+
+    app.dependency_overrides[get_async_db] = fake_db
+    try:
+        pending = client.get("/api/v1/admin/pending", headers={"X-Admin-Password": "secret"})
+        response = client.post(f"/api/v1/admin/pending/{uuid.uuid4()}/approve", headers={"X-Admin-Password": "secret"})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert pending.status_code == 200 and pending.json()["data"] == []
+    assert response.status_code == 409
+    assert post.pending_approval is True
+    assert statements[1]._for_update_arg is not None
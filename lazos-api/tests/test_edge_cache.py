@@ -0,0 +1,194 @@
+"""
+Tests for CDN cache policies (Cache-Control / surrogate keys) and edge purges
+"""
+import asyncio
+import time
+import uuid
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException, Depends
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_async_db
+from app.db_router import READ_YOUR_WRITES_HEADER
+from app.main import app as lazos_app
+from app.middleware import ResponseCacheMiddleware
+from app.services import edge_cache, http_client, response_cache
+from app.services.edge_cache import (
+    CloudflarePurgeHook,
+    RecordingPurgeHook,
+    cache_policy,
+    detail_cache_control,
+    feed_cache_control,
+    drain_purges,
+    post_keys,
+    purge_surrogate_keys,
+    schedule_purge,
+)
+from app.services.http_client import init_http_client
+from app.services.response_cache import MemoryResponseCache, POSTS
+
+
+@pytest.fixture
+def recording_purge(monkeypatch):
+    hook = RecordingPurgeHook()
+    monkeypatch.setattr(edge_cache, "_purge_hook", hook)
+    return hook
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(response_cache, "_response_cache", MemoryResponseCache(max_size=100, ttl_seconds=60))
+    app = FastAPI()
+    app.add_middleware(ResponseCacheMiddleware, routes={"/posts": (POSTS,)})
+
+    @app.get("/posts", dependencies=[Depends(cache_policy(feed_cache_control, "posts"))])
+    async def list_posts():
+        return {"data": []}
+
+    @app.get("/posts/{post_id}", dependencies=[Depends(cache_policy(detail_cache_control, "post:{post_id}"))])
+    async def get_post(post_id: str):
+        if post_id == "missing":
+            raise HTTPException(status_code=404, detail="Post not found")
+        return {"id": post_id}
+
+    with TestClient(app) as client:
+        yield client
+
+
+def test_feeds_and_details_get_their_cache_policy(client):
+    """Test per-route Cache-Control and surrogate keys"""
+    feed = client.get("/posts")
+    assert "s-maxage=60" in feed.headers["cache-control"]
+    assert "stale-while-revalidate=300" in feed.headers["cache-control"]
+    assert "max-age=0" in feed.headers["cache-control"]
+    assert feed.headers["surrogate-key"] == "posts"
+
+    detail = client.get("/posts/abc")
+    assert "s-maxage=86400" in detail.headers["cache-control"]
+    assert detail.headers["surrogate-key"] == "post:abc"
+    assert detail.headers["cache-tag"] == "post:abc"
+
+    missing = client.get("/posts/missing")
+    assert missing.status_code == 404
+    assert "surrogate-key" not in missing.headers
+
+
+def test_cached_and_not_modified_responses_keep_the_policy(client):
+    """Test that HITs and 304s repeat Cache-Control and surrogate keys"""
+    first = client.get("/posts/abc")
+    hit = client.get("/posts/abc")
+    assert hit.headers["x-cache"] == "HIT"
+    assert hit.headers["cache-control"] == first.headers["cache-control"]
+    assert hit.headers["surrogate-key"] == "post:abc"
+
+    not_modified = client.get("/posts/abc", headers={"If-None-Match": first.headers["etag"]})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["cache-control"] == first.headers["cache-control"]
+    assert not_modified.headers["surrogate-key"] == "post:abc"
+
+
+def test_recent_writers_are_not_stored_by_the_edge(client):
+    """Test that responses for a client with a fresh write are private, no-store"""
+    response = client.get("/posts", headers={READ_YOUR_WRITES_HEADER: f"{time.time():.3f}:100"})
+    assert response.headers["cache-control"] == "private, no-store"
+
+
+@pytest.mark.asyncio
+async def test_purge_dedupes_keys_and_swallows_errors(recording_purge, monkeypatch):
+    """Test that purges are recorded once per key and failures never raise"""
+    post_id = uuid.uuid4()
+    await purge_surrogate_keys(post_keys(post_id) + ["posts"])
+    assert recording_purge.purged == [[f"post:{post_id}", "posts", "map"]]
+
+    async def failing(keys):
+        raise RuntimeError("edge down")
+
+    monkeypatch.setattr(recording_purge, "purge", failing)
+    await purge_surrogate_keys(["posts"])
+
+
+@pytest.mark.asyncio
+async def test_scheduled_purges_do_not_block_the_caller(recording_purge, monkeypatch):
+    """Test that mutations hand the CDN round-trip to a background task"""
+    release = asyncio.Event()
+    record = recording_purge.purge
+
+    async def slow_purge(keys):
+        await release.wait()
+        await record(keys)
+
+    monkeypatch.setattr(recording_purge, "purge", slow_purge)
+    schedule_purge(["posts", "posts", "map"])
+    await asyncio.sleep(0)
+    assert recording_purge.purged == []
+
+    release.set()
+    await drain_purges()
+    assert recording_purge.purged == [["posts", "map"]]
+
+
+@pytest.mark.asyncio
+async def test_cloudflare_hook_purges_by_cache_tag_in_chunks():
+    """Test that the Cloudflare hook sends at most 30 tags per request"""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json={"success": True})
+
+    init_http_client(transport=httpx.MockTransport(handler))
+    try:
+        await CloudflarePurgeHook("zone123", "token").purge([f"post:{i}" for i in range(45)])
+    finally:
+        http_client._client = None
+
+    assert [r.url.path for r in requests] == ["/client/v4/zones/zone123/purge_cache"] * 2
+    assert requests[0].headers["authorization"] == "Bearer token"
+    assert len(httpx.Response(200, content=requests[0].content).json()["tags"]) == 30
+
+
+class FakeResult:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar_one_or_none(self):
+        return self.value
+
+
+class FakeSession:
+    """AsyncSession mínima: devuelve siempre el mismo objeto y registra commits"""
+
+    def __init__(self, obj):
+        self.obj = obj
+        self.commits = 0
+
+    async def execute(self, statement):
+        return FakeResult(self.obj)
+
+    async def commit(self):
+        self.commits += 1
+
+
+def test_post_mutations_purge_edge_and_invalidate_responses(recording_purge, monkeypatch):
+    """Test that deleting a post purges its keys and bumps the posts version"""
+    monkeypatch.setattr(response_cache, "_response_cache", MemoryResponseCache(max_size=10, ttl_seconds=60))
+    post = SimpleNamespace(is_active=True)
+    session = FakeSession(post)
+
+    async def fake_db():
+        yield session
+
+    lazos_app.dependency_overrides[get_async_db] = fake_db
+    try:
+        post_id = uuid.uuid4()
+        response = TestClient(lazos_app).delete(f"/api/v1/posts/{post_id}")
+    finally:
+        lazos_app.dependency_overrides.clear()
+
+    assert response.status_code == 204
+    assert post.is_active is False and session.commits == 1
+    assert recording_purge.purged == [[f"post:{post_id}", "posts", "map"]]
+    assert response_cache._response_cache._versions[POSTS][0] == 1
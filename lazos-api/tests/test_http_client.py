@@ -0,0 +1,80 @@
+"""
+Tests for the shared HTTP client used by the Cloudflare AI validators
+"""
+from io import BytesIO
+
+import httpx
+import pytest
+from PIL import Image
+
+from app.services import http_client
+from app.services.http_client import init_http_client, get_http_client, close_http_client, http_client_request_seconds
+from app.services.image_validation_ai import ImageValidationAI
+from app.services.text_validation_ai import TextValidationAI
+
+
+def make_jpeg() -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", (64, 48), (120, 90, 60)).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def mock_cloudflare():
+    """Shared client backed by httpx.MockTransport emulating Cloudflare AI"""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if "resnet-50" in request.url.path:
+            return httpx.Response(200, json={"result": [{"label": "golden retriever", "score": 0.9}]})
+        if "llama" in request.url.path:
+            return httpx.Response(200, json={"result": {"response": "VALIDO"}})
+        return httpx.Response(404)
+
+    init_http_client(transport=httpx.MockTransport(handler))
+    yield requests
+    http_client._client = None
+
+
+@pytest.mark.asyncio
+async def test_validators_share_one_client(mock_cloudflare):
+    """Test that both validators go through the shared client"""
+    client = get_http_client()
+
+    image_result = await ImageValidationAI("acc", "token").validate_image(make_jpeg())
+    text_result = await TextValidationAI("acc", "token").validate_sighting_text("Lo vi ayer a la tarde cerca del club")
+
+    assert image_result["is_valid"] is True
+    assert image_result["service"] == "cloudflare_ai"
+    assert text_result["is_valid"] is True
+    assert len(mock_cloudflare) == 2
+    assert mock_cloudflare[0].headers["Authorization"] == "Bearer token"
+    assert get_http_client() is client
+
+
+@pytest.mark.asyncio
+async def test_request_latency_is_recorded(mock_cloudflare):
+    """Test that each call is observed in the latency histogram"""
+    before = http_client_request_seconds.snapshot().get("service=cloudflare_image,status=200", {}).get("count", 0)
+
+    await ImageValidationAI("acc", "token").validate_image(make_jpeg())
+
+    after = http_client_request_seconds.snapshot()["service=cloudflare_image,status=200"]["count"]
+    assert after == before + 1
+
+
+@pytest.mark.asyncio
+async def test_network_errors_fall_back(mock_cloudflare):
+    """Test that transport errors keep the validators' fallback behaviour"""
+    def failing(request):
+        raise httpx.ConnectError("boom", request=request)
+
+    init_http_client(transport=httpx.MockTransport(failing))
+
+    assert await ImageValidationAI("acc", "token").validate_image(make_jpeg()) is None
+    text_result = await TextValidationAI("acc", "token").validate_sighting_text("Lo vi ayer a la tarde cerca del club")
+    assert text_result["is_valid"] is True
+
+    await close_http_client()
+    assert http_client._client is None
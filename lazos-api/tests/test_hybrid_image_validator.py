@@ -0,0 +1,90 @@
+"""
+Tests for the hybrid image validator verdict cache
+"""
+import pytest
+
+from app.config import settings
+from app.services import hybrid_image_validator
+from app.services.hybrid_image_validator import HybridImageValidator, nsfw_phase1_seconds
+from app.services.image_verdict_cache import ImageVerdictCache
+
+SUSPICIOUS = {"is_valid": False, "reason": "Alto porcentaje de tonos de piel (70.0%) - posible NSFW", "confidence": 0.7, "service": "python_nsfw"}
+CLEAN = {"is_valid": True, "reason": "Bajo porcentaje de tonos de piel", "confidence": 0.8, "service": "python_nsfw"}
+
+
+class RecordingCloudflare:
+    """Cloudflare validator stand-in that approves and records calls"""
+    endpoint = "https://cloudflare.test"
+
+    def __init__(self):
+        self.calls = 0
+
+    async def validate_image(self, image_bytes):
+        self.calls += 1
+        return {"is_valid": True, "reason": "Imagen apropiada", "confidence": 0.9, "service": "cloudflare_ai"}
+
+
+@pytest.fixture
+def validator(monkeypatch):
+    """Validator with an in-memory verdict cache and a recording phase 1"""
+    monkeypatch.setattr(settings, "IMAGE_VERDICT_CACHE_PERSIST", False)
+    phase1_calls = []
+
+    async def fake_detect(image_bytes):
+        phase1_calls.append(image_bytes)
+        return SUSPICIOUS if image_bytes.startswith(b"skin") else CLEAN
+
+    monkeypatch.setattr(hybrid_image_validator, "detect_nsfw", fake_detect)
+    instance = HybridImageValidator()
+    instance.cloudflare_validator = RecordingCloudflare()
+    instance.verdict_cache = ImageVerdictCache()
+    instance.phase1_calls = phase1_calls
+    return instance
+
+
+@pytest.mark.asyncio
+async def test_identical_images_skip_both_phases(validator):
+    """Test that a re-uploaded image reuses phase 1 and phase 2 verdicts"""
+    first = await validator.validate_all([b"skin-1", b"clean-1"])
+    second = await validator.validate_all([b"skin-1", b"clean-1"])
+
+    assert first == second
+    assert first["is_valid"] is True
+    assert len(validator.phase1_calls) == 2
+    assert validator.cloudflare_validator.calls == 1
+    assert validator.verdict_cache.memory.hit_rate() > 0
+
+
+@pytest.mark.asyncio
+async def test_cached_batches_are_not_timed(validator):
+    """Test that a batch served entirely from the verdict cache adds no phase 1 observation"""
+    await validator.validate_all([b"clean-1", b"clean-2"])
+    timed = nsfw_phase1_seconds.count()
+
+    await validator.validate_all([b"clean-2", b"clean-1"])
+    assert nsfw_phase1_seconds.count() == timed
+
+
+@pytest.mark.asyncio
+async def test_duplicates_in_one_request_validated_once(validator):
+    """Test that duplicated images in the same post are validated once"""
+    result = await validator.validate_all([b"skin-2", b"skin-2", b"skin-2"])
+
+    assert result["is_valid"] is True
+    assert validator.phase1_calls == [b"skin-2"]
+    assert validator.cloudflare_validator.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_cloudflare_failures_are_not_cached(validator):
+    """Test that a failed phase 2 is retried on the next upload"""
+    async def failing(image_bytes):
+        validator.cloudflare_validator.calls += 1
+        return None
+
+    validator.cloudflare_validator.validate_image = failing
+
+    assert (await validator.validate_all([b"skin-3"]))["is_valid"] is False
+    assert (await validator.validate_all([b"skin-3"]))["is_valid"] is False
+    assert validator.cloudflare_validator.calls == 2
+    assert len(validator.phase1_calls) == 1
@@ -0,0 +1,62 @@
+"""
+Tests for image processing service
+"""
+import pytest
+from io import BytesIO
+from PIL import Image
+
+from app.services.image import ImageService
+
+
+def make_image(width: int, height: int, format: str = "PNG") -> bytes:
+    """Create an in-memory test image"""
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), (120, 80, 40)).save(buffer, format=format)
+    return buffer.getvalue()
+
+
+def test_process_upload_returns_jpeg_and_thumbnail():
+    """Test that process_upload resizes the main image and builds a thumbnail"""
+    main, thumb = ImageService.process_upload(make_image(2400, 1200))
+    main_img = Image.open(BytesIO(main))
+    thumb_img = Image.open(BytesIO(thumb))
+    assert main_img.format == "JPEG"
+    assert max(main_img.size) == ImageService.MAX_SIZE
+    assert max(thumb_img.size) == ImageService.THUMBNAIL_SIZE
+
+
+@pytest.mark.asyncio
+async def test_generate_variants_widths_and_formats():
+    """Test that variants are generated for every width and supported format"""
+    variants = await ImageService.generate_variants(
+        make_image(1000, 500), widths=[200, 400, 800, 1600], formats=["webp", "jpeg"]
+    )
+    # 1600 is larger than the original, so the original width is used instead
+    assert sorted({v["width"] for v in variants}) == [200, 400, 800, 1000]
+    assert {v["format"] for v in variants} == {"webp", "jpeg"}
+    for variant in variants:
+        img = Image.open(BytesIO(variant["data"]))
+        assert img.size == (variant["width"], variant["height"])
+        assert variant["height"] == variant["width"] // 2
+
+
+@pytest.mark.asyncio
+async def test_generate_variants_skips_unsupported_formats():
+    """Test that unknown formats are dropped instead of failing"""
+    variants = await ImageService.generate_variants(
+        make_image(300, 300), widths=[200], formats=["jpeg", "bmp"]
+    )
+    assert [(v["width"], v["format"]) for v in variants] == [(200, "jpeg")]
+
+
+def test_build_srcset():
+    """Test srcset strings grouped by format and ordered by width"""
+    srcset = ImageService.build_srcset([
+        {"url": "https://cdn/a/400w.webp", "width": 400, "format": "webp"},
+        {"url": "https://cdn/a/200w.webp", "width": 200, "format": "webp"},
+        {"url": "https://cdn/a/200w.jpg", "width": 200, "format": "jpeg"},
+    ])
+    assert srcset == {
+        "webp": "https://cdn/a/200w.webp 200w, https://cdn/a/400w.webp 400w",
+        "jpeg": "https://cdn/a/200w.jpg 200w",
+    }
@@ -0,0 +1,90 @@
+"""
+Tests for the compact map payload formats (columnar / binary)
+"""
+import uuid
+
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_read_db
+from app.config import settings
+from app.main import app
+from app.models.post import AnimalEnum
+from app.services.map_encoding import BINARY_MEDIA_TYPE, decode_binary, encode_binary, encode_columnar
+
+BASE_URL = "https://cdn.lazos.app"
+DIGEST = "ab" * 32
+
+POSTS = [
+    (uuid.uuid4(), -34.603722, -58.381592, f"{BASE_URL}/posts/{DIGEST}.jpg", AnimalEnum.cat),
+    (uuid.uuid4(), -31.4201, -64.1888, f"{BASE_URL}/posts/{uuid.uuid4()}_thumb.jpg", AnimalEnum.dog),
+    (uuid.uuid4(), -32.89, -68.83, "https://otro.cdn/thumb.jpg", AnimalEnum.other),
+]
+ALERTS = [(uuid.uuid4(), -38.0055, -57.5426, AnimalEnum.dog, "Perro con collar rojo, ñandú")]
+
+
+def test_binary_round_trip_quantizes_coordinates_to_micro_degrees():
+    """Test that the binary payload decodes to the same points (lat/lon at 1e-6)"""
+    decoded = decode_binary(encode_binary(POSTS, ALERTS, BASE_URL))
+
+    assert [p["id"] for p in decoded["posts"]] == [p[0] for p in POSTS]
+    assert [p["thumbnail_url"] for p in decoded["posts"]] == [p[3] for p in POSTS]
+    assert [p["animal_type"] for p in decoded["posts"]] == ["cat", "dog", "other"]
+    for point, (_, lat, lon, *_rest) in zip(decoded["posts"], POSTS):
+        assert abs(point["lat"] - lat) <= 5e-7 and abs(point["lon"] - lon) <= 5e-7
+    assert decoded["alerts"][0]["description"] == ALERTS[0][4]
+    assert decoded["alerts"][0]["id"] == ALERTS[0][0]
+
+
+def test_binary_points_are_fixed_width_and_columnar_is_relative():
+    """Test that content-addressed thumbnails travel as 32-byte digests"""
+    posts = [(uuid.uuid4(), -34.6 + i * 1e-4, -58.4, f"{BASE_URL}/posts/{DIGEST}.jpg", AnimalEnum.dog) for i in range(500)]
+    payload = encode_binary(posts, [], BASE_URL)
+
+    # header + 2 coords + id + digest + tipo por punto + strings
+    assert len(payload) < 16 + 500 * (8 + 16 + 32 + 1) + 200
+    columnar = encode_columnar(posts, [], BASE_URL)
+    assert columnar["base_url"] == BASE_URL
+    assert columnar["posts"]["thumb"][0] == f"posts/{DIGEST}.jpg"
+    assert columnar["posts"]["lat"][1] == -34599900
+    assert columnar["posts"]["id"][0] == posts[0][0].hex
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    def __init__(self, *results):
+        self.results = list(results)
+
+    async def execute(self, statement):
+        return FakeResult(self.results.pop(0))
+
+
+def test_unified_map_points_binary_format(monkeypatch):
+    """Test format=binary on the endpoint (media type, cache headers, truncated descriptions)"""
+    monkeypatch.setattr(settings, "R2_PUBLIC_URL", BASE_URL)
+    session = FakeSession(
+        [POSTS[0]],
+        [(ALERTS[0][0], -38.0, -57.5, AnimalEnum.dog, "x" * 150)],
+    )
+
+    async def fake_db():
+        yield session
+
+    app.dependency_overrides[get_read_db] = fake_db
+    try:
+        response = TestClient(app).get("/api/v1/map/points/unified", params={"format": "binary"})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == BINARY_MEDIA_TYPE
+    assert response.headers["surrogate-key"] == "map"
+    decoded = decode_binary(response.content)
+    assert decoded["posts"][0]["thumbnail_url"] == POSTS[0][3]
+    assert decoded["alerts"][0]["description"] == "x" * 100 + "..."
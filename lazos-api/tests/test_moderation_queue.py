@@ -0,0 +1,109 @@
+"""
+Tests for the post-publish moderation queue
+"""
+import asyncio
+from datetime import datetime, timezone
+from io import BytesIO
+from uuid import uuid4
+
+import pytest
+from PIL import Image
+from sqlalchemy.dialects import postgresql
+
+from app.config import settings
+from app.services import moderation_queue
+from app.services.moderation_queue import (
+    claim_query,
+    retry_delay,
+    run_job,
+    moderation_jobs_total,
+    moderation_queue_depth,
+)
+from app.services.post_pipeline import stage_raw_images
+from app.services.storage import UPLOAD_CACHE_CONTROL
+
+
+def make_job(attempts: int = 1) -> dict:
+    return {
+        "id": uuid4(),
+        "post_id": uuid4(),
+        "upload_keys": ["uploads/a.jpg"],
+        "pending_approval": False,
+        "attempts": attempts,
+        "created_at": datetime.now(timezone.utc),
+    }
+
+
+def test_claim_query_skips_locked_rows():
+    """Test that workers claim jobs with FOR UPDATE SKIP LOCKED"""
+    sql = str(claim_query(datetime.now(timezone.utc)).compile(dialect=postgresql.dialect()))
+
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert "LIMIT" in sql
+
+
+def test_retry_delay_backs_off(monkeypatch):
+    """Test exponential backoff between attempts"""
+    monkeypatch.setattr(settings, "MODERATION_RETRY_BASE_SECONDS", 10)
+
+    assert [retry_delay(n) for n in (1, 2, 3)] == [10, 20, 40]
+
+
+@pytest.mark.asyncio
+async def test_run_job_records_result(monkeypatch):
+    """Test that the job outcome is stored and counted"""
+    completed = []
+
+    async def fake_finalize(post_id, upload_keys, pending_approval):
+        return False
+
+    def fake_complete(job_id, success, attempts, error=None):
+        completed.append((job_id, success, attempts, error))
+        return moderation_queue.QUEUED
+
+    monkeypatch.setattr(moderation_queue, "finalize_direct_upload", fake_finalize)
+    monkeypatch.setattr(moderation_queue, "complete_job", fake_complete)
+    job = make_job()
+    before = moderation_jobs_total.value(status="queued")
+
+    assert await run_job(job) == "queued"
+    assert completed == [(job["id"], False, 1, "Error procesando imágenes")]
+    assert moderation_jobs_total.value(status="queued") == before + 1
+
+
+@pytest.mark.asyncio
+async def test_queue_depth_is_refreshed_during_a_backlog(monkeypatch):
+    """Test that the depth gauge moves while workers are busy, not only when the queue drains"""
+    monkeypatch.setattr(settings, "MODERATION_WORKERS", 1)
+    monkeypatch.setattr(settings, "MODERATION_POLL_SECONDS", 0.01)
+    monkeypatch.setattr(moderation_queue, "claim_job", make_job)
+    monkeypatch.setattr(moderation_queue, "queue_depth", lambda: 42)
+
+    async def slow_job(job):
+        await asyncio.sleep(0.01)
+        return moderation_queue.DONE
+
+    monkeypatch.setattr(moderation_queue, "run_job", slow_job)
+    moderation_queue_depth.set(0)
+    moderation_queue.start_workers()
+    try:
+        await asyncio.sleep(0.1)
+    finally:
+        await moderation_queue.stop_workers()
+
+    assert moderation_queue_depth.value() == 42
+
+
+@pytest.mark.asyncio
+async def test_stage_raw_images_uses_upload_prefix(s3_storage):
+    """Test that async mode stages raw images under uploads/, never cacheable"""
+    buffer = BytesIO()
+    Image.new("RGB", (8, 8)).save(buffer, format="PNG")
+
+    keys = await stage_raw_images([buffer.getvalue()])
+
+    assert len(keys) == 1
+    assert keys[0].startswith("uploads/") and keys[0].endswith(".png")
+    assert s3_storage.get_object_size(keys[0]) == len(buffer.getvalue())
+    head = s3_storage.s3_client.head_object(Bucket=s3_storage.bucket, Key=keys[0])
+    assert head["CacheControl"] == UPLOAD_CACHE_CONTROL
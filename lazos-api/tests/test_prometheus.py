@@ -0,0 +1,146 @@
+"""
+Tests for the Prometheus /metrics endpoint and multi-worker aggregation
+"""
+import os
+import subprocess
+import sys
+
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app as lazos_app
+from app.utils import prometheus
+from app.utils.metrics import Counter, Gauge, Histogram
+
+
+def _state(counter: float, gauge: float, observations):
+    buckets = [0.1, 1.0]
+    return {
+        "test_jobs_total": {"type": "counter", "description": "Jobs", "series": [[[["kind", "a"]], counter]]},
+        "test_queue_depth": {"type": "gauge", "description": "Depth", "series": [[[], gauge]]},
+        "test_job_seconds": {
+            "type": "histogram",
+            "description": "Job latency",
+            "buckets": buckets,
+            "series": [[[], {
+                "count": len(observations),
+                "sum": sum(observations),
+                "buckets": [sum(1 for o in observations if o <= b) for b in buckets],
+            }]],
+        },
+    }
+
+
+def _dead_pid() -> int:
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def test_render_exposition_format():
+    """Test HELP/TYPE lines, label escaping and cumulative histogram buckets"""
+    counter = Counter("test_render_total", "Renders")
+    counter.inc(2, route='/a"b')
+    histogram = Histogram("test_render_seconds", "Render latency", buckets=(0.1, 1.0))
+    histogram.observe(0.05, route="/a")
+    histogram.observe(0.5, route="/a")
+
+    text = prometheus.render({
+        "test_render_total": counter.export(),
+        "test_render_seconds": histogram.export(),
+    })
+    assert "# TYPE test_render_total counter" in text
+    assert 'test_render_total{route="/a\\"b"} 2' in text
+    assert 'test_render_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'test_render_seconds_bucket{route="/a",le="1"} 2' in text
+    assert 'test_render_seconds_bucket{route="/a",le="+Inf"} 2' in text
+    assert 'test_render_seconds_count{route="/a"} 2' in text
+
+
+def test_merge_sums_workers_and_drops_dead_gauges():
+    """Test that counters/histograms add up across workers and gauges keep only live pids"""
+    live, dead = os.getpid(), _dead_pid()
+    merged = prometheus.merge([
+        (live, "", _state(3, 2, [0.05, 0.5])),
+        (dead, "", _state(4, 7, [2.0])),
+    ])
+    text = prometheus.render(merged)
+
+    assert 'test_jobs_total{kind="a"} 7' in text
+    assert f'test_queue_depth{{pid="{live}"}} 2' in text
+    assert f'pid="{dead}"' not in text
+    assert 'test_job_seconds_bucket{le="1"} 2' in text
+    assert 'test_job_seconds_bucket{le="+Inf"} 3' in text
+    assert "test_job_seconds_sum 2.55" in text
+
+
+def test_multiprocess_directory(tmp_path):
+    """Test that /metrics text includes the states dumped by other workers"""
+    gauge = Gauge("test_multiproc_inflight", "In flight")
+    gauge.set(1)
+    other = _dead_pid()
+    (tmp_path / f"{other}.json").write_bytes(
+        prometheus.orjson.dumps({"pid": other, "metrics": _state(5, 9, [0.2])})
+    )
+    (tmp_path / "broken.json").write_text("{")
+
+    text = prometheus.render_metrics(str(tmp_path))
+    assert (tmp_path / prometheus.state_filename()).exists()
+    assert 'test_jobs_total{kind="a"} 5' in text
+    assert f'test_multiproc_inflight{{pid="{os.getpid()}"}} 1' in text
+
+
+def test_prune_stale_keeps_the_current_generation(tmp_path):
+    """Test that startup/shutdown drop dead workers' files from previous deploys only"""
+    previous, recycled = _dead_pid(), _dead_pid()
+    (tmp_path / f"{previous}.json").write_bytes(
+        prometheus.orjson.dumps({"pid": previous, "generation": "old-deploy", "metrics": _state(5, 9, [0.2])})
+    )
+    (tmp_path / f"{previous}.json.tmp").write_text("{")
+    (tmp_path / f"{recycled}.json").write_bytes(prometheus.orjson.dumps(
+        {"pid": recycled, "generation": prometheus.generation(), "metrics": _state(2, 1, [0.2])}
+    ))
+    prometheus.write_state(str(tmp_path))
+
+    assert prometheus.prune_stale(str(tmp_path)) == 2
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted([f"{recycled}.json", prometheus.state_filename()])
+    assert 'test_jobs_total{kind="a"} 2' in prometheus.render_metrics(str(tmp_path))
+
+
+def test_recycled_pid_keeps_the_dead_workers_counters(tmp_path):
+    """Test that a new process reusing a dead worker's pid neither overwrites nor revives its file"""
+    pid = os.getpid()
+    stale = f"{pid}-1.json"  # mismo pid, arrancado en otro instante (worker muerto)
+    (tmp_path / stale).write_bytes(prometheus.orjson.dumps(
+        {"pid": pid, "started": "1", "generation": prometheus.generation(), "metrics": _state(5, 9, [0.2])}
+    ))
+
+    text = prometheus.render_metrics(str(tmp_path))
+    assert prometheus.state_filename() != stale
+    assert (tmp_path / stale).exists()
+    assert 'test_jobs_total{kind="a"} 5' in text
+    assert f'test_queue_depth{{pid="{pid}"}}' not in text
+
+    assert prometheus.prune_stale(str(tmp_path)) == 0
+    assert 'test_jobs_total{kind="a"} 5' in prometheus.render_metrics(str(tmp_path))
+
+
+def test_metrics_endpoint(monkeypatch):
+    """Test the endpoint on the real app: disabled without token, 401 with a wrong one"""
+    client = TestClient(lazos_app)
+    client.get("/health")
+
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "")
+    assert client.get("/metrics").status_code == 404
+
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-me")
+    assert client.get("/metrics").status_code == 401
+    response = client.get("/metrics", headers={"Authorization": "Bearer scrape-me"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'http_request_duration_seconds_count{method="GET",route="/health",status="200"}' in response.text
+    assert "# TYPE db_pool_checkout_seconds histogram" in response.text
+    assert "# TYPE storage_put_seconds histogram" in response.text
+    assert "# TYPE cloudflare_ai_fallbacks_total counter" in response.text
+    assert "# TYPE nsfw_phase1_seconds histogram" in response.text
+    assert "# TYPE email_queue_depth gauge" in response.text
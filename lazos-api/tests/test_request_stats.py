@@ -0,0 +1,68 @@
+"""
+Tests for per-request instrumentation (query counters, stage spans, Server-Timing)
+"""
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.middleware import RequestTimingMiddleware
+from app.middleware.timing import http_request_queries, request_query_alarms_total
+from app.utils.request_stats import instrument_queries, stage
+
+
+@pytest.fixture
+def client():
+    engine = create_engine("sqlite://")
+    instrument_queries(engine)
+    app = FastAPI()
+    app.add_middleware(RequestTimingMiddleware, log_stats=True, query_alarm=3)
+
+    @app.get("/items/{count}")
+    async def items(count: int):
+        with stage("nsfw"):
+            with engine.connect() as connection:
+                for _ in range(count):
+                    connection.execute(text("SELECT 1"))
+        return {"ok": True}
+
+    yield TestClient(app), engine
+    engine.dispose()
+
+
+def test_server_timing_reports_queries_and_stages(client, caplog):
+    """Test the Server-Timing header and the structured log line"""
+    client, _ = client
+    caplog.set_level(logging.INFO, logger="app.middleware.timing")
+
+    response = client.get("/items/2")
+    server_timing = response.headers["server-timing"]
+    assert 'desc="2 queries"' in server_timing
+    assert "nsfw;dur=" in server_timing
+    assert "total;dur=" in server_timing
+    assert http_request_queries.count(method="GET", route="/items/{count}", status=200) >= 1
+    assert any('"queries":2' in record.message and '"route":"/items/{count}"' in record.message for record in caplog.records)
+
+
+def test_query_alarm_flags_n_plus_one_requests(client, caplog):
+    """Test that requests above the query threshold log a warning and count an alarm"""
+    client, _ = client
+    before = request_query_alarms_total.value(route="/items/{count}")
+
+    client.get("/items/3")
+    assert request_query_alarms_total.value(route="/items/{count}") == before
+
+    with caplog.at_level(logging.WARNING, logger="app.middleware.timing"):
+        client.get("/items/5")
+    assert request_query_alarms_total.value(route="/items/{count}") == before + 1
+    assert any("5 queries (> 3)" in record.message for record in caplog.records)
+
+
+def test_queries_outside_requests_are_ignored(client):
+    """Test that workers and scripts (no request context) run queries normally"""
+    _, engine = client
+    with stage("process"):
+        with engine.connect() as connection:
+            assert connection.execute(text("SELECT 1")).scalar() == 1
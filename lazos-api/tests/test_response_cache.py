@@ -0,0 +1,227 @@
+"""
+Tests for the public-read response cache (ETag / Last-Modified / 304)
+"""
+import asyncio
+import time
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.db_router import READ_YOUR_WRITES_HEADER
+from app.middleware import ResponseCacheMiddleware
+from app.services import response_cache
+from app.services.response_cache import MemoryResponseCache, RedisResponseCache, POSTS, ALERTS
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request, monkeypatch):
+    if request.param == "memory":
+        cache = MemoryResponseCache(max_size=100, ttl_seconds=60)
+    else:
+        cache = RedisResponseCache(fakeredis.aioredis.FakeRedis(server=fakeredis.FakeServer()), ttl_seconds=60)
+    monkeypatch.setattr(response_cache, "_response_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def api(backend):
+    """App mínima: cuenta cuántas veces se ejecuta cada handler (= queries a la base)"""
+    app = FastAPI()
+    app.add_middleware(ResponseCacheMiddleware, routes={"/api/v1/posts": (POSTS,), "/api/v1/map": (POSTS, ALERTS)})
+    calls = {"posts": 0, "map": 0}
+
+    @app.get("/api/v1/posts")
+    async def list_posts(page: int = 1, limit: int = 20):
+        calls["posts"] += 1
+        return {"page": page, "limit": limit, "calls": calls["posts"]}
+
+    @app.post("/api/v1/posts")
+    async def create_post():
+        await response_cache.invalidate(POSTS)
+        return {"ok": True}
+
+    @app.get("/api/v1/posts/{post_id}")
+    async def get_post(post_id: int):
+        raise HTTPException(status_code=404, detail="Post no encontrado")
+
+    @app.get("/api/v1/map/points")
+    async def map_points():
+        calls["map"] += 1
+        return {"calls": calls["map"]}
+
+    # Un solo event loop para todos los requests (el cliente de Redis queda atado a él)
+    with TestClient(app) as client:
+        yield client, calls
+
+
+def test_repeated_reads_are_served_from_cache(api):
+    """Test that the second identical GET does not run the handler"""
+    client, calls = api
+    first = client.get("/api/v1/posts?page=1&limit=20")
+    assert first.headers["x-cache"] == "MISS"
+    assert first.headers["cache-control"] == "no-cache"
+    assert "last-modified" in first.headers
+
+    # Mismos params en otro orden: misma entrada
+    second = client.get("/api/v1/posts?limit=20&page=1")
+    assert second.headers["x-cache"] == "HIT"
+    assert second.json() == first.json()
+    assert second.headers["etag"] == first.headers["etag"]
+    assert calls["posts"] == 1
+
+
+def test_if_none_match_returns_304_without_running_handler(api):
+    """Test conditional GET with the current ETag"""
+    client, calls = api
+    etag = client.get("/api/v1/posts").headers["etag"]
+
+    response = client.get("/api/v1/posts", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert calls["posts"] == 1
+
+    last_modified = client.get("/api/v1/posts").headers["last-modified"]
+    response = client.get("/api/v1/posts", headers={"If-Modified-Since": last_modified})
+    assert response.status_code == 304
+
+
+def test_conditionals_for_unknown_urls_reach_the_app(api):
+    """Test that a key without a stored response never gets a 304 (unknown id, bad params)"""
+    client, calls = api
+    last_modified = client.get("/api/v1/posts").headers["last-modified"]
+
+    assert client.get("/api/v1/posts/999", headers={"If-None-Match": "*"}).status_code == 404
+    assert client.get("/api/v1/posts/999", headers={"If-Modified-Since": last_modified}).status_code == 404
+    assert client.get("/api/v1/posts?page=x", headers={"If-Modified-Since": last_modified}).status_code == 422
+
+
+def test_store_grace_counts_from_the_last_invalidation(monkeypatch):
+    """Test that an epoch rollover does not reopen the no-store grace window"""
+    now = [960_000.0]  # inicio de una época de 60s, sin escrituras
+    monkeypatch.setattr(response_cache.time, "time", lambda: now[0])
+    monkeypatch.setattr(response_cache, "_response_cache", MemoryResponseCache(max_size=10, ttl_seconds=60))
+    app = FastAPI()
+    app.add_middleware(ResponseCacheMiddleware, routes={"/api/v1/posts": (POSTS,)}, store_grace_seconds=5)
+
+    @app.get("/api/v1/posts")
+    async def list_posts():
+        return {"ok": True}
+
+    @app.post("/api/v1/posts")
+    async def create_post():
+        await response_cache.invalidate(POSTS)
+        return {"ok": True}
+
+    with TestClient(app) as client:
+        client.get("/api/v1/posts")
+        assert client.get("/api/v1/posts").headers["x-cache"] == "HIT"
+
+        client.post("/api/v1/posts")
+        client.get("/api/v1/posts")
+        assert client.get("/api/v1/posts").headers["x-cache"] == "MISS"
+
+        now[0] += 5
+        client.get("/api/v1/posts")
+        assert client.get("/api/v1/posts").headers["x-cache"] == "HIT"
+
+
+def test_mutations_invalidate_dependent_routes(api):
+    """Test that a write changes the ETag of every route depending on the table"""
+    client, calls = api
+    posts_etag = client.get("/api/v1/posts").headers["etag"]
+    map_etag = client.get("/api/v1/map/points").headers["etag"]
+
+    assert client.post("/api/v1/posts").status_code == 200
+
+    response = client.get("/api/v1/posts", headers={"If-None-Match": posts_etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != posts_etag
+    assert response.json()["calls"] == 2
+    assert client.get("/api/v1/map/points", headers={"If-None-Match": map_etag}).status_code == 200
+
+
+def test_backend_errors_bypass_the_cache(api, backend, monkeypatch):
+    """Test that an unavailable backend degrades to uncached responses"""
+    client, calls = api
+
+    async def broken(tables):
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(backend, "table_state", broken)
+    response = client.get("/api/v1/posts")
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+    assert calls["posts"] == 1
+
+
+def test_recent_writers_bypass_the_cache(api):
+    """Test that a client echoing a fresh read-your-writes token never gets a cached copy or a 304"""
+    client, calls = api
+    etag = client.get("/api/v1/posts").headers["etag"]
+    token = {READ_YOUR_WRITES_HEADER: f"{time.time():.3f}:100"}
+
+    response = client.get("/api/v1/posts", headers={**token, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert "x-cache" not in response.headers
+    assert calls["posts"] == 2
+
+    expired = {READ_YOUR_WRITES_HEADER: f"{time.time() - 3600:.3f}:100"}
+    assert client.get("/api/v1/posts", headers=expired).headers["x-cache"] == "HIT"
+
+
+@pytest.mark.asyncio
+async def test_redis_versions_survive_a_flush_without_reusing_etags():
+    """Test that an emptied Redis starts from a clock-based version, not 0"""
+    redis = fakeredis.aioredis.FakeRedis(server=fakeredis.FakeServer())
+    cache = RedisResponseCache(redis, ttl_seconds=60)
+
+    token = (await cache.table_state([POSTS])).token
+    await cache.invalidate([POSTS])
+    bumped = (await cache.table_state([POSTS])).token
+    assert int(bumped) == int(token) + 1
+
+    await redis.flushall()
+    await asyncio.sleep(0.01)
+    fresh = (await cache.table_state([POSTS])).token
+    assert fresh not in (token, bumped)
+
+
+@pytest.mark.asyncio
+async def test_redis_write_in_one_process_invalidates_the_others_etag():
+    """Test that two workers sharing Redis agree on versions after a write"""
+    server = fakeredis.FakeServer()
+    worker_a = RedisResponseCache(fakeredis.aioredis.FakeRedis(server=server), ttl_seconds=60)
+    worker_b = RedisResponseCache(fakeredis.aioredis.FakeRedis(server=server), ttl_seconds=60)
+
+    token_b = (await worker_b.table_state([POSTS])).token
+    etag = response_cache.make_etag("posts", token_b)
+    await worker_a.invalidate([POSTS])
+
+    token_b = (await worker_b.table_state([POSTS])).token
+    assert response_cache.make_etag("posts", token_b) != etag
+
+
+@pytest.mark.asyncio
+async def test_memory_etags_expire_with_the_ttl_epoch(monkeypatch):
+    """Test that a worker that never saw a write stops answering 304 after one TTL"""
+    now = [960_000.0]  # inicio de una época de 60s
+    monkeypatch.setattr(response_cache.time, "time", lambda: now[0])
+    worker_a = MemoryResponseCache(max_size=10, ttl_seconds=60)
+    worker_b = MemoryResponseCache(max_size=10, ttl_seconds=60)
+
+    token_b, modified_b, _ = await worker_b.table_state([POSTS])
+    etag = response_cache.make_etag("posts", token_b)
+    await worker_a.invalidate([POSTS])
+
+    # Dentro de la misma época B no se enteró de la escritura de A
+    now[0] += 30
+    assert (await worker_b.table_state([POSTS]))[0] == token_b
+
+    now[0] += 60
+    token_b, modified, _ = await worker_b.table_state([POSTS])
+    assert response_cache.make_etag("posts", token_b) != etag
+    assert modified > modified_b
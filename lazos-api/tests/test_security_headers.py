@@ -0,0 +1,61 @@
+"""
+Tests for the pure-ASGI security headers and request timing middleware
+"""
+from fastapi import BackgroundTasks, FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.main import app as lazos_app
+from app.middleware import RequestTimingMiddleware, SecurityHeadersMiddleware
+from app.middleware.timing import http_request_duration_seconds
+
+
+def test_app_responses_carry_security_headers():
+    """Test the headers on the real app, including errors"""
+    client = TestClient(lazos_app)
+    for path in ["/health", "/does-not-exist"]:
+        response = client.get(path)
+        assert response.headers["x-content-type-options"] == "nosniff"
+        assert response.headers["x-frame-options"] == "DENY"
+        assert response.headers["permissions-policy"] == "geolocation=(self)"
+        assert response.headers["x-response-time"].endswith("ms")
+
+
+def test_streaming_and_background_tasks_survive_the_stack():
+    """Test that streamed bodies and background tasks work through the middlewares"""
+    app = FastAPI()
+    app.add_middleware(SecurityHeadersMiddleware)
+    app.add_middleware(RequestTimingMiddleware)
+    done = []
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for i in range(3):
+                yield f"{i}\n".encode()
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    @app.post("/items/{item_id}")
+    async def create(item_id: int, background_tasks: BackgroundTasks):
+        background_tasks.add_task(done.append, item_id)
+        return {"ok": True}
+
+    @app.get("/boom")
+    async def boom():
+        raise HTTPException(status_code=418, detail="teapot")
+
+    client = TestClient(app)
+    response = client.get("/stream")
+    assert response.text == "0\n1\n2\n"
+    assert response.headers["x-frame-options"] == "DENY"
+
+    assert client.post("/items/7").status_code == 200
+    assert done == [7]
+
+    before = http_request_duration_seconds.count(method="POST", route="/items/{item_id}", status=200)
+    client.post("/items/8")
+    assert http_request_duration_seconds.count(method="POST", route="/items/{item_id}", status=200) == before + 1
+
+    client.get("/boom")
+    assert http_request_duration_seconds.count(method="GET", route="/boom", status=418) >= 1
@@ -0,0 +1,92 @@
+"""
+Tests for the trusted (orjson, no re-validation) JSON path of hot read endpoints
+"""
+import json
+import uuid
+from datetime import date, datetime, timezone
+
+from fastapi import Response
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_read_db
+from app.api.responses import trusted_json
+from app.api.routes.map import UnifiedMapPointsResponse
+from app.main import app
+from app.models.post import AnimalEnum, SexEnum, SizeEnum
+from app.schemas.post import PostListResponse, PostResponse
+
+
+def test_trusted_json_matches_the_validated_response_model():
+    """Test that orjson output equals pydantic's for a feed page (enums, UUIDs, UTC datetimes)"""
+    post = {
+        "id": uuid.uuid4(),
+        "image_url": "https://cdn/a.webp",
+        "thumbnail_url": "https://cdn/a_thumb.webp",
+        "sex": SexEnum.female,
+        "size": SizeEnum.large,
+        "animal_type": AnimalEnum.cat,
+        "description": "Gata tricolor con collar",
+        "location_name": "Calle 1, Palermo, CABA",
+        "latitude": -34.588,
+        "longitude": -58.43,
+        "sighting_date": date(2024, 5, 1),
+        "created_at": datetime(2024, 5, 1, 12, 30, 5, 123456, tzinfo=timezone.utc),
+        "is_active": True,
+        "srcset": None,
+    }
+    # Los dicts de las rutas deben tener exactamente los campos del schema
+    assert set(post) == set(PostResponse.model_fields)
+
+    content = {"data": [post], "meta": {"page": 1}, "available_filters": {}}
+    response = Response(headers={"Cache-Control": "public, s-maxage=60"})
+    trusted = trusted_json(content, response)
+
+    assert json.loads(trusted.body) == json.loads(PostListResponse(**content).model_dump_json())
+    assert trusted.headers["cache-control"] == "public, s-maxage=60"
+    assert trusted.headers["content-type"] == "application/json"
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """AsyncSession mínima: devuelve los resultados en el orden de las queries"""
+
+    def __init__(self, *results):
+        self.results = list(results)
+
+    async def execute(self, statement):
+        return FakeResult(self.results.pop(0))
+
+
+def test_unified_map_points_serializes_rows_without_orm_objects():
+    """Test that map rows (id, lat, lon, ...) come out as the documented schema, with cache headers"""
+    post_id, alert_id = uuid.uuid4(), uuid.uuid4()
+    session = FakeSession(
+        [(post_id, -34.6, -58.4, "https://cdn/t.webp", AnimalEnum.dog)],
+        [(alert_id, -31.4, -64.2, AnimalEnum.cat, "x" * 150)],
+    )
+
+    async def fake_db():
+        yield session
+
+    app.dependency_overrides[get_read_db] = fake_db
+    try:
+        response = TestClient(app).get("/api/v1/map/points/unified", params={"limit": 10})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body == json.loads(UnifiedMapPointsResponse(**body).model_dump_json())
+    assert body["posts"] == [
+        {"id": str(post_id), "lat": -34.6, "lon": -58.4, "thumbnail_url": "https://cdn/t.webp", "animal_type": "dog"}
+    ]
+    assert body["alerts"][0]["description"] == "x" * 100 + "..."
+    assert "s-maxage" in response.headers["cache-control"]
+    assert response.headers["surrogate-key"] == "map"
@@ -0,0 +1,126 @@
+"""
+Tests for slow-query capture, sampled EXPLAIN and the admin endpoint
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.config import settings
+from app.main import app as lazos_app
+from app.middleware import RequestTimingMiddleware
+from app.utils.slow_queries import SlowQueryLog, explainable
+
+
+class FakeExplainEngine:
+    """Async engine mínimo: devuelve un plan fijo y guarda lo que se ejecutó"""
+
+    def __init__(self, driver: str):
+        self.dialect = SimpleNamespace(driver=driver)
+        self.executed = []
+
+    def connect(self):
+        engine = self
+
+        class Connection:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            async def exec_driver_sql(self, statement, parameters):
+                engine.executed.append((statement, parameters))
+                return [("Seq Scan on posts  (actual time=0.01..120.5 rows=20 loops=1)",), ("  Buffers: shared hit=42",)]
+
+        return Connection()
+
+
+@pytest.fixture
+def slow_log():
+    engine = create_engine("sqlite://")
+    slow_query_log = SlowQueryLog(threshold_ms=0, size=3)
+    slow_query_log.instrument(engine)
+    yield slow_query_log, engine
+    engine.dispose()
+
+
+def test_captures_statement_parameters_and_route(slow_log):
+    """Test that captures carry the bound parameters and the route template"""
+    slow_query_log, engine = slow_log
+    app = FastAPI()
+    app.add_middleware(RequestTimingMiddleware)
+
+    @app.get("/posts/{post_id}")
+    def get_post(post_id: int):
+        with engine.connect() as connection:
+            connection.execute(text("SELECT :post_id AS id"), {"post_id": post_id})
+        return {"ok": True}
+
+    TestClient(app).get("/posts/7")
+    entry = slow_query_log.entries()[0]
+    assert entry["route"] == "/posts/{post_id}"
+    assert entry["method"] == "GET"
+    assert entry["statement"] == "SELECT ? AS id"
+    assert entry["parameters"] == ["7"]
+    assert entry["explain"] is None
+
+
+def test_ring_buffer_and_shapes(slow_log):
+    """Test that old captures are dropped and repeated shapes are grouped"""
+    slow_query_log, engine = slow_log
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        for value in range(3):
+            connection.execute(text("SELECT :value"), {"value": "x" * 500 if value == 2 else value})
+
+    entries = slow_query_log.entries()
+    assert len(entries) == 3
+    assert entries[0]["parameters"][0].endswith("…")
+    assert entries[0]["route"] == "background"
+    shapes = slow_query_log.shapes()
+    assert len(shapes) == 1 and shapes[0]["count"] == 3
+
+
+def test_explainable_only_plain_reads():
+    """Test that EXPLAIN ANALYZE is never run for statements with side effects"""
+    assert explainable("SELECT posts.id FROM posts WHERE posts.is_active = $1")
+    assert not explainable("UPDATE posts SET is_active = false")
+    assert not explainable("SELECT * FROM moderation_jobs FOR UPDATE SKIP LOCKED")
+    assert not explainable("WITH moved AS (DELETE FROM alerts RETURNING *) SELECT * FROM moved")
+
+
+@pytest.mark.asyncio
+async def test_sampled_explain_runs_in_background():
+    """Test the sampled EXPLAIN on a separate engine with the original parameters"""
+    slow_query_log = SlowQueryLog(threshold_ms=0, explain_sample_rate=1.0)
+    explain_engine = FakeExplainEngine("asyncpg")
+    slow_query_log.set_explain_engine(explain_engine)
+
+    entry = slow_query_log.record("SELECT * FROM posts WHERE id = $1", ("abc",), 0.3, "asyncpg")
+    assert entry["explain"] == "pending"
+    # Otro driver (engine sync, psycopg2): formato de parámetros distinto, no se explica
+    other = slow_query_log.record("SELECT * FROM posts WHERE id = %(id)s", {"id": "abc"}, 0.3, "psycopg2")
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+    assert explain_engine.executed == [("EXPLAIN (ANALYZE, BUFFERS) SELECT * FROM posts WHERE id = $1", ("abc",))]
+    assert "Buffers: shared hit=42" in entry["explain"]
+    assert other["explain"] is None
+    shapes = {shape["statement"]: shape for shape in slow_query_log.shapes()}
+    assert "Seq Scan" in shapes["SELECT * FROM posts WHERE id = $1"]["explain"]
+
+
+def test_admin_endpoint_requires_password(monkeypatch):
+    """Test GET/DELETE /admin/slow-queries behind verify_admin_password"""
+    monkeypatch.setattr(settings, "ADMIN_PASSWORD", "secret")
+    client = TestClient(lazos_app)
+
+    assert client.get("/api/v1/admin/slow-queries").status_code == 401
+    response = client.get("/api/v1/admin/slow-queries", headers={"X-Admin-Password": "secret"})
+    assert response.status_code == 200
+    assert set(response.json()) == {"enabled", "threshold_ms", "shapes", "entries"}
+    assert client.delete("/api/v1/admin/slow-queries", headers={"X-Admin-Password": "secret"}).status_code == 204
@@ -0,0 +1,125 @@
+"""
+Tests for StorageService batch uploads (moto S3 stand-in)
+"""
+import pytest
+from botocore.exceptions import ClientError
+
+from app.config import settings
+from app.services.storage import content_key, storage_put_retries_total, IMMUTABLE_CACHE_CONTROL
+
+
+def keys_in_bucket(service) -> set:
+    response = service.s3_client.list_objects_v2(Bucket=service.bucket)
+    return {obj["Key"] for obj in response.get("Contents", [])}
+
+
+def client_error(code: str) -> ClientError:
+    return ClientError({"Error": {"Code": code, "Message": code}}, "PutObject")
+
+
+@pytest.mark.asyncio
+async def test_upload_images_uploads_all_objects(s3_storage):
+    """Test that images, thumbnails and variants are uploaded in one batch"""
+    variants = [[{"width": 200, "height": 100, "format": "webp", "content_type": "image/webp", "data": b"v"}]]
+    image_urls, uploaded_variants = await s3_storage.upload_images([(b"main", b"thumb")], variants)
+
+    image_url, thumb_url = image_urls[0]
+    assert image_url.startswith("https://cdn.test/posts/")
+    assert image_url.endswith(content_key(b"main", "jpg"))
+    assert uploaded_variants[0][0]["url"].endswith(content_key(b"v", "webp"))
+    assert uploaded_variants[0][0]["size_bytes"] == 1
+    assert len(keys_in_bucket(s3_storage)) == 3
+
+
+@pytest.mark.asyncio
+async def test_upload_objects_cleans_up_on_failure(s3_storage, monkeypatch):
+    """Test that a failure mid-batch deletes the per-request uploads/ objects already uploaded"""
+    original_put = s3_storage.s3_client.put_object
+
+    def failing_put(**kwargs):
+        if kwargs["Key"] == "uploads/bad.jpg":
+            raise client_error("AccessDenied")
+        return original_put(**kwargs)
+
+    monkeypatch.setattr(s3_storage.s3_client, "put_object", failing_put)
+
+    with pytest.raises(Exception, match="uploads/bad.jpg"):
+        await s3_storage.upload_objects([
+            ("uploads/ok1.jpg", b"1", "image/jpeg"),
+            ("uploads/bad.jpg", b"2", "image/jpeg"),
+            ("uploads/ok2.jpg", b"3", "image/jpeg"),
+        ], skip_existing=False)
+
+    assert keys_in_bucket(s3_storage) == set()
+
+
+@pytest.mark.asyncio
+async def test_put_retries_transient_errors(s3_storage, monkeypatch):
+    """Test that transient errors are retried with backoff"""
+    monkeypatch.setattr(settings, "STORAGE_RETRY_BASE_DELAY", 0.001)
+    original_put = s3_storage.s3_client.put_object
+    calls = {"count": 0}
+
+    def flaky_put(**kwargs):
+        calls["count"] += 1
+        if calls["count"] < 3:
+            raise client_error("SlowDown")
+        return original_put(**kwargs)
+
+    monkeypatch.setattr(s3_storage.s3_client, "put_object", flaky_put)
+    retries_before = storage_put_retries_total.value()
+
+    await s3_storage.upload_objects([("posts/flaky.jpg", b"x", "image/jpeg")])
+
+    assert calls["count"] == 3
+    assert storage_put_retries_total.value() == retries_before + 2
+    assert keys_in_bucket(s3_storage) == {"posts/flaky.jpg"}
+
+
+@pytest.mark.asyncio
+async def test_upload_images_deduplicates_content(s3_storage, monkeypatch):
+    """Test that identical content maps to the same key and is uploaded once"""
+    first_urls, _ = await s3_storage.upload_images([(b"same", b"thumb")])
+
+    # Nuevo proceso: sin índice local, la existencia se resuelve con HEAD
+    s3_storage._known_keys.clear()
+    puts = []
+    original_put = s3_storage.s3_client.put_object
+
+    def recording_put(**kwargs):
+        puts.append(kwargs["Key"])
+        return original_put(**kwargs)
+
+    monkeypatch.setattr(s3_storage.s3_client, "put_object", recording_put)
+
+    second_urls, _ = await s3_storage.upload_images([(b"same", b"thumb"), (b"same", b"thumb")])
+
+    assert second_urls == first_urls * 2
+    assert puts == []
+    head = s3_storage.s3_client.head_object(Bucket=s3_storage.bucket, Key=content_key(b"same", "jpg"))
+    assert head["CacheControl"] == IMMUTABLE_CACHE_CONTROL
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_keeps_content_addressed_objects(s3_storage, monkeypatch):
+    """Test that cleanup never deletes posts/ objects another request may have deduplicated against"""
+    await s3_storage.upload_objects([("posts/shared.jpg", b"1", "image/jpeg")])
+    original_put = s3_storage.s3_client.put_object
+
+    def failing_put(**kwargs):
+        if kwargs["Key"] == "posts/bad.jpg":
+            raise client_error("AccessDenied")
+        return original_put(**kwargs)
+
+    monkeypatch.setattr(s3_storage.s3_client, "put_object", failing_put)
+
+    with pytest.raises(Exception):
+        await s3_storage.upload_objects([
+            ("posts/shared.jpg", b"1", "image/jpeg"),
+            ("posts/new.jpg", b"2", "image/jpeg"),
+            ("posts/bad.jpg", b"3", "image/jpeg"),
+        ])
+
+    assert keys_in_bucket(s3_storage) == {"posts/shared.jpg", "posts/new.jpg"}
+    # Sigue en el índice local: un request concurrente que deduplique contra ella apunta a un objeto que existe
+    assert "posts/new.jpg" in s3_storage._known_keys
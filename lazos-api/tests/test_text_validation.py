@@ -0,0 +1,124 @@
+"""
+Tests for the text validation fast path (local classifier + verdict cache)
+"""
+import json
+from pathlib import Path
+
+import httpx
+import pytest
+
+from app.services import http_client, text_validation_ai
+from app.services.http_client import init_http_client
+from app.services.text_validation_ai import (
+    TextValidationAI,
+    normalize_text,
+    classify_locally,
+    evaluate_local_classifier,
+    text_validation_decisions_total,
+)
+
+
+@pytest.fixture
+def llama_calls():
+    """Shared client answering like Llama-3 on Cloudflare AI, recording calls"""
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if len(calls) == 1 and request.headers.get("x-fail"):
+            return httpx.Response(500)
+        return httpx.Response(200, json={"result": {"response": "VALIDO"}})
+
+    init_http_client(transport=httpx.MockTransport(handler))
+    yield calls
+    http_client._client = None
+
+
+def test_normalize_text():
+    """Test that case, whitespace and trailing punctuation are normalized"""
+    assert normalize_text("  Perro SUELTO\ten la   esquina!! ") == "perro suelto en la esquina"
+
+
+@pytest.mark.asyncio
+async def test_repeated_text_uses_cached_verdict(llama_calls):
+    """Test that equivalent texts call the model only once"""
+    validator = TextValidationAI("acc", "token")
+
+    first = await validator.validate_sighting_text("Lo vi ayer a la tarde cerca del club")
+    second = await validator.validate_sighting_text("lo vi  ayer a la tarde cerca del CLUB.")
+
+    assert first == second
+    assert first["is_valid"] is True
+    assert len(llama_calls) == 1
+    assert validator.verdict_cache.hit_rate() > 0
+
+
+def test_prompt_version_changes_key(monkeypatch):
+    """Test that bumping the prompt version invalidates cached verdicts"""
+    validator = TextValidationAI("acc", "token")
+    key = validator.cache_key("Perro suelto en la esquina")
+
+    monkeypatch.setattr(text_validation_ai, "PROMPT_VERSION", "v2")
+
+    assert validator.cache_key("Perro suelto en la esquina") != key
+
+
+@pytest.mark.asyncio
+async def test_api_errors_are_not_cached(llama_calls):
+    """Test that fallback verdicts from API errors are not cached"""
+    validator = TextValidationAI("acc", "token")
+    http_client.get_http_client().headers["x-fail"] = "1"
+
+    error_result = await validator.validate_sighting_text("Andaba dando vueltas por el club")
+    ok_result = await validator.validate_sighting_text("Andaba dando vueltas por el club")
+
+    assert error_result["reason"] == "API error"
+    assert ok_result["reason"] == "Aprobado por IA"
+    assert len(llama_calls) == 2
+
+
+def load_samples():
+    path = Path(__file__).parent / "fixtures" / "text_validation_samples.json"
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def test_local_classifier_agrees_with_hand_labels():
+    """
+    Test the local pre-classifier against the fixture's labels.
+
+    The fixture is labeled by hand, so this checks agreement with those labels,
+    not with the LLM's verdicts.
+    """
+    report = evaluate_local_classifier(load_samples())
+
+    assert report["avoided_fraction"] >= 0.5
+    assert report["agreement"] >= 0.95
+
+
+def test_local_classifier_escalates_ambiguous_text():
+    """Test that texts without clear signals are left to the LLM"""
+    assert classify_locally("Perro suelto en la esquina")["is_valid"] is True
+    assert classify_locally("prueba prueba")["is_valid"] is False
+    assert classify_locally("Lo vi ayer a la tarde cerca del club") is None
+
+
+def test_local_classifier_never_approves_sales_or_gibberish():
+    """Test that animal words do not auto-approve sale ads or keyword-stuffed gibberish"""
+    assert classify_locally("Vendo perro de raza, llamar 11-5555-4444") is None
+    assert classify_locally("Cachorros caniche en venta, precio $15000") is None
+    assert classify_locally("Perro suelto en la calle asdkjh qwpzk xcvbnm") is None
+    assert classify_locally("Vendo bicicleta usada en buen estado")["is_valid"] is False
+    assert classify_locally("Perro negro frente a la construcción de la esquina")["is_valid"] is True
+
+
+@pytest.mark.asyncio
+async def test_obvious_text_skips_llm(llama_calls):
+    """Test that locally decided texts never reach Cloudflare AI"""
+    validator = TextValidationAI("acc", "token")
+    before = text_validation_decisions_total.value(source="local_valid")
+
+    result = await validator.validate_sighting_text("Gato gris en la plaza central")
+
+    assert result["is_valid"] is True
+    assert llama_calls == []
+    assert text_validation_decisions_total.value(source="local_valid") == before + 1
@@ -0,0 +1,107 @@
+"""
+Tests for streaming upload ingestion and request body limits
+"""
+import pytest
+from io import BytesIO
+from PIL import Image
+from fastapi import UploadFile
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.middleware import BodySizeLimitMiddleware
+from app.services.upload_ingestion import (
+    read_upload,
+    sniff_image_format,
+    UploadBudget,
+    UploadTooLargeError,
+    UnsupportedImageError,
+)
+
+
+def make_upload(data: bytes, filename: str = "foto.jpg") -> UploadFile:
+    return UploadFile(file=BytesIO(data), filename=filename)
+
+
+def make_jpeg(width: int = 64, height: int = 64) -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), (10, 20, 30)).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+def test_sniff_image_format():
+    """Test magic byte detection for accepted formats"""
+    assert sniff_image_format(make_jpeg()) == "jpeg"
+    assert sniff_image_format(b"\x89PNG\r\n\x1a\n" + b"\x00" * 8) == "png"
+    assert sniff_image_format(b"RIFF\x00\x00\x00\x00WEBPVP8 ") == "webp"
+    assert sniff_image_format(b"%PDF-1.7 ...") is None
+
+
+@pytest.mark.asyncio
+async def test_read_upload_returns_bytes():
+    """Test that a valid image is read completely"""
+    data = make_jpeg()
+    assert await read_upload(make_upload(data)) == data
+
+
+@pytest.mark.asyncio
+async def test_read_upload_rejects_non_image_on_first_chunk():
+    """Test that non-image content is rejected by its magic bytes"""
+    with pytest.raises(UnsupportedImageError):
+        await read_upload(make_upload(b"MZ" + b"\x00" * 1024, "virus.exe"))
+
+
+@pytest.mark.asyncio
+async def test_read_upload_enforces_file_limit():
+    """Test that the per-file limit aborts the read"""
+    data = make_jpeg() + b"\x00" * 2_000_000
+    upload = make_upload(data)
+    with pytest.raises(UploadTooLargeError):
+        await read_upload(upload, max_bytes=100_000)
+    # Corta apenas pasa el límite, sin leer (ni copiar) el resto del archivo
+    assert upload.file.tell() <= 100_000 + 64 * 1024
+
+
+@pytest.mark.asyncio
+async def test_read_upload_enforces_request_budget():
+    """Test that the per-request budget is shared across files"""
+    data = make_jpeg()
+    budget = UploadBudget(int(len(data) * 1.5))
+    await read_upload(make_upload(data), budget=budget)
+    with pytest.raises(UploadTooLargeError):
+        await read_upload(make_upload(data), budget=budget)
+
+
+async def echo_length(request: Request):
+    body = await request.body()
+    return JSONResponse({"size": len(body)})
+
+
+limited_app = Starlette(routes=[Route("/upload", echo_length, methods=["POST"])])
+limited_app.add_middleware(BodySizeLimitMiddleware, max_bytes=1000)
+limited_client = TestClient(limited_app)
+
+
+def test_body_limit_allows_small_requests():
+    """Test that requests under the limit pass through"""
+    response = limited_client.post("/upload", content=b"x" * 500)
+    assert response.status_code == 200
+    assert response.json() == {"size": 500}
+
+
+def test_body_limit_rejects_by_content_length():
+    """Test that an oversized Content-Length is rejected without reading"""
+    response = limited_client.post("/upload", content=b"x" * 5000)
+    assert response.status_code == 413
+
+
+def test_body_limit_rejects_chunked_stream():
+    """Test that chunked bodies are cut once they exceed the limit"""
+    def chunks():
+        for _ in range(10):
+            yield b"x" * 300
+
+    response = limited_client.post("/upload", content=chunks())
+    assert response.status_code == 413
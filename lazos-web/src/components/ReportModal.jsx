@@ -1,6 +1,6 @@
 import { useState } from 'react'
 import { X, AlertTriangle } from 'lucide-react'
-import { API_URL } from '@/config/api'
+import { API_URL, apiFetch } from '@/config/api'
 
 const REPORT_REASONS = [
   { value: 'not_animal', label: 'No es un animal' },
@@ -30,7 +30,7 @@ export default function ReportModal({ postId, alertId, isOpen, onClose }) {
     setError(null)
 
     try {
-      const response = await fetch(`${API_URL}/api/v1/reports`, {
+      const response = await apiFetch(`${API_URL}/api/v1/reports`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
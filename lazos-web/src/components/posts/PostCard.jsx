@@ -23,6 +23,9 @@ const animalLabels = {
   other: 'Otro',
 }
 
+// Ancho aproximado de la card en el grid (para elegir variante del srcset)
+const cardImageSizes = '(max-width: 768px) 50vw, 300px'
+
 export default function PostCard({ post, onClick }) {
   const navigate = useNavigate()
   const [isExpanded, setIsExpanded] = useState(false)
@@ -93,14 +96,25 @@ export default function PostCard({ post, onClick }) {
     >
       {/* Imagen */}
       <div className="relative aspect-square bg-muted">
-        <img
-          src={post.thumbnail_url}
-          alt={`${animalLabels[post.animal_type]} ${sizeLabels[post.size]}`}
-          className="w-full h-full object-cover"
-          onLoad={() => handleImageLoad(post.id, post.thumbnail_url)}
-          onError={(e) => handleImageError(e, post.id, post.thumbnail_url)}
-          loading="lazy"
-        />
+        <picture>
+          {/* Variantes responsive: el navegador elige el archivo más chico adecuado */}
+          {post.srcset?.avif && (
+            <source type="image/avif" srcSet={post.srcset.avif} sizes={cardImageSizes} />
+          )}
+          {post.srcset?.webp && (
+            <source type="image/webp" srcSet={post.srcset.webp} sizes={cardImageSizes} />
+          )}
+          <img
+            src={post.thumbnail_url}
+            srcSet={post.srcset?.jpeg}
+            sizes={cardImageSizes}
+            alt={`${animalLabels[post.animal_type]} ${sizeLabels[post.size]}`}
+            className="w-full h-full object-cover"
+            onLoad={() => handleImageLoad(post.id, post.thumbnail_url)}
+            onError={(e) => handleImageError(e, post.id, post.thumbnail_url)}
+            loading="lazy"
+          />
+        </picture>
 
         {/* Indicador de múltiples imágenes */}
         {imageCount > 1 && (
@@ -12,8 +12,59 @@ export const GEOREF_API_URL = 'https://apis.datos.gob.ar/georef/api'
 // OpenStreetMap Nominatim (public geocoding service - OK to hardcode)
 export const NOMINATIM_API_URL = 'https://nominatim.openstreetmap.org'
 
+// Read-your-writes: after a write the API answers with X-Last-Write. Echoing it on the
+// next requests makes the API read from a replica that already has our change (or from
+// the primary). A header and not a cookie: the API is on another site than the frontend.
+const LAST_WRITE_HEADER = 'X-Last-Write'
+const LAST_WRITE_KEY = 'lazos_last_write'
+const LAST_WRITE_TTL_MS = 60_000 // >= READ_YOUR_WRITES_SECONDS on the API (30 by default)
+
+function readLastWrite() {
+  try {
+    const stored = JSON.parse(sessionStorage.getItem(LAST_WRITE_KEY))
+    return stored && Date.now() - stored.receivedAt < LAST_WRITE_TTL_MS ? stored.value : null
+  } catch {
+    return null
+  }
+}
+
+function storeLastWrite(value) {
+  try {
+    sessionStorage.setItem(LAST_WRITE_KEY, JSON.stringify({ value, receivedAt: Date.now() }))
+  } catch {
+    // Storage unavailable (private mode): read-your-writes just doesn't apply
+  }
+}
+
+/**
+ * fetch() for LAZOS API calls: sends and keeps the read-your-writes header.
+ * While a write is fresh, GETs also carry it in the query string so the CDN
+ * (which doesn't vary on the header) misses and the API answers with our change.
+ */
+export async function apiFetch(url, options = {}) {
+  const headers = new Headers(options.headers)
+  const lastWrite = readLastWrite()
+  let target = url
+  let fetchOptions = options
+  if (lastWrite) {
+    headers.set(LAST_WRITE_HEADER, lastWrite)
+    if ((options.method || 'GET').toUpperCase() === 'GET') {
+      const busted = new URL(url, window.location.href)
+      busted.searchParams.set('_rw', lastWrite)
+      target = busted.toString()
+      fetchOptions = { ...options, cache: 'no-store' }
+    }
+  }
+
+  const response = await fetch(target, { ...fetchOptions, headers })
+  const written = response.headers.get(LAST_WRITE_HEADER)
+  if (written) storeLastWrite(written)
+  return response
+}
+
 export default {
   API_URL,
   GEOREF_API_URL,
   NOMINATIM_API_URL,
+  apiFetch,
 }
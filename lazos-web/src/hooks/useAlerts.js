@@ -1,5 +1,5 @@
 import { useState, useEffect, useCallback } from 'react'
-import { API_URL } from '@/config/api'
+import { API_URL, apiFetch } from '@/config/api'
 
 export function useAlerts(filters = {}) {
   const [alerts, setAlerts] = useState([])
@@ -20,7 +20,7 @@ export function useAlerts(filters = {}) {
         if (filters.animal_type) params.append('animal_type', filters.animal_type)
 
         const url = `${API_URL}/api/v1/alerts${params.toString() ? `?${params.toString()}` : ''}`
-        const response = await fetch(url)
+        const response = await apiFetch(url)
 
         if (!response.ok) {
           throw new Error(`Error fetching alerts: ${response.status}`)
@@ -1,5 +1,5 @@
 import { useState, useEffect, useCallback } from 'react'
-import { API_URL } from '@/config/api'
+import { API_URL, apiFetch } from '@/config/api'
 
 export function usePosts(filters = {}) {
   const [posts, setPosts] = useState([])
@@ -22,7 +22,7 @@ export function usePosts(filters = {}) {
           }
         })
 
-        const response = await fetch(`${API_URL}/api/v1/posts?${params}`)
+        const response = await apiFetch(`${API_URL}/api/v1/posts?${params}`)
 
         if (!response.ok) {
           throw new Error(`Error ${response.status}: ${response.statusText}`)
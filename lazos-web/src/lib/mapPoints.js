@@ -0,0 +1,104 @@
+/**
+ * Decoder del formato binario de /api/v1/map/points/unified?format=binary
+ *
+ * El layout está documentado en lazos-api/app/services/map_encoding.py.
+ * Las columnas numéricas se leen como vistas (Int32Array / Uint8Array) sobre
+ * el mismo ArrayBuffer: no se crea un objeto por punto. Ids, thumbnails y
+ * descripciones se arman recién cuando se piden (al abrir un popup).
+ */
+
+const MAGIC = 'LZMP'
+const VERSION = 1
+const HEADER_BYTES = 16
+export const COORD_SCALE = 1e6
+
+const hex = (bytes, start, length) => {
+  let out = ''
+  for (let i = start; i < start + length; i++) {
+    out += bytes[i].toString(16).padStart(2, '0')
+  }
+  return out
+}
+
+const uuid = (bytes, start) => {
+  const h = hex(bytes, start, 16)
+  return `${h.slice(0, 8)}-${h.slice(8, 12)}-${h.slice(12, 16)}-${h.slice(16, 20)}-${h.slice(20)}`
+}
+
+export function decodeMapPoints(buffer) {
+  const view = new DataView(buffer)
+  const bytes = new Uint8Array(buffer)
+  const magic = String.fromCharCode(...bytes.subarray(0, 4))
+  const version = view.getUint16(4, true)
+  if (magic !== MAGIC || version !== VERSION) {
+    throw new Error(`Formato de mapa no soportado: ${magic} v${version}`)
+  }
+  const n = view.getUint32(8, true)
+  const m = view.getUint32(12, true)
+
+  // Int32Array usa el orden de bytes de la plataforma (little-endian en todos los navegadores)
+  let offset = HEADER_BYTES
+  const int32 = (count) => {
+    const column = new Int32Array(buffer, offset, count)
+    offset += 4 * count
+    return column
+  }
+  const postLat = int32(n)
+  const postLon = int32(n)
+  const alertLat = int32(m)
+  const alertLon = int32(m)
+  const postIds = offset
+  const alertIds = postIds + 16 * n
+  const thumbDigests = alertIds + 16 * m
+  const postTypes = bytes.subarray(thumbDigests + 32 * n, thumbDigests + 32 * n + n)
+  const alertTypes = bytes.subarray(thumbDigests + 33 * n, thumbDigests + 33 * n + m)
+  const strings = JSON.parse(new TextDecoder().decode(bytes.subarray(thumbDigests + 33 * n + m)))
+
+  const withBase = (key) =>
+    /^https?:\/\//.test(key) || !strings.base_url ? key : `${strings.base_url}/${key}`
+
+  return {
+    posts: {
+      count: n,
+      lat: postLat,
+      lon: postLon,
+      types: postTypes,
+      id: (i) => uuid(bytes, postIds + 16 * i),
+      animalType: (i) => strings.animal_types[postTypes[i]],
+      thumbnailUrl: (i) =>
+        withBase(strings.thumbnails[i] ?? `posts/${hex(bytes, thumbDigests + 32 * i, 32)}.jpg`),
+    },
+    alerts: {
+      count: m,
+      lat: alertLat,
+      lon: alertLon,
+      types: alertTypes,
+      id: (i) => uuid(bytes, alertIds + 16 * i),
+      animalType: (i) => strings.animal_types[alertTypes[i]],
+      description: (i) => strings.descriptions[i],
+    },
+  }
+}
+
+export const EMPTY_MAP_POINTS = {
+  posts: { count: 0, lat: new Int32Array(0), lon: new Int32Array(0) },
+  alerts: { count: 0, lat: new Int32Array(0), lon: new Int32Array(0) },
+}
+
+/** Bounds [[minLat, minLon], [maxLat, maxLon]] de todas las columnas, o null si no hay puntos */
+export function mapPointsBounds({ posts, alerts }) {
+  let minLat = Infinity, minLon = Infinity, maxLat = -Infinity, maxLon = -Infinity
+  for (const { count, lat, lon } of [posts, alerts]) {
+    for (let i = 0; i < count; i++) {
+      if (lat[i] < minLat) minLat = lat[i]
+      if (lat[i] > maxLat) maxLat = lat[i]
+      if (lon[i] < minLon) minLon = lon[i]
+      if (lon[i] > maxLon) maxLon = lon[i]
+    }
+  }
+  if (minLat === Infinity) return null
+  return [
+    [minLat / COORD_SCALE, minLon / COORD_SCALE],
+    [maxLat / COORD_SCALE, maxLon / COORD_SCALE],
+  ]
+}
@@ -1,7 +1,7 @@
 import { useState, useEffect } from 'react'
 import { AlertTriangle, Trash2, CheckCircle, TrendingUp, Eye, FileText } from 'lucide-react'
 
-import { API_URL } from '@/config/api'
+import { API_URL, apiFetch } from '@/config/api'
 
 const REASON_LABELS = {
   not_animal: 'No es un animal',
@@ -72,7 +72,7 @@ export default function Admin() {
     setError(null)
 
     try {
-      const response = await fetch(`${API_URL}/api/v1/admin/reports?resolved=false`, {
+      const response = await apiFetch(`${API_URL}/api/v1/admin/reports?resolved=false`, {
         headers: {
           'X-Admin-Password': password
         }
@@ -100,7 +100,7 @@ export default function Admin() {
 
   const fetchStats = async () => {
     try {
-      const response = await fetch(`${API_URL}/api/v1/admin/stats`, {
+      const response = await apiFetch(`${API_URL}/api/v1/admin/stats`, {
         headers: {
           'X-Admin-Password': password
         }
@@ -120,7 +120,7 @@ export default function Admin() {
     setError(null)
 
     try {
-      const response = await fetch(`${API_URL}/api/v1/admin/pending`, {
+      const response = await apiFetch(`${API_URL}/api/v1/admin/pending`, {
         headers: {
           'X-Admin-Password': password
         }
@@ -158,7 +158,7 @@ export default function Admin() {
     setProcessingIds(prev => new Set([...prev, reportId]))
 
     try {
-      const response = await fetch(`${API_URL}/api/v1/admin/posts/${postId}`, {
+      const response = await apiFetch(`${API_URL}/api/v1/admin/posts/${postId}`, {
         method: 'DELETE',
         headers: {
           'X-Admin-Password': password
@@ -192,7 +192,7 @@ export default function Admin() {
     setProcessingIds(prev => new Set([...prev, reportId]))
 
     try {
-      const response = await fetch(`${API_URL}/api/v1/admin/alerts/${alertId}`, {
+      const response = await apiFetch(`${API_URL}/api/v1/admin/alerts/${alertId}`, {
         method: 'DELETE',
         headers: {
           'X-Admin-Password': password
@@ -222,7 +222,7 @@ export default function Admin() {
     setProcessingIds(prev => new Set([...prev, reportId]))
 
     try {
-      const response = await fetch(`${API_URL}/api/v1/admin/reports/${reportId}/resolve`, {
+      const response = await apiFetch(`${API_URL}/api/v1/admin/reports/${reportId}/resolve`, {
         method: 'POST',
         headers: {
           'X-Admin-Password': password
@@ -254,7 +254,7 @@ export default function Admin() {
     setProcessingIds(prev => new Set(prev).add(postId))
 
     try {
-      const response = await fetch(`${API_URL}/api/v1/admin/pending/${postId}/approve`, {
+      const response = await apiFetch(`${API_URL}/api/v1/admin/pending/${postId}/approve`, {
         method: 'POST',
         headers: {
           'X-Admin-Password': password
@@ -293,7 +293,7 @@ export default function Admin() {
         ? `${API_URL}/api/v1/admin/pending/${postId}/reject?reason=${encodeURIComponent(reason)}`
         : `${API_URL}/api/v1/admin/pending/${postId}/reject`
 
-      const response = await fetch(url, {
+      const response = await apiFetch(url, {
         method: 'POST',
         headers: {
           'X-Admin-Password': password
@@ -603,14 +603,6 @@ export default function Admin() {
                           >
                             {processingIds.has(post.id) ? 'Procesando...' : 'Rechazar'}
                           </button>
-                          <a
-                            href={`/post/${post.id}`}
-                            target="_blank"
-                            rel="noopener noreferrer"
-                            className="px-4 py-2 bg-muted hover:bg-muted/80 text-card-foreground rounded-md text-sm font-medium text-center transition-colors"
-                          >
-                            Ver detalle
-                          </a>
                         </div>
                       </div>
                     </div>
@@ -5,7 +5,7 @@ import { Button } from '@/components/ui/button'
 import { MapPin, ArrowLeft, AlertTriangle, Clock, Navigation } from 'lucide-react'
 import ReportModal from '@/components/ReportModal'
 
-import { API_URL } from '@/config/api'
+import { API_URL, apiFetch } from '@/config/api'
 
 // Animal type labels and emojis
 const animalEmojis = {
@@ -53,7 +53,7 @@ export default function AlertDetail() {
         setLoading(true)
         setError(null)
 
-        const response = await fetch(`${API_URL}/api/v1/alerts/${id}`)
+        const response = await apiFetch(`${API_URL}/api/v1/alerts/${id}`)
 
         if (!response.ok) {
           if (response.status === 404) {
@@ -5,7 +5,8 @@ import L from 'leaflet'
 import 'leaflet/dist/leaflet.css'
 import { Locate, Filter, X } from 'lucide-react'
 
-import { API_URL } from '@/config/api'
+import { API_URL, apiFetch } from '@/config/api'
+import { decodeMapPoints, mapPointsBounds, EMPTY_MAP_POINTS, COORD_SCALE } from '@/lib/mapPoints'
 
 // Fix Leaflet default icon issue with Vite
 delete L.Icon.Default.prototype._getIconUrl
@@ -36,22 +37,15 @@ const animalLabels = {
 }
 
 // Component to fit map bounds to all markers
-function FitBounds({ posts, alerts }) {
+function FitBounds({ points }) {
   const map = useMap()
 
   useEffect(() => {
-    if (posts.length > 0 || alerts.length > 0) {
-      const allPoints = [
-        ...posts.map(p => [p.lat, p.lon]),
-        ...alerts.map(a => [a.lat, a.lon])
-      ]
-
-      if (allPoints.length > 0) {
-        const bounds = L.latLngBounds(allPoints)
-        map.fitBounds(bounds, { padding: [50, 50] })
-      }
+    const bounds = mapPointsBounds(points)
+    if (bounds) {
+      map.fitBounds(L.latLngBounds(bounds), { padding: [50, 50] })
     }
-  }, [posts, alerts, map])
+  }, [points, map])
 
   return null
 }
@@ -83,8 +77,8 @@ function LocationButton({ onLocate }) {
 
 export default function Map() {
   const navigate = useNavigate()
-  const [posts, setPosts] = useState([])
-  const [alerts, setAlerts] = useState([])
+  // Columnas del formato binario (ver lib/mapPoints.js)
+  const [points, setPoints] = useState(EMPTY_MAP_POINTS)
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState(null)
   const [showFilters, setShowFilters] = useState(false)
@@ -106,20 +100,18 @@ export default function Map() {
     setError(null)
 
     try {
-      const params = new URLSearchParams()
+      const params = new URLSearchParams({ format: 'binary' })
       if (filters.animal_type) {
         params.append('animal_type', filters.animal_type)
       }
 
-      const response = await fetch(`${API_URL}/api/v1/map/points/unified?${params}`)
+      const response = await apiFetch(`${API_URL}/api/v1/map/points/unified?${params}`)
 
       if (!response.ok) {
         throw new Error('Error al cargar puntos del mapa')
       }
 
-      const data = await response.json()
-      setPosts(data.posts || [])
-      setAlerts(data.alerts || [])
+      setPoints(decodeMapPoints(await response.arrayBuffer()))
     } catch (err) {
       console.error('Error fetching map points:', err)
       setError(err.message)
@@ -177,24 +169,24 @@ export default function Map() {
         />
 
         {/* Auto-fit bounds to show all markers */}
-        <FitBounds posts={posts} alerts={alerts} />
+        <FitBounds points={points} />
 
         {/* Post Markers */}
-          {posts.map((post) => (
+          {Array.from({ length: points.posts.count }, (_, i) => (
             <Marker
-              key={`post-${post.id}`}
-              position={[post.lat, post.lon]}
+              key={`post-${i}`}
+              position={[points.posts.lat[i] / COORD_SCALE, points.posts.lon[i] / COORD_SCALE]}
               icon={postIcon}
             >
               <Popup>
                 <div className="max-w-[200px]">
                   <div
                     className="cursor-pointer mb-2"
-                    onClick={() => navigate(`/post/${post.id}`)}
+                    onClick={() => navigate(`/post/${points.posts.id(i)}`)}
                   >
                     <div className="flex gap-2 mb-2">
                       <img
-                        src={post.thumbnail_url}
+                        src={points.posts.thumbnailUrl(i)}
                         alt="Post"
                         className="w-16 h-16 object-cover rounded"
                         onError={(e) => {
@@ -203,7 +195,7 @@ export default function Map() {
                       />
                       <div>
                         <p className="font-semibold text-sm">
-                          {animalLabels[post.animal_type]}
+                          {animalLabels[points.posts.animalType(i)]}
                         </p>
                         <p className="text-xs text-muted-foreground">Post</p>
                       </div>
@@ -218,25 +210,25 @@ export default function Map() {
           ))}
 
           {/* Alert Markers */}
-          {alerts.map((alert) => (
+          {Array.from({ length: points.alerts.count }, (_, i) => (
             <Marker
-              key={`alert-${alert.id}`}
-              position={[alert.lat, alert.lon]}
+              key={`alert-${i}`}
+              position={[points.alerts.lat[i] / COORD_SCALE, points.alerts.lon[i] / COORD_SCALE]}
               icon={alertIcon}
             >
               <Popup>
                 <div className="max-w-[200px]">
                   <div
                     className="cursor-pointer mb-2"
-                    onClick={() => navigate(`/avisos/${alert.id}`)}
+                    onClick={() => navigate(`/avisos/${points.alerts.id(i)}`)}
                   >
                     <div className="mb-2">
                       <p className="font-semibold text-sm">
-                        {animalLabels[alert.animal_type]}
+                        {animalLabels[points.alerts.animalType(i)]}
                       </p>
                       <p className="text-xs text-muted-foreground mb-2">Aviso rápido</p>
                       <p className="text-xs text-foreground line-clamp-2">
-                        {alert.description}
+                        {points.alerts.description(i)}
                       </p>
                     </div>
                     <p className="text-xs text-primary hover:underline">
@@ -342,11 +334,11 @@ export default function Map() {
         <div className="space-y-1">
           <div className="flex items-center gap-2">
             <div className="w-4 h-4 bg-[#ff6b35] rounded-full border-2 border-card shadow"></div>
-            <span className="text-xs text-card-foreground">Posts ({posts.length})</span>
+            <span className="text-xs text-card-foreground">Posts ({points.posts.count})</span>
           </div>
           <div className="flex items-center gap-2">
             <div className="w-4 h-4 bg-[#ffd93d] rounded-full border-2 border-card shadow"></div>
-            <span className="text-xs text-card-foreground">Avisos ({alerts.length})</span>
+            <span className="text-xs text-card-foreground">Avisos ({points.alerts.count})</span>
           </div>
         </div>
       </div>
@@ -7,7 +7,7 @@ import { Textarea } from '@/components/ui/textarea'
 import { Select } from '@/components/ui/select'
 import { MapPin, Loader2, X } from 'lucide-react'
 import { validateText, sanitizeText } from '@/utils/validateText'
-import { API_URL, NOMINATIM_API_URL } from '@/config/api'
+import { API_URL, NOMINATIM_API_URL, apiFetch } from '@/config/api'
 
 export default function NewAlert() {
   const navigate = useNavigate()
@@ -291,7 +291,7 @@ export default function NewAlert() {
 
       console.log('📦 [FRONTEND] Datos del aviso:', alertData)
 
-      const response = await fetch(`${API_URL}/api/v1/alerts`, {
+      const response = await apiFetch(`${API_URL}/api/v1/alerts`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -8,7 +8,7 @@ import { Select } from '@/components/ui/select'
 import { Camera, MapPin, Loader2, X, AlertTriangle } from 'lucide-react'
 import { useContentValidation } from '@/hooks/useContentValidation'
 import { validateText, sanitizeText } from '@/utils/validateText'
-import { API_URL, GEOREF_API_URL, NOMINATIM_API_URL } from '@/config/api'
+import { API_URL, GEOREF_API_URL, NOMINATIM_API_URL, apiFetch } from '@/config/api'
 
 export default function NewPost() {
   const navigate = useNavigate()
@@ -475,7 +475,7 @@ export default function NewPost() {
 
       // Submit to API
       console.log('🚀 [FRONTEND] Enviando POST a:', `${API_URL}/api/v1/posts`)
-      const response = await fetch(`${API_URL}/api/v1/posts`, {
+      const response = await apiFetch(`${API_URL}/api/v1/posts`, {
         method: 'POST',
         body: formDataToSend,
       })
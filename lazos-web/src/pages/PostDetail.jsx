@@ -5,7 +5,7 @@ import { Button } from '@/components/ui/button'
 import { MapPin, ChevronLeft, ChevronRight, ArrowLeft, AlertTriangle } from 'lucide-react'
 import ReportModal from '@/components/ReportModal'
 
-import { API_URL } from '@/config/api'
+import { API_URL, apiFetch } from '@/config/api'
 
 // Iconos de sexo
 const SexIcon = ({ sex }) => {
@@ -172,7 +172,7 @@ export default function PostDetail() {
         setLoading(true)
         setError(null)
 
-        const response = await fetch(`${API_URL}/api/v1/posts/${id}`)
+        const response = await apiFetch(`${API_URL}/api/v1/posts/${id}`)
 
         if (!response.ok) {
           if (response.status === 404) {
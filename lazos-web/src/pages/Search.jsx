@@ -4,7 +4,7 @@ import { Search as SearchIcon, MapPin, Calendar, X } from 'lucide-react'
 import { Card, CardContent } from '@/components/ui/card'
 import { Button } from '@/components/ui/button'
 
-import { API_URL } from '@/config/api'
+import { API_URL, apiFetch } from '@/config/api'
 
 // Animal type labels
 const animalLabels = {
@@ -67,7 +67,7 @@ export default function Search() {
         type: type
       })
 
-      const response = await fetch(`${API_URL}/api/v1/search?${params}`)
+      const response = await apiFetch(`${API_URL}/api/v1/search?${params}`)
 
       if (!response.ok) {
         throw new Error('Error al realizar la búsqueda')